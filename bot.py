@@ -198,6 +198,15 @@ async def graceful_shutdown():  # sourcery skip: use-named-expression
         # 停止所有异步任务
         await async_task_manager.stop_and_wait_all_tasks()
 
+        # 刷出写后缓冲中尚未落库的消息、人物信息与表情包使用记录
+        from src.common.database.message_write_buffer import message_write_buffer
+        from src.emoji_system.emoji_manager import emoji_manager
+        from src.person_info.person_info import flush_person_info_cache
+
+        message_write_buffer.close()
+        flush_person_info_cache()
+        emoji_manager.flush_emoji_usage()
+
         # 获取所有剩余任务，排除当前任务
         remaining_tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
 
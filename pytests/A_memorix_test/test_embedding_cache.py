@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+try:
+    from src.A_memorix.core.embedding.api_adapter import EmbeddingAPIAdapter
+    from src.A_memorix.core.embedding.cache import EmbeddingCache, get_shared_embedding_cache
+except SystemExit as exc:
+    EmbeddingCache = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def _vec(value: float, dim: int = 4) -> np.ndarray:
+    return np.full(dim, value, dtype=np.float32)
+
+
+def test_lru_is_bounded_by_entries_and_bytes() -> None:
+    cache = EmbeddingCache(max_entries=2)
+    cache.put_many("m", 4, ["a", "b"], [_vec(1), _vec(2)])
+    cache.get_many("m", 4, ["a"])
+    cache.put_many("m", 4, ["c"], [_vec(3)])
+
+    assert [v is None for v in cache.get_many("m", 4, ["a", "b", "c"])] == [False, True, False]
+
+    small = EmbeddingCache(max_bytes=4 * 2 * 3)  # float16: 3 个 4 维向量
+    small.put_many("m", 4, ["a", "b", "c", "d"], [_vec(i) for i in range(4)])
+    assert len(small) == 3 and small.get_stats()["evictions"] == 1
+
+
+def test_keys_normalize_text_and_separate_model_and_dimension() -> None:
+    cache = EmbeddingCache()
+    cache.put_many("m", 4, ["hello   world"], [_vec(1)])
+
+    hit, other_model, other_dim = (
+        cache.get_many("m", 4, [" hello world "])[0],
+        cache.get_many("n", 4, ["hello world"])[0],
+        cache.get_many("m", 8, ["hello world"])[0],
+    )
+
+    assert hit is not None and hit.dtype == np.float32
+    assert other_model is None and other_dim is None
+    assert cache.get_stats()["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_disk_backed_cache_survives_restart_and_warms_hot_keys(tmp_path: Path) -> None:
+    path = tmp_path / "embedding_cache.db"
+    first = EmbeddingCache(path)
+    first.put_many("m", 4, ["hot", "cold"], [_vec(1.5), _vec(2.5)])
+    for _ in range(3):
+        first.get_many("m", 4, ["hot"])
+    first.close()
+
+    warmed = EmbeddingCache(path)
+    assert warmed.warmup(limit=1) == 1
+    assert warmed.get_many("m", 4, ["hot"])[0] is not None
+    assert warmed.get_stats()["memory_hits"] == 1
+
+    restored = warmed.get_many("m", 4, ["cold"])[0]
+    np.testing.assert_allclose(restored, _vec(2.5))
+    assert warmed.get_stats()["disk_hits"] == 1
+
+
+def test_shared_cache_stays_persistent_until_last_holder_closes(tmp_path: Path) -> None:
+    path = tmp_path / "embedding_cache.db"
+    first = get_shared_embedding_cache(path)
+    second = get_shared_embedding_cache(path)
+    assert first is second
+
+    first.close()
+    assert second.persistent
+    second.close()
+    assert not second.persistent
+
+    reopened = get_shared_embedding_cache(path)
+    assert reopened is not first
+    assert reopened.persistent
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_adapter_reuses_injected_cache_across_instances(monkeypatch) -> None:
+    cache = EmbeddingCache()
+    calls: list[list[str]] = []
+
+    def build() -> EmbeddingAPIAdapter:
+        adapter = EmbeddingAPIAdapter(default_dimension=4, cache=cache)
+        adapter._dimension, adapter._dimension_detected = 4, True
+
+        async def fake_detect_dimension() -> int:
+            return 4
+
+        async def fake_get_embeddings_direct(texts: list[str], dimensions: int | None = None):
+            del dimensions
+            calls.append(list(texts))
+            return [_vec(float(len(text))) for text in texts]
+
+        monkeypatch.setattr(adapter, "_detect_dimension", fake_detect_dimension)
+        monkeypatch.setattr(adapter, "_get_embeddings_direct", fake_get_embeddings_direct)
+        return adapter
+
+    await build().encode(["a", "bb"])
+    second = build()
+    embeddings = await second.encode(["bb", "ccc"])
+
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert embeddings[0][0] == 2.0 and embeddings[1][0] == 3.0
+    assert second.get_model_info()["cache"]["memory_hits"] == 1
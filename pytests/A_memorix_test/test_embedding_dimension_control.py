@@ -7,6 +7,7 @@ import pytest
 
 from A_memorix.core.embedding import api_adapter as api_adapter_module
 from A_memorix.core.embedding.api_adapter import EmbeddingAPIAdapter
+from src.llm_models.exceptions import RespNotOkException
 from A_memorix.core.utils.runtime_self_check import run_embedding_runtime_self_check
 
 
@@ -175,13 +176,16 @@ async def test_encode_batch_keeps_batch_local_indexes_when_cache_hits_previous_b
     async def fake_detect_dimension() -> int:
         return 4
 
-    async def fake_get_embedding_direct(text: str, dimensions: int | None = None):
+    async def fake_get_embeddings_direct(texts: list[str], dimensions: int | None = None):
         del dimensions
-        base = float(ord(str(text)[0]))
-        return [base, base + 1.0, base + 2.0, base + 3.0]
+        vectors = []
+        for text in texts:
+            base = float(ord(str(text)[0]))
+            vectors.append(np.array([base, base + 1.0, base + 2.0, base + 3.0], dtype=np.float32))
+        return vectors
 
     monkeypatch.setattr(adapter, "_detect_dimension", fake_detect_dimension)
-    monkeypatch.setattr(adapter, "_get_embedding_direct", fake_get_embedding_direct)
+    monkeypatch.setattr(adapter, "_get_embeddings_direct", fake_get_embeddings_direct)
 
     embeddings = await adapter.encode(["A", "B", "A", "C"], batch_size=2)
 
@@ -189,3 +193,73 @@ async def test_encode_batch_keeps_batch_local_indexes_when_cache_hits_previous_b
     assert np.array_equal(embeddings[0], embeddings[2])
     assert embeddings[1][0] == float(ord("B"))
     assert embeddings[3][0] == float(ord("C"))
+
+
+class _FakeBatchEmbeddingClient(_FakeEmbeddingClient):
+    def __init__(self, *, max_inputs: int | None = None) -> None:
+        super().__init__(natural_dimension=4)
+        self.max_inputs = max_inputs
+
+    async def get_embedding(self, request):
+        self.requests.append(request)
+        inputs = request.embedding_input
+        if not isinstance(inputs, list):
+            return SimpleNamespace(embedding=[float(len(inputs))] * 4)
+        if self.max_inputs is not None and len(inputs) > self.max_inputs:
+            raise RespNotOkException(413, "Payload Too Large")
+        rows = [[float(len(text))] * 4 for text in inputs]
+        return SimpleNamespace(embedding=rows[0], embeddings=rows)
+
+
+@pytest.mark.asyncio
+async def test_encode_sends_array_input_and_splits_on_payload_too_large(monkeypatch):
+    monkeypatch.setattr(EmbeddingAPIAdapter, "_GLOBAL_PROVIDER_BATCH_LIMIT", {})
+    adapter, _ = _build_adapter(monkeypatch, client_type="custom", effective_dimension=4)
+    fake_client = _FakeBatchEmbeddingClient(max_inputs=3)
+    monkeypatch.setattr(
+        api_adapter_module.client_registry,
+        "get_client_class_instance",
+        lambda api_provider, force_new=False: fake_client,
+    )
+    texts = ["a" * (i + 1) for i in range(8)]
+
+    embeddings = await adapter.encode(texts, batch_size=8)
+
+    assert embeddings[:, 0].tolist() == [float(i + 1) for i in range(8)]
+    assert [len(req.embedding_input) for req in fake_client.requests] == [8, 4, 2, 2, 2, 2]
+    assert adapter._provider_batch_limit(SimpleNamespace(name="provider-1", client_type="custom")) == 2
+
+    fake_client.requests.clear()
+    await adapter.encode(["x" * 9, "y" * 10, "z" * 11], batch_size=8)
+    assert [req.embedding_input for req in fake_client.requests] == [["x" * 9, "y" * 10], "z" * 11]
+
+
+@pytest.mark.asyncio
+async def test_encode_falls_back_to_single_requests_when_provider_ignores_arrays(monkeypatch):
+    monkeypatch.setattr(EmbeddingAPIAdapter, "_GLOBAL_PROVIDER_BATCH_LIMIT", {})
+    adapter, fake_client = _build_adapter(monkeypatch, client_type="custom", effective_dimension=12)
+
+    embeddings = await adapter.encode(["甲", "乙", "丙"], batch_size=8)
+
+    assert embeddings.shape == (3, 12)
+    assert isinstance(fake_client.requests[0].embedding_input, list)
+    assert [req.embedding_input for req in fake_client.requests[1:]] == ["甲", "乙", "丙"]
+    assert adapter._provider_batch_limit(SimpleNamespace(name="provider-1", client_type="custom")) == 1
+
+
+def test_lowered_provider_batch_limit_recovers_after_cooldown(monkeypatch):
+    monkeypatch.setattr(EmbeddingAPIAdapter, "_GLOBAL_PROVIDER_BATCH_LIMIT", {})
+    adapter, _ = _build_adapter(monkeypatch, client_type="custom", effective_dimension=4)
+    provider = SimpleNamespace(name="provider-1", client_type="custom")
+    adapter._lower_provider_batch_limit(provider, 1)
+    assert adapter._provider_batch_limit(provider) == 1
+
+    now = [1e9]
+    monkeypatch.setattr(api_adapter_module.time, "monotonic", lambda: now[0])
+    assert adapter._provider_batch_limit(provider) == 2
+
+    for _ in range(16):
+        now[0] += EmbeddingAPIAdapter._BATCH_LIMIT_RECOVERY_SECONDS
+        adapter._provider_batch_limit(provider)
+    assert adapter._provider_batch_limit(provider) == 2048
+    assert "provider-1" not in EmbeddingAPIAdapter._GLOBAL_PROVIDER_BATCH_LIMIT
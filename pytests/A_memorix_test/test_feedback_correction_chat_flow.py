@@ -120,6 +120,10 @@ class _KernelBackedRuntimeManager:
 
 
 class _NoopRuntimeManager:
+    def has_subscribers(self, hook_name: str) -> bool:
+        del hook_name
+        return False
+
     async def invoke_hook(self, hook_name: str, **kwargs: Any) -> Any:
         del hook_name
         return SimpleNamespace(aborted=False, kwargs=kwargs)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+try:
+    from src.A_memorix.core.storage.graph_snapshot import is_memory_mapped, read_graph_snapshot_manifest
+    from src.A_memorix.core.storage.graph_store import GraphStore
+except SystemExit as exc:
+    GraphStore = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def _populate(store: GraphStore) -> None:
+    store.add_nodes(["Alice", "Bob", "Café"], attributes={"Alice": {"kind": "person"}})
+    store.add_edges(
+        [("Alice", "Bob"), ("Bob", "Café"), ("Alice", "Bob")],
+        weights=[1.0, 2.0, 1.0],
+        relation_hashes=["r1", "r2", "r3"],
+    )
+
+
+@pytest.mark.parametrize("matrix_format", ["csr", "csc"])
+def test_snapshot_round_trip_is_lazy_and_mutable(tmp_path: Path, matrix_format: str) -> None:
+    store = GraphStore(matrix_format=matrix_format, data_dir=tmp_path)
+    _populate(store)
+    store.save()
+
+    manifest = read_graph_snapshot_manifest(tmp_path)
+    assert manifest["format_version"] == 1 and manifest["edge_hash_entries"] == 3
+
+    reloaded = GraphStore(matrix_format=matrix_format, data_dir=tmp_path)
+    reloaded.load()
+
+    assert reloaded._edge_hash_columns is not None
+    assert reloaded.has_edge_hash_map()
+    assert reloaded.get_nodes() == ["Alice", "Bob", "Café"]
+    assert reloaded.get_node_attributes("alice") == {"kind": "person"}
+    assert reloaded.get_node_attributes("bob") == {}
+    assert reloaded.get_relation_hashes_for_edge("alice", "bob") == {"r1", "r3"}
+    assert reloaded._edge_hash_columns is None
+    assert reloaded.get_edge_weight("bob", "café") == pytest.approx(2.0)
+
+    reloaded.deactivate_edges([("Bob", "Café")])
+    reloaded.add_edges([("Café", "Dave")], relation_hashes=["r4"])
+    reloaded.save()
+
+    again = GraphStore(matrix_format=matrix_format, data_dir=tmp_path)
+    again.load()
+    assert again.get_edge_weight("bob", "café") == 0.0
+    assert again.get_relation_hashes_for_edge("café", "dave") == {"r4"}
+
+
+def test_save_releases_snapshot_mmaps_before_replacing_directory(tmp_path: Path) -> None:
+    store = GraphStore(data_dir=tmp_path)
+    _populate(store)
+    store.save()
+
+    reloaded = GraphStore(data_dir=tmp_path)
+    reloaded.load()
+    assert is_memory_mapped(reloaded._adjacency.data)
+
+    reloaded.save()
+
+    assert not any(
+        is_memory_mapped(array)
+        for array in (reloaded._adjacency.data, reloaded._adjacency.indices, reloaded._adjacency.indptr)
+    )
+    assert reloaded._edge_hash_columns is None
+    assert not (tmp_path / "graph_snapshot.old").exists()
+    assert reloaded.get_relation_hashes_for_edge("alice", "bob") == {"r1", "r3"}
+
+
+def test_legacy_pickle_is_migrated_on_save(tmp_path: Path) -> None:
+    store = GraphStore(data_dir=tmp_path)
+    _populate(store)
+    store.save()
+
+    legacy = GraphStore(data_dir=tmp_path)
+    legacy.load()
+    metadata = {
+        "nodes": legacy.get_nodes(),
+        "node_to_idx": dict(legacy._node_to_idx),
+        "node_attrs": {"Alice": {"kind": "person"}},
+        "matrix_format": "csr",
+        "total_nodes_added": 3,
+        "total_edges_added": 3,
+        "total_nodes_deleted": 0,
+        "total_edges_deleted": 0,
+        "edge_hash_map": {(0, 1): {"legacy"}},
+    }
+    with (tmp_path / "graph_metadata.pkl").open("wb") as handle:
+        pickle.dump(metadata, handle)
+
+    migrated = GraphStore(data_dir=tmp_path)
+    migrated.load()
+    assert migrated.get_relation_hashes_for_edge("alice", "bob") == {"legacy"}
+
+    migrated.save()
+    assert not (tmp_path / "graph_metadata.pkl").exists()
+
+    reloaded = GraphStore(data_dir=tmp_path)
+    reloaded.load()
+    assert reloaded.get_relation_hashes_for_edge("alice", "bob") == {"legacy"}
+    assert reloaded.get_node_attributes("alice") == {"kind": "person"}
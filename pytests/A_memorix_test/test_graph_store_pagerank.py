@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+
+try:
+    from src.A_memorix.core.retrieval.pagerank import PersonalizedPageRank
+    from src.A_memorix.core.storage.graph_store import GraphStore
+except SystemExit as exc:
+    GraphStore = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def _build_graph() -> GraphStore:
+    store = GraphStore()
+    store.add_edges(
+        [
+            ("Alice", "Bob"),
+            ("Bob", "Carol"),
+            ("Carol", "Alice"),
+            ("Carol", "Dave"),
+            ("Eve", "Alice"),
+        ]
+    )
+    return store
+
+
+def test_transition_matrix_is_cached_until_adjacency_changes() -> None:
+    store = _build_graph()
+
+    first = store._get_transition_matrix()
+    store.compute_pagerank({"Alice": 1.0})
+    assert store._get_transition_matrix() is first
+
+    store.add_edges([("Dave", "Eve")])
+    rebuilt = store._get_transition_matrix()
+    assert rebuilt is not first
+    assert not rebuilt[2][store._node_to_idx["dave"]]
+
+
+def test_batch_pagerank_matches_single_runs() -> None:
+    store = _build_graph()
+    personalizations = [{"Alice": 1.0}, None, {"dave": 2.0, "Bob": 1.0}]
+
+    batched = store.compute_pagerank_batch(personalizations)
+
+    for personalization, scores in zip(personalizations, batched, strict=True):
+        single = store.compute_pagerank(personalization)
+        assert scores.keys() == single.keys()
+        assert all(scores[node] == pytest.approx(single[node], abs=1e-6) for node in single)
+
+
+def test_push_approximation_tracks_power_iteration() -> None:
+    store = _build_graph()
+    seeds = {"Alice": 1.0}
+
+    exact = store.compute_pagerank(seeds, tol=1e-10)
+    local = store.compute_ppr_push(seeds, epsilon=1e-8)
+
+    assert local.keys() == exact.keys() - {"Eve"}
+    assert all(local[node] == pytest.approx(exact[node], abs=1e-5) for node in local)
+
+    ppr = PersonalizedPageRank(store)
+    assert sum(ppr.compute_local(seeds).values()) == pytest.approx(1.0)
+    assert len(ppr.compute_batch([seeds, {"Bob": 1.0}])) == 2
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+try:
+    from src.A_memorix.core.storage.graph_store import GraphStore
+except SystemExit as exc:
+    GraphStore = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def _build_graph() -> GraphStore:
+    store = GraphStore()
+    store.add_edges(
+        [("A", "B"), ("B", "D"), ("A", "C"), ("D", "C"), ("C", "E"), ("E", "F"), ("D", "F")],
+        weights=[1.0, 1.0, 1.0, 1.0, 1.0, 0.2, 1.0],
+        relation_hashes=["ab", "bd", "ac", "dc", "ce", "ef", "df"],
+    )
+    return store
+
+
+def test_find_paths_returns_shortest_simple_paths_first() -> None:
+    store = _build_graph()
+
+    paths = store.find_paths("A", "F", max_depth=3, max_paths=10)
+
+    assert sorted(paths) == [["A", "B", "D", "F"], ["A", "C", "D", "F"], ["A", "C", "E", "F"]]
+    assert store.find_paths("A", "D", max_depth=3, max_paths=10)[:2] in (
+        [["A", "B", "D"], ["A", "C", "D"]],
+        [["A", "C", "D"], ["A", "B", "D"]],
+    )
+    assert store.find_paths("A", "F", max_depth=2) == []
+    assert store.find_paths("a", "a") == [["A"]]
+    assert store.find_paths("A", "missing") == []
+
+
+def test_find_paths_honours_weight_and_relation_constraints() -> None:
+    store = _build_graph()
+
+    assert ["A", "C", "E", "F"] not in store.find_paths("A", "F", min_weight=0.5)
+    assert store.find_paths("A", "F", relation_hashes={"ac", "ce", "ef"}) == [["A", "C", "E", "F"]]
+
+    store.deactivate_edges([("D", "F")])
+    assert store.find_paths("A", "F") == [["A", "C", "E", "F"]]
@@ -37,7 +37,7 @@ def test_graph_store_clear_save_removes_stale_adjacency(tmp_path: Path) -> None:
     store.add_edges([("Alice", "Bob")], relation_hashes=["rel-1"])
     store.save()
 
-    matrix_path = data_dir / "graph_adjacency.npz"
+    matrix_path = data_dir / "graph_snapshot" / "adj_indptr.npy"
     assert matrix_path.exists()
 
     store.clear()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+try:
+    from src.A_memorix.core.runtime.sdk_memory_kernel import SDKMemoryKernel
+    from src.A_memorix.core.storage.graph_store import GraphStore
+    from src.A_memorix.core.storage.metadata_store import BatchTransactionAborted, MetadataStore
+    from src.A_memorix.core.storage.vector_store import VectorStore
+    from src.A_memorix.core.utils.hash import compute_hash
+except SystemExit as exc:
+    SDKMemoryKernel = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+DIM = 8
+
+
+class _CountingEmbedding:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.calls: list[list[str]] = []
+        self.fail = fail
+
+    async def encode(self, texts: Any, **kwargs: Any) -> np.ndarray:
+        del kwargs
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        self.calls.append(batch)
+        if self.fail:
+            raise RuntimeError("embedding backend down")
+        rows = [np.random.default_rng(abs(hash(text)) % (2**32)).standard_normal(DIM) for text in batch]
+        return np.asarray(rows, dtype=np.float32)
+
+
+def _build_kernel(tmp_path: Path, *, fail: bool = False) -> SDKMemoryKernel:
+    kernel = SDKMemoryKernel(
+        plugin_root=tmp_path,
+        config={"retrieval": {"relation_vectorization": {"enabled": True}}},
+    )
+
+    async def _fake_initialize() -> None:
+        return None
+
+    kernel.initialize = _fake_initialize  # type: ignore[method-assign]
+    kernel.metadata_store = MetadataStore(data_dir=tmp_path / "metadata")
+    kernel.metadata_store.connect()
+    kernel.vector_store = VectorStore(dimension=DIM, data_dir=tmp_path / "vectors")
+    kernel.graph_store = GraphStore(data_dir=tmp_path / "graph")
+    kernel.embedding_manager = _CountingEmbedding(fail=fail)
+    return kernel
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_embeds_once_and_writes_all_rows(tmp_path: Path) -> None:
+    kernel = _build_kernel(tmp_path)
+    relation = {"subject": "Alice", "predicate": "likes", "object": "Tea"}
+
+    payload = await kernel.ingest_batch(
+        [
+            {"external_id": "m1", "source_type": "chat_summary", "chat_id": "s1", "text": "Alice drank tea", "person_ids": ["p1"], "relations": [relation]},
+            {"external_id": "m2", "source_type": "chat_summary", "chat_id": "s1", "text": "Bob went home", "entities": ["Bob"]},
+            {"external_id": "m1", "source_type": "chat_summary", "chat_id": "s1", "text": "Alice drank tea"},
+            {"external_id": "m3", "source_type": "chat_summary", "chat_id": "s1", "text": "   "},
+        ],
+        respect_filter=False,
+    )
+
+    assert payload["stored_count"] == 2 and payload["skipped_count"] == 2
+    assert [item.get("reason") for item in payload["items"][2:]] == ["duplicate_in_batch", "empty_text"]
+    assert len(kernel.embedding_manager.calls) == 1
+    assert len(kernel.embedding_manager.calls[0]) == 3
+
+    store = kernel.metadata_store
+    p1, p2 = payload["items"][0]["stored_ids"][0], payload["items"][1]["stored_ids"][0]
+    rel_hash = store.compute_relation_hash("Alice", "likes", "Tea")
+    assert payload["items"][0]["stored_ids"] == [p1, rel_hash]
+    assert store.get_paragraph(p1)["source"] == "chat_summary:s1"
+    assert store.get_external_memory_ref("m2")["paragraph_hash"] == p2
+    assert store.get_relation(rel_hash)["vector_state"] == "ready"
+    assert {row["name"] for row in store.get_paragraph_entities(p2)} == {"Bob"}
+    assert all(token in kernel.vector_store for token in (p1, p2, rel_hash))
+    assert kernel.graph_store.get_relation_hashes_for_edge("Alice", "Tea") == {rel_hash}
+    assert "p1" in kernel._active_person_timestamps
+
+    again = await kernel.ingest_batch([{"external_id": "m2", "text": "Bob went home"}], respect_filter=False)
+    assert again["items"][0]["reason"] == "exists"
+    assert len(kernel.embedding_manager.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_degrades_to_backfill_when_embedding_fails(tmp_path: Path) -> None:
+    kernel = _build_kernel(tmp_path, fail=True)
+
+    payload = await kernel.ingest_batch(
+        [{"external_id": "m1", "text": "Carol met Dave", "relations": [{"subject": "Carol", "predicate": "met", "object": "Dave"}]}],
+        respect_filter=False,
+    )
+
+    paragraph_hash, rel_hash = payload["items"][0]["stored_ids"]
+    assert payload["items"][0]["detail"] == "vector_degraded_write"
+    assert paragraph_hash not in kernel.vector_store
+    assert kernel.metadata_store.get_relation(rel_hash)["vector_state"] == "failed"
+    backfill = kernel.metadata_store.fetch_paragraph_vector_backfill_batch(limit=10)
+    assert [row["paragraph_hash"] for row in backfill] == [paragraph_hash]
+
+
+def test_batch_transaction_defers_commits_and_rolls_back(tmp_path: Path) -> None:
+    store = MetadataStore(data_dir=tmp_path)
+    store.connect()
+
+    with pytest.raises(RuntimeError):
+        with store.batch_transaction():
+            store.add_paragraph(content="rolled back paragraph")
+            with store.batch_transaction():
+                store.add_entity(name="Ghost")
+            raise RuntimeError("abort")
+
+    assert store.get_paragraph(compute_hash("rolled back paragraph")) is None
+    assert store.get_entity(store.compute_entity_hash("Ghost")) is None
+
+    with store.batch_transaction():
+        kept = store.add_paragraph(content="kept paragraph")
+    assert store.get_paragraph(kept) is not None
+
+
+def test_batch_transaction_aborts_on_inner_rollback(tmp_path: Path) -> None:
+    store = MetadataStore(data_dir=tmp_path)
+    store.connect()
+
+    with pytest.raises(BatchTransactionAborted):
+        with store.batch_transaction():
+            store.add_paragraph(content="first paragraph")
+            store._conn.rollback()
+            store.add_paragraph(content="second paragraph")
+
+    assert store.get_paragraph(compute_hash("first paragraph")) is None
+    assert store.get_paragraph(compute_hash("second paragraph")) is None
+
+
+def test_batch_transaction_isolated_from_other_threads(tmp_path: Path) -> None:
+    store = MetadataStore(data_dir=tmp_path)
+    store.connect()
+    other_conn: list[Any] = []
+
+    with pytest.raises(RuntimeError):
+        with store.batch_transaction():
+            store.add_paragraph(content="batched paragraph")
+            worker = threading.Thread(target=lambda: other_conn.append(store._conn))
+            worker.start()
+            worker.join()
+            raise RuntimeError("abort")
+
+    assert other_conn == [store._shared_conn]
+    assert store.get_paragraph(compute_hash("batched paragraph")) is None
+
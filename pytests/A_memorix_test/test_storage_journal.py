@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+try:
+    from src.A_memorix.core.storage.graph_store import GraphStore
+    from src.A_memorix.core.storage.journal import AppendOnlyJournal
+    from src.A_memorix.core.storage.vector_store import VectorStore
+except SystemExit as exc:
+    GraphStore = None  # type: ignore[assignment]
+    AppendOnlyJournal = None  # type: ignore[assignment]
+    VectorStore = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def test_journal_replays_after_seq_and_truncates_torn_tail(tmp_path: Path) -> None:
+    path = tmp_path / "j.log"
+    journal = AppendOnlyJournal(path, fsync_interval=0)
+    journal.append("a", [1])
+    journal.append("b", {"x": 2})
+    assert journal.commit() == 2
+    good_size = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+
+    reopened = AppendOnlyJournal(path)
+    records = list(reopened.replay(after_seq=1))
+
+    assert records == [(2, "b", {"x": 2})]
+    assert reopened.seq == 2
+    assert path.stat().st_size == good_size
+
+
+def test_journal_idle_timer_fsyncs_deferred_commit(tmp_path: Path) -> None:
+    journal = AppendOnlyJournal(tmp_path / "j.log", fsync_interval=0.05)
+    journal.append("a", [1])
+    journal.commit()
+    journal.append("b", [2])
+    journal.commit()
+    assert journal._unsynced
+
+    deadline = time.monotonic() + 2.0
+    while journal._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not journal._unsynced
+
+
+def test_journal_truncate_through_keeps_newer_records(tmp_path: Path) -> None:
+    path = tmp_path / "j.log"
+    journal = AppendOnlyJournal(path, fsync_interval=0)
+    journal.append("a", 1)
+    journal.append("b", 2)
+    journal.commit()
+    journal.append("c", 3)
+
+    journal.truncate_through(1)
+    journal.commit()
+
+    assert [op for _, op, _ in AppendOnlyJournal(path).replay()] == ["b", "c"]
+
+
+def test_vector_store_recovers_adds_and_deletes_from_journal(tmp_path: Path) -> None:
+    data_dir = tmp_path / "vectors"
+    vectors = np.random.default_rng(5).standard_normal((400, 16)).astype(np.float32)
+    store = VectorStore(dimension=16, data_dir=data_dir)
+    store.min_train_threshold = 100
+    store.configure_ann(index_type="none")
+    store.add(vectors[:300], [f"h{i}" for i in range(300)])
+    store.warmup_index(force_train=True)
+    store.save()
+    snapshot_meta = (data_dir / "vectors_metadata.pkl").read_bytes()
+
+    store.enable_journal(fsync_interval=0)
+    store.add(vectors[300:], [f"h{i}" for i in range(300, 400)])
+    store.delete(["h5", "h350"])
+    store.commit_journal()
+    assert (data_dir / "vectors_metadata.pkl").read_bytes() == snapshot_meta
+
+    reloaded = VectorStore(dimension=16, data_dir=data_dir)
+    reloaded.load()
+
+    assert "h399" in reloaded and "h5" not in reloaded and "h350" not in reloaded
+    assert reloaded.num_vectors == 398
+    assert reloaded.search(vectors[320], k=1)[0] == ["h320"]
+    assert "h5" not in reloaded.search(vectors[5], k=5)[0]
+
+
+def test_vector_store_snapshot_truncates_journal(tmp_path: Path) -> None:
+    data_dir = tmp_path / "vectors"
+    store = VectorStore(dimension=8, data_dir=data_dir)
+    store.enable_journal(fsync_interval=0)
+    store.add(np.eye(8, dtype=np.float32), [f"h{i}" for i in range(8)])
+    store.commit_journal()
+    assert store.journal_size_bytes > 0
+    assert store.has_data()
+
+    store.save()
+
+    assert store.journal_size_bytes == 0
+    reloaded = VectorStore(dimension=8, data_dir=data_dir)
+    reloaded.load()
+    assert reloaded.num_vectors == 8
+
+
+def test_graph_store_replays_mutations_over_snapshot(tmp_path: Path) -> None:
+    data_dir = tmp_path / "graph"
+    graph = GraphStore(data_dir=data_dir)
+    graph.add_edges([("a", "b"), ("b", "c")], relation_hashes=["r1", "r2"])
+    graph.save()
+
+    graph.enable_journal(fsync_interval=0)
+    graph.add_edges([("a", "b")], weights=[2.0])
+    graph.update_edge_weight("b", "c", 0.5)
+    graph.add_edges(iter([("c", "d")]), relation_hashes=["r3"])
+    graph.delete_nodes(["a"])
+    with graph.batch_update():
+        graph.add_edges([("b", "d")], weights=[4.0])
+    graph.commit_journal()
+
+    reloaded = GraphStore(data_dir=data_dir)
+    reloaded.load()
+
+    assert sorted(reloaded.get_nodes()) == ["b", "c", "d"]
+    assert reloaded.get_edge_weight("b", "c") == pytest.approx(1.5)
+    assert reloaded.get_edge_weight("b", "d") == pytest.approx(4.0)
+    assert reloaded.get_relation_hashes_for_edge("c", "d") == {"r3"}
+    assert reloaded.num_edges == graph.num_edges
+
+
+def test_graph_store_loads_from_journal_without_snapshot(tmp_path: Path) -> None:
+    data_dir = tmp_path / "graph"
+    graph = GraphStore(data_dir=data_dir)
+    graph.enable_journal(fsync_interval=0)
+    graph.add_nodes(["x", "y"], attributes={"x": {"kind": "person"}})
+    graph.add_edges([("x", "y")])
+    graph.commit_journal()
+
+    reloaded = GraphStore(data_dir=data_dir)
+    assert reloaded.has_data()
+    reloaded.load()
+
+    assert reloaded.get_edge_weight("x", "y") == pytest.approx(1.0)
+    assert reloaded.get_node_attributes("x") == {"kind": "person"}
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+try:
+    from src.A_memorix.core.storage.vector_store import VectorStore
+except SystemExit as exc:
+    VectorStore = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def _build_store(data_dir: Path, index_type: str, count: int = 1500) -> tuple[VectorStore, np.ndarray]:
+    vectors = np.random.default_rng(7).standard_normal((count, 16)).astype(np.float32)
+    store = VectorStore(dimension=16, data_dir=data_dir)
+    store.configure_ann(index_type=index_type, min_vectors=1000, nlist=16, nprobe=16)
+    store.add(vectors, [f"h{i}" for i in range(count)])
+    return store, vectors
+
+
+@pytest.mark.parametrize("index_type", ["ivf_sq8", "hnsw_sq8"])
+def test_warmup_promotes_to_ann_tier_above_threshold(tmp_path: Path, index_type: str) -> None:
+    store, vectors = _build_store(tmp_path / "vectors", index_type)
+
+    summary = store.warmup_index(force_train=True)
+
+    assert summary["index_tier"] == index_type
+    assert store.index_tier == index_type
+    assert store.search(vectors[42], k=1)[0] == ["h42"]
+
+    store.delete(["h42"])
+    ids, _ = store.search(vectors[42], k=5)
+    assert "h42" not in ids
+    assert all(item.startswith("h") for item in ids)
+
+
+def test_warmup_keeps_flat_tier_below_threshold(tmp_path: Path) -> None:
+    store, _ = _build_store(tmp_path / "vectors", "ivf_sq8", count=200)
+
+    summary = store.warmup_index(force_train=True)
+
+    assert summary["index_tier"] == "flat"
+    assert store.maybe_promote_index() is False
+
+
+def test_ann_tier_survives_save_and_load(tmp_path: Path) -> None:
+    data_dir = tmp_path / "vectors"
+    store, vectors = _build_store(data_dir, "ivf_sq8")
+    store.warmup_index(force_train=True)
+    store.save()
+
+    reloaded = VectorStore(dimension=16, data_dir=data_dir)
+    reloaded.configure_ann(index_type="ivf_sq8", min_vectors=1000)
+    reloaded.load()
+    summary = reloaded.warmup_index(force_train=True)
+
+    assert summary["index_tier"] == "ivf_sq8"
+    assert summary["fallback_ntotal"] == 0
+    assert reloaded.search(vectors[7], k=1)[0] == ["h7"]
+
+
+def test_configure_ann_rejects_unknown_index_type(tmp_path: Path) -> None:
+    store = VectorStore(dimension=16, data_dir=tmp_path / "vectors")
+
+    with pytest.raises(ValueError):
+        store.configure_ann(index_type="pq")
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+try:
+    from src.A_memorix.core.storage.vector_store import VectorStore, _RowOffsetTable
+except SystemExit as exc:
+    VectorStore = None  # type: ignore[assignment]
+    _RowOffsetTable = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def _trained_store(data_dir: Path, use_mmap: bool, count: int = 600) -> tuple[VectorStore, np.ndarray]:
+    vectors = np.random.default_rng(11).standard_normal((count, 16)).astype(np.float32)
+    store = VectorStore(dimension=16, data_dir=data_dir, use_mmap=use_mmap)
+    store.min_train_threshold = 100
+    store.configure_ann(index_type="none")
+    store.add(vectors, [f"h{i}" for i in range(count)])
+    store.warmup_index(force_train=True)
+    assert store.index_tier == "flat" and store._is_trained
+    return store, vectors
+
+
+def _exact_scores(vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+    data = vectors.astype(np.float16).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data @ (query / np.linalg.norm(query))
+
+
+def test_row_offset_table_lookup_with_delta_and_merge(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(_RowOffsetTable, "MERGE_THRESHOLD", 4)
+    table = _RowOffsetTable()
+    table.reset(np.array([30, 10, 20], dtype=np.int64))
+    table.append(np.array([5, 99], dtype=np.int64), 3)
+
+    assert table.lookup(np.array([10, 20, 30, 5, 99, 7])).tolist() == [1, 2, 0, 3, 4, -1]
+
+    table.append(np.array([-8, 42], dtype=np.int64), 5)
+    assert not table._delta
+    assert len(table) == 7
+    assert table.lookup(np.array([42, -8, 99, 30])).tolist() == [6, 5, 4, 0]
+
+
+def test_sq8_candidates_are_reranked_with_exact_scores(tmp_path: Path) -> None:
+    store, vectors = _trained_store(tmp_path / "vectors", use_mmap=True)
+    query = vectors[7] + 0.1 * vectors[8]
+
+    ids, scores = store.search(query, k=5)
+
+    exact = _exact_scores(vectors, query)
+    expected = [float(exact[int(item[1:])]) for item in ids]
+    assert scores == pytest.approx(expected, abs=1e-5)
+    assert scores == sorted(scores, reverse=True)
+    assert ids[0] == "h7"
+
+
+def test_mmap_and_file_read_paths_agree_after_rebuild(tmp_path: Path) -> None:
+    mmap_store, vectors = _trained_store(tmp_path / "mmap", use_mmap=True, count=1500)
+    read_store, _ = _trained_store(tmp_path / "read", use_mmap=False, count=1500)
+    doomed = [f"h{i}" for i in range(0, 1500, 2)]
+    for store in (mmap_store, read_store):
+        store.delete(doomed)
+        store.rebuild_index()
+        assert store._bin_count == 750
+
+    for store in (mmap_store, read_store):
+        ids, _ = store.search(vectors[3], k=10)
+        assert ids[0] == "h3"
+        assert not set(ids) & set(doomed)
+    assert (tmp_path / "mmap" / "vectors.bin").read_bytes() == (tmp_path / "read" / "vectors.bin").read_bytes()
+    assert mmap_store._disk_view is not None and len(mmap_store._row_table) == 750
+
+
+def test_flushed_rows_become_rerankable(tmp_path: Path) -> None:
+    store, _ = _trained_store(tmp_path / "vectors", use_mmap=True)
+    extra = np.random.default_rng(3).standard_normal((4, 16)).astype(np.float32)
+    store.add(extra, [f"x{i}" for i in range(4)])
+    store._flush_write_buffer()
+
+    ids, scores = store.search(extra[2], k=1)
+
+    assert ids == ["x2"]
+    assert scores[0] == pytest.approx(float(_exact_scores(extra, extra[2])[2]), abs=1e-5)
+    assert len(store._row_table) == 604
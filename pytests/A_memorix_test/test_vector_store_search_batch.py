@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+try:
+    from src.A_memorix.core.retrieval.dual_path import _VectorSearchCoalescer
+    from src.A_memorix.core.storage.vector_store import VectorStore
+except SystemExit as exc:
+    VectorStore = None  # type: ignore[assignment]
+    _VectorSearchCoalescer = None  # type: ignore[assignment]
+    IMPORT_ERROR = f"config initialization exited during import: {exc}"
+else:
+    IMPORT_ERROR = None
+
+
+pytestmark = pytest.mark.skipif(IMPORT_ERROR is not None, reason=IMPORT_ERROR or "")
+
+
+def _random_vectors(count: int, dimension: int = 16, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((count, dimension)).astype(np.float32)
+
+
+def test_search_batch_matches_single_search(tmp_path: Path) -> None:
+    vectors = _random_vectors(120)
+    store = VectorStore(dimension=16, data_dir=tmp_path / "vectors", buffer_size=32)
+    store.add(vectors, [f"h{i}" for i in range(len(vectors))])
+    store.warmup_index()
+
+    batch = store.search_batch(vectors[[3, 40, 119]], k=5)
+
+    assert len(batch) == 3
+    for row, expected_id in zip(batch, ["h3", "h40", "h119"], strict=True):
+        assert row[0][0] == expected_id
+    assert batch[1] == store.search(vectors[40], k=5)
+
+
+def test_search_sees_unflushed_buffer_without_duplicates(tmp_path: Path) -> None:
+    vectors = _random_vectors(10)
+    store = VectorStore(dimension=16, data_dir=tmp_path / "vectors", buffer_size=1024)
+    store.add(vectors, [f"h{i}" for i in range(len(vectors))])
+
+    ids, scores = store.search(vectors[7], k=10)
+
+    assert ids[0] == "h7"
+    assert len(ids) == len(set(ids)) == 10
+    assert scores == sorted(scores, reverse=True)
+    assert not (tmp_path / "vectors" / "vectors.bin").exists()
+
+
+def test_search_batch_rejects_dimension_mismatch(tmp_path: Path) -> None:
+    store = VectorStore(dimension=16, data_dir=tmp_path / "vectors")
+
+    with pytest.raises(ValueError, match="dimension mismatch"):
+        store.search_batch(np.zeros((2, 8), dtype=np.float32), k=3)
+
+
+def test_search_is_not_blocked_by_writer_lock(tmp_path: Path) -> None:
+    vectors = _random_vectors(64)
+    store = VectorStore(dimension=16, data_dir=tmp_path / "vectors", buffer_size=16)
+    store.add(vectors, [f"h{i}" for i in range(len(vectors))])
+
+    result = {}
+    with store._lock:
+        worker = threading.Thread(target=lambda: result.setdefault("hit", store.search(vectors[5], k=1)))
+        worker.start()
+        worker.join(timeout=5)
+
+    assert not worker.is_alive()
+    assert result["hit"][0] == ["h5"]
+
+
+def test_coalescer_merges_concurrent_searches_into_one_batch() -> None:
+    calls = []
+
+    def search_batch(queries: np.ndarray, k: int):
+        calls.append((queries.shape[0], k))
+        return [([f"q{i}-a", f"q{i}-b", f"q{i}-c"], [0.9, 0.8, 0.7]) for i in range(queries.shape[0])]
+
+    store = SimpleNamespace(dimension=4, search_batch=search_batch)
+    coalescer = _VectorSearchCoalescer(store, window_seconds=0.01, max_batch_size=8)
+
+    async def _run():
+        query = np.ones(4, dtype=np.float32)
+        return await asyncio.gather(coalescer.search(query, 1), coalescer.search(query, 3))
+
+    first, second = asyncio.run(_run())
+
+    assert calls == [(2, 3)]
+    assert first == (["q0-a"], [0.9])
+    assert second == (["q1-a", "q1-b", "q1-c"], [0.9, 0.8, 0.7])
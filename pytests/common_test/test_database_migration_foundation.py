@@ -31,6 +31,8 @@ from src.common.database.migrations import (
     SchemaVersionSource,
     SQLiteSchemaInspector,
     SQLiteUserVersionStore,
+    V3_SCHEMA_VERSION,
+    V4_SCHEMA_VERSION,
     build_default_migration_registry,
     build_default_schema_version_resolver,
     create_database_migration_bootstrapper,
@@ -676,6 +678,82 @@ def test_bootstrapper_can_finalize_empty_database_to_latest_version(tmp_path: Pa
     assert recorded_version == LATEST_SCHEMA_VERSION
 
 
+def test_default_bootstrapper_can_migrate_v3_database_to_latest(tmp_path: Path) -> None:
+    """未写版本号的 v3 数据库应被识别并补齐 ``llm_usage.cached_tokens`` 字段。"""
+    engine = _create_sqlite_engine(tmp_path / "v3_to_v4.db")
+    bootstrapper = create_database_migration_bootstrapper(engine)
+
+    with engine.begin() as connection:
+        _create_current_schema(connection)
+        connection.exec_driver_sql('ALTER TABLE "llm_usage" DROP COLUMN "cached_tokens"')
+        connection.execute(
+            text(
+                """
+                INSERT INTO llm_usage (
+                    model_name, model_api_provider_name, request_type, time_cost,
+                    prompt_tokens, completion_tokens, total_tokens, cost
+                ) VALUES ('model', 'provider', 'planner', 1.0, 10, 2, 12, 0.0)
+                """
+            )
+        )
+
+    with engine.connect() as connection:
+        resolved_version = build_default_schema_version_resolver().resolve(connection)
+
+    assert resolved_version.version == V3_SCHEMA_VERSION
+    assert resolved_version.detector_name == "v3_schema_detector"
+
+    migration_state = bootstrapper.prepare_database()
+    bootstrapper.finalize_database(migration_state)
+
+    assert migration_state.resolved_version.version == LATEST_SCHEMA_VERSION
+
+    with engine.connect() as connection:
+        snapshot = SQLiteSchemaInspector().inspect(connection)
+        cached_tokens = connection.execute(text("SELECT cached_tokens FROM llm_usage")).scalar_one()
+
+    assert snapshot.has_column("llm_usage", "cached_tokens")
+    assert cached_tokens == 0
+
+
+def test_default_bootstrapper_can_migrate_v4_database_to_latest(tmp_path: Path) -> None:
+    """未写版本号的 v4 数据库应被识别并补齐 ``images.perceptual_hash`` 字段。"""
+    engine = _create_sqlite_engine(tmp_path / "v4_to_v5.db")
+    bootstrapper = create_database_migration_bootstrapper(engine)
+
+    with engine.begin() as connection:
+        _create_current_schema(connection)
+        connection.exec_driver_sql('ALTER TABLE "images" DROP COLUMN "perceptual_hash"')
+        connection.execute(
+            text(
+                """
+                INSERT INTO images (
+                    image_hash, description, full_path, image_type, query_count,
+                    is_registered, is_banned, no_file_flag, record_time, vlm_processed
+                ) VALUES ('hash', '描述', '/tmp/a.png', 'IMAGE', 0, 0, 0, 0, '2026-01-01 00:00:00', 1)
+                """
+            )
+        )
+
+    with engine.connect() as connection:
+        resolved_version = build_default_schema_version_resolver().resolve(connection)
+
+    assert resolved_version.version == V4_SCHEMA_VERSION
+    assert resolved_version.detector_name == "v4_schema_detector"
+
+    migration_state = bootstrapper.prepare_database()
+    bootstrapper.finalize_database(migration_state)
+
+    assert migration_state.resolved_version.version == LATEST_SCHEMA_VERSION
+
+    with engine.connect() as connection:
+        snapshot = SQLiteSchemaInspector().inspect(connection)
+        perceptual_hash = connection.execute(text("SELECT perceptual_hash FROM images")).scalar_one()
+
+    assert snapshot.has_column("images", "perceptual_hash")
+    assert perceptual_hash is None
+
+
 def test_bootstrapper_runs_registered_steps_for_versioned_database(tmp_path: Path) -> None:
     """启动桥接器应在已登记旧版本数据库上执行注册迁移步骤。"""
     engine = _create_sqlite_engine(tmp_path / "bootstrap_registered.db")
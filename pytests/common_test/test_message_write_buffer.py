@@ -0,0 +1,186 @@
+"""消息写后缓冲与读己之写叠加测试。"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Generator
+
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from src.common import message_repository
+from src.common.data_models.message_component_data_model import MessageSequence, TextComponent
+from src.common.database.database_model import Messages
+from src.common.database.message_write_buffer import MessageWriteBuffer
+from src.common.utils.utils_message import MessageUtils
+
+_BASE_TIME = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _make_message(index: int, *, session_id: str = "s1", message_id: str | None = None) -> Messages:
+    """构造一条测试消息行。
+
+    Args:
+        index: 消息序号，同时决定时间戳。
+        session_id: 会话 ID。
+        message_id: 消息 ID，缺省为 ``m{index}``。
+
+    Returns:
+        Messages: 未绑定会话的消息行。
+    """
+    return Messages(
+        message_id=message_id or f"m{index}",
+        timestamp=_BASE_TIME + timedelta(seconds=index),
+        platform="qq",
+        user_id="u1",
+        user_nickname="用户",
+        session_id=session_id,
+        raw_content=MessageUtils.from_MaiSeq_to_db_record_msg(MessageSequence([TextComponent(text=f"hi {index}")])),
+        processed_plain_text=f"hi {index}",
+    )
+
+
+@pytest.fixture
+def engine(tmp_path: Path):
+    """创建仅包含消息表的临时 SQLite 引擎。"""
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'messages.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(db_engine, tables=[Messages.__table__])  # type: ignore[list-item]
+    yield db_engine
+    db_engine.dispose()
+
+
+def _count_rows(engine) -> int:
+    with Session(engine) as session:
+        return int(session.exec(select(func.count()).select_from(Messages)).one())
+
+
+def test_buffer_flushes_on_batch_size_and_close(engine) -> None:
+    buffer = MessageWriteBuffer(engine, batch_size=4, flush_interval=60.0)
+
+    for index in range(3):
+        buffer.enqueue(_make_message(index))
+    time.sleep(0.05)
+    assert _count_rows(engine) == 0
+    with buffer.pending_view() as pending:
+        assert [msg.message_id for msg in pending] == ["m0", "m1", "m2"]
+
+    buffer.enqueue(_make_message(3))
+    deadline = time.monotonic() + 5.0
+    while _count_rows(engine) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _count_rows(engine) == 4
+
+    buffer.enqueue(_make_message(4))
+    buffer.close()
+    assert _count_rows(engine) == 5
+    assert buffer.get_stats()["pending"] == 0
+
+    buffer.enqueue(_make_message(5))
+    assert _count_rows(engine) == 6
+
+
+def test_buffer_flushes_on_interval(engine) -> None:
+    buffer = MessageWriteBuffer(engine, batch_size=1000, flush_interval=0.05)
+    buffer.enqueue(_make_message(0))
+
+    deadline = time.monotonic() + 5.0
+    while _count_rows(engine) < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _count_rows(engine) == 1
+    buffer.close()
+
+
+def test_find_messages_overlays_pending_rows(engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    session_factory = sessionmaker(bind=engine, class_=Session, autoflush=False)
+
+    @contextmanager
+    def _get_db_session(auto_commit: bool = True) -> Generator[Session, None, None]:
+        session = session_factory()
+        try:
+            yield session
+            if auto_commit:
+                session.commit()
+        finally:
+            session.close()
+
+    buffer = MessageWriteBuffer(engine, batch_size=1000, flush_interval=60.0)
+    monkeypatch.setattr(message_repository, "get_db_session", _get_db_session)
+    monkeypatch.setattr(message_repository, "message_write_buffer", buffer)
+
+    for index in range(3):
+        buffer.enqueue(_make_message(index))
+    buffer.flush()
+    for index in range(3, 6):
+        buffer.enqueue(_make_message(index))
+    buffer.enqueue(_make_message(6, session_id="other"))
+
+    found = message_repository.find_messages(session_id="s1")
+    assert [msg.message_id for msg in found] == ["m0", "m1", "m2", "m3", "m4", "m5"]
+    assert [msg.message_id for msg in message_repository.find_messages(session_id="s1", limit=2)] == ["m4", "m5"]
+    assert [
+        msg.message_id for msg in message_repository.find_messages(session_id="s1", limit=4, limit_mode="earliest")
+    ] == ["m0", "m1", "m2", "m3"]
+    assert [
+        msg.message_id for msg in message_repository.find_messages(session_id="s1", sort=[("time", -1)])
+    ][:2] == ["m5", "m4"]
+    assert message_repository.count_messages(session_id="s1") == 6
+    assert message_repository.count_messages(after_time=(_BASE_TIME + timedelta(seconds=4)).timestamp()) == 2
+
+    buffer.flush()
+    assert [msg.message_id for msg in message_repository.find_messages(session_id="s1")] == [
+        "m0",
+        "m1",
+        "m2",
+        "m3",
+        "m4",
+        "m5",
+    ]
+    assert message_repository.count_messages() == 7
+    buffer.close()
+
+
+def test_bad_row_is_isolated_and_dropped_after_max_attempts(engine) -> None:
+    buffer = MessageWriteBuffer(engine, batch_size=1000, flush_interval=60.0, max_row_attempts=2)
+    bad = _make_message(1)
+    bad.message_id = None  # type: ignore[assignment]
+    for db_message in (_make_message(0), bad, _make_message(2)):
+        buffer.enqueue(db_message)
+
+    assert buffer.flush() == 2
+    assert _count_rows(engine) == 2
+    assert buffer.get_stats()["pending"] == 1
+
+    buffer.enqueue(_make_message(3))
+    assert buffer.flush() == 1
+    assert _count_rows(engine) == 3
+    stats = buffer.get_stats()
+    assert stats["pending"] == 0
+    assert stats["dropped"] == 1
+    buffer.close()
+
+
+def test_pending_rows_are_bounded(engine) -> None:
+    buffer = MessageWriteBuffer(engine, batch_size=2, flush_interval=60.0, max_pending=3)
+    buffer._thread = object()  # type: ignore[assignment]  # 不启动写线程，只观察缓冲上限
+    for index in range(5):
+        buffer.enqueue(_make_message(index))
+
+    with buffer.pending_view() as pending:
+        assert [msg.message_id for msg in pending] == ["m2", "m3", "m4"]
+    assert buffer.get_stats()["dropped"] == 2
+
+
+def test_read_with_pending_does_not_wait_for_commit_lock(engine) -> None:
+    buffer = MessageWriteBuffer(engine, batch_size=1000, flush_interval=60.0)
+    buffer.enqueue(_make_message(0))
+
+    with buffer._commit_lock:
+        seen = buffer.read_with_pending(lambda pending: [msg.message_id for msg in pending])
+
+    assert seen == ["m0"]
+    buffer.close()
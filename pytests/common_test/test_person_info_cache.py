@@ -0,0 +1,132 @@
+"""人物信息写回缓存测试。"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator
+
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.common.database.database_model import PersonInfo
+from src.person_info import person_info as person_info_module
+from src.person_info.person_info_cache import PersonInfoCache
+
+
+def test_cache_tracks_changed_columns_and_skips_noop_updates() -> None:
+    cache = PersonInfoCache(max_entries=2)
+    cache.put("p1", {"person_name": "甲", "group_cardname": "[]"})
+
+    assert cache.update("p1", {"person_name": "甲", "group_cardname": "[]"}) is False
+    assert cache.update("p1", {"person_name": "甲", "group_cardname": '[{"group_id": "1"}]'}) is True
+    assert cache.is_unchanged("p1", {"person_name": "甲"}) is False
+
+    cache.put("p2", {"person_name": "乙"})
+    cache.put("p3", {"person_name": "丙"})
+    # 脏条目在写回前不会被淘汰
+    assert cache.get("p1") is not None
+    assert cache.get("p2") is None
+
+    dirty = cache.pop_dirty()
+    assert dirty == {"p1": {"group_cardname": '[{"group_id": "1"}]'}}
+    cache.invalidate("p1")
+    cache.restore_dirty(dirty)
+    assert cache.pop_dirty() == {}
+
+
+@pytest.fixture
+def counted_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """将 person_info 模块的数据库会话替换为临时 SQLite，并统计会话次数。"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'person.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine, tables=[PersonInfo.__table__])  # type: ignore[list-item]
+    session_factory = sessionmaker(bind=engine, class_=Session, autoflush=False)
+    counter = {"sessions": 0}
+
+    @contextmanager
+    def _get_db_session(auto_commit: bool = True) -> Generator[Session, None, None]:
+        counter["sessions"] += 1
+        session = session_factory()
+        try:
+            yield session
+            if auto_commit:
+                session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(person_info_module, "get_db_session", _get_db_session)
+    monkeypatch.setattr(person_info_module, "person_info_cache", PersonInfoCache())
+    yield engine, counter
+    engine.dispose()
+
+
+def test_register_person_is_query_free_in_steady_state(counted_db) -> None:
+    engine, counter = counted_db
+    Person = person_info_module.Person
+
+    Person.register_person("qq", "10001", "看番的龙", group_id="20001", group_nick_name="白泽大人")
+    counter["sessions"] = 0
+
+    for _ in range(5):
+        person = Person.register_person("qq", "10001", "看番的龙", group_id="20001", group_nick_name="白泽大人")
+    assert counter["sessions"] == 0
+    assert person.person_name == "看番的龙"
+
+    Person.register_person("qq", "10001", "看番的龙", group_id="20002", group_nick_name="新群名片")
+    assert counter["sessions"] == 0
+    assert person_info_module.flush_person_info_cache() == 1
+
+    with Session(engine) as session:
+        record = session.exec(select(PersonInfo)).one()
+        assert "新群名片" in (record.group_cardname or "")
+        assert record.first_known_time is not None
+
+    person_info_module.person_info_cache.invalidate(record.person_id)
+    assert person_info_module.flush_person_info_cache() == 0
+    assert person_info_module.is_person_known(platform="qq", user_id="10001") is True
+
+
+def test_direct_sync_is_not_overwritten_by_inflight_flush(counted_db, monkeypatch: pytest.MonkeyPatch) -> None:
+    engine, _ = counted_db
+    Person = person_info_module.Person
+
+    Person.register_person("qq", "10001", "看番的龙", group_id="20001", group_nick_name="白泽大人")
+    person_info_module.flush_person_info_cache()
+    person = Person.register_person("qq", "10001", "看番的龙", group_id="20002", group_nick_name="旧群名片")
+
+    get_db_session = person_info_module.get_db_session
+    flush_entered = threading.Event()
+    release_flush = threading.Event()
+
+    @contextmanager
+    def _slow_db_session(auto_commit: bool = True) -> Generator[Session, None, None]:
+        flush_entered.set()
+        release_flush.wait(timeout=5)
+        with get_db_session(auto_commit) as session:
+            yield session
+
+    monkeypatch.setattr(person_info_module, "get_db_session", _slow_db_session)
+    flusher = threading.Thread(target=person_info_module.flush_person_info_cache)
+    flusher.start()
+    assert flush_entered.wait(timeout=5)
+    monkeypatch.setattr(person_info_module, "get_db_session", get_db_session)
+
+    person.group_cardname_list = [{"group_id": "20002", "group_cardname": "新群名片"}]
+    syncer = threading.Thread(target=person.sync_to_database)
+    syncer.start()
+    syncer.join(timeout=0.05)
+    # 直写等待正在提交的批量写回，随后以更新的值覆盖
+    assert syncer.is_alive()
+
+    release_flush.set()
+    flusher.join(timeout=5)
+    syncer.join(timeout=5)
+
+    with Session(engine) as session:
+        record = session.exec(select(PersonInfo)).one()
+        assert "新群名片" in (record.group_cardname or "")
+        assert "旧群名片" not in (record.group_cardname or "")
+    assert person_info_module.flush_person_info_cache() == 0
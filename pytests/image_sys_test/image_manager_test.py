@@ -62,6 +62,7 @@ class DummyMaiImage:
         self.image_format = "png"
         self.description = ""
         self.vlm_processed = False
+        self.perceptual_hash = None
 
     @classmethod
     def from_db_instance(cls, record):
@@ -69,6 +70,7 @@ class DummyMaiImage:
         image.file_hash = getattr(record, "image_hash", "dummy-hash")
         image.description = getattr(record, "description", "")
         image.vlm_processed = getattr(record, "vlm_processed", False)
+        image.perceptual_hash = getattr(record, "perceptual_hash", None)
         return image
 
     def to_db_instance(self):
@@ -83,6 +85,7 @@ class DummyMaiImage:
             query_count=0,
             register_time=None,
             vlm_processed=self.vlm_processed,
+            perceptual_hash=self.perceptual_hash,
         )
 
     async def calculate_hash_format(self):
@@ -293,3 +296,53 @@ async def test_get_image_description_returns_cached_description_after_session_cl
     desc = await mgr.get_image_description(image_hash="cached-hash", wait_for_build=False)
 
     assert desc == "cached description"
+
+
+@pytest.mark.asyncio
+async def test_backfill_records_failed_perceptual_hash(monkeypatch, tmp_path):
+    image_manager = _load_image_manager_module(tmp_path)
+
+    session = DummySession()
+    session.record = types.SimpleNamespace(perceptual_hash=None)
+    monkeypatch.setattr(image_manager, "get_db_session", lambda: session)
+    monkeypatch.setattr(image_manager, "compute_perceptual_hash", lambda image_bytes: None)
+
+    mgr = image_manager.ImageManager()
+    image = DummyMaiImage()
+    await mgr._backfill_perceptual_hash(image, b"undecodable")
+
+    assert image.perceptual_hash == image_manager.PERCEPTUAL_HASH_UNAVAILABLE
+    assert session.record.perceptual_hash == image_manager.PERCEPTUAL_HASH_UNAVAILABLE
+    assert image.perceptual_hash is not None
+
+
+@pytest.mark.asyncio
+async def test_images_described_while_index_loads_are_added_after_loading(monkeypatch, tmp_path):
+    import asyncio
+    import threading
+
+    image_manager = _load_image_manager_module(tmp_path)
+
+    release_load = threading.Event()
+    mgr = image_manager.ImageManager()
+
+    def _load_perceptual_index():
+        release_load.wait(timeout=5)
+        return image_manager.PerceptualHashIndex()
+
+    monkeypatch.setattr(mgr, "_load_perceptual_index", _load_perceptual_index)
+    loading = asyncio.create_task(mgr._get_perceptual_index())
+    while mgr._perceptual_index_additions is None:
+        await asyncio.sleep(0.001)
+
+    image = DummyMaiImage()
+    image.file_hash = "described-while-loading"
+    image.description = "desc"
+    image.vlm_processed = True
+    image.perceptual_hash = "0f" * 16
+    mgr._add_to_perceptual_index(image)
+    release_load.set()
+
+    index = await loading
+    assert index.search("0f" * 16, 0) == [(0, "described-while-loading")]
+    assert mgr._perceptual_index_additions is None
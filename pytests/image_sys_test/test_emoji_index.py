@@ -0,0 +1,74 @@
+"""表情包情绪标签索引测试。"""
+
+from pathlib import Path
+from typing import List, Tuple
+
+import heapq
+
+import Levenshtein
+import pytest
+
+from src.common.data_models.image_data_model import MaiEmoji
+from src.emoji_system.emoji_index import EmojiTagIndex
+from src.emoji_system.emoji_manager import EmojiManager, _get_emoji_emotions
+
+
+def _build_emoji(image_path: Path, file_hash: str, description: str) -> MaiEmoji:
+    emoji = MaiEmoji(full_path=image_path)
+    emoji.file_hash = file_hash
+    emoji.description = description
+    return emoji
+
+
+def _brute_force_top_matches(emojis: List[MaiEmoji], query: str, limit: int) -> List[Tuple[MaiEmoji, float]]:
+    normalized_query = query.strip().lower()
+    scored: List[Tuple[MaiEmoji, float]] = []
+    for emoji in emojis:
+        tags = [tag.strip().lower() for tag in _get_emoji_emotions(emoji)]
+        if tags:
+            scored.append(
+                (emoji, max(1 - Levenshtein.distance(normalized_query, tag) / max(len(normalized_query), len(tag)) for tag in tags))
+            )
+    return heapq.nlargest(limit, scored, key=lambda item: item[1])
+
+
+@pytest.fixture
+def image_path(tmp_path: Path) -> Path:
+    path = tmp_path / "emoji.png"
+    path.write_bytes(b"")
+    return path
+
+
+def test_top_matches_equals_linear_scan(image_path: Path) -> None:
+    descriptions = ["开心,大笑", "难过", "开心", "无语,尴尬", "Happy,lol", "", "有点开心", "暗中观察", "开心"]
+    emojis = [_build_emoji(image_path, f"hash-{index}", text) for index, text in enumerate(descriptions)]
+    index = EmojiTagIndex(emojis, _get_emoji_emotions)
+
+    for query in ["开心", "  HAPPY ", "非常开心", "生气", "观察", "lol"]:
+        for limit in (1, 3, 10):
+            assert index.top_matches(query, limit) == _brute_force_top_matches(emojis, query, limit)
+    assert index.top_matches("", 10) == []
+
+
+def test_manager_rebuilds_index_and_batches_usage(image_path: Path) -> None:
+    manager = EmojiManager()
+    try:
+        first = _build_emoji(image_path, "hash-1", "开心")
+        manager.emojis.append(first)
+        assert manager._get_emoji_index().top_matches("开心", 10) == [(first, 1.0)]
+
+        second = _build_emoji(image_path, "hash-2", "开心,难过")
+        manager.emojis.append(second)
+        assert [emoji for emoji, _ in manager._get_emoji_index().top_matches("开心", 10)] == [first, second]
+
+        second.description = "难过"
+        manager.invalidate_emoji_index()
+        assert manager._get_emoji_index().top_matches("开心", 1) == [(first, 1.0)]
+
+        assert manager.update_emoji_usage(first) is True
+        assert manager.update_emoji_usage(first) is True
+        assert first.query_count == 2
+        assert first.last_used_time is not None
+        assert list(manager._pending_usage) == ["hash-1"]
+    finally:
+        manager.shutdown()
@@ -65,6 +65,7 @@ async def test_calculate_hash_format_reuses_existing_target_file(tmp_path: Path)
             {
                 "description": "",
                 "vlm_processed": False,
+                "perceptual_hash": None,
             },
         ),
     ],
@@ -0,0 +1,113 @@
+"""图片感知哈希与近重复复核测试。"""
+
+from typing import Dict, List, Tuple
+
+import io
+import random
+
+from PIL import Image as PILImage
+from PIL import ImageDraw, ImageFont
+
+from src.common.utils.utils_perceptual_hash import (
+    DEFAULT_DETAIL_THRESHOLD,
+    PerceptualHashIndex,
+    compute_detail_thumbnail,
+    compute_perceptual_hash,
+    hamming_distance,
+    max_block_difference,
+)
+
+_MAX_DISTANCE = 12
+
+
+def _build_picture(rng: random.Random, caption: str) -> PILImage.Image:
+    image = PILImage.new("RGB", (320, 240), (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(5):
+        x0, y0 = rng.randint(0, 280), rng.randint(0, 200)
+        color = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+        draw.ellipse([x0, y0, x0 + rng.randint(20, 120), y0 + rng.randint(20, 120)], fill=color)
+    font = ImageFont.load_default(size=30)
+    draw.text((30, 180), caption, fill=(255, 255, 255), font=font, stroke_width=2, stroke_fill=(0, 0, 0))
+    return image
+
+
+def _encode(image: PILImage.Image, image_format: str, quality: int = 90) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.save(buffer, format="JPEG", quality=quality)
+    else:
+        image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _build_variants(image: PILImage.Image) -> List[bytes]:
+    half = image.resize((image.width // 2, image.height // 2), PILImage.Resampling.BILINEAR)
+    enlarged = image.resize((image.width * 3 // 2, image.height * 3 // 2), PILImage.Resampling.BICUBIC)
+    return [_encode(half, "PNG"), _encode(enlarged, "PNG"), _encode(image, "JPEG", 40), _encode(image, "WEBP")]
+
+
+def test_bk_tree_search_matches_brute_force() -> None:
+    rng = random.Random(1)
+    hashes = [f"{rng.getrandbits(128):032x}" for _ in range(300)]
+    # 人为制造一批彼此接近的哈希
+    base = int(hashes[0], 16)
+    hashes.extend(f"{base ^ (1 << rng.randrange(128)) ^ (1 << rng.randrange(128)):032x}" for _ in range(30))
+
+    index: PerceptualHashIndex[int] = PerceptualHashIndex()
+    for key, perceptual_hash in enumerate(hashes):
+        index.add(perceptual_hash, key)
+    index.add(hashes[0], 0)
+    assert len(index) == len(hashes)
+
+    for query in (hashes[0], hashes[5], f"{rng.getrandbits(128):032x}"):
+        for max_distance in (0, 4, 40, 60):
+            expected = sorted(
+                (hamming_distance(int(query, 16), int(item, 16)), key)
+                for key, item in enumerate(hashes)
+                if hamming_distance(int(query, 16), int(item, 16)) <= max_distance
+            )
+            assert sorted(index.search(query, max_distance)) == expected
+
+
+def test_flat_or_invalid_images_are_not_hashed() -> None:
+    assert compute_perceptual_hash(b"not an image") is None
+    assert compute_perceptual_hash(_encode(PILImage.new("RGB", (64, 64), (200, 200, 200)), "PNG")) is None
+    assert compute_detail_thumbnail(b"not an image") is None
+
+
+def test_variants_reuse_description_and_captions_stay_distinct() -> None:
+    """模拟入库：同图变体应复用描述，仅配字不同的同模板图必须重新生成描述。"""
+    corpus: List[Tuple[int, bytes]] = []
+    base_id = 0
+    for template_seed in range(6):
+        for caption in ("OK", "no way"):
+            original = _build_picture(random.Random(template_seed), caption)
+            corpus.append((base_id, _encode(original, "PNG")))
+            corpus.extend((base_id, variant) for variant in _build_variants(original))
+            base_id += 1
+    random.Random(0).shuffle(corpus)
+
+    index: PerceptualHashIndex[int] = PerceptualHashIndex()
+    thumbnails: Dict[int, object] = {}
+    described: Dict[int, int] = {}
+    vlm_calls = 0
+    for position, (image_base, image_bytes) in enumerate(corpus):
+        perceptual_hash = compute_perceptual_hash(image_bytes)
+        thumbnail = compute_detail_thumbnail(image_bytes)
+        assert perceptual_hash is not None and thumbnail is not None
+
+        source = None
+        for _, candidate in index.search(perceptual_hash, _MAX_DISTANCE):
+            if max_block_difference(thumbnail, thumbnails[candidate]) <= DEFAULT_DETAIL_THRESHOLD:
+                source = described[candidate]
+                break
+        if source is None:
+            vlm_calls += 1
+            source = image_base
+        assert source == image_base
+        described[position] = source
+        thumbnails[position] = thumbnail
+        index.add(perceptual_hash, position)
+
+    assert vlm_calls == base_id
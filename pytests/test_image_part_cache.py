@@ -0,0 +1,88 @@
+"""图片片段共享缓存测试。"""
+
+from __future__ import annotations
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from src.llm_models.image_part_cache import ImagePartCache
+from src.llm_models.model_client import openai_client
+from src.llm_models.payload_content.message import ImageMessagePart, Message, RoleType, TextMessagePart
+from src.llm_models.utils import compress_messages
+
+
+def _image_base64(image_format: str, color: str = "red") -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), color).save(buffer, format=image_format)
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch: pytest.MonkeyPatch) -> ImagePartCache:
+    cache = ImagePartCache()
+    monkeypatch.setattr(openai_client, "image_part_cache", cache)
+    monkeypatch.setattr("src.llm_models.utils.image_part_cache", cache)
+    return cache
+
+
+def test_cache_is_bounded_by_entries_and_bytes() -> None:
+    cache = ImagePartCache(max_entries=2, max_bytes=10)
+    cache.get_or_create("a", "v", 0, lambda: "1234")
+    cache.get_or_create("b", "v", 0, lambda: "1234")
+    cache.get_or_create("a", "v", 0, lambda: "unused")
+    cache.get_or_create("c", "v", 0, lambda: "1234")
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 8
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 1
+    # 最近使用过的 a 被保留
+    assert cache.get_or_create("a", "v", 0, lambda: "miss") == "1234"
+
+    cache.get_or_create("big", "v", 0, lambda: "x" * 11)
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_openai_image_parts_are_transcoded_once(fresh_cache: ImagePartCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    original_normalize = openai_client._normalize_image_part_for_openai
+
+    def _counting_normalize(part: ImageMessagePart):
+        calls.append(part.image_format)
+        return original_normalize(part)
+
+    monkeypatch.setattr(openai_client, "_normalize_image_part_for_openai", _counting_normalize)
+    message = Message(
+        role=RoleType.User,
+        parts=[TextMessagePart(text="看图"), ImageMessagePart(image_format="gif", image_base64=_image_base64("GIF"))],
+    )
+
+    for _ in range(3):
+        await openai_client._prepare_image_parts([message])
+        payload = openai_client._convert_messages([message])
+    image_url = payload[0]["content"][1]["image_url"]["url"]  # type: ignore[index]
+    assert image_url.startswith("data:image/webp;base64,")
+    assert calls == ["gif"]
+
+    broken = Message(role=RoleType.User, parts=[ImageMessagePart(image_format="png", image_base64="bm90LWFuLWltYWdl")])
+    for _ in range(2):
+        await openai_client._prepare_image_parts([broken])
+        payload = openai_client._convert_messages([broken])
+    assert payload[0]["content"][0]["text"] == "[图片内容不可用]"  # type: ignore[index]
+    assert calls == ["gif", "png"]
+
+
+def test_compress_messages_reuses_cached_payload(fresh_cache: ImagePartCache) -> None:
+    message = Message(role=RoleType.User, parts=[ImageMessagePart(image_format="png", image_base64=_image_base64("PNG"))])
+
+    first = compress_messages([message], img_target_size=1024 * 1024)
+    second = compress_messages([message], img_target_size=1024 * 1024)
+    assert first[0].parts[0].image_base64 == second[0].parts[0].image_base64  # type: ignore[union-attr]
+    assert fresh_cache.stats()["hits"] == 1
+
+    compress_messages([message], img_target_size=512)
+    assert fresh_cache.stats()["entries"] == 2
@@ -0,0 +1,134 @@
+"""LLMOrchestrator 对冲请求测试。"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+import asyncio
+
+import pytest
+
+from src.config.config import config_manager
+from src.config.model_configs import TaskConfig
+from src.llm_models import utils_model
+from src.llm_models.exceptions import ReqAbortException
+from src.llm_models.model_client.base_client import APIResponse, UsageRecord
+from src.llm_models.model_router import ModelRouter
+from src.llm_models.utils_model import LLMOrchestrator, RequestType
+
+
+def _build_orchestrator(
+    monkeypatch: pytest.MonkeyPatch,
+    task_config: TaskConfig,
+    latencies: Dict[str, Optional[float]],
+) -> tuple[LLMOrchestrator, List[str], List[str]]:
+    """构建一个使用模拟模型的编排器。
+
+    ``latencies`` 中值为 None 的模型会一直挂起，直到被中断。
+    """
+    model_config = SimpleNamespace(model_task_config=SimpleNamespace(planner=task_config))
+    monkeypatch.setattr(config_manager, "get_model_config", lambda: model_config)
+    router = ModelRouter()
+    monkeypatch.setattr(utils_model, "model_router", router)
+    recorded: List[str] = []
+    aborted: List[str] = []
+    monkeypatch.setattr(
+        utils_model.llm_usage_recorder,
+        "record_usage_to_database",
+        lambda model_info, **_: recorded.append(model_info.name),
+    )
+
+    orchestrator = LLMOrchestrator("planner", request_type="maisaka_planner")
+
+    def _select_model(exclude_models: Optional[Set[str]] = None) -> Any:
+        candidates = [
+            (name, f"provider-{name}") for name in task_config.model_list if not exclude_models or name not in exclude_models
+        ]
+        name = router.select(candidates, "balance")
+        return SimpleNamespace(name=name), SimpleNamespace(name=f"provider-{name}"), None
+
+    def _build_client_request(*, model_info: Any, interrupt_flag: asyncio.Event | None, **_: Any) -> Any:
+        return SimpleNamespace(model_info=model_info, interrupt_flag=interrupt_flag)
+
+    async def _attempt_request_on_model(api_provider: Any, client: Any, request: Any) -> APIResponse:
+        name = request.model_info.name
+        latency = latencies[name]
+        if latency is None:
+            await request.interrupt_flag.wait()
+            aborted.append(name)
+            raise ReqAbortException("请求被外部信号中断")
+        await asyncio.sleep(latency)
+        usage = UsageRecord(
+            model_name=name, provider_name=api_provider.name, prompt_tokens=1, completion_tokens=1, total_tokens=2
+        )
+        return APIResponse(content=name, usage=usage)
+
+    monkeypatch.setattr(orchestrator, "_select_model", _select_model)
+    monkeypatch.setattr(orchestrator, "_build_client_request", _build_client_request)
+    monkeypatch.setattr(orchestrator, "_attempt_request_on_model", _attempt_request_on_model)
+    return orchestrator, recorded, aborted
+
+
+@pytest.mark.asyncio
+async def test_hedge_fires_after_deadline_and_aborts_loser(monkeypatch: pytest.MonkeyPatch) -> None:
+    task_config = TaskConfig(model_list=["stuck", "fast"], enable_hedging=True, hedge_delay=0.05)
+    orchestrator, _, aborted = _build_orchestrator(monkeypatch, task_config, {"stuck": None, "fast": 0.01})
+
+    result = await orchestrator._execute_request(request_type=RequestType.RESPONSE)
+    assert result.api_response.content == "fast"
+
+    await asyncio.sleep(0.05)
+    assert aborted == ["stuck"]
+    snapshot = utils_model.model_router.snapshot()["models"]
+    assert snapshot["stuck"]["inflight"] == 0
+    assert snapshot["fast"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_fired_when_first_model_is_fast(monkeypatch: pytest.MonkeyPatch) -> None:
+    task_config = TaskConfig(model_list=["a", "b"], enable_hedging=True, hedge_delay=0.5)
+    orchestrator, recorded, _ = _build_orchestrator(monkeypatch, task_config, {"a": 0.01, "b": 0.01})
+
+    result = await orchestrator._execute_request(request_type=RequestType.RESPONSE)
+    assert result.api_response.content == "a"
+    # 胜出通道的用量由调用方记录，此处没有落败通道
+    assert recorded == []
+
+
+@pytest.mark.asyncio
+async def test_loser_that_already_returned_records_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    task_config = TaskConfig(model_list=["a", "b"], enable_hedging=True, hedge_delay=0.01)
+    orchestrator, recorded, _ = _build_orchestrator(monkeypatch, task_config, {"a": 0.05, "b": 0.05})
+
+    result = await orchestrator._execute_request(request_type=RequestType.RESPONSE)
+    await asyncio.sleep(0.1)
+    loser = "b" if result.api_response.content == "a" else "a"
+    assert recorded == [loser]
+
+
+@pytest.mark.asyncio
+async def test_outer_interrupt_aborts_all_lanes(monkeypatch: pytest.MonkeyPatch) -> None:
+    task_config = TaskConfig(model_list=["a", "b"], enable_hedging=True, hedge_delay=0.01)
+    orchestrator, _, aborted = _build_orchestrator(monkeypatch, task_config, {"a": None, "b": None})
+    interrupt_flag = asyncio.Event()
+    asyncio.get_running_loop().call_later(0.05, interrupt_flag.set)
+
+    with pytest.raises(ReqAbortException):
+        await orchestrator._execute_request(request_type=RequestType.RESPONSE, interrupt_flag=interrupt_flag)
+    assert sorted(aborted) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_stream_handler_disables_hedging(monkeypatch: pytest.MonkeyPatch) -> None:
+    task_config = TaskConfig(model_list=["slow", "fast"], enable_hedging=True, hedge_delay=0.01)
+    orchestrator, _, _ = _build_orchestrator(monkeypatch, task_config, {"slow": 0.05, "fast": 0.01})
+
+    async def _stream_response_handler(*_: Any) -> Any:
+        raise AssertionError("模拟客户端不会调用流式处理函数")
+
+    result = await orchestrator._execute_request(
+        request_type=RequestType.RESPONSE, stream_response_handler=_stream_response_handler
+    )
+    assert result.api_response.content == "slow"
+    assert utils_model.model_router.snapshot()["models"].get("fast", {}).get("requests", 0) == 0
@@ -0,0 +1,100 @@
+"""Maisaka 上下文消息转换缓存测试。"""
+
+from datetime import datetime
+from typing import List
+
+import gc
+
+import pytest
+
+from src.llm_models.payload_content.tool_option import ToolCall
+from src.maisaka import chat_loop_service as chat_loop_module
+from src.maisaka.chat_loop_service import MaisakaChatLoopService
+from src.maisaka.context_message_cache import ContextMessageCache
+from src.maisaka.context_messages import AssistantMessage, LLMContextMessage, ReferenceMessage, ToolResultMessage
+
+_NOW = datetime(2026, 4, 5, 12, 0, 0)
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch: pytest.MonkeyPatch) -> ContextMessageCache:
+    cache = ContextMessageCache()
+    monkeypatch.setattr(chat_loop_module, "context_message_cache", cache)
+    return cache
+
+
+def _history(turns: int) -> List[LLMContextMessage]:
+    history: List[LLMContextMessage] = []
+    for index in range(turns):
+        history.append(ReferenceMessage(content=f"第 {index} 条消息", timestamp=_NOW, remaining_uses_value=None))
+        history.append(
+            AssistantMessage(
+                content=f"思考 {index}",
+                timestamp=_NOW,
+                tool_calls=[
+                    ToolCall(call_id=f"reply-{index}", func_name="reply", args={}),
+                    ToolCall(call_id=f"wait-{index}", func_name="wait", args={}),
+                ],
+            )
+        )
+        history.append(ToolResultMessage(content="ok", timestamp=_NOW, tool_call_id=f"reply-{index}", tool_name="reply"))
+        history.append(ToolResultMessage(content="ok", timestamp=_NOW, tool_call_id=f"wait-{index}", tool_name="wait"))
+    return history
+
+
+def _select(history: List[LLMContextMessage], max_context_size: int) -> List[LLMContextMessage]:
+    selected, _ = MaisakaChatLoopService.select_llm_context_messages(
+        history,
+        enable_visual_message=False,
+        request_kind="planner",
+        max_context_size=max_context_size,
+    )
+    return selected
+
+
+def test_selection_reuses_conversions_and_derived_messages(fresh_cache: ContextMessageCache) -> None:
+    history = _history(6)
+    service = MaisakaChatLoopService.__new__(MaisakaChatLoopService)
+    service._chat_system_prompt = "system"
+
+    first = _select(history, max_context_size=4)
+    service._build_request_messages(first, enable_visual_message=False)
+    misses_after_first_round = fresh_cache.stats()["misses"]
+
+    second = _select(history, max_context_size=4)
+    built_messages = service._build_request_messages(second, enable_visual_message=False)
+    assert [id(message) for message in first] == [id(message) for message in second]
+    assert len(built_messages) == len(second) + 1
+    assert fresh_cache.stats()["misses"] == misses_after_first_round
+
+    # timing gate 工具结果被过滤，部分工具调用被剔除的 assistant 消息只保留 reply
+    assert all(not (isinstance(message, ToolResultMessage) and message.tool_name == "wait") for message in second)
+    assistant_messages = [message for message in second if isinstance(message, AssistantMessage)]
+    assert assistant_messages
+    assert all([call.func_name for call in message.tool_calls] == ["reply"] for message in assistant_messages)
+
+
+def test_selection_only_converts_the_tail_window(fresh_cache: ContextMessageCache) -> None:
+    history = _history(50)
+    _select(history, max_context_size=3)
+    # 只处理了窗口附近的消息，而不是全部 200 条历史
+    assert fresh_cache.stats()["misses"] < 20
+
+    history.append(ReferenceMessage(content="新消息", timestamp=_NOW, remaining_uses_value=None))
+    misses_before = fresh_cache.stats()["misses"]
+    selected = _select(history, max_context_size=3)
+    assert selected[-1].processed_plain_text.endswith("新消息")
+    assert fresh_cache.stats()["misses"] - misses_before <= 2
+
+
+def test_cache_entries_follow_message_lifetime() -> None:
+    cache = ContextMessageCache()
+    message = ReferenceMessage(content="临时消息", timestamp=_NOW)
+    first = cache.to_llm_message(message, enable_visual_message=True)
+    assert cache.to_llm_message(message, enable_visual_message=True) is first
+    cache.to_llm_message(message, enable_visual_message=False)
+    assert cache.stats()["entries"] == 2
+
+    del message
+    gc.collect()
+    assert cache.stats()["entries"] == 0
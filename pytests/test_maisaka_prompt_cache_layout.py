@@ -0,0 +1,120 @@
+"""Maisaka 提示词缓存友好布局的离线回放测试。"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+import json
+
+import pytest
+
+from src.config.config import global_config
+from src.llm_models.model_client import openai_client
+from src.llm_models.payload_content.tool_option import ToolCall
+from src.maisaka.chat_loop_service import MaisakaChatLoopService
+from src.maisaka.context_messages import AssistantMessage, LLMContextMessage, ReferenceMessage, ToolResultMessage
+from src.maisaka.history_post_processor import process_chat_history_after_cycle
+
+_MAX_CONTEXT_SIZE = 12
+_TURNS = 80
+
+
+def _append_turn(history: List[LLMContextMessage], index: int) -> None:
+    timestamp = datetime(2026, 4, 5, 12, 0, 0) + timedelta(minutes=index)
+    history.append(ReferenceMessage(content=f"群友消息 {index}", timestamp=timestamp, remaining_uses_value=None))
+    call_id = f"reply-{index}"
+    history.append(
+        AssistantMessage(
+            content=f"第 {index} 轮的想法",
+            timestamp=timestamp,
+            tool_calls=[ToolCall(call_id=call_id, func_name="reply", args={"msg_id": str(index)})],
+        )
+    )
+    history.append(ToolResultMessage(content="已回复", timestamp=timestamp, tool_call_id=call_id, tool_name="reply"))
+
+
+def _replay_conversation(block_size: int) -> List[List[str]]:
+    """回放一段对话，返回每轮请求序列化后的消息列表。"""
+
+    service = MaisakaChatLoopService(chat_system_prompt="稳定的系统提示词与人设")
+    history: List[LLMContextMessage] = []
+    requests: List[List[str]] = []
+    for index in range(_TURNS):
+        _append_turn(history, index)
+        selected_history, _ = MaisakaChatLoopService.select_llm_context_messages(
+            history,
+            enable_visual_message=False,
+            request_kind="planner",
+        )
+        built_messages = service._build_request_messages(selected_history, enable_visual_message=False)
+        requests.append(
+            [json.dumps(payload, ensure_ascii=False, sort_keys=True) for payload in openai_client._convert_messages(built_messages)]
+        )
+        history = process_chat_history_after_cycle(
+            history,
+            max_context_size=_MAX_CONTEXT_SIZE,
+            block_size=block_size,
+        ).history
+    return requests
+
+
+def _prefix_reuse_ratio(requests: List[List[str]]) -> float:
+    """计算相邻请求中，上一轮请求整体作为本轮前缀被复用的平均比例。"""
+
+    ratios: List[float] = []
+    for previous, current in zip(requests, requests[1:], strict=False):
+        shared = 0
+        for previous_message, current_message in zip(previous, current, strict=False):
+            if previous_message != current_message:
+                break
+            shared += 1
+        ratios.append(shared / len(previous))
+    return sum(ratios) / len(ratios)
+
+
+@pytest.fixture
+def chat_config(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(global_config.chat, "max_context_size", _MAX_CONTEXT_SIZE)
+    return global_config.chat
+
+
+def test_cache_layout_keeps_request_prefix_stable(chat_config, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(chat_config, "enable_prompt_cache_layout", False)
+    baseline_ratio = _prefix_reuse_ratio(_replay_conversation(block_size=0))
+
+    block_size = 10
+    monkeypatch.setattr(chat_config, "enable_prompt_cache_layout", True)
+    monkeypatch.setattr(chat_config, "prompt_cache_block_size", block_size)
+    cache_requests = _replay_conversation(block_size=MaisakaChatLoopService.resolve_prompt_cache_block_size())
+    cache_ratio = _prefix_reuse_ratio(cache_requests)
+
+    # 滑动窗口每轮都会改变前部，只有系统提示词能被复用
+    assert baseline_ratio < 0.3
+    assert cache_ratio > 0.8
+    # 系统提示词在所有请求中字节级一致
+    assert len({request[0] for request in cache_requests}) == 1
+    # 上下文不会无限增长（每轮 3 条消息，其中 1 条占用上下文窗口）
+    assert max(len(request) for request in cache_requests) <= 1 + 3 * (_MAX_CONTEXT_SIZE + 2 * block_size)
+
+
+def test_prompt_cache_control_marks_system_and_last_message() -> None:
+    payload = [
+        {"role": "system", "content": "system"},
+        {"role": "user", "content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]},
+    ]
+    openai_client._apply_prompt_cache_control(payload)  # type: ignore[arg-type]
+    assert payload[0]["content"] == [{"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}]
+    assert "cache_control" not in payload[1]["content"][0]  # type: ignore[index]
+    assert payload[1]["content"][1]["cache_control"] == {"type": "ephemeral"}  # type: ignore[index]
+
+
+def test_cached_tokens_are_extracted_from_usage() -> None:
+    class _Details:
+        cached_tokens = 96
+
+    class _Usage:
+        prompt_tokens = 128
+        completion_tokens = 8
+        total_tokens = 136
+        prompt_tokens_details = _Details()
+
+    assert openai_client._extract_usage_record(_Usage()) == (128, 8, 136, 96)
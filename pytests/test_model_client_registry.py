@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.llm_models.model_client.base_client import ClientRegistry
+
+
+class _DummyClient:
+    def __init__(self, api_provider) -> None:
+        self.api_provider = api_provider
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _build_registry(monkeypatch) -> ClientRegistry:
+    monkeypatch.setattr("src.llm_models.model_client.ensure_client_type_loaded", lambda client_type: None)
+    registry = ClientRegistry()
+    registry.client_registry["dummy"] = _DummyClient  # type: ignore[assignment]
+    return registry
+
+
+def test_client_instances_are_reused_within_event_loop_and_isolated_across_loops(monkeypatch) -> None:
+    registry = _build_registry(monkeypatch)
+    provider = SimpleNamespace(name="provider-a", client_type="dummy")
+
+    async def _acquire_twice():
+        return registry.get_client_class_instance(provider), registry.get_client_class_instance(provider)
+
+    first, second = asyncio.run(_acquire_twice())
+    other, _ = asyncio.run(_acquire_twice())
+
+    assert first is second
+    assert other is not first
+    assert registry.get_client_class_instance(provider, force_new=True) is not first
+
+
+def test_clear_client_instance_cache_drops_loop_scoped_clients(monkeypatch) -> None:
+    registry = _build_registry(monkeypatch)
+    provider = SimpleNamespace(name="provider-a", client_type="dummy")
+
+    async def _scenario():
+        before = registry.get_client_class_instance(provider)
+        registry.clear_client_instance_cache()
+        return before, registry.get_client_class_instance(provider)
+
+    before, after = asyncio.run(_scenario())
+
+    assert before is not after
+
+
+def test_closed_loops_are_evicted_and_loop_clients_can_be_closed(monkeypatch) -> None:
+    registry = _build_registry(monkeypatch)
+    provider = SimpleNamespace(name="provider-a", client_type="dummy")
+
+    async def _acquire():
+        return registry.get_client_class_instance(provider)
+
+    asyncio.run(_acquire())
+    asyncio.run(_acquire())
+    assert len(registry._loop_instance_caches) == 1
+
+    async def _acquire_and_close():
+        client = registry.get_client_class_instance(provider)
+        await registry.aclose_loop_clients()
+        return client
+
+    client = asyncio.run(_acquire_and_close())
+    assert client.closed
+    assert registry._loop_instance_caches == {}
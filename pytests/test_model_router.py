@@ -0,0 +1,153 @@
+"""共享模型路由器测试。"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.llm_models import model_router as model_router_module
+from src.llm_models.exceptions import parse_retry_after
+from src.llm_models.model_router import BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN, ModelRouter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    fake_clock = _Clock()
+    monkeypatch.setattr(model_router_module.time, "monotonic", fake_clock)
+    return fake_clock
+
+
+def test_balance_prefers_fast_idle_and_healthy_models(clock: _Clock) -> None:
+    router = ModelRouter()
+    candidates = [("fast", "p1"), ("slow", "p2")]
+    router.record_model_result("fast", True, 0.5, total_tokens=100)
+    router.record_model_result("slow", True, 2.0, total_tokens=10)
+
+    assert router.select(candidates, "balance") == "fast"
+    assert router.select(candidates, "balance") == "fast"
+    assert router.select(candidates, "balance") == "fast"
+    # 三个在途请求后，快模型的预期耗时超过慢模型
+    assert router.select(candidates, "balance") == "slow"
+
+    for _ in range(3):
+        router.release("fast")
+    router.release("slow")
+    for _ in range(10):
+        router.record_model_result("fast", False, 0.5)
+    assert router.select(candidates, "balance") == "slow"
+
+
+def test_breaker_trips_and_half_open_probe_doubles_cooldown(clock: _Clock) -> None:
+    router = ModelRouter(failure_threshold=2, cooldown_seconds=10)
+    candidates = [("a", "p1"), ("b", "p2")]
+    router.record_model_result("a", True, 0.1)
+    router.record_model_result("b", True, 1.0)
+
+    router.record_provider_failure("p1")
+    assert router.snapshot()["providers"]["p1"]["state"] == BREAKER_CLOSED
+    router.record_provider_failure("p1")
+    assert router.snapshot()["providers"]["p1"]["state"] == BREAKER_OPEN
+    assert router.select(candidates, "balance") == "b"
+    router.release("b")
+
+    clock.now += 11
+    assert router.select(candidates, "balance") == "a"
+    assert router.snapshot()["providers"]["p1"]["state"] == BREAKER_HALF_OPEN
+    router.release("a")
+
+    # 探测失败：冷却翻倍
+    router.record_provider_failure("p1")
+    snapshot = router.snapshot()["providers"]["p1"]
+    assert snapshot["state"] == BREAKER_OPEN
+    assert snapshot["cooldown"] == 20
+    assert snapshot["trips"] == 2
+
+    clock.now += 21
+    assert router.select(candidates, "balance") == "a"
+    router.record_provider_success("p1")
+    snapshot = router.snapshot()["providers"]["p1"]
+    assert snapshot["state"] == BREAKER_CLOSED
+    assert snapshot["cooldown"] == 10
+
+
+def test_retry_after_pauses_provider_and_all_open_falls_back(clock: _Clock) -> None:
+    router = ModelRouter()
+    router.record_provider_failure("p1", retry_after=5)
+    router.record_provider_failure("p2", retry_after=2)
+
+    # 全部暂停时选择最早恢复的提供商
+    assert router.select([("a", "p1"), ("b", "p2")], "random") == "b"
+    clock.now += 6
+    assert router.select([("a", "p1")], "random") == "a"
+
+
+def test_backoff_delay_bounds_and_retry_after() -> None:
+    for attempt in range(1, 10):
+        ceiling = min(2.0 * 2 ** (attempt - 1), model_router_module.MAX_BACKOFF_SECONDS)
+        delay = ModelRouter.backoff_delay(2.0, attempt)
+        assert ceiling / 2 <= delay <= ceiling
+    assert ModelRouter.backoff_delay(2.0, 1, retry_after=7.5) == 7.5
+    assert ModelRouter.backoff_delay(2.0, 1, retry_after=600) == model_router_module.MAX_BACKOFF_SECONDS
+
+
+def test_parse_retry_after_headers() -> None:
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "1500"})) == 1.5
+    assert parse_retry_after(httpx.Headers({"Retry-After": "3"})) == 3.0
+    assert parse_retry_after(httpx.Headers({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(httpx.Headers({"Retry-After": "soon"})) is None
+
+
+@pytest.mark.asyncio
+async def test_provider_slot_caps_concurrency() -> None:
+    router = ModelRouter()
+    active = 0
+    peak = 0
+
+    async def _call() -> None:
+        nonlocal active, peak
+        async with router.provider_slot("p1", 2):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(_call() for _ in range(6)))
+    assert peak == 2
+
+
+def test_provider_slot_keeps_one_semaphore_per_loop() -> None:
+    router = ModelRouter()
+    loop_a = asyncio.new_event_loop()
+    loop_b = asyncio.new_event_loop()
+
+    async def _acquire(hold: asyncio.Event | None = None) -> None:
+        async with router.provider_slot("p1", 1):
+            if hold is not None:
+                await hold.wait()
+
+    try:
+        hold = asyncio.Event()
+        held = loop_a.create_task(_acquire(hold))
+        loop_a.run_until_complete(asyncio.sleep(0))
+        loop_b.run_until_complete(_acquire())
+
+        semaphores = router._provider_locked("p1").semaphores
+        assert set(semaphores) == {loop_a, loop_b}
+        assert semaphores[loop_a][1].locked()
+
+        loop_a.call_soon(hold.set)
+        loop_a.run_until_complete(held)
+    finally:
+        loop_a.close()
+        loop_b.close()
@@ -0,0 +1,244 @@
+"""Platform IO 按会话有界入站队列测试。"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import asyncio
+import time
+
+import pytest
+
+from src.platform_io.drivers.base import PlatformIODriver
+from src.platform_io.inbound_scheduler import InboundOverflowPolicy, InboundScheduler
+from src.platform_io.manager import PlatformIOManager
+from src.platform_io.types import DeliveryReceipt, DeliveryStatus, DriverDescriptor, DriverKind, InboundMessageEnvelope, RouteBinding, RouteKey
+
+_ROUTE_KEY = RouteKey(platform="qq", account_id="10001", scope="main")
+
+
+def _build_envelope(group_id: str, index: int) -> InboundMessageEnvelope:
+    """构造带有群聊信息的测试用入站信封。
+
+    Args:
+        group_id: 消息所属群号。
+        index: 消息序号。
+
+    Returns:
+        InboundMessageEnvelope: 测试用入站消息信封。
+    """
+    session_message = SimpleNamespace(
+        message_id=f"{group_id}-{index}",
+        message_info=SimpleNamespace(
+            group_info=SimpleNamespace(group_id=group_id),
+            user_info=SimpleNamespace(user_id="20001"),
+        ),
+    )
+    return InboundMessageEnvelope(
+        route_key=_ROUTE_KEY,
+        driver_id="plugin.napcat",
+        driver_kind=DriverKind.PLUGIN,
+        session_message=session_message,  # type: ignore[arg-type]
+        metadata={"index": index, "submitted_at": time.monotonic()},
+    )
+
+
+class _StubPlatformIODriver(PlatformIODriver):
+    """测试用 Platform IO 驱动。"""
+
+    async def send_message(
+        self,
+        message: Any,
+        route_key: RouteKey,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> DeliveryReceipt:
+        """返回一个固定的成功回执。"""
+        return DeliveryReceipt(
+            internal_message_id=str(getattr(message, "message_id", "stub-message-id")),
+            route_key=route_key,
+            status=DeliveryStatus.SENT,
+            driver_id=self.driver_id,
+            driver_kind=self.descriptor.kind,
+        )
+
+
+async def _wait_until(predicate, timeout: float = 5.0) -> None:
+    """轮询等待条件成立。"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待条件超时")
+        await asyncio.sleep(0.001)
+
+
+class TestInboundScheduler:
+    """入站调度器测试。"""
+
+    @pytest.mark.asyncio
+    async def test_flood_session_does_not_delay_quiet_sessions(self) -> None:
+        """刷屏会话被限制在高水位内，安静会话的延迟不受其积压影响。"""
+        dispatched: List[InboundMessageEnvelope] = []
+        quiet_latencies: List[float] = []
+
+        async def dispatcher(envelope: InboundMessageEnvelope) -> None:
+            await asyncio.sleep(0.002)
+            dispatched.append(envelope)
+            if envelope.session_message.message_info.group_info.group_id != "flood":  # type: ignore[union-attr]
+                quiet_latencies.append(time.monotonic() - envelope.metadata["submitted_at"])
+
+        scheduler = InboundScheduler(dispatcher, high_watermark=50, low_watermark=10, max_concurrency=2)
+        try:
+            flood_results = [scheduler.submit("flood", _build_envelope("flood", index)) for index in range(300)]
+            for group_index in range(5):
+                assert scheduler.submit(f"quiet-{group_index}", _build_envelope(f"quiet-{group_index}", 0)) is True
+
+            assert flood_results.count(True) == 50
+            stats = scheduler.stats()
+            assert stats["total_dropped"] == 250
+            assert stats["sessions"][0]["session_key"] == "flood"
+            assert stats["sessions"][0]["shedding"] is True
+
+            await _wait_until(lambda: len(quiet_latencies) == 5)
+            flood_done = sum(
+                1
+                for envelope in dispatched
+                if envelope.session_message.message_info.group_info.group_id == "flood"  # type: ignore[union-attr]
+            )
+            # 轮转调度下安静会话只需等待每个会话各一条消息，而不是刷屏会话的全部积压
+            assert flood_done <= 5
+            assert max(quiet_latencies) < 0.25
+
+            await _wait_until(lambda: len(dispatched) == 55)
+            flood_indices = [
+                envelope.metadata["index"]
+                for envelope in dispatched
+                if envelope.session_message.message_info.group_info.group_id == "flood"  # type: ignore[union-attr]
+            ]
+            assert flood_indices == list(range(50))
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_shedding_recovers_after_reaching_low_watermark(self) -> None:
+        """削峰状态在队列回落到低水位后解除。"""
+        release = asyncio.Event()
+        dispatched: List[int] = []
+
+        async def dispatcher(envelope: InboundMessageEnvelope) -> None:
+            await release.wait()
+            dispatched.append(envelope.metadata["index"])
+
+        scheduler = InboundScheduler(dispatcher, high_watermark=4, low_watermark=1, max_concurrency=1)
+        try:
+            results = [scheduler.submit("group", _build_envelope("group", index)) for index in range(6)]
+            assert results == [True, True, True, True, False, False]
+
+            await asyncio.sleep(0)
+            # 首条消息出队后深度为 3，仍高于低水位
+            assert scheduler.submit("group", _build_envelope("group", 6)) is False
+
+            release.set()
+            await _wait_until(lambda: len(dispatched) == 4)
+            assert scheduler.submit("group", _build_envelope("group", 7)) is True
+            await _wait_until(lambda: len(dispatched) == 5)
+            assert dispatched == [0, 1, 2, 3, 7]
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_coalesce_policy_keeps_latest_message(self) -> None:
+        """coalesce 策略在削峰期间用新消息覆盖队尾。"""
+        release = asyncio.Event()
+        dispatched: List[int] = []
+
+        async def dispatcher(envelope: InboundMessageEnvelope) -> None:
+            await release.wait()
+            dispatched.append(envelope.metadata["index"])
+
+        scheduler = InboundScheduler(
+            dispatcher,
+            high_watermark=3,
+            low_watermark=0,
+            overflow_policy=InboundOverflowPolicy.COALESCE,
+            max_concurrency=1,
+        )
+        try:
+            assert all(scheduler.submit("group", _build_envelope("group", index)) for index in range(10))
+            assert scheduler.stats()["total_coalesced"] == 7
+
+            release.set()
+            await _wait_until(lambda: len(dispatched) == 3)
+            assert dispatched == [0, 1, 9]
+        finally:
+            await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_manager_queues_inbound_per_session() -> None:
+    """启用入站队列后，Broker 按群聊划分会话并异步分发。"""
+    manager = PlatformIOManager()
+    driver = _StubPlatformIODriver(
+        DriverDescriptor(driver_id="plugin.napcat", kind=DriverKind.PLUGIN, platform="qq", account_id="10001", scope="main")
+    )
+    manager.register_driver(driver)
+    manager.bind_receive_route(RouteBinding(route_key=_ROUTE_KEY, driver_id=driver.driver_id, driver_kind=DriverKind.PLUGIN))
+    accepted: List[InboundMessageEnvelope] = []
+
+    async def dispatcher(envelope: InboundMessageEnvelope) -> None:
+        accepted.append(envelope)
+
+    manager.set_inbound_dispatcher(dispatcher)
+    await manager.configure_inbound_queue(enabled=True, high_watermark=2, low_watermark=0)
+    try:
+        assert await manager.accept_inbound(_build_envelope("a", 0)) is True
+        assert await manager.accept_inbound(_build_envelope("a", 1)) is True
+        assert await manager.accept_inbound(_build_envelope("a", 2)) is False
+        assert await manager.accept_inbound(_build_envelope("b", 0)) is True
+        assert manager.inbound_scheduler is not None
+        assert {item["session_key"] for item in manager.inbound_scheduler.stats()["sessions"]} == {
+            "qq:10001:main:group:a",
+            "qq:10001:main:group:b",
+        }
+
+        await _wait_until(lambda: len(accepted) == 3)
+    finally:
+        await manager.configure_inbound_queue(enabled=False)
+    assert manager.inbound_scheduler is None
+
+
+@pytest.mark.asyncio
+async def test_manager_queues_legacy_inbound_through_scheduler() -> None:
+    """旧链 maim_message 入站在启用队列后同样按会话排队，未启用时直接处理。"""
+    manager = PlatformIOManager()
+    handled: List[str] = []
+
+    async def handler(message: Any) -> None:
+        handled.append(message.message_id)
+
+    def _build_legacy_message(group_id: str, index: int) -> Any:
+        return SimpleNamespace(
+            message_id=f"{group_id}-{index}",
+            platform="qq",
+            message_info=SimpleNamespace(
+                group_info=SimpleNamespace(group_id=group_id),
+                user_info=SimpleNamespace(user_id="20001"),
+                additional_config={},
+            ),
+        )
+
+    assert await manager.accept_legacy_inbound(_build_legacy_message("a", 0)) is False
+
+    manager.set_legacy_inbound_handler(handler)
+    assert await manager.accept_legacy_inbound(_build_legacy_message("a", 0)) is True
+    assert handled == ["a-0"]
+
+    await manager.configure_inbound_queue(enabled=True, high_watermark=1, low_watermark=0)
+    try:
+        assert await manager.accept_legacy_inbound(_build_legacy_message("a", 1)) is True
+        assert await manager.accept_legacy_inbound(_build_legacy_message("a", 2)) is False
+        assert manager.inbound_scheduler is not None
+        assert [item["session_key"] for item in manager.inbound_scheduler.stats()["sessions"]] == ["qq:::group:a"]
+
+        await _wait_until(lambda: len(handled) == 2)
+        assert handled == ["a-0", "a-1"]
+    finally:
+        await manager.configure_inbound_queue(enabled=False)
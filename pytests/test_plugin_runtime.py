@@ -187,6 +187,41 @@ class TestProtocol:
         assert decoded.payload["key"] == "value"
         assert decoded.payload["number"] == 42
 
+    def test_msgpack_codec_encodes_like_model_dump(self):
+        """快速编码与 model_dump 的结果一致，包括载荷中嵌套的模型与 dataclass"""
+        from dataclasses import dataclass
+
+        import msgpack
+
+        from src.plugin_runtime.protocol.codec import MsgPackCodec
+        from src.plugin_runtime.protocol.envelope import Envelope, HookHandlerTarget, MessageType
+
+        @dataclass
+        class _Point:
+            x: int
+            y: int
+
+        codec = MsgPackCodec()
+        env = Envelope(
+            request_id=7,
+            message_type=MessageType.BROADCAST,
+            method="runner.log_batch",
+            payload={
+                "target": HookHandlerTarget(plugin_id="demo", component_name="on_message"),
+                "point": _Point(1, 2),
+                "items": [1, "a", None, b"raw"],
+            },
+        )
+
+        data = codec.encode_envelope(env)
+        assert msgpack.unpackb(data, raw=False) == msgpack.unpackb(
+            msgpack.packb(env.model_dump(), use_bin_type=True), raw=False
+        )
+        decoded = codec.decode_envelope(data)
+        assert decoded.message_type is MessageType.BROADCAST
+        assert decoded.payload["point"] == {"x": 1, "y": 2}
+        assert decoded.payload["target"]["component_name"] == "on_message"
+
     def test_json_codec(self):
         """JSON 编解码已移除，仅保留 MsgPack"""
         pass
@@ -252,6 +287,82 @@ class TestTransport:
         await conn.close()
         await server.stop()
 
+    @pytest.mark.asyncio
+    async def test_concurrent_frames_are_corked_into_one_write(self):
+        """同一轮事件循环内发送的帧应合并为一次写入，且保持顺序"""
+        from src.plugin_runtime.transport.uds import UDSTransportClient, UDSTransportServer
+
+        server = UDSTransportServer()
+        received: list[bytes] = []
+        done = asyncio.Event()
+
+        async def handler(conn):
+            for _ in range(20):
+                received.append(await conn.recv_frame())
+            done.set()
+            await asyncio.sleep(0.1)
+
+        await server.start(handler)
+        conn = await UDSTransportClient(server.get_address()).connect()
+        write_calls = []
+        original_writelines = conn._writer.writelines
+
+        def counting_writelines(chunks):
+            write_calls.append(len(chunks))
+            original_writelines(chunks)
+
+        conn._writer.writelines = counting_writelines
+
+        await asyncio.gather(*(conn.send_frame(f"frame-{index}".encode()) for index in range(20)))
+        await asyncio.wait_for(done.wait(), timeout=5.0)
+
+        assert write_calls == [40]
+        assert received == [f"frame-{index}".encode() for index in range(20)]
+
+        await conn.close()
+        await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_large_frames_are_compressed_after_negotiation(self):
+        """启用压缩后超过阈值的帧以压缩形式传输，接收端透明解压"""
+        from src.plugin_runtime.transport.base import FRAME_COMPRESSION_ZLIB, FRAME_FLAG_COMPRESSED
+        from src.plugin_runtime.transport.uds import UDSTransportClient, UDSTransportServer
+
+        server = UDSTransportServer()
+        received: list[bytes] = []
+        done = asyncio.Event()
+
+        async def handler(conn):
+            received.append(await conn.recv_frame())
+            received.append(await conn.recv_frame())
+            done.set()
+            await asyncio.sleep(0.1)
+
+        await server.start(handler)
+        conn = await UDSTransportClient(server.get_address()).connect()
+        conn.enable_compression(FRAME_COMPRESSION_ZLIB, threshold=1024)
+        headers = []
+        original_writelines = conn._writer.writelines
+
+        def recording_writelines(chunks):
+            headers.extend(int.from_bytes(chunk, "big") for chunk in chunks[::2])
+            original_writelines(chunks)
+
+        conn._writer.writelines = recording_writelines
+
+        large_payload = b"prompt " * 10000
+        await conn.send_frame(b"small")
+        await conn.send_frame(large_payload)
+        await asyncio.wait_for(done.wait(), timeout=5.0)
+
+        assert received == [b"small", large_payload]
+        assert not headers[0] & FRAME_FLAG_COMPRESSED
+        assert headers[1] & FRAME_FLAG_COMPRESSED
+        assert headers[1] & ~FRAME_FLAG_COMPRESSED < len(large_payload)
+
+        await conn.close()
+        await server.stop()
+
     @pytest.mark.asyncio
     async def test_tcp_connection_framing(self):
         """TCP 分帧协议测试"""
@@ -1502,6 +1613,46 @@ class TestComponentRegistry:
         match = reg.find_command_by_text("no match")
         assert match is None
 
+    def test_command_router_prefilters_without_changing_matches(self):
+        from src.plugin_runtime.host.component_registry import ComponentRegistry
+
+        reg = ComponentRegistry()
+        commands = {
+            "help": {"command_pattern": r"^/help", "aliases": ["帮助"]},
+            "set": {"command_pattern": r"^(?P<cmd>/set)\s+(?P<key>\w+)"},
+            "mention": {"command_pattern": r"@bot\s+(?P<rest>.+)"},
+            "case": {"command_pattern": r"(?i)^/ping"},
+            "alias_only": {"aliases": ["!roll", "!r"]},
+        }
+        for name, metadata in commands.items():
+            reg.register_component(name, "command", "p1", metadata)
+
+        def linear_scan(text: str):
+            for comp in reg.get_components_by_type("command"):
+                if comp.compiled_pattern and comp.compiled_pattern.search(text):
+                    return comp.name
+                if any(text.startswith(alias) for alias in comp.aliases):
+                    return comp.name
+            return None
+
+        texts = ["/help me", "帮助一下", "/set key v", "/set", "hi @bot 你好", "/PING", "!r 2d6", "!roll", "普通消息", ""]
+        for text in texts:
+            match = reg.find_command_by_text(text)
+            assert (match[0].name if match else None) == linear_scan(text)
+        assert reg.find_command_by_text("/set key v")[1] == {"cmd": "/set", "key": "key"}
+
+        # 普通消息只剩无法提取字面量的正则作为候选
+        router = reg._get_command_router()
+        assert [comp.name for comp in router.match_candidates("普通消息")] == ["case"]
+        assert reg._get_command_router() is router
+
+        reg.register_component("echo", "command", "p2", {"command_pattern": r"^/echo"})
+        assert reg._get_command_router() is not router
+        assert reg.find_command_by_text("/echo hi")[0].name == "echo"
+
+        reg.set_component_enabled("p1.help", False)
+        assert reg.find_command_by_text("/help") is None
+
     def test_enable_disable(self):
         from src.plugin_runtime.host.component_registry import ComponentRegistry
 
@@ -1778,6 +1929,7 @@ class _FakeHookSupervisor:
         self.component_registry = component_registry
         self._handlers = handlers
         self._call_log = call_log
+        self.batch_calls: List[List[str]] = []
 
     @property
     def group_name(self) -> str:
@@ -1817,6 +1969,37 @@ class _FakeHookSupervisor:
             result = await result
         return SimpleNamespace(payload=result)
 
+    async def invoke_hook_batch(
+        self,
+        hook_name: str,
+        handlers: List[tuple[str, str]],
+        args: Optional[Dict[str, Any]] = None,
+        timeout_ms: int = 30000,
+    ) -> SimpleNamespace:
+        """模拟在一次 RPC 中批量调用多个 HookHandler。
+
+        Args:
+            hook_name: 当前 Hook 名称。
+            handlers: 处理器列表，元素为 `(plugin_id, component_name)`。
+            args: 调用参数。
+            timeout_ms: 超时配置，测试中仅用于保持接口一致。
+
+        Returns:
+            SimpleNamespace: 仅包含 `payload` 字段的简化响应对象。
+        """
+
+        del timeout_ms
+
+        self.batch_calls.append([f"{plugin_id}.{component_name}" for plugin_id, component_name in handlers])
+        results: List[Any] = []
+        for plugin_id, component_name in handlers:
+            self._call_log.append((plugin_id, component_name))
+            result = self._handlers[f"{plugin_id}.{component_name}"]({"hook_name": hook_name, **(args or {})})
+            if asyncio.iscoroutine(result):
+                result = await result
+            results.append(result)
+        return SimpleNamespace(payload={"results": results})
+
 
 # ─── HookDispatcher 测试 ────────────────────────────────
 
@@ -1856,6 +2039,101 @@ class TestHookDispatcher:
         assert result.kwargs == {"session_id": "s-1"}
         assert result.aborted is False
 
+    def test_has_subscribers_reflects_registered_handlers(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """has_subscribers 应仅在存在启用的处理器时返回 True。"""
+
+        ComponentRegistry, HookDispatcher = self._import_dispatcher_modules(monkeypatch)
+
+        registry = ComponentRegistry()
+        dispatcher = HookDispatcher()
+        supervisor = _FakeHookSupervisor("builtin", registry, {}, [])
+        assert dispatcher.has_subscribers("heart_fc.cycle_start", [supervisor]) is False
+
+        registry.register_component(
+            "observer",
+            "HOOK_HANDLER",
+            "p1",
+            {"hook": "heart_fc.cycle_start", "mode": "observe", "order": "normal"},
+        )
+        assert dispatcher.has_subscribers("heart_fc.cycle_start", [supervisor]) is True
+        assert dispatcher.has_subscribers("heart_fc.cycle_end", [supervisor]) is False
+
+    def test_dispatch_plan_is_rebuilt_only_when_components_change(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """调度计划应被缓存，仅在组件注册或注销后重建，启用状态变化实时生效。"""
+
+        ComponentRegistry, HookDispatcher = self._import_dispatcher_modules(monkeypatch)
+
+        registry = ComponentRegistry()
+        registry.register_component(
+            "observer",
+            "HOOK_HANDLER",
+            "p1",
+            {"hook": "heart_fc.cycle_start", "mode": "observe", "order": "normal"},
+        )
+        dispatcher = HookDispatcher()
+        supervisor = _FakeHookSupervisor("builtin", registry, {}, [])
+
+        first_plan = dispatcher._get_dispatch_plan("heart_fc.cycle_start", [supervisor])
+        assert dispatcher._get_dispatch_plan("heart_fc.cycle_start", [supervisor]) is first_plan
+
+        registry.toggle_component_status("p1.observer", False)
+        assert dispatcher.has_subscribers("heart_fc.cycle_start", [supervisor]) is False
+        assert dispatcher._get_dispatch_plan("heart_fc.cycle_start", [supervisor]) is first_plan
+        registry.toggle_component_status("p1.observer", True)
+
+        registry.register_component(
+            "guard",
+            "HOOK_HANDLER",
+            "p2",
+            {"hook": "heart_fc.cycle_start", "mode": "blocking", "order": "early"},
+        )
+        second_plan = dispatcher._get_dispatch_plan("heart_fc.cycle_start", [supervisor])
+        assert second_plan is not first_plan
+        assert [target.entry.full_name for target in second_plan.targets] == ["p2.guard", "p1.observer"]
+
+        registry.remove_components_by_plugin("p2")
+        third_plan = dispatcher._get_dispatch_plan("heart_fc.cycle_start", [supervisor])
+        assert [target.entry.full_name for target in third_plan.targets] == ["p1.observer"]
+
+    @pytest.mark.asyncio
+    async def test_observe_handlers_on_same_supervisor_are_batched(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """同一 Supervisor 上的多个 observe 处理器应合并为一次批量调用。"""
+
+        ComponentRegistry, HookDispatcher = self._import_dispatcher_modules(monkeypatch)
+
+        registry = ComponentRegistry()
+        for plugin_id in ("p1", "p2"):
+            registry.register_component(
+                "observer",
+                "HOOK_HANDLER",
+                plugin_id,
+                {"hook": "heart_fc.cycle_start", "mode": "observe", "order": "normal"},
+            )
+        seen_session_ids: List[str] = []
+
+        def observe_handler(args: Dict[str, Any]) -> Dict[str, Any]:
+            """记录观察到的参数。"""
+
+            seen_session_ids.append(args["session_id"])
+            return {"success": True, "action": "abort"}
+
+        call_log: List[tuple[str, str]] = []
+        supervisor = _FakeHookSupervisor(
+            "builtin",
+            registry,
+            {"p1.observer": observe_handler, "p2.observer": observe_handler},
+            call_log,
+        )
+        dispatcher = HookDispatcher()
+
+        result = await dispatcher.invoke_hook("heart_fc.cycle_start", [supervisor], session_id="s-1")
+        await asyncio.gather(*dispatcher._background_tasks)
+
+        assert result.aborted is False
+        assert supervisor.batch_calls == [["p1.observer", "p2.observer"]]
+        assert call_log == [("p1", "observer"), ("p2", "observer")]
+        assert seen_session_ids == ["s-1", "s-1"]
+
     @pytest.mark.asyncio
     async def test_blocking_hook_modifies_kwargs(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """blocking 处理器可以修改参数。"""
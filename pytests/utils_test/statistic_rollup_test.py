@@ -0,0 +1,168 @@
+"""统计预聚合（rollup）测试。"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import ModuleType
+from typing import Generator
+
+import sys
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.chat.utils import statistic, statistic_rollup
+from src.common.database.database_model import (
+    Messages,
+    MessageStatRollup,
+    ModelUsage,
+    ModelUsageStatRollup,
+    OnlineTime,
+    StatRollupCursor,
+    ToolRecord,
+)
+
+_NOW = datetime(2026, 1, 10, 12, 30, 0)
+
+
+def _message(offset: timedelta, user_id: str = "u1", group_id: str | None = "100", reply_to: str | None = None):
+    return Messages(
+        message_id=f"m-{offset.total_seconds()}-{user_id}",
+        timestamp=_NOW - offset,
+        platform="qq",
+        user_id=user_id,
+        user_nickname=f"昵称{user_id}",
+        group_id=group_id,
+        group_name="测试群" if group_id else None,
+        session_id="s1",
+        reply_to=reply_to,
+        raw_content=b"",
+    )
+
+
+def _usage(offset: timedelta, time_cost: float, model: str = "model-a", request_type: str = "replyer.chat"):
+    return ModelUsage(
+        model_name=model,
+        model_api_provider_name="provider",
+        request_type=request_type,
+        time_cost=time_cost,
+        timestamp=_NOW - offset,
+        prompt_tokens=10,
+        completion_tokens=5,
+        total_tokens=15,
+        cost=0.5,
+    )
+
+
+@pytest.fixture
+def rollup_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """将统计与预聚合模块的数据库会话替换为临时 SQLite。"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'stat.db'}", connect_args={"check_same_thread": False})
+    tables = [Messages, ModelUsage, ToolRecord, OnlineTime, MessageStatRollup, ModelUsageStatRollup, StatRollupCursor]
+    SQLModel.metadata.create_all(engine, tables=[table.__table__ for table in tables])  # type: ignore[attr-defined]
+    session_factory = sessionmaker(bind=engine, class_=Session, autoflush=False)
+
+    @contextmanager
+    def _get_db_session(auto_commit: bool = True) -> Generator[Session, None, None]:
+        session = session_factory()
+        try:
+            yield session
+            if auto_commit:
+                session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(statistic_rollup, "get_db_session", _get_db_session)
+    monkeypatch.setattr(statistic, "get_db_session", _get_db_session)
+
+    utils_module = ModuleType("src.chat.utils.utils")
+    utils_module.is_bot_self = lambda platform, user_id: user_id == "bot"
+    monkeypatch.setitem(sys.modules, "src.chat.utils.utils", utils_module)
+
+    yield engine
+    engine.dispose()
+
+
+def test_refresh_is_incremental_and_prunes_old_minute_buckets(rollup_db) -> None:
+    with Session(rollup_db) as session:
+        session.add(_message(timedelta(minutes=10)))
+        session.add(_message(timedelta(days=5)))
+        session.add(_usage(timedelta(minutes=10), 1.0))
+        session.commit()
+
+    assert statistic_rollup.refresh_statistic_rollups(batch_size=1, now=_NOW) == 3
+    assert statistic_rollup.refresh_statistic_rollups(now=_NOW) == 0
+
+    with Session(rollup_db) as session:
+        granularities = sorted(row.granularity for row in session.exec(select(MessageStatRollup)).all())
+        assert granularities == ["hour", "hour", "minute"]
+
+        session.add(_message(timedelta(minutes=9)))
+        session.commit()
+
+    assert statistic_rollup.refresh_statistic_rollups(now=_NOW) == 1
+    with Session(rollup_db) as session:
+        hour_bucket = session.exec(
+            select(MessageStatRollup).where(
+                MessageStatRollup.granularity == "hour",
+                MessageStatRollup.bucket_start == datetime(2026, 1, 10, 12),
+            )
+        ).one()
+        assert hour_bucket.message_count == 2
+
+    # 三天后分钟桶被清理，小时桶保留
+    statistic_rollup.refresh_statistic_rollups(now=_NOW + timedelta(days=4))
+    with Session(rollup_db) as session:
+        assert {row.granularity for row in session.exec(select(MessageStatRollup)).all()} == {"hour"}
+
+
+def test_statistic_collectors_read_rollups(rollup_db) -> None:
+    with Session(rollup_db) as session:
+        session.add(_message(timedelta(minutes=10), reply_to="m0"))
+        session.add(_message(timedelta(minutes=20), user_id="bot"))
+        session.add(_message(timedelta(minutes=90), group_id=None))
+        session.add(_message(timedelta(days=5)))
+        session.add(_usage(timedelta(minutes=5), 1.0))
+        session.add(_usage(timedelta(minutes=40), 3.0))
+        session.add(_usage(timedelta(minutes=45), 0.0, model="model-b", request_type="planner"))
+        session.add(_usage(timedelta(hours=5), 2.0))
+        session.add(ToolRecord(tool_id="t1", timestamp=_NOW - timedelta(minutes=3), session_id="s1", tool_name="reply"))
+        session.add(ToolRecord(tool_id="t2", timestamp=_NOW - timedelta(hours=2), session_id="s1", tool_name="reply"))
+        session.commit()
+    statistic_rollup.refresh_statistic_rollups(now=_NOW)
+
+    task = statistic.StatisticOutputTask.__new__(statistic.StatisticOutputTask)
+    task.name_mapping = {}
+    periods = [("last_hour", _NOW - timedelta(hours=1)), ("last_24_hours", _NOW - timedelta(days=1))]
+
+    model_stats = statistic.StatisticOutputTask._collect_model_request_for_period(list(periods), _NOW)
+    last_hour = model_stats["last_hour"]
+    assert last_hour[statistic.TOTAL_REQ_CNT] == 3
+    assert last_hour[statistic.REQ_CNT_BY_MODULE] == {"replyer": 2, "planner": 1}
+    assert last_hour[statistic.AVG_TIME_COST_BY_MODEL]["model-a"] == 2.0
+    assert last_hour[statistic.STD_TIME_COST_BY_MODEL]["model-a"] == 1.0
+    assert last_hour[statistic.AVG_TIME_COST_BY_MODEL]["model-b"] == 0.0
+    assert model_stats["last_24_hours"][statistic.TOTAL_REQ_CNT] == 4
+    assert model_stats["last_24_hours"][statistic.TOTAL_COST] == pytest.approx(2.0)
+
+    message_stats = task._collect_message_count_for_period(list(periods), _NOW)
+    assert message_stats["last_hour"][statistic.TOTAL_MSG_CNT] == 2
+    assert message_stats["last_24_hours"][statistic.MSG_CNT_BY_CHAT] == {"g100": 2, "uu1": 1}
+    assert message_stats["last_hour"][statistic.TOTAL_REPLY_CNT] == 1
+    assert message_stats["last_24_hours"][statistic.TOTAL_REPLY_CNT] == 2
+    assert task.name_mapping["g100"][0] == "测试群"
+
+    with Session(rollup_db) as session:
+        totals = statistic_rollup.query_message_totals(session, _NOW - timedelta(hours=1), _NOW, _NOW)
+        assert [tuple(row) for row in totals] == [("g100", 2, 1, 1)]
+        # 分钟桶已清理的起始端退化为整小时精度
+        old_start = _NOW - timedelta(days=5, minutes=10)
+        old_totals = statistic_rollup.query_message_totals(session, old_start, _NOW, _NOW)
+        assert sum(row[1] for row in old_totals) == 4
+
+    interval_data = task._collect_interval_data(_NOW, hours=1, interval_minutes=30)
+    assert interval_data["message_by_chat"] == {"测试群": [0, 2, 0]}
+    assert interval_data["total_cost_data"] == pytest.approx([1.0, 0.5, 0.0])
@@ -107,9 +107,9 @@ def test_statistic_read_queries_disable_auto_commit(monkeypatch: pytest.MonkeyPa
     monkeypatch.setitem(sys.modules, "src.chat.utils.utils", utils_module)
 
     statistic.StatisticOutputTask._fetch_online_time_since(now)
-    statistic.StatisticOutputTask._fetch_model_usage_since(now)
-    task._collect_message_count_for_period([("last_hour", now - timedelta(hours=1))])
+    statistic.StatisticOutputTask._collect_model_request_for_period([("last_hour", now - timedelta(hours=1))], now)
+    task._collect_message_count_for_period([("last_hour", now - timedelta(hours=1))], now)
     task._collect_interval_data(now, hours=1, interval_minutes=60)
     task._collect_metrics_interval_data(now, hours=1, interval_hours=1)
 
-    assert calls == [False] * 9
+    assert calls == [False] * 6
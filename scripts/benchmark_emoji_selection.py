@@ -0,0 +1,151 @@
+"""表情包按情绪选择基准：逐个表情包计算编辑距离 vs 情绪标签倒排索引。
+
+随机生成 ``--emojis`` 个带 3~5 个情绪标签的表情包，对同一组请求情绪分别测量：
+- legacy：对每个表情包的每个标签计算编辑距离，再取 ``heapq.nlargest``（改动前的实现）
+- indexed：`EmojiTagIndex.top_matches`，并统计索引构建耗时
+
+两种实现返回的前 K 个候选会逐一比对，确保选择结果不变。
+
+示例：
+    python scripts/benchmark_emoji_selection.py --emojis 5000 --queries 500
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import argparse
+import heapq
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import Levenshtein
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.common.data_models.image_data_model import MaiEmoji  # noqa: E402
+from src.emoji_system.emoji_index import EmojiTagIndex  # noqa: E402
+from src.emoji_system.emoji_manager import _get_emoji_emotions  # noqa: E402
+
+_BASE_EMOTIONS = [
+    "开心", "难过", "生气", "惊讶", "害怕", "无语", "尴尬", "委屈", "得意", "嫌弃",
+    "疑惑", "感动", "害羞", "兴奋", "无聊", "疲惫", "期待", "失望", "震惊", "心虚",
+    "暗中观察", "摸鱼", "点赞", "鼓掌", "哭泣", "大笑", "翻白眼", "比心", "抱抱", "晚安",
+    "happy", "sad", "angry", "confused", "shocked", "tired", "love", "lol", "facepalm", "cool",
+]
+_MODIFIERS = ["有点", "非常", "超级", "假装", "偷偷", "疯狂", "默默", "略微"]
+
+
+def _build_vocabulary() -> List[str]:
+    vocabulary = list(_BASE_EMOTIONS)
+    vocabulary.extend(f"{modifier}{emotion}" for modifier in _MODIFIERS for emotion in _BASE_EMOTIONS)
+    return vocabulary
+
+
+def _build_emojis(count: int, vocabulary: List[str], rng: random.Random, image_path: Path) -> List[MaiEmoji]:
+    emojis: List[MaiEmoji] = []
+    for index in range(count):
+        emoji = MaiEmoji(full_path=image_path)
+        emoji.file_hash = f"{index:064x}"
+        emoji.description = ",".join(rng.sample(vocabulary, rng.randint(3, 5)))
+        emojis.append(emoji)
+    return emojis
+
+
+def _legacy_top_matches(emojis: List[MaiEmoji], text_emotion: str, limit: int) -> List[Tuple[MaiEmoji, float]]:
+    """改动前 `_calculate_emotion_similarity_list` + ``heapq.nlargest`` 的实现，仅用于对比。"""
+    normalized_text_emotion = str(text_emotion or "").strip().lower()
+    if not normalized_text_emotion:
+        return []
+    similarity_list: List[Tuple[MaiEmoji, float]] = []
+    for emoji in emojis:
+        candidate_emotions = _get_emoji_emotions(emoji)
+        if not candidate_emotions:
+            continue
+        emotion_similarities = [
+            1
+            - Levenshtein.distance(normalized_text_emotion, str(emotion).strip().lower())
+            / max(len(normalized_text_emotion), len(str(emotion).strip().lower()))
+            for emotion in candidate_emotions
+            if emotion
+        ]
+        if emotion_similarities:
+            similarity_list.append((emoji, max(emotion_similarities)))
+    return heapq.nlargest(limit, similarity_list, key=lambda item: item[1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比表情包按情绪选择的线性扫描与倒排索引耗时")
+    parser.add_argument("--emojis", type=int, default=5000, help="表情包数量")
+    parser.add_argument("--queries", type=int, default=300, help="请求情绪数量")
+    parser.add_argument("--top-k", type=int, default=10, help="候选数量")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = _build_vocabulary()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # MaiEmoji 要求图片路径存在，全部表情包共用同一个占位文件
+        image_path = Path(temp_dir) / "emoji.png"
+        image_path.write_bytes(b"")
+        emojis = _build_emojis(args.emojis, vocabulary, rng, image_path)
+    # 一半请求直接命中已有标签，一半为库中不存在的近似说法
+    queries = [
+        rng.choice(vocabulary) if index % 2 == 0 else f"{rng.choice(_MODIFIERS)}{rng.choice(_BASE_EMOTIONS)}了"
+        for index in range(args.queries)
+    ]
+
+    started = time.perf_counter()
+    index = EmojiTagIndex(emojis, _get_emoji_emotions)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    legacy_ms: List[float] = []
+    indexed_ms: List[float] = []
+    for query in queries:
+        started = time.perf_counter()
+        expected = _legacy_top_matches(emojis, query, args.top_k)
+        legacy_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        actual = index.top_matches(query, args.top_k)
+        indexed_ms.append((time.perf_counter() - started) * 1000)
+
+        if [(id(emoji), score) for emoji, score in actual] != [(id(emoji), score) for emoji, score in expected]:
+            raise AssertionError(f"索引结果与线性扫描不一致: query={query!r}")
+
+    result: Dict[str, Any] = {
+        "emojis": args.emojis,
+        "unique_tags": index.tag_count,
+        "queries": args.queries,
+        "index_build_ms": build_ms,
+        "legacy_mean_ms": statistics.fmean(legacy_ms),
+        "indexed_mean_ms": statistics.fmean(indexed_ms),
+        "legacy_p99_ms": sorted(legacy_ms)[int(len(legacy_ms) * 0.99) - 1],
+        "indexed_p99_ms": sorted(indexed_ms)[int(len(indexed_ms) * 0.99) - 1],
+    }
+    result["speedup"] = result["legacy_mean_ms"] / result["indexed_mean_ms"]
+
+    print(
+        f"emojis={result['emojis']} unique_tags={result['unique_tags']} queries={result['queries']} "
+        f"index_build_ms={build_ms:.2f}"
+    )
+    print(f"{'impl':<10} {'mean_ms':>9} {'p99_ms':>9}")
+    print(f"{'legacy':<10} {result['legacy_mean_ms']:>9.3f} {result['legacy_p99_ms']:>9.3f}")
+    print(f"{'indexed':<10} {result['indexed_mean_ms']:>9.3f} {result['indexed_p99_ms']:>9.3f}")
+    print(f"speedup: {result['speedup']:.1f}x")
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""图片近重复检测基准：仅按 sha256 去重 vs 感知哈希复用描述。
+
+随机生成 ``--bases`` 张原图（彩色图形、渐变背景与文字），并为每张原图生成若干变体：
+缩放、不同质量的 JPEG 重压缩、PNG/WEBP 转码以及“缩放后再压缩”的组合。
+另有一部分原图共享同一模板、仅配字不同，用来衡量误复用风险。
+
+把原图与变体打乱后按顺序模拟入库，统计需要调用 VLM 生成描述的次数：
+- sha256：只有字节完全相同才命中缓存（改动前的 `ImageManager`）
+- phash@D：sha256 未命中时，在 BK 树中查找汉明距离不超过 D 的已描述图片并直接复用其描述
+- verify@D：同上，但候选图片还需通过缩略图复核（`ImageManager` 的实际行为）
+
+误复用指复用了另一张原图（包括配字不同的同模板图）的描述。
+
+示例：
+    python scripts/benchmark_image_dedup.py --bases 300 --max-distance 4 8 12 16
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from PIL import Image as PILImage
+from PIL import ImageDraw, ImageFont
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.common.utils.utils_perceptual_hash import (  # noqa: E402
+    DEFAULT_DETAIL_THRESHOLD,
+    PerceptualHashIndex,
+    compute_detail_thumbnail,
+    compute_perceptual_hash,
+    max_block_difference,
+)
+
+_CAPTIONS = ["OK", "LOL", "no way", "awsl", "???", "nice", "bruh", "yyds", "wow", "gg"]
+
+
+def _random_color(rng: random.Random) -> Tuple[int, int, int]:
+    return rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)
+
+
+def _draw_template(rng: random.Random) -> PILImage.Image:
+    """生成一张随机模板图：渐变背景加若干彩色图形。"""
+    width, height = rng.choice([(240, 240), (320, 240), (300, 400), (512, 512)])
+    start, end = _random_color(rng), _random_color(rng)
+    image = PILImage.new("RGB", (width, height))
+    draw = ImageDraw.Draw(image)
+    for y in range(height):
+        ratio = y / max(height - 1, 1)
+        draw.line([(0, y), (width, y)], fill=tuple(int(s + (e - s) * ratio) for s, e in zip(start, end, strict=True)))
+    for _ in range(rng.randint(3, 8)):
+        x0, y0 = rng.randint(0, width - 20), rng.randint(0, height - 20)
+        x1, y1 = rng.randint(x0 + 10, width), rng.randint(y0 + 10, height)
+        shape = rng.choice(["rectangle", "ellipse"])
+        getattr(draw, shape)([x0, y0, x1, y1], fill=_random_color(rng))
+    return image
+
+
+def _add_caption(image: PILImage.Image, caption: str) -> PILImage.Image:
+    """在图片底部加一行配字。"""
+    captioned = image.copy()
+    draw = ImageDraw.Draw(captioned)
+    font = ImageFont.load_default(size=max(16, captioned.height // 8))
+    draw.text((captioned.width // 10, captioned.height * 3 // 4), caption, fill=(255, 255, 255), font=font, stroke_width=2, stroke_fill=(0, 0, 0))
+    return captioned
+
+
+def _encode(image: PILImage.Image, image_format: str, quality: int = 90) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.convert("RGB").save(buffer, format="JPEG", quality=quality)
+    else:
+        image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _build_variants(image: PILImage.Image) -> List[bytes]:
+    """生成常见的转发变体：缩放、重压缩与转码。"""
+    variants: List[bytes] = []
+    for scale in (0.5, 0.75, 1.5):
+        resized = image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))), PILImage.Resampling.BILINEAR)
+        variants.append(_encode(resized, "PNG"))
+    for quality in (40, 70, 95):
+        variants.append(_encode(image, "JPEG", quality))
+    variants.append(_encode(image, "WEBP"))
+    small = image.resize((image.width * 2 // 3, image.height * 2 // 3), PILImage.Resampling.LANCZOS)
+    variants.append(_encode(small, "JPEG", 60))
+    return variants
+
+
+def _build_corpus(bases: int, rng: random.Random) -> List[Tuple[int, bytes]]:
+    """生成 ``(原图编号, 图片字节)`` 列表，原图先于变体出现在同一原图组中的顺序不固定。"""
+    corpus: List[Tuple[int, bytes]] = []
+    base_id = 0
+    while base_id < bases:
+        template = _draw_template(rng)
+        # 约三分之一的模板会派生出 2~3 张仅配字不同的原图
+        caption_count = rng.choice([1, 1, 2, 3])
+        for caption in rng.sample(_CAPTIONS, caption_count):
+            if base_id >= bases:
+                break
+            original = _add_caption(template, caption)
+            corpus.append((base_id, _encode(original, "PNG")))
+            corpus.extend((base_id, variant) for variant in _build_variants(original))
+            base_id += 1
+    rng.shuffle(corpus)
+    return corpus
+
+
+def _simulate(
+    corpus: List[Tuple[int, bytes]],
+    hashes: List[Optional[str]],
+    max_distance: Optional[int],
+    verify: bool,
+) -> Dict[str, Any]:
+    """模拟入库流程并统计 VLM 调用次数。``max_distance`` 为 ``None`` 时只按 sha256 去重。"""
+    described: Dict[str, int] = {}
+    thumbnails: Dict[str, Any] = {}
+    index: PerceptualHashIndex[str] = PerceptualHashIndex()
+    vlm_calls = 0
+    reused = 0
+    false_reuse = 0
+    lookup_ms: List[float] = []
+    for (base_id, image_bytes), perceptual_hash in zip(corpus, hashes, strict=True):
+        sha = hashlib.sha256(image_bytes).hexdigest()
+        if sha in described:
+            continue
+        source: Optional[int] = None
+        if max_distance is not None and perceptual_hash:
+            started = time.perf_counter()
+            thumbnail = compute_detail_thumbnail(image_bytes) if verify else None
+            for _, candidate in index.search(perceptual_hash, max_distance):
+                if verify and max_block_difference(thumbnail, thumbnails[candidate]) > DEFAULT_DETAIL_THRESHOLD:
+                    continue
+                source = described[candidate]
+                break
+            lookup_ms.append((time.perf_counter() - started) * 1000)
+            thumbnails[sha] = thumbnail
+        if source is None:
+            vlm_calls += 1
+            described[sha] = base_id
+        else:
+            reused += 1
+            false_reuse += int(source != base_id)
+            described[sha] = source
+        if max_distance is not None and perceptual_hash:
+            index.add(perceptual_hash, sha)
+    return {
+        "vlm_calls": vlm_calls,
+        "reused": reused,
+        "false_reuse": false_reuse,
+        "lookup_mean_ms": statistics.fmean(lookup_ms) if lookup_ms else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比 sha256 与感知哈希去重下的 VLM 调用次数")
+    parser.add_argument("--bases", type=int, default=200, help="原图数量")
+    parser.add_argument("--max-distance", type=int, nargs="+", default=[6, 10, 14], help="汉明距离阈值，可给出多个")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = _build_corpus(args.bases, rng)
+
+    hash_ms: List[float] = []
+    hashes: List[Optional[str]] = []
+    for _, image_bytes in corpus:
+        started = time.perf_counter()
+        hashes.append(compute_perceptual_hash(image_bytes))
+        hash_ms.append((time.perf_counter() - started) * 1000)
+
+    baseline = _simulate(corpus, hashes, None, verify=False)
+    result: Dict[str, Any] = {
+        "bases": args.bases,
+        "images": len(corpus),
+        "unhashable": sum(1 for item in hashes if item is None),
+        "hash_mean_ms": statistics.fmean(hash_ms),
+        "sha256": baseline,
+        "phash": {},
+        "verify": {},
+    }
+    print(
+        f"bases={args.bases} images={len(corpus)} unhashable={result['unhashable']} "
+        f"hash_mean_ms={result['hash_mean_ms']:.3f}"
+    )
+    print(f"{'mode':<10} {'vlm_calls':>9} {'saved':>7} {'reused':>7} {'false':>6} {'lookup_ms':>10}")
+    print(f"{'sha256':<10} {baseline['vlm_calls']:>9} {'-':>7} {baseline['reused']:>7} {baseline['false_reuse']:>6} {'-':>10}")
+    for mode in ("phash", "verify"):
+        for max_distance in args.max_distance:
+            stats = _simulate(corpus, hashes, max_distance, verify=mode == "verify")
+            stats["saved_ratio"] = 1 - stats["vlm_calls"] / baseline["vlm_calls"]
+            result[mode][str(max_distance)] = stats
+            print(
+                f"{f'{mode}@{max_distance}':<10} {stats['vlm_calls']:>9} {stats['saved_ratio']:>7.1%} "
+                f"{stats['reused']:>7} {stats['false_reuse']:>6} {stats['lookup_mean_ms']:>10.4f}"
+            )
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
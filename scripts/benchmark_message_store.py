@@ -0,0 +1,127 @@
+"""消息入库吞吐基准：逐条提交 vs 写后缓冲批量提交。
+
+在临时 SQLite 数据库（与主库相同的 WAL / synchronous=NORMAL PRAGMA）上模拟群聊突发入站，
+分别测量：
+1. 旧版 store_message_to_db：每条消息一个会话 + 一次提交（在调用方线程上完成）
+2. MessageWriteBuffer：调用方只入队，后台线程按条数/时间批量 executemany 提交
+
+报告端到端 messages/sec（含最终刷盘）以及调用方单次调用的 p50 / p99 耗时。
+
+示例：
+    python scripts/benchmark_message_store.py --num-messages 5000
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlmodel import Session, SQLModel, create_engine, func, select  # noqa: E402
+
+import src.common.database.database  # noqa: E402,F401  注册 SQLite PRAGMA 监听
+from src.common.data_models.message_component_data_model import MessageSequence, TextComponent  # noqa: E402
+from src.common.database.database_model import Messages  # noqa: E402
+from src.common.database.message_write_buffer import MessageWriteBuffer  # noqa: E402
+from src.common.utils.utils_message import MessageUtils  # noqa: E402
+
+
+def _make_messages(count: int) -> List[Messages]:
+    base_time = datetime.now()
+    raw_content = MessageUtils.from_MaiSeq_to_db_record_msg(MessageSequence([TextComponent(text="群聊消息")]))
+    return [
+        Messages(
+            message_id=f"bench-{index}",
+            timestamp=base_time + timedelta(milliseconds=index),
+            platform="qq",
+            user_id=f"user-{index % 50}",
+            user_nickname=f"用户{index % 50}",
+            group_id="bench-group",
+            group_name="基准测试群",
+            session_id="bench-session",
+            raw_content=raw_content,
+            processed_plain_text=f"第 {index} 条群聊消息",
+        )
+        for index in range(count)
+    ]
+
+
+def _new_engine(db_path: Path):
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine, tables=[Messages.__table__])  # type: ignore[list-item]
+    return engine
+
+
+def _run(label: str, store: Callable[[Messages], None], finish: Callable[[], None], messages: List[Messages]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for db_message in messages:
+        call_started = time.perf_counter()
+        store(db_message)
+        latencies.append((time.perf_counter() - call_started) * 1000.0)
+    finish()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "impl": label,
+        "messages_per_sec": len(messages) / elapsed,
+        "total_s": elapsed,
+        "call_p50_ms": statistics.median(latencies),
+        "call_p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比消息逐条提交与写后缓冲批量提交的吞吐")
+    parser.add_argument("--num-messages", type=int, default=3000)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_engine = _new_engine(Path(tmp_dir) / "legacy.db")
+
+        def _store_legacy(db_message: Messages) -> None:
+            with Session(legacy_engine) as session:
+                session.add(db_message)
+                session.commit()
+
+        results.append(_run("per_message", _store_legacy, lambda: None, _make_messages(args.num_messages)))
+
+        buffered_engine = _new_engine(Path(tmp_dir) / "buffered.db")
+        buffer = MessageWriteBuffer(buffered_engine, batch_size=args.batch_size, flush_interval=args.flush_interval)
+        results.append(_run("write_behind", buffer.enqueue, buffer.close, _make_messages(args.num_messages)))
+
+        for engine, row in ((legacy_engine, results[0]), (buffered_engine, results[1])):
+            with Session(engine) as session:
+                row["rows"] = int(session.exec(select(func.count()).select_from(Messages)).one())
+            engine.dispose()
+
+    print(f"messages={args.num_messages} batch_size={args.batch_size} flush_interval={args.flush_interval}s")
+    print(f"{'impl':<14} {'msg/s':>10} {'total_s':>9} {'p50_ms':>9} {'p99_ms':>9} {'rows':>7}")
+    for row in results:
+        print(
+            f"{row['impl']:<14} {row['messages_per_sec']:>10.0f} {row['total_s']:>9.2f} "
+            f"{row['call_p50_ms']:>9.3f} {row['call_p99_ms']:>9.3f} {row['rows']:>7}"
+        )
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""模型路由基准：各编排器独立的 token 均衡 + 固定重试间隔 vs 共享路由器。
+
+模拟两个 API 提供商：
+- steady：稳定但较慢
+- flaky：平时很快，但在一段故障窗口内持续返回 503（带 `Retry-After`）
+
+多个编排器（planner、replyer……）并发发起请求，每个请求按各自策略选择模型，
+在单个模型上最多重试 ``--max-retry`` 次后切换到下一个模型。分别测量：
+1. legacy：每个编排器各自维护 (total_tokens, penalty, usage_penalty)，失败后固定等待 retry_interval
+2. router：进程级 `ModelRouter`，按 EWMA 延迟/错误率均衡，熔断故障提供商，指数退避 + 抖动
+
+报告端到端请求耗时 p50 / p99 与失败请求数。时间均为模拟秒，实际休眠按 ``--time-scale`` 缩放。
+
+示例：
+    python scripts/benchmark_model_router.py --requests-per-orchestrator 40
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm_models.model_router import ModelRouter  # noqa: E402
+
+
+class _SimulatedFailure(Exception):
+    def __init__(self, retry_after: Optional[float]) -> None:
+        super().__init__("503 Service Unavailable")
+        self.retry_after = retry_after
+
+
+@dataclass
+class _SimulatedProvider:
+    name: str
+    model: str
+    latency: float
+    outage: Tuple[float, float] = (0.0, 0.0)
+    """故障窗口（模拟秒），窗口内请求在短暂等待后返回 503"""
+    retry_after: Optional[float] = None
+
+    async def call(self, clock: Callable[[], float], scale: float) -> int:
+        start, end = self.outage
+        if start <= clock() < end:
+            await asyncio.sleep(0.2 * scale)
+            raise _SimulatedFailure(self.retry_after)
+        await asyncio.sleep(random.lognormvariate(0, 0.3) * self.latency * scale)
+        return 300
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+async def _run(args: argparse.Namespace, use_router: bool) -> Dict[str, Any]:
+    random.seed(args.seed)
+    scale = args.time_scale
+    started = time.perf_counter()
+
+    def _clock() -> float:
+        return (time.perf_counter() - started) / scale
+
+    providers = {
+        "steady": _SimulatedProvider("steady", "steady-model", latency=1.5),
+        "flaky": _SimulatedProvider(
+            "flaky", "flaky-model", latency=0.5, outage=(args.outage_start, args.outage_end), retry_after=5.0
+        ),
+    }
+    by_model = {provider.model: provider for provider in providers.values()}
+    router = ModelRouter()
+    latencies: List[float] = []
+    failures = 0
+
+    async def _orchestrator(index: int) -> None:
+        nonlocal failures
+        usage: Dict[str, List[int]] = {model: [0, 0, 0] for model in by_model}
+        await asyncio.sleep(random.uniform(0, 1) * scale)
+        for _ in range(args.requests_per_orchestrator):
+            request_started = _clock()
+            tried: set[str] = set()
+            succeeded = False
+            while not succeeded and len(tried) < len(by_model):
+                candidates = [model for model in by_model if model not in tried]
+                if use_router:
+                    model = router.select([(m, by_model[m].name) for m in candidates], "balance")
+                else:
+                    model = min(candidates, key=lambda m: usage[m][0] + usage[m][1] * 300 + usage[m][2] * 1000)
+                    usage[model][2] += 1
+                provider = by_model[model]
+                model_started = _clock()
+                for attempt in range(1, args.max_retry + 1):
+                    try:
+                        tokens = await provider.call(_clock, scale)
+                    except _SimulatedFailure as exc:
+                        if use_router:
+                            router.record_provider_failure(provider.name, exc.retry_after)
+                            delay = router.backoff_delay(args.retry_interval, attempt, exc.retry_after)
+                        else:
+                            delay = args.retry_interval
+                        if attempt < args.max_retry:
+                            await asyncio.sleep(delay * scale)
+                        continue
+                    succeeded = True
+                    if use_router:
+                        router.record_provider_success(provider.name)
+                        router.record_model_result(model, True, _clock() - model_started, tokens)
+                    else:
+                        usage[model][0] += tokens
+                        usage[model][2] -= 1
+                    break
+                if not succeeded:
+                    tried.add(model)
+                    if use_router:
+                        router.record_model_result(model, False, _clock() - model_started)
+                    else:
+                        usage[model][1] += 1
+                        usage[model][2] -= 1
+            if succeeded:
+                latencies.append(_clock() - request_started)
+            else:
+                failures += 1
+            await asyncio.sleep(random.uniform(0.5, 2.0) * scale)
+
+    await asyncio.gather(*(_orchestrator(index) for index in range(args.orchestrators)))
+    latencies.sort()
+    return {
+        "impl": "router" if use_router else "legacy",
+        "requests": len(latencies) + failures,
+        "failed": failures,
+        "p50_s": statistics.median(latencies) if latencies else 0.0,
+        "p99_s": _percentile(latencies, 0.99) if latencies else 0.0,
+        "wall_s": _clock(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比各编排器独立负载均衡与共享模型路由器的尾延迟")
+    parser.add_argument("--orchestrators", type=int, default=6)
+    parser.add_argument("--requests-per-orchestrator", type=int, default=30)
+    parser.add_argument("--max-retry", type=int, default=2)
+    parser.add_argument("--retry-interval", type=float, default=10.0, help="模拟秒")
+    parser.add_argument("--outage-start", type=float, default=10.0, help="模拟秒")
+    parser.add_argument("--outage-end", type=float, default=60.0, help="模拟秒")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="1 模拟秒对应的实际秒数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    args = parser.parse_args()
+
+    results = [asyncio.run(_run(args, use_router=False)), asyncio.run(_run(args, use_router=True))]
+
+    print(
+        f"orchestrators={args.orchestrators} requests_per_orchestrator={args.requests_per_orchestrator} "
+        f"outage={args.outage_start:g}-{args.outage_end:g}s retry_interval={args.retry_interval:g}s"
+    )
+    print(f"{'impl':<8} {'requests':>9} {'failed':>7} {'p50_s':>8} {'p99_s':>8} {'wall_s':>8}")
+    for row in results:
+        print(
+            f"{row['impl']:<8} {row['requests']:>9} {row['failed']:>7} "
+            f"{row['p50_s']:>8.2f} {row['p99_s']:>8.2f} {row['wall_s']:>8.1f}"
+        )
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
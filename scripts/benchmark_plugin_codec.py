@@ -0,0 +1,107 @@
+"""插件运行时 Envelope 编解码微基准：``model_dump()`` 编码 vs 直接打包字段字典。
+
+对每种典型消息分别测量一次 encode + decode 的平均耗时：
+- legacy：``model_dump()`` + msgpack 打包，解码后 ``Envelope.model_validate``（改动前的 `MsgPackCodec`）
+- fast：当前 `MsgPackCodec`，直接打包字段字典，解码同样使用 ``Envelope.model_validate``
+
+示例：
+    python scripts/benchmark_plugin_codec.py --iterations 50000
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import msgpack
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plugin_runtime.protocol.codec import MsgPackCodec  # noqa: E402
+from src.plugin_runtime.protocol.envelope import Envelope, MessageType  # noqa: E402
+
+
+def _legacy_roundtrip(envelope: Envelope) -> Envelope:
+    data = msgpack.packb(envelope.model_dump(), use_bin_type=True)
+    return Envelope.model_validate(msgpack.unpackb(data, raw=False))
+
+
+def _build_cases() -> Dict[str, Envelope]:
+    return {
+        "hook_response": Envelope(
+            request_id=1,
+            message_type=MessageType.RESPONSE,
+            method="plugin.invoke_hook",
+            plugin_id="demo_plugin",
+            payload={"success": True, "continue_processing": True, "modified_kwargs": None},
+        ),
+        "log_batch": Envelope(
+            request_id=2,
+            message_type=MessageType.BROADCAST,
+            method="runner.log_batch",
+            payload={
+                "entries": [
+                    {"level": 20, "logger_name": "plugin.demo", "message": f"log line {index}", "timestamp_ms": index}
+                    for index in range(32)
+                ]
+            },
+        ),
+        "invoke_command": Envelope(
+            request_id=3,
+            message_type=MessageType.REQUEST,
+            method="plugin.invoke_command",
+            plugin_id="demo_plugin",
+            payload={
+                "component_name": "echo",
+                "args": {"text": "x" * 512, "stream_id": "s" * 32, "matched_groups": {"arg": "value"}},
+            },
+        ),
+    }
+
+
+def _measure(func: Callable[[Envelope], Any], envelope: Envelope, iterations: int) -> float:
+    for _ in range(min(iterations, 1000)):
+        func(envelope)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(envelope)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比 Envelope 改动前后编解码的单次耗时")
+    parser.add_argument("--iterations", type=int, default=20000, help="每种消息的 encode+decode 次数")
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    args = parser.parse_args()
+
+    codec = MsgPackCodec()
+
+    def _fast_roundtrip(envelope: Envelope) -> Envelope:
+        return codec.decode_envelope(codec.encode_envelope(envelope))
+
+    results: List[Dict[str, Any]] = []
+    for name, envelope in _build_cases().items():
+        assert _fast_roundtrip(envelope) == _legacy_roundtrip(envelope)
+        legacy_us = _measure(_legacy_roundtrip, envelope, args.iterations)
+        fast_us = _measure(_fast_roundtrip, envelope, args.iterations)
+        results.append({"case": name, "legacy_us": legacy_us, "fast_us": fast_us, "speedup": legacy_us / fast_us})
+
+    print(f"iterations={args.iterations}")
+    print(f"{'case':<16} {'legacy_us':>10} {'fast_us':>9} {'speedup':>8}")
+    for row in results:
+        print(f"{row['case']:<16} {row['legacy_us']:>10.2f} {row['fast_us']:>9.2f} {row['speedup']:>7.2f}x")
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
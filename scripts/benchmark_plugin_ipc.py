@@ -0,0 +1,155 @@
+"""插件运行时 IPC 回环基准：逐帧写入 vs 合并写入（可选帧压缩）。
+
+在同一进程内启动 Host 端 `RPCServer` 与 Runner 端 `RPCClient`，通过本机传输（UDS / Named Pipe）握手后测量：
+1. 广播吞吐：Runner 并发发送 ``--frames`` 条日志广播，Host 全部收到的 frames/sec
+2. RPC 延迟：Host 以 ``--concurrency`` 并发向 Runner 发起 ``--requests`` 次回显请求，统计 p50 / p99
+
+对比的实现：
+- legacy：每帧单独 write + drain（本次改动前的 `Connection.send_frame`）
+- corked：同一轮事件循环内的帧合并为一次写入
+- corked+zlib：在 corked 基础上握手协商帧压缩，适用于 ``--payload-bytes`` 较大的场景
+
+示例：
+    python scripts/benchmark_plugin_ipc.py --frames 20000 --requests 5000 --payload-bytes 256
+    python scripts/benchmark_plugin_ipc.py --payload-bytes 262144 --frames 500 --requests 200
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import struct
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plugin_runtime.host.rpc_server import RPCServer  # noqa: E402
+from src.plugin_runtime.protocol.envelope import Envelope  # noqa: E402
+from src.plugin_runtime.runner.rpc_client import RPCClient  # noqa: E402
+from src.plugin_runtime.transport import base as transport_base  # noqa: E402
+from src.plugin_runtime.transport.factory import create_transport_server  # noqa: E402
+
+_CORKED_SEND_FRAME = transport_base.Connection.send_frame
+
+
+async def _legacy_send_frame(self: transport_base.Connection, data: bytes) -> None:
+    """改动前的逐帧写入实现，仅用于对比。"""
+    if self._closed:
+        raise transport_base.ConnectionClosed("连接已关闭")
+    length = len(data)
+    if length > transport_base.MAX_FRAME_SIZE:
+        raise ValueError(f"帧大小 {length} 超过最大限制 {transport_base.MAX_FRAME_SIZE}")
+    async with self._write_lock:
+        self._writer.write(struct.pack(">I", length) + data)
+        await self._writer.drain()
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+async def _run(args: argparse.Namespace, impl: str) -> Dict[str, Any]:
+    transport_base.Connection.send_frame = _legacy_send_frame if impl == "legacy" else _CORKED_SEND_FRAME  # type: ignore[method-assign]
+
+    payload = {"blob": "x" * args.payload_bytes}
+    received = 0
+    all_received = asyncio.Event()
+
+    async def _on_log(envelope: Envelope) -> Envelope:
+        nonlocal received
+        received += 1
+        if received >= args.frames:
+            all_received.set()
+        return envelope.make_response(payload={})
+
+    async def _on_echo(envelope: Envelope) -> Envelope:
+        return envelope.make_response(payload=envelope.payload)
+
+    server = RPCServer(
+        create_transport_server(),
+        send_queue_size=max(args.concurrency * 2, 128),
+        frame_compression=impl == "corked+zlib",
+        compression_threshold=args.compression_threshold,
+    )
+    server.register_method("runner.log_batch", _on_log)
+    await server.start()
+    client = RPCClient(server._transport.get_address(), server.session_token)
+    client.register_method("bench.echo", _on_echo)
+    try:
+        if not await client.connect_and_handshake():
+            raise RuntimeError("握手失败")
+        while not server.is_connected:
+            await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client.send_event("runner.log_batch", payload=payload) for _ in range(args.frames)))
+        await asyncio.wait_for(all_received.wait(), timeout=120)
+        frames_elapsed = time.perf_counter() - started
+
+        latencies: List[float] = []
+        remaining = args.requests
+
+        async def _caller() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                request_started = time.perf_counter()
+                await server.send_request("bench.echo", payload=payload, timeout_ms=120000)
+                latencies.append((time.perf_counter() - request_started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_caller() for _ in range(args.concurrency)))
+        rpc_elapsed = time.perf_counter() - started
+    finally:
+        await client.disconnect()
+        await server.stop()
+        transport_base.Connection.send_frame = _CORKED_SEND_FRAME  # type: ignore[method-assign]
+
+    latencies.sort()
+    return {
+        "impl": impl,
+        "frames_per_s": args.frames / frames_elapsed,
+        "rpc_per_s": args.requests / rpc_elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比插件 IPC 逐帧写入与合并写入的吞吐和尾延迟")
+    parser.add_argument("--frames", type=int, default=20000, help="广播吞吐测试的帧数")
+    parser.add_argument("--requests", type=int, default=5000, help="RPC 延迟测试的请求数")
+    parser.add_argument("--concurrency", type=int, default=64, help="并发 RPC 调用方数量")
+    parser.add_argument("--payload-bytes", type=int, default=256, help="每帧 payload 中的字符串长度")
+    parser.add_argument("--compression-threshold", type=int, default=64 * 1024, help="corked+zlib 的压缩阈值（字节）")
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    args = parser.parse_args()
+
+    results = [asyncio.run(_run(args, impl)) for impl in ("legacy", "corked", "corked+zlib")]
+
+    print(
+        f"frames={args.frames} requests={args.requests} concurrency={args.concurrency} "
+        f"payload_bytes={args.payload_bytes}"
+    )
+    print(f"{'impl':<12} {'frames/s':>10} {'rpc/s':>9} {'p50_ms':>8} {'p99_ms':>8}")
+    for row in results:
+        print(
+            f"{row['impl']:<12} {row['frames_per_s']:>10.0f} {row['rpc_per_s']:>9.0f} "
+            f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}"
+        )
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
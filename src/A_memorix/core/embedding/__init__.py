@@ -5,6 +5,7 @@ from .api_adapter import (
     EmbeddingAPIAdapter,
     create_embedding_api_adapter,
 )
+from .cache import EmbeddingCache, create_embedding_cache, get_shared_embedding_cache
 
 from ..utils.quantization import QuantizationType
 
@@ -12,6 +13,10 @@ __all__ = [
     # 新的 API 适配器（推荐使用）
     "EmbeddingAPIAdapter",
     "create_embedding_api_adapter",
+    # 嵌入缓存
+    "EmbeddingCache",
+    "create_embedding_cache",
+    "get_shared_embedding_cache",
     # 量化
     "QuantizationType",
 ]
@@ -10,6 +10,7 @@
 from __future__ import annotations
 
 import asyncio
+import re
 import time
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -20,9 +21,11 @@ import openai
 from src.common.logger import get_logger
 from src.config.config import config_manager
 from src.config.model_configs import APIProvider, ModelInfo
-from src.llm_models.exceptions import NetworkConnectionError
+from src.llm_models.exceptions import NetworkConnectionError, RespParseException
 from src.llm_models.model_client.base_client import EmbeddingRequest, client_registry
 
+from .cache import EmbeddingCache, get_shared_embedding_cache
+
 logger = get_logger("A_Memorix.EmbeddingAPIAdapter")
 
 
@@ -30,7 +33,15 @@ class EmbeddingAPIAdapter:
     """适配宿主 embedding 请求接口。"""
 
     _GLOBAL_DIMENSION_CACHE: Dict[str, int] = {}
-    _GLOBAL_TEXT_EMBEDDING_CACHE: Dict[Tuple[str, int, str], np.ndarray] = {}
+    # provider 名称 -> (临时下调后的单次请求最大输入条数, 下次放宽时间)；遇到 413/超限/条数不符时下调，
+    # 每过 _BATCH_LIMIT_RECOVERY_SECONDS 翻倍放宽，直至恢复默认上限
+    _GLOBAL_PROVIDER_BATCH_LIMIT: Dict[str, Tuple[int, float]] = {}
+    _BATCH_LIMIT_RECOVERY_SECONDS = 300.0
+    _DEFAULT_PROVIDER_BATCH_LIMITS: Dict[str, int] = {"openai": 2048, "gemini": 100, "google": 100}
+    _BATCH_SIZE_ERROR_PATTERN = re.compile(
+        r"too many|too large|too long|batch|maximum|exceed|payload|413",
+        re.IGNORECASE,
+    )
 
     def __init__(
         self,
@@ -40,12 +51,17 @@ class EmbeddingAPIAdapter:
         enable_cache: bool = False,
         model_name: str = "auto",
         retry_config: Optional[dict] = None,
+        cache: Optional[EmbeddingCache] = None,
     ) -> None:
         self.batch_size = max(1, int(batch_size))
         self.max_concurrent = max(1, int(max_concurrent))
         self.default_dimension = max(1, int(default_dimension))
-        self.enable_cache = bool(enable_cache)
+        self.enable_cache = bool(enable_cache) or cache is not None
         self.model_name = str(model_name or "auto")
+        # 未显式传入时使用进程内共享的纯内存缓存
+        self.cache: Optional[EmbeddingCache] = None
+        if self.enable_cache:
+            self.cache = cache if cache is not None else get_shared_embedding_cache()
 
         self.retry_config = retry_config or {}
         self.max_attempts = max(1, int(self.retry_config.get("max_attempts", 5)))
@@ -147,7 +163,7 @@ class EmbeddingAPIAdapter:
             raise RuntimeError(f"{source} 返回了非有限 embedding 值")
         return array
 
-    async def _request_with_retry(self, client, model_info, text: str, extra_params: dict):
+    async def _request_with_retry(self, client, model_info, embedding_input: Union[str, List[str]], extra_params: dict):
         retriable_exceptions = (
             openai.APIConnectionError,
             openai.APITimeoutError,
@@ -162,7 +178,7 @@ class EmbeddingAPIAdapter:
                 return await client.get_embedding(
                     EmbeddingRequest(
                         model_info=model_info,
-                        embedding_input=text,
+                        embedding_input=embedding_input,
                         extra_params=extra_params,
                     )
                 )
@@ -187,13 +203,152 @@ class EmbeddingAPIAdapter:
             raise last_exc
         raise RuntimeError("Embedding 请求失败：未知错误")
 
-    async def _get_embedding_direct(
+    def _default_provider_batch_limit(self, api_provider: APIProvider) -> int:
+        client_type = str(getattr(api_provider, "client_type", "") or "").strip().lower()
+        return max(1, int(self._DEFAULT_PROVIDER_BATCH_LIMITS.get(client_type, 2048)))
+
+    def _provider_batch_limit(self, api_provider: APIProvider) -> int:
+        provider_key = str(getattr(api_provider, "name", "") or "")
+        default_limit = self._default_provider_batch_limit(api_provider)
+        entry = self._GLOBAL_PROVIDER_BATCH_LIMIT.get(provider_key)
+        if entry is None:
+            return default_limit
+        limit, recover_at = entry
+        now = time.monotonic()
+        if now >= recover_at:
+            # 下调只是临时退避：冷却期满后翻倍试探，恢复到默认上限即移除记录
+            limit = min(default_limit, max(1, int(limit)) * 2)
+            if limit >= default_limit:
+                self._GLOBAL_PROVIDER_BATCH_LIMIT.pop(provider_key, None)
+                logger.info(f"embedding provider {provider_key} 批量上限已恢复: {default_limit}")
+            else:
+                self._GLOBAL_PROVIDER_BATCH_LIMIT[provider_key] = (limit, now + self._BATCH_LIMIT_RECOVERY_SECONDS)
+        return max(1, int(limit))
+
+    def _lower_provider_batch_limit(self, api_provider: APIProvider, limit: int) -> None:
+        provider_key = str(getattr(api_provider, "name", "") or "")
+        previous = self._provider_batch_limit(api_provider)
+        if limit < previous:
+            self._GLOBAL_PROVIDER_BATCH_LIMIT[provider_key] = (
+                max(1, int(limit)),
+                time.monotonic() + self._BATCH_LIMIT_RECOVERY_SECONDS,
+            )
+            logger.warning(
+                f"embedding provider {provider_key} 批量上限临时下调: {previous} -> {max(1, int(limit))}"
+                f"（{self._BATCH_LIMIT_RECOVERY_SECONDS:.0f}s 后逐步放宽）"
+            )
+
+    @classmethod
+    def _is_batch_size_error(cls, exc: BaseException) -> bool:
+        status_code = getattr(exc, "status_code", None)
+        if status_code == 413:
+            return True
+        if status_code in {400, 422}:
+            message = str(getattr(exc, "message", None) or exc)
+            return bool(cls._BATCH_SIZE_ERROR_PATTERN.search(message))
+        return False
+
+    async def _request_embeddings(
         self,
-        text: str,
+        *,
+        client,
+        model_info,
+        api_provider: APIProvider,
+        texts: List[str],
+        extra_params: dict,
+    ) -> List[np.ndarray]:
+        """
+        以数组输入请求多条 embedding。
+
+        超过 provider 上限时按上限切分；413/超限错误时对半拆分并记住新的上限；
+        服务端不接受数组输入（报错或返回条数不符）时回退逐条请求。
+        """
+        limit = self._provider_batch_limit(api_provider)
+        if len(texts) > limit:
+            vectors: List[np.ndarray] = []
+            for offset in range(0, len(texts), limit):
+                vectors.extend(
+                    await self._request_embeddings(
+                        client=client,
+                        model_info=model_info,
+                        api_provider=api_provider,
+                        texts=texts[offset : offset + limit],
+                        extra_params=extra_params,
+                    )
+                )
+            return vectors
+
+        source = f"embedding 模型 {getattr(model_info, 'name', '')}"
+        if len(texts) == 1:
+            response = await self._request_with_retry(
+                client=client,
+                model_info=model_info,
+                embedding_input=texts[0],
+                extra_params=extra_params,
+            )
+            embedding = getattr(response, "embedding", None)
+            if embedding is None:
+                raise RuntimeError(f"{source} 未返回 embedding")
+            return [self._validate_embedding_vector(embedding, source=source)]
+
+        try:
+            response = await self._request_with_retry(
+                client=client,
+                model_info=model_info,
+                embedding_input=list(texts),
+                extra_params=extra_params,
+            )
+            embeddings = getattr(response, "embeddings", None)
+        except Exception as exc:
+            if not self._is_batch_size_error(exc):
+                # 仅在服务端拒绝数组输入（参数/解析类错误）时回退逐条请求，网络与鉴权错误直接上抛
+                if getattr(exc, "status_code", None) not in {400, 415, 422} and not isinstance(exc, RespParseException):
+                    raise
+                logger.warning(f"{source} 数组输入请求失败，回退逐条请求: {exc}")
+                embeddings = None
+            else:
+                half = len(texts) // 2
+                self._lower_provider_batch_limit(api_provider, half)
+                head = await self._request_embeddings(
+                    client=client,
+                    model_info=model_info,
+                    api_provider=api_provider,
+                    texts=texts[:half],
+                    extra_params=extra_params,
+                )
+                tail = await self._request_embeddings(
+                    client=client,
+                    model_info=model_info,
+                    api_provider=api_provider,
+                    texts=texts[half:],
+                    extra_params=extra_params,
+                )
+                return head + tail
+
+        if embeddings is not None and len(embeddings) == len(texts):
+            return [self._validate_embedding_vector(item, source=source) for item in embeddings]
+
+        vectors = []
+        for text in texts:
+            vectors.extend(
+                await self._request_embeddings(
+                    client=client,
+                    model_info=model_info,
+                    api_provider=api_provider,
+                    texts=[text],
+                    extra_params=extra_params,
+                )
+            )
+        self._lower_provider_batch_limit(api_provider, 1)
+        return vectors
+
+    async def _get_embeddings_direct(
+        self,
+        texts: List[str],
         dimensions: Optional[int] = None,
         *,
         include_dimension: bool = True,
-    ) -> Optional[List[float]]:
+    ) -> Optional[List[np.ndarray]]:
         candidate_names = self._resolve_candidate_model_names()
         if not candidate_names:
             raise RuntimeError("embedding 任务未配置模型")
@@ -203,7 +358,8 @@ class EmbeddingAPIAdapter:
             try:
                 model_info = self._find_model_info(candidate_name)
                 api_provider = self._find_provider(model_info.api_provider)
-                client = client_registry.get_client_class_instance(api_provider, force_new=True)
+                # 注册表按事件循环缓存客户端，同一循环内复用 keep-alive 连接池
+                client = client_registry.get_client_class_instance(api_provider)
 
                 requested_dimension = self._resolve_canonical_dimension(dimensions) if include_dimension else None
                 extra_params = self._build_request_extra_params(
@@ -213,20 +369,13 @@ class EmbeddingAPIAdapter:
                     include_dimension=include_dimension,
                 )
 
-                response = await self._request_with_retry(
+                return await self._request_embeddings(
                     client=client,
                     model_info=model_info,
-                    text=text,
+                    api_provider=api_provider,
+                    texts=list(texts),
                     extra_params=extra_params,
                 )
-                embedding = getattr(response, "embedding", None)
-                if embedding is None:
-                    raise RuntimeError(f"模型 {candidate_name} 未返回 embedding")
-                vector = self._validate_embedding_vector(
-                    embedding,
-                    source=f"embedding 模型 {candidate_name}",
-                )
-                return vector.tolist()
             except Exception as exc:
                 last_exc = exc
                 logger.warning(f"embedding 模型 {candidate_name} 请求失败: {exc}")
@@ -235,6 +384,18 @@ class EmbeddingAPIAdapter:
             logger.error(f"通过直接 Client 获取 Embedding 失败: {last_exc}")
         return None
 
+    async def _get_embedding_direct(
+        self,
+        text: str,
+        dimensions: Optional[int] = None,
+        *,
+        include_dimension: bool = True,
+    ) -> Optional[List[float]]:
+        vectors = await self._get_embeddings_direct([text], dimensions=dimensions, include_dimension=include_dimension)
+        if not vectors:
+            return None
+        return vectors[0].tolist()
+
     def _dimension_cache_key(self) -> str:
         candidate_names = self._resolve_candidate_model_names()
         return "|".join(
@@ -245,10 +406,6 @@ class EmbeddingAPIAdapter:
             ]
         )
 
-    def _embedding_cache_key(self, text: str, dimensions: Optional[int]) -> Tuple[str, int, str]:
-        requested_dimension = self._resolve_canonical_dimension(dimensions)
-        return (self._dimension_cache_key(), int(requested_dimension), str(text or ""))
-
     async def _detect_dimension(self) -> int:
         if self._dimension_detected and self._dimension is not None:
             return self._dimension
@@ -355,65 +512,52 @@ class EmbeddingAPIAdapter:
             logger.error(f"编码失败: {exc}")
             raise RuntimeError(f"embedding encode failed: {exc}") from exc
 
+    async def _cache_call(self, func, *args):
+        """落盘缓存的 SQLite 读写放到线程中执行，避免阻塞事件循环；纯内存缓存直接调用。"""
+        if self.cache is not None and self.cache.persistent:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
     async def _encode_batch_internal(
         self,
         texts: List[str],
         batch_size: int,
         dimensions: Optional[int] = None,
     ) -> np.ndarray:
-        all_embeddings: List[np.ndarray] = []
-        for offset in range(0, len(texts), batch_size):
-            batch = texts[offset : offset + batch_size]
-            batch_results: List[Tuple[int, np.ndarray]] = []
-            uncached_items: List[Tuple[int, str]] = []
-
-            if self.enable_cache:
-                for index, text in enumerate(batch):
-                    cache_key = self._embedding_cache_key(text, dimensions)
-                    cached_vector = self._GLOBAL_TEXT_EMBEDDING_CACHE.get(cache_key)
-                    if cached_vector is None:
-                        uncached_items.append((index, text))
-                    else:
-                        batch_results.append((index, cached_vector.copy()))
-            else:
-                uncached_items = list(enumerate(batch))
-
-            if not uncached_items:
-                batch_results.sort(key=lambda item: item[0])
-                all_embeddings.extend(emb for _, emb in batch_results)
-                continue
-
-            semaphore = asyncio.Semaphore(self.max_concurrent)
-
-            async def encode_with_semaphore(text: str, batch_index: int, absolute_index: int):
-                async with semaphore:
-                    embedding = await self._get_embedding_direct(text, dimensions=dimensions)
-                    if embedding is None:
-                        raise RuntimeError(f"文本 {absolute_index} 编码失败：embedding 返回为空")
-                    vector = self._validate_embedding_vector(
-                        embedding,
-                        source=f"文本 {absolute_index}",
-                    )
-                    return batch_index, vector
-
-            tasks = [
-                encode_with_semaphore(text, index, offset + index)
-                for index, text in uncached_items
-            ]
-            results = await asyncio.gather(*tasks)
-            normalized_results: List[Tuple[int, np.ndarray]] = []
-            for batch_index, vector in results:
-                normalized_results.append((batch_index, vector))
-                if self.enable_cache:
-                    text = batch[batch_index]
-                    cache_key = self._embedding_cache_key(text, dimensions)
-                    self._GLOBAL_TEXT_EMBEDDING_CACHE[cache_key] = vector.copy()
-
-            batch_results.extend(normalized_results)
-            batch_results.sort(key=lambda item: item[0])
-            all_embeddings.extend(emb for _, emb in batch_results)
-
-        return np.array(all_embeddings, dtype=np.float32)
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        cache_model_key = self._dimension_cache_key()
+        cache_dimension = int(self._resolve_canonical_dimension(dimensions))
+        if self.cache is not None:
+            results = await self._cache_call(self.cache.get_many, cache_model_key, cache_dimension, texts)
+        # 未命中缓存的文本按内容去重，每 batch_size 条合并为一次数组输入请求
+        pending: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            if results[index] is None:
+                pending.setdefault(text, []).append(index)
+
+        unique_texts = list(pending)
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def encode_with_semaphore(offset: int, batch: List[str]):
+            async with semaphore:
+                vectors = await self._get_embeddings_direct(batch, dimensions=dimensions)
+            if not vectors or len(vectors) != len(batch):
+                raise RuntimeError(f"文本 {offset}-{offset + len(batch) - 1} 编码失败：embedding 返回为空")
+            return offset, vectors
+
+        tasks = [
+            encode_with_semaphore(offset, unique_texts[offset : offset + batch_size])
+            for offset in range(0, len(unique_texts), batch_size)
+        ]
+        for offset, vectors in await asyncio.gather(*tasks):
+            batch_texts = unique_texts[offset : offset + len(vectors)]
+            for text, vector in zip(batch_texts, vectors, strict=True):
+                for index in pending[text]:
+                    results[index] = vector
+            if self.cache is not None:
+                await self._cache_call(self.cache.put_many, cache_model_key, cache_dimension, batch_texts, vectors)
+
+        return np.array(results, dtype=np.float32)
 
     async def encode_batch(
         self,
@@ -453,6 +597,7 @@ class EmbeddingAPIAdapter:
             "total_encoded": self._total_encoded,
             "total_errors": self._total_errors,
             "avg_time_per_text": self._total_time / self._total_encoded if self._total_encoded else 0.0,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
         }
 
     def get_statistics(self) -> dict:
@@ -479,6 +624,7 @@ def create_embedding_api_adapter(
     enable_cache: bool = False,
     model_name: str = "auto",
     retry_config: Optional[dict] = None,
+    cache: Optional[EmbeddingCache] = None,
 ) -> EmbeddingAPIAdapter:
     return EmbeddingAPIAdapter(
         batch_size=batch_size,
@@ -487,4 +633,5 @@ def create_embedding_api_adapter(
         enable_cache=enable_cache,
         model_name=model_name,
         retry_config=retry_config,
+        cache=cache,
     )
@@ -0,0 +1,324 @@
+"""
+嵌入缓存
+
+进程内共享的 LRU 缓存（按条目数与字节数双重限额），可选 SQLite 落盘以跨重启复用。
+
+- 键：(模型标识, 维度, 规范化文本)
+- 值：float16 向量（内存与磁盘一致，取出时转为 float32）
+- 命中统计：内存命中 / 磁盘命中 / 未命中，命中次数随 flush 回写，用于启动预热热点键
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.common.logger import get_logger
+from ..utils.hash import normalize_text
+
+logger = get_logger("A_Memorix.EmbeddingCache")
+
+_SHARED_CACHES: Dict[str, "EmbeddingCache"] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+class EmbeddingCache:
+    """
+    有界 LRU 嵌入缓存
+
+    参数：
+        path: SQLite 文件路径；为 None 时仅使用内存
+        max_entries: 内存最大条目数
+        max_bytes: 内存向量总字节上限
+        max_disk_entries: 磁盘最大条目数（flush 时按命中次数/最近访问淘汰）
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        *,
+        max_entries: int = 50000,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_disk_entries: int = 500000,
+    ):
+        self.path = Path(path) if path else None
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_disk_entries = max(1, int(max_disk_entries))
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._pending_hits: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # 共享实例的注册键与引用计数（由 get_shared_embedding_cache 维护）
+        self._shared_key: Optional[str] = None
+        self._shared_refs = 0
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if self.path is not None:
+            self._connect()
+
+    def _connect(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_cache_hot ON embedding_cache(hits DESC, last_access DESC)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_key: str, dimension: int, text: str) -> str:
+        raw = f"{model_key}\x1f{int(dimension)}\x1f{normalize_text(str(text or ''))}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._entries[key] = vector
+        self._bytes += vector.nbytes
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._evictions += 1
+
+    def get_many(self, model_key: str, dimension: int, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """批量查询，返回与 texts 对齐的 float32 向量（未命中为 None）。"""
+        keys = [self.make_key(model_key, dimension, text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for index, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(index)
+                    continue
+                self._entries.move_to_end(key)
+                self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                self._memory_hits += 1
+                results[index] = vector.astype(np.float32)
+
+            if missing and self._conn is not None:
+                for key, vector in self._load_from_disk(list(missing), int(dimension)):
+                    self._remember(key, vector)
+                    self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                    for index in missing.pop(key):
+                        self._disk_hits += 1
+                        results[index] = vector.astype(np.float32)
+            self._misses += sum(len(indexes) for indexes in missing.values())
+        return results
+
+    def _load_from_disk(self, keys: List[str], dimension: int) -> List[Tuple[str, np.ndarray]]:
+        rows: List[Tuple[str, np.ndarray]] = []
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset : offset + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self._conn.execute(
+                f"SELECT key, vector FROM embedding_cache WHERE dimension = ? AND key IN ({placeholders})",
+                (dimension, *chunk),
+            )
+            for key, blob in cursor.fetchall():
+                rows.append((key, np.frombuffer(blob, dtype=np.float16).copy()))
+        return rows
+
+    def put_many(
+        self,
+        model_key: str,
+        dimension: int,
+        texts: Sequence[str],
+        vectors: Union[np.ndarray, Sequence[np.ndarray]],
+    ) -> None:
+        """批量写入；落盘模式下一次事务写入全部新条目。"""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors, strict=True):
+                key = self.make_key(model_key, dimension, text)
+                stored = np.asarray(vector, dtype=np.float16).reshape(-1)
+                self._remember(key, stored)
+                rows.append((key, str(model_key), int(dimension), stored.tobytes(), now))
+            if rows and self._conn is not None:
+                self._conn.executemany(
+                    """
+                    INSERT INTO embedding_cache (key, model, dimension, vector, hits, last_access)
+                    VALUES (?, ?, ?, ?, 0, ?)
+                    ON CONFLICT(key) DO UPDATE SET vector = excluded.vector, last_access = excluded.last_access
+                    """,
+                    rows,
+                )
+                self._conn.commit()
+
+    def warmup(self, limit: int = 5000) -> int:
+        """启动预热：按历史命中次数与最近访问时间载入热点条目，返回载入条数。"""
+        if self._conn is None:
+            return 0
+        limit = min(max(0, int(limit)), self.max_entries)
+        if limit <= 0:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT key, vector FROM embedding_cache ORDER BY hits DESC, last_access DESC LIMIT ?",
+                (limit,),
+            )
+            rows = cursor.fetchall()
+            # 逆序写入，使最热的条目位于 LRU 尾部（最后被淘汰）
+            for key, blob in reversed(rows):
+                if key not in self._entries:
+                    self._remember(key, np.frombuffer(blob, dtype=np.float16).copy())
+        if rows:
+            logger.info(f"嵌入缓存预热完成: {len(rows)} 条")
+        return len(rows)
+
+    def flush(self) -> None:
+        """回写命中计数，并将磁盘条目裁剪到 max_disk_entries。"""
+        if self._conn is None:
+            return
+        with self._lock:
+            pending = self._pending_hits
+            self._pending_hits = {}
+            now = time.time()
+            if pending:
+                self._conn.executemany(
+                    "UPDATE embedding_cache SET hits = hits + ?, last_access = ? WHERE key = ?",
+                    [(count, now, key) for key, count in pending.items()],
+                )
+            total = int(self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0])
+            if total > self.max_disk_entries:
+                self._conn.execute(
+                    """
+                    DELETE FROM embedding_cache WHERE key IN (
+                        SELECT key FROM embedding_cache ORDER BY hits ASC, last_access ASC LIMIT ?
+                    )
+                    """,
+                    (total - self.max_disk_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self._pending_hits.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embedding_cache")
+                self._conn.commit()
+        logger.info(f"已清空嵌入缓存: {count} 条")
+
+    def close(self) -> None:
+        """
+        释放一次引用；共享实例在最后一个持有者关闭时才关闭连接并从共享表移除，
+        其余持有者继续使用落盘缓存。
+        """
+        with _SHARED_LOCK:
+            if self._shared_key is not None:
+                self._shared_refs -= 1
+                if self._shared_refs > 0:
+                    release = False
+                else:
+                    release = True
+                    if _SHARED_CACHES.get(self._shared_key) is self:
+                        del _SHARED_CACHES[self._shared_key]
+                    self._shared_key = None
+            else:
+                release = True
+        if not release:
+            self.flush()
+            return
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def persistent(self) -> bool:
+        return self._conn is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self._memory_hits + self._disk_hits + self._misses
+        if total == 0:
+            return 0.0
+        return (self._memory_hits + self._disk_hits) / total
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": int(self._bytes),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "persistent": self._conn is not None,
+            "memory_hits": self._memory_hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def get_shared_embedding_cache(
+    path: Optional[Union[str, Path]] = None,
+    **limits: Any,
+) -> EmbeddingCache:
+    """
+    获取进程内共享的缓存实例（同一路径复用同一实例；path 为 None 时为纯内存共享实例）。
+
+    limits 仅在首次创建时生效。每次获取计一次引用，持有者用完后调用 close() 释放。
+    """
+    key = str(Path(path).resolve()) if path else ""
+    with _SHARED_LOCK:
+        cache = _SHARED_CACHES.get(key)
+        if cache is None:
+            cache = EmbeddingCache(path, **limits)
+            cache._shared_key = key
+            _SHARED_CACHES[key] = cache
+        cache._shared_refs += 1
+        return cache
+
+
+def create_embedding_cache(
+    data_dir: Optional[Union[str, Path]],
+    cache_config: Optional[Dict[str, Any]] = None,
+) -> EmbeddingCache:
+    """
+    按 `embedding.cache` 配置创建共享缓存。
+
+    persist 为真且提供 data_dir 时落盘到 `data_dir/embedding_cache.db`。
+    """
+    cfg = cache_config if isinstance(cache_config, dict) else {}
+    persist = bool(cfg.get("persist", True)) and data_dir is not None
+    return get_shared_embedding_cache(
+        Path(data_dir) / "embedding_cache.db" if persist else None,
+        max_entries=int(cfg.get("max_entries", 50000) or 50000),
+        max_bytes=int(float(cfg.get("max_mb", 256) or 256) * 1024 * 1024),
+        max_disk_entries=int(cfg.get("max_disk_entries", 500000) or 500000),
+    )
@@ -4,8 +4,6 @@
 负责嵌入模型的加载、缓存和批量生成。
 """
 
-import hashlib
-import pickle
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
@@ -20,6 +18,7 @@ except ImportError:
     HAS_SENTENCE_TRANSFORMERS = False
 
 from src.common.logger import get_logger
+from .cache import EmbeddingCache, create_embedding_cache
 from .presets import (
     EmbeddingModelConfig,
     get_custom_config,
@@ -80,14 +79,13 @@ class EmbeddingManager:
         self._model: Optional[SentenceTransformer] = None
         self._model_lock = threading.Lock()
 
-        # 缓存
-        self._embedding_cache: Dict[str, np.ndarray] = {}
-        self._cache_lock = threading.Lock()
+        # 缓存：与 API 适配器共用 create_embedding_cache 的共享实例（有 cache_dir 时落盘到 cache_dir/embedding_cache.db）
+        self._embedding_cache: EmbeddingCache = create_embedding_cache(
+            self.cache_dir if enable_cache else None
+        )
 
         # 统计
         self._total_encoded = 0
-        self._cache_hits = 0
-        self._cache_misses = 0
 
         logger.info(
             f"EmbeddingManager 初始化: model={config.model_name}, "
@@ -273,97 +271,47 @@ class EmbeddingManager:
         if not self.enable_cache:
             return self.encode(texts, batch_size, show_progress)
 
-        # 分离缓存命中和未命中的文本
-        cached_embeddings = []
-        uncached_texts = []
-        uncached_indices = []
-
-        for i, text in enumerate(texts):
-            cache_key = self._get_cache_key(text)
-
-            with self._cache_lock:
-                if cache_key in self._embedding_cache:
-                    cached_embeddings.append((i, self._embedding_cache[cache_key]))
-                    self._cache_hits += 1
-                else:
-                    uncached_texts.append(text)
-                    uncached_indices.append(i)
-                    self._cache_misses += 1
+        model_key = self.config.model_name
+        dimension = self.config.dimension
+        results = self._embedding_cache.get_many(model_key, dimension, texts)
+        uncached_indices = [i for i, emb in enumerate(results) if emb is None]
 
         # 生成未缓存的嵌入
-        if uncached_texts:
+        if uncached_indices:
+            uncached_texts = [texts[i] for i in uncached_indices]
             new_embeddings = self.encode(
                 uncached_texts,
                 batch_size,
                 show_progress,
             )
-
-            # 更新缓存
-            with self._cache_lock:
-                for text, embedding in zip(uncached_texts, new_embeddings):
-                    cache_key = self._get_cache_key(text)
-                    self._embedding_cache[cache_key] = embedding.copy()
-
-            # 合并结果
+            self._embedding_cache.put_many(model_key, dimension, uncached_texts, new_embeddings)
             for idx, embedding in zip(uncached_indices, new_embeddings):
-                cached_embeddings.append((idx, embedding))
-
-        # 按原始顺序排序
-        cached_embeddings.sort(key=lambda x: x[0])
-        final_embeddings = np.array([emb for _, emb in cached_embeddings])
-
-        return final_embeddings
-
-    def save_cache(self, cache_path: Optional[Union[str, Path]] = None) -> None:
-        """
-        保存缓存到磁盘
-
-        Args:
-            cache_path: 缓存文件路径（默认使用cache_dir/embeddings_cache.pkl）
-        """
-        if cache_path is None:
-            if self.cache_dir is None:
-                raise ValueError("未指定缓存目录")
-            cache_path = self.cache_dir / "embeddings_cache.pkl"
-
-        cache_path = Path(cache_path)
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
+                results[idx] = embedding
 
-        with self._cache_lock:
-            with open(cache_path, "wb") as f:
-                pickle.dump(self._embedding_cache, f)
+        return np.array(results)
 
-            logger.info(f"缓存已保存: {cache_path} ({len(self._embedding_cache)} 条)")
+    def save_cache(self) -> None:
+        """将命中统计回写磁盘缓存（条目在写入时已落盘）"""
+        if self.cache_dir is None:
+            raise ValueError("未指定缓存目录")
+        self._embedding_cache.flush()
+        logger.info(f"缓存已保存: {self._embedding_cache.path} ({len(self._embedding_cache)} 条)")
 
-    def load_cache(self, cache_path: Optional[Union[str, Path]] = None) -> None:
+    def load_cache(self, limit: int = 5000) -> None:
         """
-        从磁盘加载缓存
+        从磁盘缓存预热热点条目
 
         Args:
-            cache_path: 缓存文件路径（默认使用cache_dir/embeddings_cache.pkl）
+            limit: 最多载入的条目数
         """
-        if cache_path is None:
-            if self.cache_dir is None:
-                raise ValueError("未指定缓存目录")
-            cache_path = self.cache_dir / "embeddings_cache.pkl"
-
-        cache_path = Path(cache_path)
-        if not cache_path.exists():
-            logger.warning(f"缓存文件不存在: {cache_path}")
-            return
-
-        with self._cache_lock:
-            with open(cache_path, "rb") as f:
-                self._embedding_cache = pickle.load(f)
-
-            logger.info(f"缓存已加载: {cache_path} ({len(self._embedding_cache)} 条)")
+        if self.cache_dir is None:
+            raise ValueError("未指定缓存目录")
+        loaded = self._embedding_cache.warmup(limit)
+        logger.info(f"缓存已加载: {self._embedding_cache.path} ({loaded} 条)")
 
     def clear_cache(self) -> None:
         """清空缓存"""
-        with self._cache_lock:
-            count = len(self._embedding_cache)
-            self._embedding_cache.clear()
-            logger.info(f"已清空缓存: {count} 条")
+        self._embedding_cache.clear()
 
     def check_model_consistency(
         self,
@@ -424,26 +372,13 @@ class EmbeddingManager:
             "cache_enabled": self.enable_cache,
             "cache_size": len(self._embedding_cache),
             "total_encoded": self._total_encoded,
-            "cache_hits": self._cache_hits,
-            "cache_misses": self._cache_misses,
+            "cache": self._embedding_cache.get_stats(),
         }
 
     def get_embedding_dimension(self) -> int:
         """获取嵌入维度"""
         return self.config.dimension
 
-    def _get_cache_key(self, text: str) -> str:
-        """
-        生成缓存键
-
-        Args:
-            text: 文本内容
-
-        Returns:
-            缓存键（SHA256哈希）
-        """
-        return hashlib.sha256(text.encode("utf-8")).hexdigest()
-
     @property
     def is_model_loaded(self) -> bool:
         """模型是否已加载"""
@@ -452,10 +387,7 @@ class EmbeddingManager:
     @property
     def cache_hit_rate(self) -> float:
         """缓存命中率"""
-        total = self._cache_hits + self._cache_misses
-        if total == 0:
-            return 0.0
-        return self._cache_hits / total
+        return self._embedding_cache.hit_rate
 
     def __repr__(self) -> str:
         return (
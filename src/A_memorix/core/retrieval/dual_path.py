@@ -33,6 +33,77 @@ class RetrievalStrategy(Enum):
     DUAL_PATH = "dual_path"      # 双路检索（推荐）
 
 
+class _VectorSearchCoalescer:
+    """
+    向量检索合批器
+
+    同一时间窗口内来自不同会话的并发检索被合并为一次 ``VectorStore.search_batch`` 调用，
+    在线程中执行，各请求按自身 k 截取结果（大 k 结果的前缀即小 k 结果）。
+    """
+
+    def __init__(self, vector_store: Any, window_seconds: float, max_batch_size: int):
+        self._vector_store = vector_store
+        self._window_seconds = max(0.0, float(window_seconds))
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[np.ndarray, int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def search(self, query_emb: np.ndarray, k: int) -> Tuple[List[str], List[float]]:
+        query = np.asarray(query_emb, dtype=np.float32).reshape(-1)
+        dimension = getattr(self._vector_store, "dimension", None)
+        if (
+            not hasattr(self._vector_store, "search_batch")
+            or (dimension is not None and query.shape[0] != int(dimension))
+            or not np.all(np.isfinite(query))
+        ):
+            # 非法查询单独走原路径，由 VectorStore 抛出原有异常，不拖累同批其他请求
+            return await asyncio.to_thread(self._vector_store.search, query_emb, k=k)
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = []
+            self._flush_handle = None
+
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((query, max(1, int(k)), future))
+        if len(self._pending) >= self._max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window_seconds, self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch or self._loop is None:
+            return
+        task = self._loop.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, int, asyncio.Future]]) -> None:
+        max_k = max(k for _, k, _ in batch)
+        try:
+            queries = np.stack([query for query, _, _ in batch])
+            outputs = await asyncio.to_thread(self._vector_store.search_batch, queries, max_k)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if len(batch) > 1:
+            logger.debug(f"metric.vector_search_batch_size={len(batch)}")
+        for (_, k, future), (ids, scores) in zip(batch, outputs, strict=True):
+            if not future.done():
+                future.set_result((ids[:k], scores[:k]))
+
+
 @dataclass
 class RetrievalResult:
     """
@@ -83,6 +154,8 @@ class DualPathRetrieverConfig:
         ppr_alpha: PageRank的alpha参数
         ppr_concurrency_limit: PPR计算的最大并发数
         enable_parallel: 是否并行检索
+        vector_batch_window_ms: 并发向量检索的合批等待窗口（毫秒，0 表示仅合并同一事件循环轮次内的请求）
+        vector_batch_max_size: 单次合批的最大查询数
         retrieval_strategy: 检索策略
         debug: 是否启用调试模式（打印搜索结果原文）
     """
@@ -95,7 +168,11 @@ class DualPathRetrieverConfig:
     ppr_alpha: float = 0.85
     ppr_timeout_seconds: float = 1.5
     ppr_concurrency_limit: int = 4
+    ppr_method: str = "power"
+    ppr_push_epsilon: float = 1e-4
     enable_parallel: bool = True
+    vector_batch_window_ms: float = 2.0
+    vector_batch_max_size: int = 32
     retrieval_strategy: RetrievalStrategy = RetrievalStrategy.DUAL_PATH
     debug: bool = False
     sparse: SparseBM25Config = field(default_factory=SparseBM25Config)
@@ -130,6 +207,13 @@ class DualPathRetrieverConfig:
             raise ValueError(f"top_k_final必须大于0: {self.top_k_final}")
         if self.ppr_timeout_seconds <= 0:
             raise ValueError(f"ppr_timeout_seconds必须大于0: {self.ppr_timeout_seconds}")
+        self.ppr_method = str(self.ppr_method or "power").strip().lower()
+        if self.ppr_method not in {"power", "push"}:
+            raise ValueError(f"ppr_method必须为 power 或 push: {self.ppr_method}")
+        if self.vector_batch_window_ms < 0:
+            raise ValueError(f"vector_batch_window_ms不能为负数: {self.vector_batch_window_ms}")
+        if self.vector_batch_max_size <= 0:
+            raise ValueError(f"vector_batch_max_size必须大于0: {self.vector_batch_max_size}")
 
 
 @dataclass
@@ -237,12 +321,20 @@ class DualPathRetriever:
         self.sparse_index = sparse_index
 
         # PageRank计算器
-        ppr_config = PageRankConfig(alpha=self.config.ppr_alpha)
+        ppr_config = PageRankConfig(
+            alpha=self.config.ppr_alpha,
+            push_epsilon=self.config.ppr_push_epsilon,
+        )
         self._ppr = PersonalizedPageRank(
             graph_store=graph_store,
             config=ppr_config,
         )
         self._ppr_semaphore = asyncio.Semaphore(self.config.ppr_concurrency_limit)
+        self._vector_search_coalescer = _VectorSearchCoalescer(
+            vector_store,
+            window_seconds=self.config.vector_batch_window_ms / 1000.0,
+            max_batch_size=self.config.vector_batch_max_size,
+        )
         self._graph_relation_recall = GraphRelationRecallService(
             graph_store=graph_store,
             metadata_store=metadata_store,
@@ -266,6 +358,10 @@ class DualPathRetriever:
         )
         self._runtime_sparse_only = False
 
+    async def _vector_search(self, query_emb: np.ndarray, k: int) -> Tuple[List[str], List[float]]:
+        """向量检索（异步，与其他并发请求合批后在线程中执行）。"""
+        return await self._vector_search_coalescer.search(query_emb, k)
+
     def set_runtime_sparse_only(self, enabled: bool) -> None:
         """由运行时控制强制 sparse-only（不改用户配置文件）。"""
         self._runtime_sparse_only = bool(enabled)
@@ -839,9 +935,9 @@ class DualPathRetriever:
         if embedding_ok:
             multiplier = max(1, temporal.candidate_multiplier) if temporal else 1
             candidate_k = self._cap_temporal_scan_k(top_k * 2 * multiplier, temporal)
-            para_ids, para_scores = self.vector_store.search(
+            para_ids, para_scores = await self._vector_search(
                 query_emb,  # type: ignore[arg-type]
-                k=candidate_k,
+                candidate_k,
             )
 
             for hash_value, score in zip(para_ids, para_scores):
@@ -927,9 +1023,9 @@ class DualPathRetriever:
             # 1. 检索向量 (混合了段落和实体，所以扩大检索范围以召回足够多实体)
             multiplier = max(1, temporal.candidate_multiplier) if temporal else 1
             candidate_k = self._cap_temporal_scan_k(top_k * 3 * multiplier, temporal)
-            ids, scores = self.vector_store.search(
+            ids, scores = await self._vector_search(
                 query_emb,  # type: ignore[arg-type]
-                k=candidate_k,
+                candidate_k,
             )
 
             seen_relations = set()
@@ -1220,11 +1316,14 @@ class DualPathRetriever:
             (段落结果, 关系结果)
         """
         try:
+            candidate_k = self._mixed_candidate_k(temporal, relation_top_k)
+            vector_hits = await self._vector_search(query_emb, candidate_k)
             return await asyncio.to_thread(
                 self._collect_mixed_candidates,
                 query_emb,
                 temporal,
                 relation_top_k,
+                vector_hits,
             )
         except Exception as e:
             logger.error(f"并行检索失败: {e}")
@@ -1251,6 +1350,15 @@ class DualPathRetriever:
             relation_top_k,
         )
 
+    def _mixed_candidate_k(
+        self,
+        temporal: Optional[TemporalQueryOptions],
+        relation_top_k: Optional[int],
+    ) -> int:
+        rel_top_k = relation_top_k if relation_top_k is not None else self.config.top_k_relations
+        candidate_k = self._mixed_candidate_budget(self.config.top_k_paragraphs, rel_top_k, temporal)
+        return self._cap_temporal_scan_k(candidate_k, temporal)
+
     def _mixed_candidate_budget(
         self,
         para_top_k: int,
@@ -1285,12 +1393,14 @@ class DualPathRetriever:
         query_emb: np.ndarray,
         temporal: Optional[TemporalQueryOptions] = None,
         relation_top_k: Optional[int] = None,
+        vector_hits: Optional[Tuple[List[str], List[float]]] = None,
     ) -> Tuple[List[RetrievalResult], List[RetrievalResult]]:
         para_top_k = self.config.top_k_paragraphs
         rel_top_k = relation_top_k if relation_top_k is not None else self.config.top_k_relations
-        candidate_k = self._mixed_candidate_budget(para_top_k, rel_top_k, temporal)
-        candidate_k = self._cap_temporal_scan_k(candidate_k, temporal)
-        ids, scores = self.vector_store.search(query_emb, k=candidate_k)
+        if vector_hits is None:
+            candidate_k = self._mixed_candidate_k(temporal, relation_top_k)
+            vector_hits = self.vector_store.search(query_emb, k=candidate_k)
+        ids, scores = vector_hits
 
         para_candidates: List[RetrievalResult] = []
         rel_candidates: List[RetrievalResult] = []
@@ -1352,8 +1462,9 @@ class DualPathRetriever:
 
         # 双重方案里，向量主干优先解决“召回不够”，因此主检索走共享候选池，
         # 但再补一层按类型回填，避免 paragraph / relation 任一侧被饿死。
-        para_backfill = self._search_paragraphs(query_emb, para_top_k, temporal)
-        rel_backfill = self._search_relations(query_emb, rel_top_k, temporal)
+        # 回填所需的 top-k 是共享候选池的前缀，直接复用同一次向量检索结果。
+        para_backfill = self._search_paragraphs(query_emb, para_top_k, temporal, vector_hits=vector_hits)
+        rel_backfill = self._search_relations(query_emb, rel_top_k, temporal, vector_hits=vector_hits)
         para_results = self._merge_backfilled_results(
             primary_results=para_results,
             backfill_results=para_backfill,
@@ -1371,6 +1482,7 @@ class DualPathRetriever:
         query_emb: np.ndarray,
         top_k: int,
         temporal: Optional[TemporalQueryOptions] = None,
+        vector_hits: Optional[Tuple[List[str], List[float]]] = None,
     ) -> List[RetrievalResult]:
         """
         搜索段落
@@ -1378,13 +1490,17 @@ class DualPathRetriever:
         Args:
             query_emb: 查询嵌入
             top_k: 返回数量
+            vector_hits: 已有的同查询向量检索结果（按分数降序），提供时直接截取前缀
 
         Returns:
             段落结果列表
         """
         multiplier = max(1, temporal.candidate_multiplier) if temporal else 1
         candidate_k = self._cap_temporal_scan_k(top_k * multiplier, temporal)
-        para_ids, para_scores = self.vector_store.search(query_emb, k=candidate_k)
+        if vector_hits is not None:
+            para_ids, para_scores = vector_hits[0][:candidate_k], vector_hits[1][:candidate_k]
+        else:
+            para_ids, para_scores = self.vector_store.search(query_emb, k=candidate_k)
 
         results = []
         for hash_value, score in zip(para_ids, para_scores):
@@ -1415,6 +1531,7 @@ class DualPathRetriever:
         query_emb: np.ndarray,
         top_k: int,
         temporal: Optional[TemporalQueryOptions] = None,
+        vector_hits: Optional[Tuple[List[str], List[float]]] = None,
     ) -> List[RetrievalResult]:
         """
         搜索关系
@@ -1422,13 +1539,17 @@ class DualPathRetriever:
         Args:
             query_emb: 查询嵌入
             top_k: 返回数量
+            vector_hits: 已有的同查询向量检索结果（按分数降序），提供时直接截取前缀
 
         Returns:
             关系结果列表
         """
         multiplier = max(1, temporal.candidate_multiplier) if temporal else 1
         candidate_k = self._cap_temporal_scan_k(top_k * multiplier, temporal)
-        rel_ids, rel_scores = self.vector_store.search(query_emb, k=candidate_k)
+        if vector_hits is not None:
+            rel_ids, rel_scores = vector_hits[0][:candidate_k], vector_hits[1][:candidate_k]
+        else:
+            rel_ids, rel_scores = self.vector_store.search(query_emb, k=candidate_k)
 
         results = []
         for hash_value, score in zip(rel_ids, rel_scores):
@@ -1669,12 +1790,14 @@ class DualPathRetriever:
             return results
 
         # 计算PPR分数 (放入线程池运行，避免阻塞主循环)
+        # push 模式只做种子附近的局部推送，代价与图规模无关
         ppr_timeout_s = max(0.1, float(getattr(self.config, "ppr_timeout_seconds", 1.5) or 1.5))
+        ppr_fn = self._ppr.compute_local if self.config.ppr_method == "push" else self._ppr.compute
         try:
             async with self._ppr_semaphore:
                 ppr_scores = await asyncio.wait_for(
                     asyncio.to_thread(
-                        self._ppr.compute,
+                        ppr_fn,
                         personalization=entities,
                         normalize=True,
                     ),
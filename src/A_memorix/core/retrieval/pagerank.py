@@ -26,6 +26,7 @@ class PageRankConfig:
         tol: 收敛阈值
         normalize: 是否归一化结果
         min_iterations: 最小迭代次数
+        push_epsilon: 局部推送近似的残差阈值
     """
 
     alpha: float = 0.85
@@ -33,6 +34,7 @@ class PageRankConfig:
     tol: float = 1e-6
     normalize: bool = True
     min_iterations: int = 20
+    push_epsilon: float = 1e-4
 
     def __post_init__(self):
         """验证配置"""
@@ -51,6 +53,9 @@ class PageRankConfig:
         if self.min_iterations >= self.max_iter:
             raise ValueError(f"min_iterations必须小于max_iter")
 
+        if self.push_epsilon <= 0:
+            raise ValueError(f"push_epsilon必须大于0: {self.push_epsilon}")
+
 
 class PersonalizedPageRank:
     """
@@ -132,9 +137,7 @@ class PersonalizedPageRank:
 
         # 归一化（如果需要）
         if normalize and scores:
-            total = sum(scores.values())
-            if total > 0:
-                scores = {node: score / total for node, score in scores.items()}
+            scores = self._normalize(scores)
 
         # 更新统计
         self._total_computations += 1
@@ -152,7 +155,7 @@ class PersonalizedPageRank:
         normalize: bool = True,
     ) -> List[Dict[str, float]]:
         """
-        批量计算PPR
+        批量计算PPR（一次幂迭代同时推进全部个性化向量）
 
         Args:
             personalization_list: 个性化向量列表
@@ -161,15 +164,58 @@ class PersonalizedPageRank:
         Returns:
             PageRank值字典列表
         """
-        results = []
-
-        for i, personalization in enumerate(personalization_list):
-            logger.debug(f"计算第 {i+1}/{len(personalization_list)} 个PPR")
-            scores = self.compute(personalization=personalization, normalize=normalize)
-            results.append(scores)
+        results = self.graph_store.compute_pagerank_batch(
+            personalization_list,
+            alpha=self.config.alpha,
+            max_iter=self.config.max_iter,
+            tol=self.config.tol,
+        )
+        if normalize:
+            results = [self._normalize(scores) for scores in results]
 
+        self._total_computations += len(results)
+        logger.debug(f"批量PPR计算完成: batch={len(results)}")
         return results
 
+    def compute_local(
+        self,
+        personalization: Dict[str, float],
+        epsilon: Optional[float] = None,
+        normalize: Optional[bool] = None,
+    ) -> Dict[str, float]:
+        """
+        局部推送近似PPR：仅有种子节点时使用，只触达种子附近的节点
+
+        Args:
+            personalization: 种子向量 {节点名: 权重}
+            epsilon: 推送阈值（覆盖配置值）
+            normalize: 是否归一化（覆盖配置值）
+
+        Returns:
+            触达节点的PageRank值字典 {节点名: 分数}
+        """
+        epsilon = epsilon if epsilon is not None else self.config.push_epsilon
+        normalize = normalize if normalize is not None else self.config.normalize
+
+        scores = self.graph_store.compute_ppr_push(
+            personalization,
+            alpha=self.config.alpha,
+            epsilon=epsilon,
+        )
+        if normalize:
+            scores = self._normalize(scores)
+
+        self._total_computations += 1
+        logger.debug(f"局部PPR计算完成: {len(scores)} 个节点, seeds={len(personalization or {})}")
+        return scores
+
+    @staticmethod
+    def _normalize(scores: Dict[str, float]) -> Dict[str, float]:
+        total = sum(scores.values())
+        if total > 0:
+            return {node: score / total for node, score in scores.items()}
+        return scores
+
     def compute_for_entities(
         self,
         entities: List[str],
@@ -9,7 +9,7 @@ from typing import Any, Callable, Coroutine, cast
 from src.common.logger import get_logger
 
 from ...paths import default_data_dir, resolve_repo_path
-from ..embedding import create_embedding_api_adapter
+from ..embedding import create_embedding_api_adapter, create_embedding_cache
 from ..retrieval import SparseBM25Config, SparseBM25Index
 from ..storage import (
     GraphStore,
@@ -150,12 +150,19 @@ async def initialize_storage_async(plugin: Any) -> None:
     logger.info(f"A_Memorix 数据存储路径: {data_dir}")
     data_dir.mkdir(parents=True, exist_ok=True)
 
+    embedding_cache = None
+    if plugin.get_config("embedding.enable_cache", False):
+        cache_cfg = plugin.get_config("embedding.cache", {}) or {}
+        embedding_cache = create_embedding_cache(data_dir, cache_cfg)
+        await asyncio.to_thread(embedding_cache.warmup, int(cache_cfg.get("warmup_entries", 5000) or 0))
+
     plugin.embedding_manager = create_embedding_api_adapter(
         batch_size=plugin.get_config("embedding.batch_size", 32),
         max_concurrent=plugin.get_config("embedding.max_concurrent", 5),
         default_dimension=plugin.get_config("embedding.dimension", 1024),
         model_name=plugin.get_config("embedding.model_name", "auto"),
         retry_config=plugin.get_config("embedding.retry", {}),
+        cache=embedding_cache,
     )
     logger.info("嵌入 API 适配器初始化完成")
 
@@ -177,6 +184,14 @@ async def initialize_storage_async(plugin: Any) -> None:
         data_dir=data_dir / "vectors",
     )
     plugin.vector_store.min_train_threshold = plugin.get_config("embedding.min_train_threshold", 40)
+    plugin.vector_store.configure_ann(
+        index_type=plugin.get_config("embedding.ann.index_type", "ivf_sq8"),
+        min_vectors=plugin.get_config("embedding.ann.min_vectors", 200000),
+        nlist=plugin.get_config("embedding.ann.nlist", 0),
+        nprobe=plugin.get_config("embedding.ann.nprobe", 32),
+        hnsw_m=plugin.get_config("embedding.ann.hnsw_m", 32),
+        hnsw_ef_search=plugin.get_config("embedding.ann.hnsw_ef_search", 64),
+    )
     logger.info(
         "向量存储初始化完成（"
         f"维度: {detected_dimension}, "
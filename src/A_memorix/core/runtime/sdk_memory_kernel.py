@@ -18,7 +18,7 @@ from src.services import message_service as message_api
 from src.services.llm_service import LLMServiceClient
 
 from ...paths import default_data_dir, resolve_repo_path
-from ..embedding import create_embedding_api_adapter
+from ..embedding import create_embedding_api_adapter, create_embedding_cache
 from ..retrieval import RetrievalResult, SparseBM25Config, SparseBM25Index, TemporalQueryOptions
 from ..storage import GraphStore, MetadataStore, QuantizationType, SparseMatrixFormat, VectorStore
 from ..utils.aggregate_query_service import AggregateQueryService
@@ -144,6 +144,9 @@ class _KernelRuntimeFacade:
     ) -> None:
         self._kernel._enqueue_paragraph_vector_backfill(paragraph_hash, error=error)
 
+    async def ingest_batch(self, items: Sequence[Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        return await self._kernel.ingest_batch(items, **kwargs)
+
 
 class SDKMemoryKernel:
     def __init__(self, *, plugin_root: Path, config: Optional[Dict[str, Any]] = None) -> None:
@@ -156,6 +159,7 @@ class SDKMemoryKernel:
         self.relation_vectors_enabled = bool(self._cfg("retrieval.relation_vectorization.enabled", False))
 
         self.embedding_manager = None
+        self._embedding_cache = None
         self.vector_store: Optional[VectorStore] = None
         self.graph_store: Optional[GraphStore] = None
         self.metadata_store: Optional[MetadataStore] = None
@@ -626,13 +630,20 @@ class SDKMemoryKernel:
             return
 
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        embedding_cache = None
+        if bool(self._cfg("embedding.enable_cache", False)):
+            cache_cfg = self._cfg("embedding.cache", {}) or {}
+            embedding_cache = create_embedding_cache(self.data_dir, cache_cfg)
+            await asyncio.to_thread(embedding_cache.warmup, int(cache_cfg.get("warmup_entries", 5000) or 0))
+        self._embedding_cache = embedding_cache
         self.embedding_manager = create_embedding_api_adapter(
             batch_size=int(self._cfg("embedding.batch_size", 32)),
             max_concurrent=int(self._cfg("embedding.max_concurrent", 5)),
             default_dimension=self.embedding_dimension,
-            enable_cache=bool(self._cfg("embedding.enable_cache", False)),
+            enable_cache=embedding_cache is not None,
             model_name=str(self._cfg("embedding.model_name", "auto") or "auto"),
             retry_config=self._cfg("embedding.retry", {}) or {},
+            cache=embedding_cache,
         )
         detected_dimension = int(await self.embedding_manager._detect_dimension())
         self.embedding_dimension = detected_dimension
@@ -654,6 +665,7 @@ class SDKMemoryKernel:
             quantization_type=QuantizationType.INT8,
             data_dir=self.data_dir / "vectors",
         )
+        self.vector_store.configure_ann(**self._vector_ann_config())
         self.graph_store = GraphStore(matrix_format=graph_format, data_dir=self.data_dir / "graph")
         self.metadata_store = MetadataStore(data_dir=self.data_dir / "metadata")
         self.metadata_store.connect()
@@ -663,6 +675,10 @@ class SDKMemoryKernel:
             self.vector_store.warmup_index(force_train=True)
         if self.graph_store.has_data():
             self.graph_store.load()
+        if self._journal_enabled():
+            fsync_interval = self._journal_fsync_interval()
+            self.vector_store.enable_journal(fsync_interval=fsync_interval)
+            self.graph_store.enable_journal(fsync_interval=fsync_interval)
 
         sparse_cfg_raw = self._cfg("retrieval.sparse", {}) or {}
         try:
@@ -757,10 +773,14 @@ class SDKMemoryKernel:
 
     def close(self) -> None:
         try:
-            self._persist()
+            self._snapshot()
         finally:
             if self.metadata_store is not None:
                 self.metadata_store.close()
+            if self._embedding_cache is not None:
+                # 释放共享缓存的引用；仅最后一个持有者真正关闭连接
+                self._embedding_cache.close()
+                self._embedding_cache = None
             self._initialized = False
             self._request_dedup_tasks.clear()
             self._runtime_facade._runtime_self_check_report = {}
@@ -1010,6 +1030,261 @@ class SDKMemoryKernel:
             payload["detail"] = "vector_degraded_write"
         return payload
 
+    async def ingest_batch(
+        self,
+        items: Sequence[Dict[str, Any]],
+        *,
+        respect_filter: bool = True,
+        user_id: str = "",
+        group_id: str = "",
+        embed_entities: bool = False,
+        write_relation_vectors: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        批量写入：语义与逐条 ingest_text 一致，但段落/关系/实体文本合并为一次 encode，
+        SQLite 行在单个事务内写入，向量一次 VectorStore.add，最后只持久化一次。
+
+        episode 生成与人物画像刷新交给 episode_pending / person_profile_refresh 后台循环，
+        不在写入路径内联执行。
+
+        items 的键与 ingest_text 参数一致，另支持 source / knowledge_type / time_meta 覆盖默认推导，
+        以及 enqueue_episode（默认 True）。实体会同时写入图节点；embed_entities 时额外写实体向量。
+        """
+        await self.initialize()
+        assert self.metadata_store is not None
+        assert self.vector_store is not None
+        assert self.graph_store is not None
+        assert self.embedding_manager is not None
+
+        write_relation_vectors = (
+            self.relation_vectors_enabled if write_relation_vectors is None else bool(write_relation_vectors)
+        )
+        results: List[Dict[str, Any]] = []
+        prepared: List[Dict[str, Any]] = []
+        seen_tokens: set[str] = set()
+        for raw in items or []:
+            row = dict(raw or {})
+            content = normalize_text(str(row.get("text", "") or ""))
+            source_type = str(row.get("source_type", "") or "").strip()
+            chat_id = str(row.get("chat_id", "") or "").strip()
+            external_token = str(row.get("external_id", "") or "").strip() or compute_hash(f"{source_type}:{chat_id}:{content}")
+            result: Dict[str, Any] = {"external_id": external_token, "stored_ids": [], "skipped_ids": []}
+            results.append(result)
+            if self._is_chat_filtered(
+                respect_filter=respect_filter,
+                stream_id=chat_id,
+                group_id=str(row.get("group_id", group_id) or ""),
+                user_id=str(row.get("user_id", user_id) or ""),
+            ):
+                result.update({"skipped_ids": [external_token], "detail": "chat_filtered"})
+                continue
+            if not content:
+                result.update({"skipped_ids": [external_token], "reason": "empty_text"})
+                continue
+            if external_token in seen_tokens:
+                result.update({"skipped_ids": [external_token], "reason": "duplicate_in_batch"})
+                continue
+            existing_ref = self.metadata_store.get_external_memory_ref(external_token)
+            if existing_ref:
+                result.update({"skipped_ids": [str(existing_ref.get("paragraph_hash", "") or "")], "reason": "exists"})
+                continue
+            seen_tokens.add(external_token)
+
+            person_tokens = self._tokens(row.get("person_ids"))
+            participant_tokens = self._tokens(row.get("participants"))
+            paragraph_meta = dict(row.get("metadata") or {})
+            paragraph_meta.update(
+                {
+                    "external_id": external_token,
+                    "source_type": source_type,
+                    "chat_id": chat_id,
+                    "person_ids": person_tokens,
+                    "participants": participant_tokens,
+                    "tags": self._tokens(row.get("tags")),
+                }
+            )
+            relations: List[Dict[str, Any]] = []
+            for rel in [dict(item) for item in (row.get("relations") or []) if isinstance(item, dict)]:
+                subject = str(rel.get("subject", "") or "").strip()
+                predicate = str(rel.get("predicate", "") or "").strip()
+                obj = str(rel.get("object", "") or "").strip()
+                if not (subject and predicate and obj):
+                    continue
+                relations.append(
+                    {
+                        "hash": self.metadata_store.compute_relation_hash(subject, predicate, obj),
+                        "subject": subject,
+                        "predicate": predicate,
+                        "object": obj,
+                        "confidence": float(rel.get("confidence", 1.0) or 1.0),
+                        "metadata": rel.get("metadata") if isinstance(rel.get("metadata"), dict) else {"external_id": external_token, "source_type": source_type},
+                    }
+                )
+            time_meta = row.get("time_meta")
+            prepared.append(
+                {
+                    "result": result,
+                    "external_id": external_token,
+                    "source_type": source_type,
+                    "chat_id": chat_id,
+                    "content": content,
+                    "paragraph_hash": compute_hash(normalize_text(content)),
+                    "source": str(row.get("source", "") or "").strip() or self._build_source(source_type, chat_id, person_tokens),
+                    "knowledge_type": str(row.get("knowledge_type", "") or "").strip() or self._resolve_knowledge_type(source_type),
+                    "time_meta": dict(time_meta) if isinstance(time_meta, dict) else self._time_meta(row.get("timestamp"), row.get("time_start"), row.get("time_end")),
+                    "metadata": paragraph_meta,
+                    "person_ids": person_tokens,
+                    "entities": self._merge_tokens(row.get("entities"), person_tokens, participant_tokens),
+                    "relations": relations,
+                    "enqueue_episode": bool(row.get("enqueue_episode", True)),
+                }
+            )
+
+        if not prepared:
+            return self._ingest_batch_payload(results)
+
+        # 1) 收集待编码文本（已存在于向量库或批内重复的跳过），合并为一次 encode
+        embed_ids: List[str] = []
+        embed_texts: List[str] = []
+        paragraph_ids: set[str] = set()
+        relation_ids: set[str] = set()
+        queued: set[str] = set()
+
+        def _queue(token: str, text: str) -> bool:
+            if token in queued or token in self.vector_store:
+                return False
+            queued.add(token)
+            embed_ids.append(token)
+            embed_texts.append(text)
+            return True
+
+        entity_names: Dict[str, str] = {}
+        for entry in prepared:
+            if _queue(entry["paragraph_hash"], entry["content"]):
+                paragraph_ids.add(entry["paragraph_hash"])
+            for rel in entry["relations"]:
+                if write_relation_vectors and _queue(
+                    rel["hash"],
+                    RelationWriteService.build_relation_vector_text(rel["subject"], rel["predicate"], rel["object"]),
+                ):
+                    relation_ids.add(rel["hash"])
+            for name in entry["entities"]:
+                entity_names.setdefault(self.metadata_store.compute_entity_hash(name), name)
+        if embed_entities:
+            for entity_hash, name in entity_names.items():
+                _queue(entity_hash, name)
+
+        allow_metadata_only = self._allow_metadata_only_write()
+        embedding = None
+        embed_error = ""
+        if embed_ids:
+            if self._is_embedding_degraded():
+                embed_error = "embedding_degraded"
+            else:
+                try:
+                    embedding = await self.embedding_manager.encode(embed_texts)
+                    if getattr(embedding, "ndim", 1) == 1:
+                        embedding = embedding.reshape(1, -1)
+                except Exception as exc:
+                    embed_error = str(exc)
+                    if self._embedding_fallback_enabled():
+                        self._set_embedding_degraded(active=True, reason=embed_error[:500], checked_at=time.time())
+            if embed_error and paragraph_ids and not allow_metadata_only:
+                raise RuntimeError(f"批量 embedding 失败，metadata-only 写入已禁用: {embed_error}")
+
+        # 2) 单事务写入全部 SQLite 行；向量写入前关系先置为 pending，崩溃后可由回填修复
+        with self.metadata_store.batch_transaction():
+            for entry in prepared:
+                paragraph_hash = self.metadata_store.add_paragraph(
+                    content=entry["content"],
+                    source=entry["source"],
+                    metadata=entry["metadata"],
+                    knowledge_type=entry["knowledge_type"],
+                    time_meta=entry["time_meta"],
+                )
+                for name in entry["entities"]:
+                    self.metadata_store.add_entity(name=name, source_paragraph=paragraph_hash)
+                for rel in entry["relations"]:
+                    self.metadata_store.add_relation(
+                        subject=rel["subject"],
+                        predicate=rel["predicate"],
+                        obj=rel["object"],
+                        confidence=rel["confidence"],
+                        source_paragraph=paragraph_hash,
+                        metadata=rel["metadata"],
+                    )
+                    if not write_relation_vectors:
+                        self.metadata_store.set_relation_vector_state(rel["hash"], "none")
+                    elif rel["hash"] in relation_ids:
+                        self.metadata_store.set_relation_vector_state(rel["hash"], "pending")
+                    else:
+                        self.metadata_store.set_relation_vector_state(rel["hash"], "ready")
+                self.metadata_store.upsert_external_memory_ref(
+                    external_id=entry["external_id"],
+                    paragraph_hash=paragraph_hash,
+                    source_type=entry["source_type"],
+                    metadata={"chat_id": entry["chat_id"], "person_ids": entry["person_ids"]},
+                )
+                if entry["enqueue_episode"]:
+                    self.metadata_store.enqueue_episode_pending(paragraph_hash, source=entry["source"])
+                entry["result"]["stored_ids"] = [paragraph_hash, *[rel["hash"] for rel in entry["relations"]]]
+
+        # 3) 图：实体节点与关系边各一次调用
+        if entity_names:
+            self.graph_store.add_nodes(list(entity_names.values()))
+        edges = [(rel["subject"], rel["object"]) for entry in prepared for rel in entry["relations"]]
+        if edges:
+            self.graph_store.add_edges(
+                edges,
+                relation_hashes=[rel["hash"] for entry in prepared for rel in entry["relations"]],
+            )
+
+        # 4) 向量一次追加；失败时段落转入回填队列，关系标记 failed
+        if embedding is not None and not embed_error:
+            try:
+                self.vector_store.add(vectors=embedding, ids=embed_ids)
+            except Exception as exc:
+                embed_error = str(exc)
+        with self.metadata_store.batch_transaction():
+            for rel_hash in relation_ids:
+                if embed_error:
+                    self.metadata_store.set_relation_vector_state(
+                        rel_hash,
+                        "failed",
+                        error=embed_error[: RelationWriteService.ERROR_MAX_LEN],
+                        bump_retry=True,
+                    )
+                else:
+                    self.metadata_store.set_relation_vector_state(rel_hash, "ready")
+            if embed_error:
+                for paragraph_hash in paragraph_ids:
+                    self._enqueue_paragraph_vector_backfill(paragraph_hash, error=embed_error)
+        if embed_error:
+            logger.warning(f"批量写入向量降级: items={len(prepared)} vectors={len(embed_ids)} error={embed_error[:200]}")
+            for entry in prepared:
+                if entry["paragraph_hash"] in paragraph_ids:
+                    entry["result"]["warnings"] = ["vector_degraded_write"]
+                    entry["result"]["detail"] = "vector_degraded_write"
+
+        self._persist()
+        for entry in prepared:
+            for person_id in entry["person_ids"]:
+                self._mark_person_active(person_id)
+        return self._ingest_batch_payload(results)
+
+    @staticmethod
+    def _ingest_batch_payload(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        stored_ids = [item for result in results for item in result.get("stored_ids", [])]
+        skipped_ids = [item for result in results for item in result.get("skipped_ids", [])]
+        return {
+            "success": True,
+            "stored_ids": stored_ids,
+            "skipped_ids": skipped_ids,
+            "stored_count": sum(1 for result in results if result.get("stored_ids")),
+            "skipped_count": sum(1 for result in results if not result.get("stored_ids")),
+            "items": results,
+        }
+
     async def process_episode_pending_batch(self, *, limit: int = 20, max_retry: int = 3) -> Dict[str, Any]:
         await self.initialize()
         assert self.metadata_store is not None
@@ -2139,13 +2414,77 @@ class SDKMemoryKernel:
         hits = self._filter_episode_hits([self._episode_hit(row) for row in rows])
         return {"success": True, "results": hits, "count": len(hits), "query_type": "episode"}
 
+    def _vector_ann_config(self) -> Dict[str, Any]:
+        return {
+            "index_type": str(self._cfg("embedding.ann.index_type", "ivf_sq8") or "ivf_sq8"),
+            "min_vectors": int(self._cfg("embedding.ann.min_vectors", 200000) or 200000),
+            "nlist": int(self._cfg("embedding.ann.nlist", 0) or 0),
+            "nprobe": int(self._cfg("embedding.ann.nprobe", 32) or 32),
+            "hnsw_m": int(self._cfg("embedding.ann.hnsw_m", 32) or 32),
+            "hnsw_ef_search": int(self._cfg("embedding.ann.hnsw_ef_search", 64) or 64),
+        }
+
+    def _journal_enabled(self) -> bool:
+        return bool(self._cfg("advanced.journal.enabled", True))
+
+    def _journal_fsync_interval(self) -> float:
+        return max(0.0, float(self._cfg("advanced.journal.fsync_interval_ms", 1000) or 0)) / 1000.0
+
+    def _journal_compact_threshold_bytes(self) -> int:
+        return int(max(1.0, float(self._cfg("advanced.journal.compact_threshold_mb", 64) or 64)) * 1024 * 1024)
+
     def _persist(self) -> None:
+        """
+        持久化写入路径：启用增量日志时只提交向量/图日志（代价与本次变更量成正比），
+        全量快照由 auto_save 与日志超限压缩在后台完成。
+        """
+        if not self._journal_enabled():
+            self._snapshot()
+            return
+        if self.vector_store is not None:
+            self.vector_store.commit_journal()
+        if self.graph_store is not None:
+            self.graph_store.commit_journal()
+        journal_bytes = (
+            (self.vector_store.journal_size_bytes if self.vector_store is not None else 0)
+            + (self.graph_store.journal_size_bytes if self.graph_store is not None else 0)
+        )
+        if journal_bytes >= self._journal_compact_threshold_bytes():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                self._snapshot()
+            else:
+                self._ensure_background_task("journal_compaction", self._snapshot_async)
+
+    def _snapshot(self) -> None:
+        """全量快照：重写向量/图元数据并截断增量日志。"""
         if self.vector_store is not None:
             self.vector_store.save()
         if self.graph_store is not None:
             self.graph_store.save()
         if self.sparse_index is not None and getattr(self.sparse_index.config, "enabled", False):
             self.sparse_index.ensure_loaded()
+        self._flush_embedding_cache()
+
+    async def _snapshot_async(self) -> None:
+        # 向量存储只在采集阶段持锁、锁外落盘，可在线程中执行；图存储无锁，保持在事件循环内保存
+        if self.vector_store is not None:
+            await asyncio.to_thread(self.vector_store.save)
+        if self.graph_store is not None:
+            self.graph_store.save()
+        if self.sparse_index is not None and getattr(self.sparse_index.config, "enabled", False):
+            self.sparse_index.ensure_loaded()
+        await asyncio.to_thread(self._flush_embedding_cache)
+
+    def _flush_embedding_cache(self) -> None:
+        cache = getattr(self.embedding_manager, "cache", None)
+        if cache is None:
+            return
+        try:
+            cache.flush()
+        except Exception as exc:
+            logger.warning(f"嵌入缓存回写失败: {exc}")
 
     async def _start_background_tasks(self) -> None:
         async with self._background_lock:
@@ -2192,7 +2531,7 @@ class SDKMemoryKernel:
                 if self._background_stopping:
                     break
                 if bool(self._cfg("advanced.enable_auto_save", True)):
-                    self._persist()
+                    await self._snapshot_async()
         except asyncio.CancelledError:
             raise
         except Exception as exc:
@@ -3928,6 +4267,8 @@ class SDKMemoryKernel:
 
         await self._process_freeze_and_prune()
         await self._orphan_gc_phase()
+        if self.vector_store is not None:
+            await asyncio.to_thread(self.vector_store.maybe_promote_index)
         self._last_maintenance_at = time.time()
         self._persist()
 
@@ -192,7 +192,17 @@ def build_search_runtime(
             ppr_concurrency_limit=_get_config_value(
                 plugin_config, "retrieval.ppr_concurrency_limit", 4
             ),
+            ppr_method=_get_config_value(plugin_config, "retrieval.ppr_method", "power"),
+            ppr_push_epsilon=_get_config_value(
+                plugin_config, "retrieval.ppr_push_epsilon", 1e-4
+            ),
             enable_parallel=_get_config_value(plugin_config, "retrieval.enable_parallel", True),
+            vector_batch_window_ms=_get_config_value(
+                plugin_config, "retrieval.vector_batch_window_ms", 2.0
+            ),
+            vector_batch_max_size=_get_config_value(
+                plugin_config, "retrieval.vector_batch_max_size", 32
+            ),
             retrieval_strategy=RetrievalStrategy.DUAL_PATH,
             debug=_resolve_debug_enabled(plugin_config),
             sparse=sparse_cfg,
@@ -0,0 +1,248 @@
+"""
+图存储列式快照
+
+替代 graph_metadata.pkl + graph_adjacency.npz 的版本化快照目录 `graph_snapshot/`：
+
+- nodes / canonical: 字符串表（UTF-8 文本 + 字符偏移数组），加载时不再逐节点规范化
+- adj_indptr / adj_indices / adj_data: 邻接矩阵的 CSR（或 CSC）数组
+- edge_src / edge_dst / edge_hash_id + relation_hashes 字符串表: 扁平化的 edge_hash_map
+- node_attrs.pkl: 仅保存非空节点属性
+- manifest.json: 版本号、形状、统计信息与日志序号，最后写入
+
+数组均为 .npy，加载时以 copy-on-write mmap 打开；写入先落到临时目录再整体替换。
+替换前调用方须释放指向旧快照的映射（见 is_memory_mapped），否则 Windows 下目录无法替换。
+"""
+
+import json
+import mmap
+import os
+import pickle
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from src.common.logger import get_logger
+
+try:
+    from scipy.sparse import csc_matrix, csr_matrix
+except ImportError:  # pragma: no cover - GraphStore 本身要求 SciPy
+    csr_matrix = csc_matrix = None
+
+logger = get_logger("A_Memorix.GraphSnapshot")
+
+GRAPH_SNAPSHOT_DIRNAME = "graph_snapshot"
+GRAPH_SNAPSHOT_VERSION = 1
+_MANIFEST = "manifest.json"
+
+
+@dataclass
+class GraphSnapshot:
+    """已打开的列式快照（数组为 mmap 视图）"""
+
+    manifest: Dict[str, Any]
+    nodes: List[str]
+    canonical: List[str]
+    node_attrs: Dict[str, Dict[str, Any]]
+    adjacency: Optional[Any]
+    edge_hash_columns: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]]
+    mtime_ns: int = 0
+    path: Optional[Path] = field(default=None)
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    with open(path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _load_array(path: Path) -> np.ndarray:
+    # copy-on-write：按需分页读取，原地修改（如冻结边）只影响进程私有页
+    return np.asarray(np.load(path, mmap_mode="c", allow_pickle=False))
+
+
+def is_memory_mapped(array: Any) -> bool:
+    """数组的 base 链上是否仍有文件映射（np.memmap 的复制结果不再持有映射）。"""
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def _remove_tree(path: Path) -> None:
+    """删除目录；失败时记录告警而不是静默吞掉（残留目录会在下次写入前再次尝试清理）。"""
+    if not path.exists():
+        return
+    try:
+        shutil.rmtree(path)
+    except OSError as exc:
+        logger.warning(f"删除图快照目录失败: {path} ({exc})")
+
+
+def _write_string_table(directory: Path, stem: str, strings: List[str]) -> None:
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, strings), dtype=np.int64, count=len(strings)), out=offsets[1:])
+    with open(directory / f"{stem}.txt", "wb") as f:
+        f.write("".join(strings).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+    _save_array(directory / f"{stem}_offsets.npy", offsets)
+
+
+def _read_string_table(directory: Path, stem: str) -> List[str]:
+    text = (directory / f"{stem}.txt").read_bytes().decode("utf-8")
+    offsets = np.load(directory / f"{stem}_offsets.npy", allow_pickle=False).tolist()
+    return [text[start:end] for start, end in zip(offsets, offsets[1:], strict=False)]
+
+
+def resolve_graph_snapshot_dir(data_dir: Union[str, Path]) -> Optional[Path]:
+    """返回可用的快照目录；替换过程中断时回退到 .old 目录。"""
+    data_dir = Path(data_dir)
+    for candidate in (data_dir / GRAPH_SNAPSHOT_DIRNAME, data_dir / f"{GRAPH_SNAPSHOT_DIRNAME}.old"):
+        if (candidate / _MANIFEST).exists():
+            return candidate
+    return None
+
+
+def read_graph_snapshot_manifest(data_dir: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """只读取 manifest（用于体检/迁移脚本，无需加载整张图）。"""
+    snapshot_dir = resolve_graph_snapshot_dir(data_dir)
+    if snapshot_dir is None:
+        return None
+    return json.loads((snapshot_dir / _MANIFEST).read_text(encoding="utf-8"))
+
+
+def write_graph_snapshot(
+    data_dir: Union[str, Path],
+    *,
+    nodes: List[str],
+    canonical: List[str],
+    node_attrs: Dict[str, Dict[str, Any]],
+    adjacency: Optional[Any],
+    matrix_format: str,
+    edge_hash_map: Dict[Tuple[int, int], Set[str]],
+    stats: Dict[str, int],
+    journal_seq: int,
+) -> Path:
+    """
+    写入列式快照并原子替换旧快照目录，返回快照目录。
+
+    调用方须先释放对旧快照数组的 mmap 引用，替换与清理失败会直接抛出或记录告警。
+    """
+    data_dir = Path(data_dir)
+    target = data_dir / GRAPH_SNAPSHOT_DIRNAME
+    tmp_dir = data_dir / f"{GRAPH_SNAPSHOT_DIRNAME}.tmp"
+    old_dir = data_dir / f"{GRAPH_SNAPSHOT_DIRNAME}.old"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    _write_string_table(tmp_dir, "nodes", nodes)
+    _write_string_table(tmp_dir, "canonical", canonical)
+
+    shape: Optional[List[int]] = None
+    if adjacency is not None:
+        matrix = adjacency.asformat("csc" if matrix_format == "csc" else "csr")
+        matrix.sum_duplicates()
+        shape = [int(matrix.shape[0]), int(matrix.shape[1])]
+        _save_array(tmp_dir / "adj_indptr.npy", matrix.indptr)
+        _save_array(tmp_dir / "adj_indices.npy", matrix.indices)
+        _save_array(tmp_dir / "adj_data.npy", np.asarray(matrix.data, dtype=np.float32))
+
+    hash_ids: Dict[str, int] = {}
+    src: List[int] = []
+    dst: List[int] = []
+    ids: List[int] = []
+    for (src_idx, dst_idx), hashes in edge_hash_map.items():
+        for relation_hash in hashes:
+            src.append(src_idx)
+            dst.append(dst_idx)
+            ids.append(hash_ids.setdefault(relation_hash, len(hash_ids)))
+    _save_array(tmp_dir / "edge_src.npy", np.asarray(src, dtype=np.int32))
+    _save_array(tmp_dir / "edge_dst.npy", np.asarray(dst, dtype=np.int32))
+    _save_array(tmp_dir / "edge_hash_id.npy", np.asarray(ids, dtype=np.int32))
+    _write_string_table(tmp_dir, "relation_hashes", list(hash_ids))
+
+    non_empty_attrs = {key: value for key, value in node_attrs.items() if value}
+    if non_empty_attrs:
+        with open(tmp_dir / "node_attrs.pkl", "wb") as f:
+            pickle.dump(non_empty_attrs, f)
+
+    manifest = {
+        "format_version": GRAPH_SNAPSHOT_VERSION,
+        "num_nodes": len(nodes),
+        "shape": shape,
+        "matrix_format": matrix_format,
+        "num_edges": int(adjacency.nnz) if adjacency is not None else 0,
+        "edge_hash_pairs": len(edge_hash_map),
+        "edge_hash_entries": len(ids),
+        "journal_seq": int(journal_seq),
+        **{key: int(value) for key, value in stats.items()},
+    }
+    with open(tmp_dir / _MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+    if target.exists():
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    _remove_tree(old_dir)
+    return target
+
+
+def read_graph_snapshot(data_dir: Union[str, Path]) -> Optional[GraphSnapshot]:
+    """打开列式快照；不存在时返回 None。"""
+    snapshot_dir = resolve_graph_snapshot_dir(data_dir)
+    if snapshot_dir is None:
+        return None
+    manifest_path = snapshot_dir / _MANIFEST
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    version = int(manifest.get("format_version", 0))
+    if version > GRAPH_SNAPSHOT_VERSION:
+        raise ValueError(f"图快照版本 {version} 高于当前支持的 {GRAPH_SNAPSHOT_VERSION}，请升级 A_Memorix")
+
+    adjacency = None
+    if manifest.get("shape"):
+        matrix_cls = csc_matrix if manifest.get("matrix_format") == "csc" else csr_matrix
+        adjacency = matrix_cls(
+            (
+                _load_array(snapshot_dir / "adj_data.npy"),
+                _load_array(snapshot_dir / "adj_indices.npy"),
+                _load_array(snapshot_dir / "adj_indptr.npy"),
+            ),
+            shape=tuple(manifest["shape"]),
+            copy=False,
+        )
+
+    edge_hash_columns = None
+    if int(manifest.get("edge_hash_entries", 0)) > 0:
+        edge_hash_columns = (
+            _load_array(snapshot_dir / "edge_src.npy"),
+            _load_array(snapshot_dir / "edge_dst.npy"),
+            _load_array(snapshot_dir / "edge_hash_id.npy"),
+            _read_string_table(snapshot_dir, "relation_hashes"),
+        )
+
+    node_attrs: Dict[str, Dict[str, Any]] = {}
+    attrs_path = snapshot_dir / "node_attrs.pkl"
+    if attrs_path.exists():
+        with open(attrs_path, "rb") as f:
+            node_attrs = pickle.load(f)
+
+    return GraphSnapshot(
+        manifest=manifest,
+        nodes=_read_string_table(snapshot_dir, "nodes"),
+        canonical=_read_string_table(snapshot_dir, "canonical"),
+        node_attrs=node_attrs,
+        adjacency=adjacency,
+        edge_hash_columns=edge_hash_columns,
+        mtime_ns=manifest_path.stat().st_mtime_ns,
+        path=snapshot_dir,
+    )
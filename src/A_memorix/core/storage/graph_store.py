@@ -4,16 +4,30 @@
 基于SciPy稀疏矩阵的知识图谱存储与计算。
 """
 
+import functools
 import pickle
 from enum import Enum
 from pathlib import Path
 from typing import Optional, Union, Tuple, List, Dict, Set, Any
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Iterator
 import threading
 import asyncio
+import time
 
 import numpy as np
 
+from .journal import AppendOnlyJournal
+from .graph_snapshot import (
+    GRAPH_SNAPSHOT_DIRNAME,
+    GraphSnapshot,
+    is_memory_mapped,
+    read_graph_snapshot,
+    resolve_graph_snapshot_dir,
+    write_graph_snapshot,
+)
+
+
 class SparseMatrixFormat(Enum):
     """稀疏矩阵格式"""
     CSR = "csr"
@@ -43,11 +57,35 @@ except ImportError:
 import contextlib
 from src.common.logger import get_logger
 from ..utils.hash import compute_hash
-from ..utils.io import atomic_write
 
 logger = get_logger("A_Memorix.GraphStore")
 
 
+def _journaled(method):
+    """
+    记录图变更到增量日志（仅最外层调用记录，内部嵌套的 add_nodes 等不重复记录）。
+
+    日志内容为 (args, kwargs, 是否处于增量模式)，回放时以相同模式重新调用同名方法。
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.journal_enabled or self._journal_depth > 0:
+            return method(self, *args, **kwargs)
+        # 生成器等一次性可迭代参数先物化，保证调用与日志看到同一份数据
+        args = tuple(list(arg) if isinstance(arg, Iterator) else arg for arg in args)
+        incremental = self._modification_mode == GraphModificationMode.INCREMENTAL
+        self._journal_depth += 1
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            self._journal_depth -= 1
+        self._journal.append(method.__name__, (args, kwargs, incremental))
+        return result
+
+    return wrapper
+
+
 class GraphModificationMode(Enum):
     """图修改模式"""
     BATCH = "batch"             # 批量模式 (默认, 适合一次性加载)
@@ -64,7 +102,7 @@ class GraphStore:
     - 节点和边的CRUD操作
     - Personalized PageRank计算
     - 同义词自动连接
-    - 图持久化
+    - 图持久化（全量快照 + 可选增量日志 graph_journal.log）
 
     参数：
         matrix_format: 稀疏矩阵格式（csr/csc）
@@ -113,14 +151,46 @@ class GraphStore:
         self._adjacency_T: Optional[Union[csr_matrix, csc_matrix]] = None
         self._adjacency_dirty: bool = True
         self._saliency_cache: Optional[Dict[str, float]] = None
+        # PageRank 缓存：(行归一化转移矩阵 P, 列随机矩阵 M = P^T, 悬挂节点掩码)，随 _adjacency_T 一起失效
+        self._transition_cache: Optional[Tuple[csr_matrix, csr_matrix, np.ndarray]] = None
+        # 路径搜索用的无向邻接索引 (indptr, indices, weights)：每行先出边后入边
+        self._path_index_cache: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        # 上一次全局 PageRank 结果，作为下一次幂迭代的热启动初值
+        self._pagerank_warm_start: Optional[Dict[str, float]] = None
 
         # V5: 多关系映射 (src_idx, dst_idx) -> Set[relation_hash]
-        self._edge_hash_map: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+        # 列式快照中的 (src, dst, hash_id, hash 表)，首次访问 _edge_hash_map 时才展开为 dict
+        self._edge_hash_columns: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]] = None
+        self._edge_hash_map = defaultdict(set)
         # V5: 简单的异步锁 (实际上 asyncio 环境下单线程主循环可能不需要，但为了安全保留)
         self._lock = asyncio.Lock()
 
+        # 增量日志：enable_journal() 后记录变更；load() 无论是否启用都会回放已有日志
+        self.journal_enabled = False
+        self._journal_depth = 0
+        self._journal: Optional[AppendOnlyJournal] = (
+            AppendOnlyJournal(self.data_dir / "graph_journal.log") if self.data_dir else None
+        )
+
         logger.info(f"GraphStore 初始化: format={matrix_format}")
 
+    @property
+    def _edge_hash_map(self) -> Dict[Tuple[int, int], Set[str]]:
+        """V5 边哈希映射 (src_idx, dst_idx) -> Set[relation_hash]，从快照加载后按需展开"""
+        if self._edge_hash_columns is not None:
+            src, dst, hash_ids, hash_table = self._edge_hash_columns
+            self._edge_hash_columns = None
+            edge_hash_map: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+            for key, hash_id in zip(zip(src.tolist(), dst.tolist(), strict=True), hash_ids.tolist(), strict=True):
+                edge_hash_map[key].add(hash_table[hash_id])
+            self._edge_hash_map_data = edge_hash_map
+        return self._edge_hash_map_data
+
+    @_edge_hash_map.setter
+    def _edge_hash_map(self, value: Dict[Tuple[int, int], Set[str]]) -> None:
+        self._edge_hash_columns = None
+        self._edge_hash_map_data = value
+
     def _canonicalize(self, node: str) -> str:
         """规范化节点名称 (用于去重和内部索引)"""
         if not node:
@@ -173,6 +243,7 @@ class GraphStore:
             
         self._modification_mode = new_mode
 
+    @_journaled
     def add_nodes(
         self,
         nodes: List[str],
@@ -218,6 +289,7 @@ class GraphStore:
         logger.debug(f"添加 {added} 个节点")
         return added
 
+    @_journaled
     def add_edges(
         self,
         edges: List[Tuple[str, str]],
@@ -279,7 +351,7 @@ class GraphStore:
                  
                  # V5: Update edge hash map
                  if relation_hashes:
-                     for (src, tgt), r_hash in zip(edges, relation_hashes):
+                     for (src, tgt), r_hash in zip(edges, relation_hashes, strict=False):
                          if r_hash:
                              s_idx = self._node_to_idx[self._canonicalize(src)]
                              t_idx = self._node_to_idx[self._canonicalize(tgt)]
@@ -297,7 +369,7 @@ class GraphStore:
         col_indices = []
         data_values = []
 
-        for (src, tgt), weight in zip(edges, weights):
+        for (src, tgt), weight in zip(edges, weights, strict=True):
             src_idx = self._node_to_idx[self._canonicalize(src)]
             tgt_idx = self._node_to_idx[self._canonicalize(tgt)]
 
@@ -329,7 +401,7 @@ class GraphStore:
         
         # V5: 更新边哈希映射 (Edge Hash Map)
         if relation_hashes:
-            for (src, tgt), r_hash in zip(edges, relation_hashes):
+            for (src, tgt), r_hash in zip(edges, relation_hashes, strict=False):
                 if r_hash:
                     try:
                         s_idx = self._node_to_idx[self._canonicalize(src)]
@@ -341,6 +413,7 @@ class GraphStore:
         logger.debug(f"添加 {len(edges)} 条边")
         return len(edges)
 
+    @_journaled
     def update_edge_weight(
         self,
         source: str,
@@ -389,6 +462,7 @@ class GraphStore:
         logger.debug(f"更新权重 {source}->{target}: {current_weight:.2f} -> {new_weight:.2f}")
         return new_weight
 
+    @_journaled
     def delete_nodes(self, nodes: List[str]) -> int:
         """
         删除节点（及相关的边）
@@ -475,6 +549,7 @@ class GraphStore:
         """兼容性别名：删除节点"""
         return self.delete_nodes(nodes)
 
+    @_journaled
     def delete_edges(
         self,
         edges: List[Tuple[str, str]],
@@ -511,7 +586,7 @@ class GraphStore:
             new_col = []
             new_data = []
 
-            for i, j, val in zip(adj_coo.row, adj_coo.col, adj_coo.data):
+            for i, j, val in zip(adj_coo.row, adj_coo.col, adj_coo.data, strict=True):
                 if (i, j) not in edges_to_delete:
                     new_row.append(i)
                     new_col.append(j)
@@ -587,7 +662,11 @@ class GraphStore:
             节点属性字典，不存在则返回None
         """
         canon = self._canonicalize(node)
-        return self._node_attrs.get(canon)
+        attrs = self._node_attrs.get(canon)
+        if attrs is None and canon in self._node_to_idx:
+            # 快照只持久化非空属性
+            return {}
+        return attrs
 
     def get_neighbors(self, node: str) -> List[str]:
         """
@@ -653,6 +732,8 @@ class GraphStore:
 
     def has_edge_hash_map(self) -> bool:
         """是否存在 relation-hash 映射。"""
+        if self._edge_hash_columns is not None:
+            return len(self._edge_hash_columns[0]) > 0
         return bool(self._edge_hash_map)
 
     def get_relation_hashes_for_edge(self, source: str, target: str) -> Set[str]:
@@ -721,6 +802,7 @@ class GraphStore:
             out.append((idx_to_node[s_idx], idx_to_node[t_idx], set(hashes)))
         return out
 
+    @_journaled
     def deactivate_edges(self, edges: List[Tuple[str, str]]) -> int:
         """
         冻结边 (将权重设为0.0，使其在计算意义上消失，但保留在Map中)
@@ -751,6 +833,8 @@ class GraphStore:
         """确保转置邻接矩阵是最新的"""
         if self._adjacency is None:
             self._adjacency_T = None
+            self._transition_cache = None
+            self._path_index_cache = None
             return
 
         if self._adjacency_dirty or self._adjacency_T is None:
@@ -758,7 +842,11 @@ class GraphStore:
             # find_paths 以“按行读取邻居”为主，因此统一缓存为 CSR，避免
             # CSR->CSC 转置后按行切片读出错误的索引视图。
             self._adjacency_T = self._adjacency.transpose().tocsr()
-            
+            # 依赖邻接矩阵的派生缓存与转置同步失效
+            self._transition_cache = None
+            self._path_index_cache = None
+            self._saliency_cache = None
+
             self._adjacency_dirty = False
             # logger.debug("重建转置邻接矩阵缓存")
 
@@ -778,25 +866,119 @@ class GraphStore:
         _, indices = row.nonzero()
         return np.asarray(indices, dtype=np.int32)
 
+    def _get_path_index(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        获取路径搜索用的无向邻接索引，随 _adjacency_T 一起失效
+
+        Returns:
+            (indptr, indices, weights)，第 i 行依次为节点 i 的出边邻居与入边邻居
+        """
+        self._ensure_adjacency_T()
+        if self._path_index_cache is None:
+            n = self._adjacency.shape[0]
+            stacked = bmat([[self._adjacency.tocsr(), self._adjacency_T]], format="csr")
+            self._path_index_cache = (
+                stacked.indptr.astype(np.int64),
+                (stacked.indices % max(1, n)).astype(np.int64),
+                np.asarray(stacked.data, dtype=np.float32),
+            )
+        return self._path_index_cache
+
+    @staticmethod
+    def _expand_frontier(
+        path_index: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        frontier: np.ndarray,
+        min_weight: float,
+    ) -> np.ndarray:
+        """向量化扩展一层 BFS 前沿，返回去重后的邻居索引。"""
+        indptr, indices, weights = path_index
+        starts = indptr[frontier]
+        lengths = indptr[frontier + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.asarray([], dtype=np.int64)
+        # 将各行的 [start, end) 区间拼接为一个偏移数组，避免逐节点切片
+        row_base = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        offsets = row_base + np.arange(total)
+        neighbors = indices[offsets]
+        return np.unique(neighbors[weights[offsets] > min_weight])
+
+    def _edge_has_relation(self, a: int, b: int, relation_hashes: Set[str]) -> bool:
+        hashes = self._edge_hash_map.get((a, b)) or set()
+        reverse = self._edge_hash_map.get((b, a)) or set()
+        return not relation_hashes.isdisjoint(hashes) or not relation_hashes.isdisjoint(reverse)
+
+    def _distances_to_target(
+        self,
+        path_index: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        start_idx: int,
+        end_idx: int,
+        max_depth: int,
+        min_weight: float,
+    ) -> Optional[np.ndarray]:
+        """
+        双向 BFS 判定 max_depth 内是否连通；连通时返回各节点到终点的距离（下界），否则返回 None
+
+        两侧交替扩展较小的前沿，相遇即确认可达；随后把终点侧补齐到 max_depth - 1 层，
+        供路径枚举剪枝使用（未标注的节点距离视为 max_depth + 1）。
+        """
+        n = len(path_index[0]) - 1
+        unreached = max_depth + 1
+        dist_s = np.full(n, unreached, dtype=np.int32)
+        dist_e = np.full(n, unreached, dtype=np.int32)
+        dist_s[start_idx] = 0
+        dist_e[end_idx] = 0
+        frontier_s = np.asarray([start_idx], dtype=np.int64)
+        frontier_e = np.asarray([end_idx], dtype=np.int64)
+        depth_s = depth_e = 0
+
+        met = start_idx == end_idx
+        while not met and depth_s + depth_e < max_depth and len(frontier_s) and len(frontier_e):
+            if len(frontier_s) <= len(frontier_e):
+                neighbors = self._expand_frontier(path_index, frontier_s, min_weight)
+                frontier_s = neighbors[dist_s[neighbors] == unreached]
+                depth_s += 1
+                dist_s[frontier_s] = depth_s
+                met = bool(np.any(dist_e[frontier_s] < unreached))
+            else:
+                neighbors = self._expand_frontier(path_index, frontier_e, min_weight)
+                frontier_e = neighbors[dist_e[neighbors] == unreached]
+                depth_e += 1
+                dist_e[frontier_e] = depth_e
+                met = bool(np.any(dist_s[frontier_e] < unreached))
+        if not met:
+            return None
+
+        while depth_e < max_depth - 1 and len(frontier_e):
+            neighbors = self._expand_frontier(path_index, frontier_e, min_weight)
+            frontier_e = neighbors[dist_e[neighbors] == unreached]
+            depth_e += 1
+            dist_e[frontier_e] = depth_e
+        return dist_e
+
     def find_paths(
         self, 
         start_node: str, 
         end_node: str, 
         max_depth: int = 3, 
         max_paths: int = 5,
-        max_expansions: int = 20000
+        max_expansions: int = 20000,
+        min_weight: float = 0.0,
+        relation_hashes: Optional[Set[str]] = None,
     ) -> List[List[str]]:
         """
-        查找两个节点之间的路径 (BFS)
-        支持有向和无向 (视作双向) 探索
-        
+        查找两个节点之间的路径 (双向 BFS 剪枝 + 父指针枚举)
+        支持有向和无向 (视作双向) 探索，按路径长度从短到长返回
+
         Args:
             start_node: 起始节点
             end_node: 目标节点
             max_depth: 最大深度
             max_paths: 最大路径数 (找到这么多就停止)
             max_expansions: 最大扩展次数 (防止爆炸)
-            
+            min_weight: 只经过权重大于该值的边（默认跳过已失活的 0 权重边）
+            relation_hashes: 可选，只经过关联了这些关系哈希的边
+
         Returns:
             路径列表 [[n1, n2, n3], ...]
         """
@@ -809,67 +991,141 @@ class GraphStore:
         if self._adjacency is None:
             return []
 
-        # 确保转置矩阵可用 (用于查找入边)
-        self._ensure_adjacency_T()
-        
         start_idx = self._node_to_idx[start_canon]
         end_idx = self._node_to_idx[end_canon]
-        
-        # 队列: (current_idx, path_indices)
-        queue = [(start_idx, [start_idx])]
-        found_paths = []
+        if start_idx == end_idx:
+            return [[self._nodes[start_idx]]]
+
+        path_index = self._get_path_index()
+        if max(start_idx, end_idx) >= len(path_index[0]) - 1:
+            return []
+        dist_e = self._distances_to_target(path_index, start_idx, end_idx, max_depth, min_weight)
+        if dist_e is None:
+            return []
+
+        indptr, indices, weights = path_index
+        # 队列元素为条目编号；路径通过父指针回溯，命中时才重建
+        entry_node = [start_idx]
+        entry_parent = [-1]
+        entry_depth = [0]
+        queue = deque([0])
+        found_paths: List[List[str]] = []
         expansions = 0
-        
-        unique_paths = set()
-        
+
         while queue:
-            curr, path = queue.pop(0)
-            
-            if len(path) > max_depth + 1:
-                continue
-                
+            entry = queue.popleft()
+            curr = entry_node[entry]
+
             if curr == end_idx:
-                # 找到路径
-                # 转换回节点名
-                path_names = [self._nodes[i] for i in path]
-                path_tuple = tuple(path_names)
-                if path_tuple not in unique_paths:
-                    found_paths.append(path_names)
-                    unique_paths.add(path_tuple)
-                    
+                path: List[int] = []
+                while entry >= 0:
+                    path.append(entry_node[entry])
+                    entry = entry_parent[entry]
+                found_paths.append([self._nodes[i] for i in reversed(path)])
                 if len(found_paths) >= max_paths:
                     break
                 continue
-                
+
             if expansions >= max_expansions:
                 break
-            
             expansions += 1
-            
-            # 获取邻居 (出边 + 入边)
-            out_indices = self._row_neighbor_indices(self._adjacency, curr)
-            
-            # 2. 入边 (使用转置矩阵)
-            if self._adjacency_T is not None:
-                in_indices = self._row_neighbor_indices(self._adjacency_T, curr)
-                neighbors = np.concatenate((out_indices, in_indices))
-            else:
-                neighbors = out_indices
-                
-            # 去重并过滤已在路径中的节点 (防止环)
-            # 注意: 这里简单去重，可能包含重复的邻居(如果既是出又是入)
-            seen_in_path = set(path)
-            queued_neighbors = set()
-            
-            for neighbor_idx in neighbors:
-                neighbor = int(neighbor_idx)
-                if neighbor not in seen_in_path and neighbor not in queued_neighbors:
-                    # 只有未访问过的才加入
-                    queue.append((neighbor, path + [neighbor]))
-                    queued_neighbors.add(neighbor)
-                    
+
+            on_path = set()
+            cursor = entry
+            while cursor >= 0:
+                on_path.add(entry_node[cursor])
+                cursor = entry_parent[cursor]
+
+            # 只保留仍能在 max_depth 内到达终点的邻居，保持“出边在前、入边在后”的首次出现顺序
+            depth = entry_depth[entry] + 1
+            row = slice(indptr[curr], indptr[curr + 1])
+            neighbors = indices[row]
+            neighbors = neighbors[(weights[row] > min_weight) & (dist_e[neighbors] + depth <= max_depth)]
+            _, first_pos = np.unique(neighbors, return_index=True)
+
+            for neighbor in neighbors[np.sort(first_pos)].tolist():
+                if neighbor in on_path:
+                    continue
+                if relation_hashes is not None and not self._edge_has_relation(curr, neighbor, relation_hashes):
+                    continue
+                entry_node.append(neighbor)
+                entry_parent.append(entry)
+                entry_depth.append(depth)
+                queue.append(len(entry_node) - 1)
+
         return found_paths
 
+    def _get_transition_matrix(self) -> Tuple[csr_matrix, csr_matrix, np.ndarray]:
+        """
+        获取缓存的转移矩阵，仅在邻接矩阵变脏后重建
+
+        Returns:
+            (行归一化转移矩阵 P, 列随机转移矩阵 M = P^T, 悬挂节点掩码)
+        """
+        self._ensure_adjacency_T()
+        if self._transition_cache is None:
+            adj = self._adjacency.astype(np.float32)
+
+            # 处理悬挂节点（出度为0）
+            out_degrees = np.asarray(adj.sum(axis=1), dtype=np.float32).ravel()
+            dangling = out_degrees == 0
+            out_degrees_inv = np.zeros_like(out_degrees)
+            out_degrees_inv[~dangling] = 1.0 / out_degrees[~dangling]
+
+            # 归一化 (使用稀疏对角阵避免内存溢出)
+            from scipy.sparse import diags
+            row_stochastic = (diags(out_degrees_inv) @ adj).tocsr()
+            self._transition_cache = (row_stochastic, row_stochastic.T.tocsr(), dangling)
+        return self._transition_cache
+
+    def _personalization_matrix(
+        self,
+        personalizations: List[Optional[Dict[str, float]]],
+    ) -> np.ndarray:
+        """将个性化向量列表组装为 (n, b) 的列归一化矩阵；无有效种子的列回退为均匀分布。"""
+        n = len(self._nodes)
+        matrix = np.zeros((n, len(personalizations)))
+        for col, personalization in enumerate(personalizations):
+            for node, weight in (personalization or {}).items():
+                idx = self._node_to_idx.get(self._canonicalize(node))
+                if idx is not None and weight > 0:
+                    matrix[idx, col] += weight
+            total = matrix[:, col].sum()
+            if total > 0:
+                matrix[:, col] /= total
+            else:
+                matrix[:, col] = 1.0 / n
+        return matrix
+
+    def _power_iterate(
+        self,
+        transition: csr_matrix,
+        teleport: np.ndarray,
+        start: np.ndarray,
+        alpha: float,
+        max_iter: int,
+        tol: float,
+    ) -> np.ndarray:
+        """批量幂迭代：每轮对 (n, b) 矩阵做一次稀疏矩阵乘，全部列收敛后停止。"""
+        p = start
+        for i in range(max_iter):
+            # p_new = alpha * M * p + (1-alpha) * personalization
+            p_new = alpha * (transition @ p) + (1 - alpha) * teleport
+
+            # 处理因为悬挂节点导致的概率流失
+            lost = np.clip(1.0 - p_new.sum(axis=0), 0.0, None)
+            p_new += teleport * lost
+
+            # 检查收敛（取最慢的一列）
+            diff = float(np.abs(p_new - p).sum(axis=0).max())
+            p = p_new
+            if diff < tol:
+                logger.debug(f"PageRank在 {i+1} 次迭代后收敛 (batch={p.shape[1]})")
+                break
+        else:
+            logger.warning(f"PageRank未在 {max_iter} 次迭代内收敛")
+        return p
+
     def compute_pagerank(
         self,
         personalization: Optional[Dict[str, float]] = None,
@@ -893,66 +1149,121 @@ class GraphStore:
             logger.warning("图为空，无法计算PageRank")
             return {}
 
-        n = len(self._nodes)
+        _, transition, _ = self._get_transition_matrix()
+        teleport = self._personalization_matrix([personalization])
 
-        # 构建列归一化的转移矩阵
-        adj = self._adjacency.astype(np.float32)
+        # 全局 PageRank 从上一次结果热启动（图只做了增量修改时迭代次数大幅减少）
+        start = teleport
+        warm = self._pagerank_warm_start if not personalization else None
+        if warm:
+            start = np.array([[warm.get(node, 0.0)] for node in self._nodes])
+            total = start.sum()
+            start = start / total if total > 0 else teleport
 
-        # 计算出度
-        out_degrees = np.array(adj.sum(axis=1)).flatten()
+        p = self._power_iterate(transition, teleport, start, alpha, max_iter, tol)[:, 0]
 
-        # 处理悬挂节点（出度为0）
-        dangling = (out_degrees == 0)
-        out_degrees_inv = np.zeros_like(out_degrees)
-        out_degrees_inv[~dangling] = 1.0 / out_degrees[~dangling]
+        # 转换为真实节点名称字典
+        scores = {self._nodes[idx]: float(val) for idx, val in enumerate(p)}
+        if not personalization:
+            self._pagerank_warm_start = scores
+        return scores
 
-        # 归一化 (使用稀疏对角阵避免内存溢出)
-        from scipy.sparse import diags
-        D_inv = diags(out_degrees_inv)
-        M = adj.T @ D_inv  # 转移矩阵
+    def compute_pagerank_batch(
+        self,
+        personalizations: List[Optional[Dict[str, float]]],
+        alpha: float = 0.85,
+        max_iter: int = 100,
+        tol: float = 1e-6,
+    ) -> List[Dict[str, float]]:
+        """
+        批量计算Personalized PageRank：b 个个性化向量组成 (n, b) 矩阵，
+        每轮迭代只做一次稀疏矩阵乘
 
-        # 初始化个性化向量
-        if personalization is None:
-            # 均匀分布
-            p = np.ones(n) / n
-        else:
-            # 使用指定的个性化向量
-            p = np.zeros(n)
-            total_weight = sum(personalization.values())
-            for node, weight in personalization.items():
-                if node in self._node_to_idx:
-                    idx = self._node_to_idx[node]
-                    p[idx] = weight / total_weight
-
-            # 确保和为1
-            if p.sum() == 0:
-                p = np.ones(n) / n
-            else:
-                p = p / p.sum()
+        Args:
+            personalizations: 个性化向量列表（None 表示均匀分布）
+            alpha: 阻尼系数（0-1之间）
+            max_iter: 最大迭代次数
+            tol: 收敛阈值
 
-        # 幂迭代法
-        p_orig = p.copy()
-        for i in range(max_iter):
-            # p_new = alpha * M * p + (1-alpha) * personalization
-            p_new = alpha * (M @ p) + (1 - alpha) * p_orig
-            
-            # 处理因为悬挂节点导致的概率流失
-            current_sum = p_new.sum()
-            if current_sum < 1.0:
-                p_new += (1.0 - current_sum) * p_orig
+        Returns:
+            与输入对齐的节点PageRank值字典列表
+        """
+        if not personalizations:
+            return []
+        if self._adjacency is None or len(self._nodes) == 0:
+            logger.warning("图为空，无法计算PageRank")
+            return [{} for _ in personalizations]
+
+        _, transition, _ = self._get_transition_matrix()
+        teleport = self._personalization_matrix(personalizations)
+        p = self._power_iterate(transition, teleport, teleport, alpha, max_iter, tol)
+        return [
+            {self._nodes[idx]: float(val) for idx, val in enumerate(p[:, col])}
+            for col in range(p.shape[1])
+        ]
 
-            # 检查收敛
-            diff = np.linalg.norm(p_new - p, 1)
-            if diff < tol:
-                logger.debug(f"PageRank在 {i+1} 次迭代后收敛")
-                p = p_new
-                break
-            p = p_new
-        else:
-            logger.warning(f"PageRank未在 {max_iter} 次迭代内收敛")
+    def compute_ppr_push(
+        self,
+        personalization: Dict[str, float],
+        alpha: float = 0.85,
+        epsilon: float = 1e-4,
+    ) -> Dict[str, float]:
+        """
+        基于残差推送的局部PPR近似（Andersen-Chung-Lang）
 
-        # 转换为真实节点名称字典
-        return {self._nodes[idx]: float(val) for idx, val in enumerate(p)}
+        只访问种子附近残差超过 epsilon·出度 的节点，代价与图规模无关；
+        悬挂节点的流失概率按种子分布回流，与 compute_pagerank 的处理一致。
+
+        Args:
+            personalization: 种子向量 {node: weight}
+            alpha: 阻尼系数（0-1之间）
+            epsilon: 推送阈值，越小越接近精确解
+
+        Returns:
+            触达节点的近似PPR值字典 {node: score}（未触达节点视为 0）
+        """
+        if self._adjacency is None or len(self._nodes) == 0:
+            return {}
+
+        seeds: Dict[int, float] = {}
+        for node, weight in (personalization or {}).items():
+            idx = self._node_to_idx.get(self._canonicalize(node))
+            if idx is not None and weight > 0:
+                seeds[idx] = seeds.get(idx, 0.0) + float(weight)
+        total = sum(seeds.values())
+        if total <= 0:
+            return {}
+        seeds = {idx: weight / total for idx, weight in seeds.items()}
+
+        row_stochastic, _, dangling = self._get_transition_matrix()
+        indptr, indices, data = row_stochastic.indptr, row_stochastic.indices, row_stochastic.data
+
+        estimate: Dict[int, float] = defaultdict(float)
+        residual: Dict[int, float] = dict(seeds)
+        queue = deque(seeds)
+        queued = set(seeds)
+        while queue:
+            u = queue.popleft()
+            queued.discard(u)
+            r = residual.pop(u, 0.0)
+            if r <= 0:
+                continue
+            estimate[u] += (1 - alpha) * r
+            spread = alpha * r
+            if dangling[u]:
+                targets = ((v, spread * w) for v, w in seeds.items())
+            else:
+                start, end = indptr[u], indptr[u + 1]
+                targets = zip(indices[start:end].tolist(), (data[start:end] * spread).tolist(), strict=True)
+            for v, amount in targets:
+                value = residual.get(v, 0.0) + amount
+                residual[v] = value
+                degree = max(1, int(indptr[v + 1] - indptr[v]))
+                if v not in queued and value > epsilon * degree:
+                    queue.append(v)
+                    queued.add(v)
+
+        return {self._nodes[idx]: float(val) for idx, val in estimate.items()}
 
     def get_saliency_scores(self) -> Dict[str, float]:
         """
@@ -1019,6 +1330,7 @@ class GraphStore:
     # V5 Memory System Methods (Graph Level)
     # =========================================================================
 
+    @_journaled
     def decay(self, factor: float, min_active_weight: float = 0.0) -> None:
         """
         全图衰减 (Atomic Decay)
@@ -1041,6 +1353,7 @@ class GraphStore:
             
         self._adjacency_dirty = True
 
+    @_journaled
     def prune_relation_hashes(self, operations: List[Tuple[str, str, str]]) -> None:
         """
         修剪特定关系哈希 (从 _edge_hash_map 移除; 如果边变空则从矩阵移除)
@@ -1158,13 +1471,14 @@ class GraphStore:
         else:
             return list(isolated_nodes_set)
 
+    @_journaled
     def clear(self) -> None:
         """清空所有数据"""
         self._nodes.clear()
         self._node_to_idx.clear()
         self._node_attrs.clear()
         self._adjacency = None
-        self._edge_hash_map.clear()
+        self._edge_hash_map = defaultdict(set)
         self._adjacency_T = None
         self._adjacency_dirty = True
         self._total_nodes_added = 0
@@ -1189,33 +1503,37 @@ class GraphStore:
         data_dir = Path(data_dir)
         data_dir.mkdir(parents=True, exist_ok=True)
 
-        # 保存邻接矩阵
-        matrix_path = data_dir / "graph_adjacency.npz"
-        if self._adjacency is not None:
-            with atomic_write(matrix_path, "wb") as f:
-                save_npz(f, self._adjacency)
-            logger.debug(f"保存邻接矩阵: {matrix_path}")
-        elif matrix_path.exists():
-            matrix_path.unlink()
-            logger.debug(f"删除陈旧邻接矩阵: {matrix_path}")
-
-        # 保存元数据
-        metadata = {
-            "nodes": self._nodes,
-            "node_to_idx": self._node_to_idx,
-            "node_attrs": self._node_attrs,
-            "matrix_format": self.matrix_format,
-            "total_nodes_added": self._total_nodes_added,
-            "total_edges_added": self._total_edges_added,
-            "total_nodes_deleted": self._total_nodes_deleted,
-            "total_edges_deleted": self._total_edges_deleted,
-            "edge_hash_map": dict(self._edge_hash_map), # 持久化 V5 映射 (将 defaultdict 转换为普通 dict)
-        }
+        # 替换快照目录前释放对旧快照文件的映射（同 VectorStore._release_disk_view）
+        self._release_snapshot_views()
+
+        # 列式快照（字符串表 + CSR 数组 + 扁平 edge_hash 列）
+        write_graph_snapshot(
+            data_dir,
+            nodes=self._nodes,
+            canonical=[self._canonicalize(node) for node in self._nodes],
+            node_attrs=self._node_attrs,
+            adjacency=self._adjacency,
+            matrix_format=self.matrix_format,
+            edge_hash_map=self._edge_hash_map,
+            stats={
+                "total_nodes_added": self._total_nodes_added,
+                "total_edges_added": self._total_edges_added,
+                "total_nodes_deleted": self._total_nodes_deleted,
+                "total_edges_deleted": self._total_edges_deleted,
+            },
+            journal_seq=self._journal.seq if self._journal is not None else 0,
+        )
 
-        metadata_path = data_dir / "graph_metadata.pkl"
-        with atomic_write(metadata_path, "wb") as f:
-            pickle.dump(metadata, f)
-        logger.debug(f"保存元数据: {metadata_path}")
+        # 迁移完成：移除旧版 pickle 元数据与 npz 邻接矩阵
+        for legacy_name in ("graph_metadata.pkl", "graph_adjacency.npz"):
+            legacy_path = data_dir / legacy_name
+            if legacy_path.exists():
+                legacy_path.unlink()
+                logger.info(f"已迁移并删除旧版图存储文件: {legacy_path}")
+
+        # 快照已包含日志中的全部变更
+        if self._journal is not None and data_dir == self.data_dir:
+            self._journal.reset()
 
         logger.info(f"图存储已保存到: {data_dir}")
 
@@ -1236,11 +1554,106 @@ class GraphStore:
         if not data_dir.exists():
             raise FileNotFoundError(f"数据目录不存在: {data_dir}")
 
-        # 加载元数据
+        started = time.perf_counter()
         metadata_path = data_dir / "graph_metadata.pkl"
-        if not metadata_path.exists():
-            raise FileNotFoundError(f"元数据文件不存在: {metadata_path}")
+        replay_journal = self._journal is not None and data_dir == self.data_dir
+        snapshot = read_graph_snapshot(data_dir)
+        # 旧版 pickle 比快照更新（例如降级后又升级）时以 pickle 为准，下次 save() 完成迁移
+        if metadata_path.exists() and (snapshot is None or metadata_path.stat().st_mtime_ns > snapshot.mtime_ns):
+            journal_seq = self._load_legacy_metadata(data_dir)
+        elif snapshot is not None:
+            journal_seq = self._apply_snapshot(snapshot)
+        else:
+            if replay_journal and self._journal.path.exists():
+                # 尚无快照：从空图开始回放日志
+                self._replay_journal(0)
+                logger.info(f"图存储已从增量日志恢复: {len(self._nodes)} 个节点")
+                return
+            raise FileNotFoundError(f"图快照不存在: {data_dir / GRAPH_SNAPSHOT_DIRNAME}")
 
+        # 检查维度不匹配并修复
+        if self._adjacency is not None:
+             adj_n = self._adjacency.shape[0]
+             current_n = len(self._nodes)
+             if current_n == 0:
+                 logger.warning("检测到空图元数据但邻接矩阵仍然存在，已重置为空图。")
+                 self._adjacency = None
+                 self._edge_hash_map = defaultdict(set)
+             elif current_n > adj_n:
+                 logger.warning(f"检测到图存储维度不匹配: 节点数={current_n}, 矩阵大小={adj_n}. 正在自动修复...")
+                 self._expand_adjacency_matrix(current_n - adj_n)
+             elif current_n < adj_n:
+                 logger.warning(
+                     f"检测到过期邻接矩阵: 节点数={current_n}, 矩阵大小={adj_n}. 正在重置邻接矩阵..."
+                 )
+                 if self.matrix_format == "csc":
+                     self._adjacency = csc_matrix((current_n, current_n), dtype=np.float32)
+                 else:
+                     self._adjacency = csr_matrix((current_n, current_n), dtype=np.float32)
+                 self._edge_hash_map = defaultdict(
+                     set,
+                     {
+                         (src_idx, dst_idx): set(hashes)
+                         for (src_idx, dst_idx), hashes in self._edge_hash_map.items()
+                         if src_idx < current_n and dst_idx < current_n
+                     },
+                 )
+
+        if not self._nodes and self.has_edge_hash_map():
+            logger.warning("检测到空图元数据但边哈希映射仍然存在，已清空。")
+            self._edge_hash_map = defaultdict(set)
+
+        self._adjacency_dirty = True
+        if replay_journal:
+            self._replay_journal(journal_seq)
+        logger.info(
+            f"图存储已加载: {len(self._nodes)} 个节点, "
+            f"{self._adjacency.nnz if self._adjacency is not None else 0} 条边, "
+            f"耗时 {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    def _release_snapshot_views(self) -> None:
+        """
+        将仍映射快照文件的数组复制到内存。
+
+        快照数组以 mmap 打开，替换/删除快照目录前必须调用，Windows 下映射中的文件无法被替换；
+        依赖邻接矩阵的派生缓存可能共享这些数组，一并失效。
+        """
+        adjacency = self._adjacency
+        if adjacency is not None and any(
+            is_memory_mapped(array) for array in (adjacency.data, adjacency.indices, adjacency.indptr)
+        ):
+            self._adjacency = adjacency.copy()
+            self._adjacency_T = None
+            self._adjacency_dirty = True
+        if self._edge_hash_columns is not None:
+            # 访问属性即把扁平列展开为内存字典并丢弃列引用
+            _ = self._edge_hash_map
+
+    def _apply_snapshot(self, snapshot: GraphSnapshot) -> int:
+        """从列式快照恢复状态，返回快照对应的日志序号。"""
+        manifest = snapshot.manifest
+        self._nodes = snapshot.nodes
+        # 逆序构建使重复的规范名保留最小索引（与旧版加载的去重语义一致）
+        n = len(snapshot.canonical)
+        self._node_to_idx = dict(zip(reversed(snapshot.canonical), range(n - 1, -1, -1), strict=True))
+        self._node_attrs = snapshot.node_attrs
+
+        self.matrix_format = manifest.get("matrix_format", self.matrix_format)
+        self._total_nodes_added = int(manifest.get("total_nodes_added", 0))
+        self._total_edges_added = int(manifest.get("total_edges_added", 0))
+        self._total_nodes_deleted = int(manifest.get("total_nodes_deleted", 0))
+        self._total_edges_deleted = int(manifest.get("total_edges_deleted", 0))
+
+        self._adjacency = snapshot.adjacency
+        self._edge_hash_map = defaultdict(set)
+        self._edge_hash_columns = snapshot.edge_hash_columns
+        logger.debug(f"加载图快照: {snapshot.path}, version={manifest.get('format_version')}")
+        return int(manifest.get("journal_seq", 0) or 0)
+
+    def _load_legacy_metadata(self, data_dir: Path) -> int:
+        """加载旧版 graph_metadata.pkl + graph_adjacency.npz，返回快照对应的日志序号。"""
+        metadata_path = data_dir / "graph_metadata.pkl"
         with open(metadata_path, "rb") as f:
             metadata = pickle.load(f)
 
@@ -1275,6 +1688,7 @@ class GraphStore:
                 self._edge_hash_map[k] = set(v) # 确保类型为 set
 
         # 加载邻接矩阵
+        self._adjacency = None
         matrix_path = data_dir / "graph_adjacency.npz"
         if matrix_path.exists():
             self._adjacency = load_npz(str(matrix_path))
@@ -1286,40 +1700,48 @@ class GraphStore:
                 self._adjacency = self._adjacency.tocsr()
 
             logger.debug(f"加载邻接矩阵: {matrix_path}, shape={self._adjacency.shape}")
+        logger.info(f"已加载旧版图存储元数据: {metadata_path}（下次保存时迁移为列式快照）")
+        return int(metadata.get("journal_seq", 0) or 0)
+
+    def _replay_journal(self, after_seq: int) -> int:
+        """回放快照之后的日志记录，返回回放条数。"""
+        replayed = 0
+        # 回放期间视同嵌套调用，不再重复写日志
+        self._journal_depth += 1
+        try:
+            for _, op, (args, kwargs, incremental) in self._journal.replay(after_seq):
+                method = getattr(self, op)
+                if incremental:
+                    with self.batch_update():
+                        method(*args, **kwargs)
+                else:
+                    method(*args, **kwargs)
+                replayed += 1
+        finally:
+            self._journal_depth -= 1
+        if replayed:
+            logger.info(f"图存储回放 {replayed} 条增量日志 (after seq={after_seq})")
+        return replayed
 
-        # 检查维度不匹配并修复
-        if self._adjacency is not None:
-             adj_n = self._adjacency.shape[0]
-             current_n = len(self._nodes)
-             if current_n == 0:
-                 logger.warning("检测到空图元数据但邻接矩阵仍然存在，已重置为空图。")
-                 self._adjacency = None
-                 self._edge_hash_map = defaultdict(set)
-             elif current_n > adj_n:
-                 logger.warning(f"检测到图存储维度不匹配: 节点数={current_n}, 矩阵大小={adj_n}. 正在自动修复...")
-                 self._expand_adjacency_matrix(current_n - adj_n)
-             elif current_n < adj_n:
-                 logger.warning(
-                     f"检测到过期邻接矩阵: 节点数={current_n}, 矩阵大小={adj_n}. 正在重置邻接矩阵..."
-                 )
-                 if self.matrix_format == "csc":
-                     self._adjacency = csc_matrix((current_n, current_n), dtype=np.float32)
-                 else:
-                     self._adjacency = csr_matrix((current_n, current_n), dtype=np.float32)
-                 self._edge_hash_map = defaultdict(
-                     set,
-                     {
-                         (src_idx, dst_idx): set(hashes)
-                         for (src_idx, dst_idx), hashes in self._edge_hash_map.items()
-                         if src_idx < current_n and dst_idx < current_n
-                     },
-                 )
+    def enable_journal(self, fsync_interval: float = 1.0) -> None:
+        """
+        开启增量日志：之后的图变更只追加日志，由 commit_journal() 批量落盘，
+        全量 save() 退为后台快照/压缩。
+        """
+        if self._journal is None:
+            raise ValueError("未指定数据目录")
+        self._journal.fsync_interval = max(0.0, float(fsync_interval))
+        self.journal_enabled = True
 
-        self._adjacency_dirty = True
-        logger.info(
-            f"图存储已加载: {len(self._nodes)} 个节点, "
-            f"{self._adjacency.nnz if self._adjacency is not None else 0} 条边"
-        )
+    def commit_journal(self, force_fsync: bool = False) -> int:
+        """将待提交的日志记录写入 graph_journal.log，返回写入条数。"""
+        if self._journal is None:
+            return 0
+        return self._journal.commit(force_fsync=force_fsync)
+
+    @property
+    def journal_size_bytes(self) -> int:
+        return self._journal.size_bytes if self._journal is not None else 0
 
     def _expand_adjacency_matrix(self, added_nodes: int) -> None:
         """
@@ -1429,7 +1851,11 @@ class GraphStore:
         """检查磁盘上是否存在现有数据"""
         if self.data_dir is None:
             return False
-        return (self.data_dir / "graph_metadata.pkl").exists()
+        if resolve_graph_snapshot_dir(self.data_dir) is not None:
+            return True
+        if (self.data_dir / "graph_metadata.pkl").exists():
+            return True
+        return self.journal_size_bytes > 0
 
     def __repr__(self) -> str:
         return (
@@ -1437,6 +1863,7 @@ class GraphStore:
             f"density={self.density:.4f}, format={self.matrix_format})"
         )
 
+    @_journaled
     def rebuild_edge_hash_map(self, triples: List[Tuple[str, str, str, str]]) -> int:
         """
         从元数据重建 V5 边哈希映射 (Migration Tool)
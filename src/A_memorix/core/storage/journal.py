@@ -0,0 +1,215 @@
+"""
+增量日志 (Append-Only Journal)
+
+为向量/图存储提供快照之间的增量持久化：变更以带序号的记录追加写入，
+提交时批量 fsync（空闲时由定时器补一次 fsync）；快照落盘后截断。
+加载时回放序号大于快照序号的记录。
+
+记录格式：<长度 u32><crc32 u32><pickle((seq, op, payload))>
+尾部被截断或校验失败的记录视为崩溃残留，回放时丢弃并截掉。
+"""
+
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+from src.common.logger import get_logger
+
+logger = get_logger("A_Memorix.Journal")
+
+_HEADER = struct.Struct("<II")
+
+
+class AppendOnlyJournal:
+    """
+    追加写增量日志
+
+    参数：
+        path: 日志文件路径
+        fsync_interval: 两次 fsync 的最小间隔（秒），0 表示每次提交都 fsync；
+            被推迟的 fsync 由空闲定时器在间隔到期后补做，不依赖下一次写入
+    """
+
+    def __init__(self, path: Union[str, Path], fsync_interval: float = 1.0):
+        self.path = Path(path)
+        self.fsync_interval = max(0.0, float(fsync_interval))
+        self._pending: List[Tuple[int, bytes]] = []
+        self._seq = 0
+        self._last_fsync = 0.0
+        self._unsynced = False
+        self._fsync_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def seq(self) -> int:
+        """最近一条已分配的记录序号。"""
+        return self._seq
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def size_bytes(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, op: str, payload: Any = None) -> int:
+        """追加一条记录到内存待提交队列，返回其序号。"""
+        with self._lock:
+            self._seq += 1
+            body = pickle.dumps((self._seq, op, payload), protocol=pickle.HIGHEST_PROTOCOL)
+            self._pending.append((self._seq, _HEADER.pack(len(body), zlib.crc32(body)) + body))
+            return self._seq
+
+    def commit(self, force_fsync: bool = False) -> int:
+        """
+        将待提交记录写入文件。
+
+        写入后总会 flush 到操作系统（进程崩溃不丢）；距上次 fsync 超过 fsync_interval
+        或 force_fsync 时再 fsync（掉电不丢），多次提交合并为一次 fsync；
+        未到间隔的提交由空闲定时器在间隔到期时补做 fsync。
+
+        Returns:
+            本次写入的记录数
+        """
+        with self._lock:
+            records = self._pending
+            self._pending = []
+            if not records and not (force_fsync and self._unsynced):
+                return 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                if records:
+                    f.write(b"".join(frame for _, frame in records))
+                    f.flush()
+                    self._unsynced = True
+                now = time.monotonic()
+                if force_fsync or now - self._last_fsync >= self.fsync_interval:
+                    os.fsync(f.fileno())
+                    self._last_fsync = now
+                    self._unsynced = False
+                else:
+                    self._schedule_idle_fsync_locked(self.fsync_interval - (now - self._last_fsync))
+            return len(records)
+
+    def _schedule_idle_fsync_locked(self, delay: float) -> None:
+        if self._fsync_timer is not None:
+            return
+        timer = threading.Timer(max(0.0, delay), self._idle_fsync)
+        timer.daemon = True
+        self._fsync_timer = timer
+        timer.start()
+
+    def _cancel_idle_fsync_locked(self) -> None:
+        if self._fsync_timer is not None:
+            self._fsync_timer.cancel()
+            self._fsync_timer = None
+
+    def _idle_fsync(self) -> None:
+        """空闲定时器回调：补做被推迟的 fsync，保证最后一批提交也能在间隔内落盘。"""
+        with self._lock:
+            self._fsync_timer = None
+            if not self._unsynced or not self.path.exists():
+                return
+            try:
+                with open(self.path, "ab") as f:
+                    os.fsync(f.fileno())
+            except OSError as exc:
+                logger.warning(f"增量日志空闲 fsync 失败: {self.path} ({exc})")
+                return
+            self._last_fsync = time.monotonic()
+            self._unsynced = False
+
+    def close(self) -> None:
+        """取消空闲定时器，并对尚未 fsync 的提交补做一次 fsync。"""
+        with self._lock:
+            self._cancel_idle_fsync_locked()
+        self.commit(force_fsync=True)
+
+    def replay(self, after_seq: int = 0) -> Iterator[Tuple[int, str, Any]]:
+        """
+        按序产出序号大于 after_seq 的记录 (seq, op, payload)。
+
+        遇到不完整或校验失败的尾部记录时停止，并将文件截断到最后一条完整记录。
+        """
+        self._seq = max(self._seq, int(after_seq))
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        offset = 0
+        valid_end = 0
+        while offset + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            body = data[start : start + length]
+            if len(body) < length or zlib.crc32(body) != crc:
+                break
+            seq, op, payload = pickle.loads(body)
+            offset = valid_end = start + length
+            self._seq = max(self._seq, int(seq))
+            if seq > after_seq:
+                yield seq, op, payload
+        if valid_end < len(data):
+            logger.warning(f"增量日志尾部存在不完整记录，已截断: {self.path} ({len(data) - valid_end} bytes)")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+
+    def reset(self) -> None:
+        """快照落盘后调用：丢弃待提交记录并清空日志文件（序号继续递增）。"""
+        with self._lock:
+            self._reset_locked()
+
+    def _reset_locked(self) -> None:
+        self._pending = []
+        self._unsynced = False
+        self._cancel_idle_fsync_locked()
+        if self.path.exists():
+            with open(self.path, "r+b") as f:
+                f.truncate(0)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def truncate_through(self, seq: int) -> None:
+        """
+        快照在锁外落盘后调用：只丢弃序号不大于 seq（已包含在快照中）的记录。
+
+        快照采集之后又追加的记录保留在待提交队列与日志文件中，下次加载时照常回放。
+        """
+        seq = int(seq)
+        with self._lock:
+            if self._seq <= seq:
+                self._reset_locked()
+                return
+            self._pending = [(s, frame) for s, frame in self._pending if s > seq]
+            if not self.path.exists():
+                return
+            with open(self.path, "rb") as f:
+                data = f.read()
+            kept: List[bytes] = []
+            offset = 0
+            while offset + _HEADER.size <= len(data):
+                length, crc = _HEADER.unpack_from(data, offset)
+                start = offset + _HEADER.size
+                body = data[start : start + length]
+                if len(body) < length or zlib.crc32(body) != crc:
+                    break
+                if int(pickle.loads(body)[0]) > seq:
+                    kept.append(data[offset : start + length])
+                offset = start + length
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(kept))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._unsynced = False
+            self._cancel_idle_fsync_locked()
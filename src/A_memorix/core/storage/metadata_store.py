@@ -9,9 +9,11 @@ import pickle
 import json
 import uuid
 import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Union, List, Dict, Any, Tuple, Sequence
+from typing import Optional, Union, List, Dict, Any, Iterator, Tuple, Sequence
 
 from src.common.logger import get_logger
 from ..utils.hash import compute_hash, normalize_text
@@ -38,6 +40,32 @@ SCHEMA_VERSION = 12
 RUNTIME_AUTO_MIGRATION_MIN_SCHEMA_VERSION = 9
 
 
+class BatchTransactionAborted(RuntimeError):
+    """批量事务内部的写方法执行了回滚，整批写入已放弃。"""
+
+
+class _DeferredCommitConnection:
+    """
+    批量事务的专用连接：commit 为空操作，其余调用透传到真实连接。
+
+    块内写方法调用 rollback() 时整批已被撤销，此时直接抛出 BatchTransactionAborted
+    终止批量块，避免后续条目继续写入并只提交其中一部分。
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.raw = conn
+
+    def commit(self) -> None:
+        return None
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+        raise BatchTransactionAborted("批量事务内部发生回滚，整批写入已放弃")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+
 class MetadataStore:
     """
     元数据存储类
@@ -68,12 +96,41 @@ class MetadataStore:
         """
         self.data_dir = Path(data_dir) if data_dir else None
         self.db_name = db_name
-        self._conn: Optional[sqlite3.Connection] = None
+        # 批量事务的专用连接按线程记录，其它线程始终使用共享连接
+        self._batch_local = threading.local()
+        self._shared_conn: Optional[sqlite3.Connection] = None
         self._is_initialized = False
         self._db_path: Optional[Path] = None
 
         logger.info(f"MetadataStore 初始化: db={db_name}")
 
+    @property
+    def _conn(self) -> Optional[Any]:
+        """当前线程可见的连接：处于批量事务中时为其专用连接，否则为共享连接。"""
+        batch_conn = getattr(self._batch_local, "conn", None)
+        return batch_conn if batch_conn is not None else self._shared_conn
+
+    @_conn.setter
+    def _conn(self, value: Optional[sqlite3.Connection]) -> None:
+        self._shared_conn = value
+
+    @staticmethod
+    def _open_connection(db_path: Path) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(db_path),
+            check_same_thread=False,
+            timeout=30.0,
+        )
+        conn.row_factory = sqlite3.Row  # 使用字典式访问
+
+        # 优化性能
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-64000")  # 64MB缓存
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA foreign_keys = ON") # 开启外键约束支持级联删除
+        return conn
+
     def connect(
         self,
         data_dir: Optional[Union[str, Path]] = None,
@@ -100,19 +157,7 @@ class MetadataStore:
         self._db_path = db_path
 
         # 连接数据库
-        self._conn = sqlite3.connect(
-            str(db_path),
-            check_same_thread=False,
-            timeout=30.0,
-        )
-        self._conn.row_factory = sqlite3.Row  # 使用字典式访问
-
-        # 优化性能
-        self._conn.execute("PRAGMA journal_mode=WAL")
-        self._conn.execute("PRAGMA synchronous=NORMAL")
-        self._conn.execute("PRAGMA cache_size=-64000")  # 64MB缓存
-        self._conn.execute("PRAGMA temp_store=MEMORY")
-        self._conn.execute("PRAGMA foreign_keys = ON") # 开启外键约束支持级联删除
+        self._conn = self._open_connection(db_path)
 
         logger.info(f"连接到数据库: {db_path}")
 
@@ -201,11 +246,37 @@ class MetadataStore:
 
     def close(self) -> None:
         """关闭数据库连接"""
-        if self._conn:
-            self._conn.close()
-            self._conn = None
+        if self._shared_conn:
+            self._shared_conn.close()
+            self._shared_conn = None
             logger.info("数据库连接已关闭")
 
+    @contextmanager
+    def batch_transaction(self) -> Iterator["MetadataStore"]:
+        """
+        批量写事务：块内各写方法的逐条 commit 被推迟，退出时统一提交一次。
+
+        事务运行在当前线程专用的连接上，其它线程经共享连接的写入不会并入本事务。
+        块内抛出异常时整体回滚；块内写方法自行回滚时抛出 BatchTransactionAborted
+        并放弃整批。可嵌套，仅最外层负责提交。
+        """
+        if getattr(self._batch_local, "conn", None) is not None:
+            yield self
+            return
+        self._resolve_conn()
+        raw = self._open_connection(self.get_db_path())
+        self._batch_local.conn = _DeferredCommitConnection(raw)
+        try:
+            yield self
+        except BaseException:
+            raw.rollback()
+            raise
+        else:
+            raw.commit()
+        finally:
+            self._batch_local.conn = None
+            raw.close()
+
     def _initialize_tables(self) -> None:
         """初始化数据库表结构"""
         cursor = self._conn.cursor()
@@ -2025,11 +2096,7 @@ class MetadataStore:
             实体哈希值
         """
         # 1. 规范化名称
-        name_normalized = self._canonicalize_name(name)
-        if not name_normalized:
-            raise ValueError("Entity name cannot be empty")
-            
-        hash_value = compute_hash(name_normalized)
+        hash_value = self.compute_entity_hash(name)
         now = datetime.now().timestamp()
 
         cursor = self._conn.cursor()
@@ -2088,6 +2155,15 @@ class MetadataStore:
                 
             return hash_value
 
+    def compute_entity_hash(self, name: str) -> str:
+        """
+        计算实体的稳定 hash（基于规范化名称），不执行写入。
+        """
+        name_normalized = self._canonicalize_name(name)
+        if not name_normalized:
+            raise ValueError("Entity name cannot be empty")
+        return compute_hash(name_normalized)
+
     def add_relation(
         self,
         subject: str,
@@ -13,6 +13,7 @@ from pathlib import Path
 from typing import Optional, Union, Tuple, List, Dict, Set, Any
 import random
 import threading  # Added threading import
+from contextlib import contextmanager
 
 import numpy as np
 
@@ -25,10 +26,137 @@ except ImportError:
 from src.common.logger import get_logger
 from ..utils.quantization import QuantizationType
 from ..utils.io import atomic_write, atomic_save_path
+from .journal import AppendOnlyJournal
 
 logger = get_logger("A_Memorix.VectorStore")
 
 
+class _ReadWriteLock:
+    """
+    读写锁（写优先、写端可重入）
+
+    检索只持有读锁，可并发执行；仅在 Faiss 索引结构被修改时（flush 入索引、删除、重建、加载）
+    才持有写锁，使 add() 的缓冲写入与训练回放不会阻塞在途检索。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            while self._writer is not None or self._waiting_writers > 0:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth -= 1
+                return
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers > 0:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class _RowOffsetTable:
+    """
+    int64 ID -> vectors.bin 行号的偏移表。
+
+    主体为按 ID 排序的 numpy 数组（searchsorted 查找，每行 16 字节），新 flush 的行先进入增量字典，
+    超过阈值后合并回排序数组，避免每次追加都整体重排。
+    """
+
+    MERGE_THRESHOLD = 65536
+
+    def __init__(self):
+        self._keys = np.empty(0, dtype=np.int64)
+        self._rows = np.empty(0, dtype=np.int64)
+        self._delta: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return int(self._keys.shape[0]) + len(self._delta)
+
+    def reset(self, ids: np.ndarray) -> None:
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        self._keys = ids[order]
+        self._rows = order.astype(np.int64)
+        self._delta = {}
+
+    def append(self, ids: np.ndarray, start_row: int) -> None:
+        for offset, id_val in enumerate(np.asarray(ids, dtype=np.int64).tolist()):
+            self._delta[id_val] = start_row + offset
+        if len(self._delta) >= self.MERGE_THRESHOLD:
+            delta_keys = np.fromiter(self._delta.keys(), dtype=np.int64, count=len(self._delta))
+            delta_rows = np.fromiter(self._delta.values(), dtype=np.int64, count=len(self._delta))
+            keys = np.concatenate([self._keys, delta_keys])
+            rows = np.concatenate([self._rows, delta_rows])
+            order = np.argsort(keys, kind="stable")
+            self._keys, self._rows, self._delta = keys[order], rows[order], {}
+
+    def lookup(self, ids: np.ndarray) -> np.ndarray:
+        """批量查找行号，缺失返回 -1。"""
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = np.full(ids.shape, -1, dtype=np.int64)
+        keys = self._keys
+        if keys.shape[0] > 0:
+            pos = np.minimum(np.searchsorted(keys, ids), keys.shape[0] - 1)
+            found = keys[pos] == ids
+            rows[found] = self._rows[pos[found]]
+        delta = self._delta
+        if delta:
+            for i in np.flatnonzero(rows < 0).tolist():
+                rows[i] = delta.get(int(ids[i]), -1)
+        return rows
+
+
 class VectorStore:
     """
     向量存储类 (SQ8 + Append-Only Disk)
@@ -39,6 +167,12 @@ class VectorStore:
     - 内存: 仅索引常驻 RAM (<512MB for 100k vectors)
     - ID: SHA1-based stable int64 IDs
     - 一致性: 强制 L2 Normalization (IP == Cosine)
+    - 并发: 检索只持索引读锁，写缓冲以快照方式参与打分；search_batch 单次 Faiss 调用处理 N 条查询
+    - 分层: 活跃向量数超过 ann_min_vectors 后，warmup_index() 自动升级为 ANN 索引 (IVF-SQ8 / HNSW-SQ8)
+    - 内存映射 (use_mmap): vectors.bin 以 float16 memmap 视图 + ID→行号偏移表访问，
+      SQ8 候选用精确内积重排；回放/自举/压缩直接切片视图，不再整块 read() 拷贝
+    - 增量日志: enable_journal() 后 hash 登记与墓碑写入 vectors_journal.log，commit_journal() 批量落盘，
+      save() 为全量快照并截断日志；load() 回放快照之后的日志并补齐索引
     """
 
     # 默认训练触发阈值 (40 样本，过大可能导致小数据集不生效，过小可能量化退化)
@@ -48,6 +182,12 @@ class VectorStore:
     # 储水池采样上限 (流式处理前 50k 数据)
     RESERVOIR_CAPACITY = 10000
     RESERVOIR_SAMPLE_SCOPE = 50000
+    # ANN 索引层 (none 表示始终使用 Flat-SQ8)
+    ANN_INDEX_TYPES = ("none", "ivf_sq8", "hnsw_sq8")
+    DEFAULT_ANN_MIN_VECTORS = 200000
+    # IVF 每个聚类中心建议的训练样本数 (Faiss 推荐 >= 39)
+    IVF_TRAIN_POINTS_PER_CENTROID = 39
+    ANN_MAX_TRAIN_SIZE = 200000
 
     def __init__(
         self,
@@ -80,8 +220,25 @@ class VectorStore:
         self.index_type = "sq8" 
         self.buffer_size = buffer_size
         self.min_train_threshold = self.DEFAULT_MIN_TRAIN
-
-        self._index: Optional[faiss.IndexIDMap2] = None
+        self.use_mmap = bool(use_mmap)
+        # 量化索引命中后是否用 float16 原始向量精确重排（依赖 use_mmap）
+        self.exact_rerank = True
+        # vectors.bin / vectors_ids.bin 的只读 memmap 视图 (vecs_fp16, ids_be)，仅覆盖已完整写入的行
+        self._disk_view: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._row_table = _RowOffsetTable()
+        self._row_table_rows = 0
+
+        # ANN 分层配置，可通过 configure_ann() 调整
+        self.ann_index_type = "ivf_sq8"
+        self.ann_min_vectors = self.DEFAULT_ANN_MIN_VECTORS
+        self.ann_nlist = 0  # 0 表示按数据量自动推导
+        self.ann_nprobe = 32
+        self.hnsw_m = 32
+        self.hnsw_ef_construction = 80
+        self.hnsw_ef_search = 64
+        self._index_tier = "flat"
+
+        self._index: Optional[faiss.Index] = None
         self._init_index()
 
         self._is_trained = False
@@ -93,20 +250,35 @@ class VectorStore:
         self._init_fallback_index()
         
         self._known_hashes: Set[str] = set()
+        self._id_to_hash: Dict[int, str] = {}
         self._deleted_ids: Set[int] = set()
-        
+
         self._reservoir_buffer: List[np.ndarray] = []
         self._seen_count_for_reservoir = 0
 
         self._write_buffer_vecs: List[np.ndarray] = []
         self._write_buffer_ids: List[int] = []
+        # 写缓冲的只读快照 ((vecs, ids), ...)，整体替换发布，检索无需持有写锁即可读取
+        self._pending_view: Tuple[Tuple[np.ndarray, np.ndarray], ...] = ()
 
         self._total_added = 0
         self._total_deleted = 0
-        self._bin_count = 0 
-        
-        # Thread safety lock
+        self._bin_count = 0
+
+        # Thread safety lock：串行化写入方（add/flush/delete/save/load）
         self._lock = threading.RLock()
+        # 索引读写锁：检索持读锁，索引结构变更持写锁
+        self._index_rw = _ReadWriteLock()
+        # 快照落盘锁：save() 的磁盘写入在 _lock 之外进行，由它串行化并丢弃过期快照
+        self._save_lock = threading.Lock()
+        self._save_generation = 0
+        self._saved_generation = 0
+
+        # 增量日志：仅 enable_journal() 后记录；load() 无论是否启用都会回放已有日志
+        self.journal_enabled = False
+        self._journal: Optional[AppendOnlyJournal] = (
+            AppendOnlyJournal(self.data_dir / "vectors_journal.log") if self.data_dir else None
+        )
 
         logger.info(f"VectorStore Init: dim={dimension}, SQ8 Mode, Append-Only Storage")
 
@@ -118,8 +290,271 @@ class VectorStore:
             faiss.METRIC_INNER_PRODUCT
         )
         self._index = faiss.IndexIDMap2(quantizer)
+        self._index_tier = "flat"
         self._is_trained = False
 
+    def configure_ann(
+        self,
+        index_type: Optional[str] = None,
+        min_vectors: Optional[int] = None,
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construction: Optional[int] = None,
+        hnsw_ef_search: Optional[int] = None,
+    ) -> None:
+        """
+        配置 ANN 索引层。
+
+        检索参数 (nprobe / ef_search) 立即作用于当前索引；索引类型与阈值在下一次 warmup_index() 时生效。
+        """
+        if index_type is not None:
+            normalized = str(index_type or "none").strip().lower()
+            if normalized not in self.ANN_INDEX_TYPES:
+                raise ValueError(f"ann index_type 仅支持 {'/'.join(self.ANN_INDEX_TYPES)}: {index_type}")
+            self.ann_index_type = normalized
+        if min_vectors is not None:
+            self.ann_min_vectors = max(1, int(min_vectors))
+        if nlist is not None:
+            self.ann_nlist = max(0, int(nlist))
+        if nprobe is not None:
+            self.ann_nprobe = max(1, int(nprobe))
+        if hnsw_m is not None:
+            self.hnsw_m = max(4, int(hnsw_m))
+        if hnsw_ef_construction is not None:
+            self.hnsw_ef_construction = max(8, int(hnsw_ef_construction))
+        if hnsw_ef_search is not None:
+            self.hnsw_ef_search = max(1, int(hnsw_ef_search))
+        with self._index_rw.write():
+            self._apply_search_params(self._index, self._index_tier)
+
+    @property
+    def index_tier(self) -> str:
+        """当前主索引层级：flat / ivf_sq8 / hnsw_sq8"""
+        return self._index_tier
+
+    def _resolve_nlist(self, num_vectors: int) -> int:
+        if self.ann_nlist > 0:
+            return int(self.ann_nlist)
+        return int(min(65536, max(16, 4 * int(np.sqrt(max(1, num_vectors))))))
+
+    def _build_ann_index(self, tier: str, nlist: int):
+        """
+        构建未训练的 ANN 索引。
+
+        IVF 原生存储外部 ID 且支持按 ID 删除，直接使用；HNSW 无 ID 能力，外包 IndexIDMap2
+        （IndexIDMap2.remove_ids 依赖内层顺序压缩语义，不能用于 IVF）。
+        """
+        if tier == "ivf_sq8":
+            coarse = faiss.IndexFlatIP(self.dimension)
+            return faiss.IndexIVFScalarQuantizer(
+                coarse,
+                self.dimension,
+                int(nlist),
+                faiss.ScalarQuantizer.QT_8bit,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+        if tier == "hnsw_sq8":
+            inner = faiss.IndexHNSWSQ(
+                self.dimension,
+                faiss.ScalarQuantizer.QT_8bit,
+                int(self.hnsw_m),
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            inner.hnsw.efConstruction = int(self.hnsw_ef_construction)
+            return faiss.IndexIDMap2(inner)
+        raise ValueError(f"unknown ann tier: {tier}")
+
+    def _apply_search_params(self, index: Optional["faiss.Index"], tier: str) -> None:
+        if index is None:
+            return
+        if tier == "ivf_sq8":
+            faiss.extract_index_ivf(index).nprobe = int(self.ann_nprobe)
+        elif tier == "hnsw_sq8":
+            faiss.downcast_index(index.index).hnsw.efSearch = int(self.hnsw_ef_search)
+
+    def _should_promote_ann(self) -> bool:
+        if self.ann_index_type == "none" or self._index_tier == self.ann_index_type:
+            return False
+        live_count = self._bin_count - len(self._deleted_ids)
+        return live_count >= max(1, int(self.ann_min_vectors))
+
+    def _disk_row_count(self) -> int:
+        """vectors.bin 与 vectors_ids.bin 中均已完整写入的行数。"""
+        if self.data_dir is None or not self._bin_path.exists() or not self._ids_bin_path.exists():
+            return 0
+        vec_rows = self._bin_path.stat().st_size // (self.dimension * 2)
+        id_rows = self._ids_bin_path.stat().st_size // 8
+        return int(min(vec_rows, id_rows))
+
+    def _release_disk_view(self) -> None:
+        """释放 memmap（替换/删除文件前必须调用，Windows 下映射中的文件无法被替换）。"""
+        self._disk_view = None
+        self._row_table = _RowOffsetTable()
+        self._row_table_rows = 0
+
+    def _map_disk(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """返回覆盖当前磁盘行数的 memmap 视图（已是最新时复用共享视图，不修改共享状态）。"""
+        rows = self._disk_row_count()
+        if rows == 0:
+            return None
+        view = self._disk_view
+        if view is not None and view[0].shape[0] == rows:
+            return view
+        vecs = np.memmap(self._bin_path, dtype=np.float16, mode="r", shape=(rows, self.dimension))
+        ids = np.memmap(self._ids_bin_path, dtype=">i8", mode="r", shape=(rows,))
+        return vecs, ids
+
+    def _refresh_disk_view(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        按当前文件长度（重新）映射共享视图，并增量维护 ID→行号偏移表。
+
+        检索路径在读锁内读取视图与偏移表，因此本方法只能在索引写锁内调用。
+        """
+        view = self._map_disk()
+        if view is None:
+            self._release_disk_view()
+            return None
+        rows = int(view[0].shape[0])
+        self._disk_view = view
+        if self._row_table_rows > rows:
+            self._row_table_rows = 0
+        if self._row_table_rows == 0:
+            self._row_table.reset(view[1])
+        elif self._row_table_rows < rows:
+            self._row_table.append(view[1][self._row_table_rows:rows], self._row_table_rows)
+        self._row_table_rows = rows
+        return view
+
+    def _iter_disk_batches(self, chunk_size: int = 10000, normalize: bool = True, start: int = 0):
+        """
+        按块遍历磁盘向量（从第 start 行开始），产出 (float32 向量, int64 ID, float16 原始切片)。
+
+        use_mmap 时直接切片 memmap 视图（零拷贝读取，仅在转 float32 时复制当前块）；
+        否则回退为逐块 read()。
+        """
+        if self.data_dir is None or not self._bin_path.exists() or not self._ids_bin_path.exists():
+            return
+        if self.use_mmap:
+            view = self._map_disk()
+            if view is None:
+                return
+            vecs_view, ids_view = view
+            for offset in range(max(0, int(start)), vecs_view.shape[0], chunk_size):
+                batch_fp16 = vecs_view[offset : offset + chunk_size]
+                batch_fp32 = batch_fp16.astype(np.float32)
+                if normalize:
+                    faiss.normalize_L2(batch_fp32)
+                yield batch_fp32, ids_view[offset : offset + chunk_size].astype(np.int64), batch_fp16
+            return
+
+        vec_item_size = self.dimension * 2
+        id_item_size = 8
+        with open(self._bin_path, "rb") as f_vec, open(self._ids_bin_path, "rb") as f_id:
+            if start > 0:
+                f_vec.seek(int(start) * vec_item_size)
+                f_id.seek(int(start) * id_item_size)
+            while True:
+                vec_data = f_vec.read(chunk_size * vec_item_size)
+                id_data = f_id.read(chunk_size * id_item_size)
+                if not vec_data:
+                    break
+                batch_fp16 = np.frombuffer(vec_data, dtype=np.float16).reshape(-1, self.dimension)
+                batch_fp32 = batch_fp16.astype(np.float32)
+                if normalize:
+                    faiss.normalize_L2(batch_fp32)
+                yield batch_fp32, np.frombuffer(id_data, dtype=">i8").astype(np.int64), batch_fp16
+
+    def _deleted_id_array(self) -> Optional[np.ndarray]:
+        """墓碑集合的排序数组快照，供按块向量化过滤；无墓碑时返回 None。"""
+        if not self._deleted_ids:
+            return None
+        return np.sort(np.fromiter(self._deleted_ids, dtype=np.int64, count=len(self._deleted_ids)))
+
+    @staticmethod
+    def _live_mask(batch_ids: np.ndarray, deleted: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """返回未删除行的掩码；无墓碑时返回 None 表示全部保留。"""
+        if deleted is None:
+            return None
+        return ~np.isin(batch_ids, deleted)
+
+    def _sample_training_vectors(self, target: int) -> np.ndarray:
+        """从磁盘均匀抽样训练集（跳过已删除向量）。"""
+        total = max(1, self._bin_count)
+        rate = min(1.0, float(target) / float(total))
+        rng = np.random.default_rng(0)
+        samples: List[np.ndarray] = []
+        deleted = self._deleted_id_array()
+        for batch_fp32, batch_ids, _ in self._iter_disk_batches():
+            keep = rng.random(len(batch_ids)) < rate if rate < 1.0 else np.ones(len(batch_ids), dtype=bool)
+            live = self._live_mask(batch_ids, deleted)
+            if live is not None:
+                keep &= live
+            if keep.any():
+                samples.append(batch_fp32[keep])
+        if not samples:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.ascontiguousarray(np.concatenate(samples, axis=0)[:target])
+
+    def maybe_promote_index(self) -> bool:
+        """运行期检查：活跃向量数越过 ANN 阈值时升级主索引。返回是否发生升级。"""
+        with self._lock:
+            if not self._should_promote_ann():
+                return False
+            return self._promote_ann_unlocked()
+
+    def _promote_ann_unlocked(self) -> bool:
+        """
+        将主索引升级为 ANN 层：在旁路训练并回放磁盘向量，完成后在写锁内原子替换。
+
+        调用方需持有 _lock；构建期间检索继续使用旧索引。
+        """
+        tier = self.ann_index_type
+        self._flush_write_buffer_unlocked()
+        live_count = max(1, self._bin_count - len(self._deleted_ids))
+        nlist = self._resolve_nlist(live_count)
+        if tier == "ivf_sq8":
+            nlist = min(nlist, live_count)
+            train_target = max(self.TRAIN_SIZE, nlist * self.IVF_TRAIN_POINTS_PER_CENTROID)
+        else:
+            train_target = self.TRAIN_SIZE
+        train_target = min(train_target, self.ANN_MAX_TRAIN_SIZE)
+
+        started = time.perf_counter()
+        train_data = self._sample_training_vectors(train_target)
+        if len(train_data) == 0 or (tier == "ivf_sq8" and len(train_data) < nlist):
+            logger.warning(f"ANN 索引训练样本不足: samples={len(train_data)} nlist={nlist}，保持 {self._index_tier}")
+            return False
+
+        new_index = self._build_ann_index(tier, nlist)
+        try:
+            new_index.train(train_data)
+            deleted = self._deleted_id_array()
+            for batch_fp32, batch_ids, _ in self._iter_disk_batches():
+                live = self._live_mask(batch_ids, deleted)
+                if live is not None:
+                    batch_fp32, batch_ids = batch_fp32[live], batch_ids[live]
+                if len(batch_ids) > 0:
+                    new_index.add_with_ids(batch_fp32, batch_ids)
+        except Exception as e:
+            logger.error(f"ANN 索引构建失败: {e}，保持 {self._index_tier}")
+            return False
+
+        self._apply_search_params(new_index, tier)
+        with self._index_rw.write():
+            self._index = new_index
+            self._index_tier = tier
+            self._is_trained = True
+            self._fallback_index.reset()
+        duration_ms = (time.perf_counter() - started) * 1000.0
+        logger.info(
+            "metric.vector_index_ann_promoted=1 "
+            f"tier={tier} nlist={nlist if tier == 'ivf_sq8' else 0} "
+            f"ntotal={new_index.ntotal} train_samples={len(train_data)} "
+            f"duration_ms={duration_ms:.2f}"
+        )
+        return True
+
     def _init_fallback_index(self):
         """初始化 Flat 回退索引"""
         flat_index = faiss.IndexFlatIP(self.dimension)
@@ -143,13 +578,13 @@ class VectorStore:
 
     @property
     def _int_to_str_map(self) -> Dict[int, str]:
-        """Lazy build volatile map from known hashes"""
-        # Note: This is read-heavy and cached, might need lock if _known_hashes updates concurrently
-        # But add/delete are now locked, so checking len mismatch is somewhat safe-ish for quick dirty cache
-        if not hasattr(self, "_cached_map") or len(self._cached_map) != len(self._known_hashes):
-            with self._lock: # Protect cache rebuild
-                 self._cached_map = {self._generate_id(k): k for k in self._known_hashes}
-        return self._cached_map
+        """int64 ID -> 原始 hash 的映射（随 add/load/clear 增量维护）"""
+        return self._id_to_hash
+
+    def _reset_known_hashes(self, hashes) -> None:
+        """整体替换已知 hash 集合，并同步重建 ID 映射。"""
+        self._known_hashes = set(hashes)
+        self._id_to_hash = {self._generate_id(k): k for k in self._known_hashes}
 
     def add(self, vectors: np.ndarray, ids: List[str]) -> int:
         with self._lock:
@@ -161,33 +596,38 @@ class VectorStore:
 
             processed_vecs = []
             processed_int_ids = []
-            
+            processed_hashes = []
+
             for i, str_id in enumerate(ids):
                 if str_id in self._known_hashes:
                     continue
-                
+
                 int_id = self._generate_id(str_id)
                 self._known_hashes.add(str_id)
-                
+                self._id_to_hash[int_id] = str_id
+
                 processed_vecs.append(vectors[i])
                 processed_int_ids.append(int_id)
+                processed_hashes.append(str_id)
 
             if not processed_vecs:
                 return 0
 
+            if self.journal_enabled and self._journal is not None:
+                self._journal.append("add", processed_hashes)
+
             batch_vecs = np.array(processed_vecs, dtype=np.float32)
             batch_ids = np.array(processed_int_ids, dtype=np.int64)
 
+            # 缓冲中的向量由检索路径直接精确打分，flush 时才进入 Faiss 索引（主索引或回退索引）
             self._write_buffer_vecs.append(batch_vecs)
             self._write_buffer_ids.extend(processed_int_ids)
+            self._pending_view = self._pending_view + ((batch_vecs, batch_ids),)
 
             if len(self._write_buffer_ids) >= self.buffer_size:
                 self._flush_write_buffer_unlocked()
 
             if not self._is_trained:
-                # 双写到回退索引
-                self._fallback_index.add_with_ids(batch_vecs, batch_ids)
-                
                 self._update_reservoir(batch_vecs)
                 # 这里的 TRAIN_SIZE 取默认 10k，或者根据当前数据量动态判断
                 if len(self._reservoir_buffer) >= 10000:
@@ -219,11 +659,17 @@ class VectorStore:
             
         self._bin_count += len(batch_ids)
 
-        if self._is_trained and self._index.is_trained:
-            self._index.add_with_ids(batch_vecs, batch_ids)
-        else:
-            # 即使在 flush 时，如果未训练，也要同步到 fallback
-            self._fallback_index.add_with_ids(batch_vecs, batch_ids)
+        # 入索引与清空缓冲快照需在同一写锁区间内完成，保证检索看到的“索引 + 缓冲”无重无漏
+        with self._index_rw.write():
+            if self._is_trained and self._index.is_trained:
+                self._index.add_with_ids(batch_vecs, batch_ids)
+            else:
+                # 未训练时写入 fallback
+                self._fallback_index.add_with_ids(batch_vecs, batch_ids)
+            self._pending_view = ()
+            if self.use_mmap:
+                # 新行已落盘，重映射视图使其可被精确重排读取
+                self._refresh_disk_view()
 
         self._write_buffer_vecs.clear()
         self._write_buffer_ids.clear()
@@ -257,51 +703,36 @@ class VectorStore:
             logger.error(f"SQ8 Training failed: {e}. Staying in fallback mode.")
             return
 
-        self._is_trained = True
         self._reservoir_buffer = []
 
+        # 回放期间 _is_trained 仍为 False，检索继续走 fallback 索引，不会读到半填充的主索引
         logger.info("Replaying data from disk to populate index...")
         try:
-            replay_count = self._replay_vectors_to_index()
-            # 只有当 replay 成功且数据量一致时，才释放回退索引
-            if self._index.ntotal >= self._bin_count:
-                logger.info(f"Replay successful ({self._index.ntotal}/{self._bin_count}). Releasing fallback index.")
-                self._fallback_index.reset()
-            else:
-                logger.warning(f"Replay count mismatch: {self._index.ntotal} vs {self._bin_count}. Keeping fallback index.")
+            self._replay_vectors_to_index()
+            with self._index_rw.write():
+                self._is_trained = True
+                # 只有当 replay 成功且数据量一致时，才释放回退索引
+                if self._index.ntotal >= self._bin_count:
+                    logger.info(f"Replay successful ({self._index.ntotal}/{self._bin_count}). Releasing fallback index.")
+                    self._fallback_index.reset()
+                else:
+                    logger.warning(f"Replay count mismatch: {self._index.ntotal} vs {self._bin_count}. Keeping fallback index.")
         except Exception as e:
+            self._is_trained = True
             logger.error(f"Replay failed: {e}. Keeping fallback index as backup.")
 
     def _replay_vectors_to_index(self) -> int:
         """从 vectors.bin 读取并添加到 index"""
-        if not self._bin_path.exists() or not self._ids_bin_path.exists():
-            return 0
-
-        vec_item_size = self.dimension * 2
-        id_item_size = 8
-        chunk_size = 10000 
-        
-        with open(self._bin_path, "rb") as f_vec, open(self._ids_bin_path, "rb") as f_id:
-            while True:
-                vec_data = f_vec.read(chunk_size * vec_item_size)
-                id_data = f_id.read(chunk_size * id_item_size)
-                
-                if not vec_data:
-                    break
-                
-                batch_fp16 = np.frombuffer(vec_data, dtype=np.float16).reshape(-1, self.dimension)
-                batch_fp32 = batch_fp16.astype(np.float32)
-                faiss.normalize_L2(batch_fp32)
-                
-                batch_ids = np.frombuffer(id_data, dtype='>i8').astype(np.int64)
-                
-                valid_mask = [id_ not in self._deleted_ids for id_ in batch_ids]
-                if not all(valid_mask):
-                    batch_fp32 = batch_fp32[valid_mask]
-                    batch_ids = batch_ids[valid_mask]
-                
-                if len(batch_ids) > 0:
-                    self._index.add_with_ids(batch_fp32, batch_ids)
+        added = 0
+        deleted = self._deleted_id_array()
+        for batch_fp32, batch_ids, _ in self._iter_disk_batches():
+            live = self._live_mask(batch_ids, deleted)
+            if live is not None:
+                batch_fp32, batch_ids = batch_fp32[live], batch_ids[live]
+            if len(batch_ids) > 0:
+                self._index.add_with_ids(batch_fp32, batch_ids)
+                added += len(batch_ids)
+        return added
 
     def search(
         self,
@@ -311,62 +742,135 @@ class VectorStore:
     ) -> Tuple[List[str], List[float]]:
         query_local = np.array(query, dtype=np.float32, order="C", copy=True)
         if query_local.ndim == 1:
-            got_dim = int(query_local.shape[0])
             query_local = query_local.reshape(1, -1)
-        elif query_local.ndim == 2:
-            if query_local.shape[0] != 1:
-                raise ValueError(
-                    f"query embedding must have shape (D,) or (1, D), got {tuple(query_local.shape)}"
-                )
-            got_dim = int(query_local.shape[1])
-        else:
+        elif query_local.ndim != 2 or query_local.shape[0] != 1:
             raise ValueError(
                 f"query embedding must have shape (D,) or (1, D), got {tuple(query_local.shape)}"
             )
+        return self.search_batch(query_local, k=k, filter_deleted=filter_deleted)[0]
 
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        filter_deleted: bool = True,
+    ) -> List[Tuple[List[str], List[float]]]:
+        """
+        批量检索：N 条查询合并为一次 Faiss 调用。
+
+        检索只持有索引读锁，不等待写入方的 _lock；尚未 flush 的写缓冲向量在此直接精确打分合并。
+
+        Args:
+            queries: 形状为 (N, D) 的查询向量
+            k: 每条查询返回数量
+            filter_deleted: 是否过滤已删除 ID
+
+        Returns:
+            与 queries 行序一致的 [(ids, scores), ...]
+        """
+        query_local = np.array(queries, dtype=np.float32, order="C", copy=True)
+        if query_local.ndim != 2:
+            raise ValueError(
+                f"query embeddings must have shape (N, D), got {tuple(query_local.shape)}"
+            )
+        got_dim = int(query_local.shape[1])
         if got_dim != self.dimension:
             raise ValueError(
                 f"query embedding dimension mismatch: expected={self.dimension} got={got_dim}"
             )
+        num_queries = int(query_local.shape[0])
+        if num_queries == 0:
+            return []
         if not np.all(np.isfinite(query_local)):
             raise ValueError("query embedding contains non-finite values")
 
         faiss.normalize_L2(query_local)
+        k = max(1, int(k))
 
         # 查询路径仅负责检索，不在此触发训练/回放。
         # 训练/回放前置到 warmup_index()，并由插件启动阶段触发。
-        # Faiss 索引在并发 search 下可能出现阻塞，这里串行化检索调用保证稳定性。
-        with self._lock:
-            self._flush_write_buffer_unlocked()
-            search_index = self._index if (self._is_trained and self._index.ntotal > 0) else self._fallback_index
-            if search_index.ntotal == 0:
-                logger.warning("Indices are empty. No data to search.")
-                return [], []
-            # 执行检索
-            dists, ids = search_index.search(query_local, k * 2)
-        
-        # Faiss search 返回的是 (1, K) 的数组，取第一行
-        dists = dists[0]
-        ids = ids[0]
-        
-        results = []
-        for id_val, score in zip(ids, dists):
-            if id_val == -1: continue
-            if filter_deleted and id_val in self._deleted_ids:
-                continue
-            
-            str_id = self._int_to_str_map.get(id_val)
-            if str_id:
-                results.append((str_id, float(score)))
+        with self._index_rw.read():
+            pending = self._pending_view
+            use_main = self._is_trained and self._index.ntotal > 0
+            search_index = self._index if use_main else self._fallback_index
+            if search_index.ntotal > 0:
+                dists, ids = search_index.search(query_local, k * 2)
+                if use_main and self.use_mmap and self.exact_rerank:
+                    # SQ8 分数带量化误差，用 float16 原始向量精确重算内积
+                    self._rerank_exact(query_local, ids, dists)
+            else:
+                dists = ids = None
+
+        pending_dists = pending_ids = None
+        if pending:
+            pending_vecs = np.concatenate([vecs for vecs, _ in pending], axis=0)
+            pending_ids_all = np.concatenate([batch_ids for _, batch_ids in pending])
+            scores = query_local @ pending_vecs.T
+            top_n = min(k * 2, scores.shape[1])
+            if top_n < scores.shape[1]:
+                order = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+            else:
+                order = np.tile(np.arange(scores.shape[1]), (num_queries, 1))
+            pending_dists = np.take_along_axis(scores, order, axis=1)
+            pending_ids = pending_ids_all[order]
+
+        if ids is None and pending_ids is None:
+            logger.warning("Indices are empty. No data to search.")
+            return [([], []) for _ in range(num_queries)]
+
+        id_to_hash = self._id_to_hash
+        deleted_ids = self._deleted_ids
+        outputs: List[Tuple[List[str], List[float]]] = []
+        for row in range(num_queries):
+            best: Dict[str, float] = {}
+            candidates = []
+            if ids is not None:
+                candidates.append(zip(ids[row], dists[row], strict=True))
+            if pending_ids is not None:
+                candidates.append(zip(pending_ids[row], pending_dists[row], strict=True))
+            for pairs in candidates:
+                for id_val, score in pairs:
+                    id_val = int(id_val)
+                    if id_val == -1:
+                        continue
+                    if filter_deleted and id_val in deleted_ids:
+                        continue
+                    str_id = id_to_hash.get(id_val)
+                    if not str_id:
+                        continue
+                    score = float(score)
+                    if score > best.get(str_id, float("-inf")):
+                        best[str_id] = score
+
+            # Sort and trim just in case filtering reduced count
+            results = sorted(best.items(), key=lambda x: x[1], reverse=True)[:k]
+            outputs.append(([r[0] for r in results], [r[1] for r in results]))
+        return outputs
+
+    def _rerank_exact(self, queries: np.ndarray, ids: np.ndarray, dists: np.ndarray) -> None:
+        """
+        就地将量化索引返回的候选分数替换为 float16 原始向量上的精确内积。
 
-        # Sort and trim just in case filtering reduced count
-        results.sort(key=lambda x: x[1], reverse=True)
-        results = results[:k]
-        
-        if not results:
-            return [], []
-            
-        return [r[0] for r in results], [r[1] for r in results]
+        需在索引读锁内调用（视图与偏移表只在写锁内更新）；不在视图中的候选保留原分数。
+        """
+        view = self._disk_view
+        if view is None:
+            return
+        flat_ids = ids.reshape(-1)
+        rows = self._row_table.lookup(flat_ids)
+        hit = (flat_ids != -1) & (rows >= 0)
+        if not hit.any():
+            return
+        hit_pos = np.flatnonzero(hit)
+        hit_rows = rows[hit_pos]
+        # 按行号排序后再 gather，对 memmap 更友好
+        order = np.argsort(hit_rows, kind="stable")
+        cand = np.asarray(view[0][hit_rows[order]], dtype=np.float32)
+        faiss.normalize_L2(cand)
+        query_rows = hit_pos[order] // ids.shape[1]
+        exact = np.einsum("ij,ij->i", cand, queries[query_rows])
+        flat_dists = dists.reshape(-1)
+        flat_dists[hit_pos[order]] = exact
 
     def warmup_index(self, force_train: bool = True) -> Dict[str, Any]:
         """
@@ -404,13 +908,19 @@ class VectorStore:
                     and self._bin_count >= min_train
                     and not self._is_trained
                 )
-                if needs_train:
+                needs_ann = bool(force_train) and self._should_promote_ann()
+                if needs_ann:
+                    # 达到 ANN 阈值时直接训练 ANN 层，跳过 Flat-SQ8 训练
+                    if not self._promote_ann_unlocked() and needs_train:
+                        self._force_train_small_data()
+                elif needs_train:
                     self._force_train_small_data()
 
                 duration_ms = (time.perf_counter() - started) * 1000.0
                 summary = {
                     "ok": True,
                     "trained": bool(self._is_trained),
+                    "index_tier": self._index_tier,
                     "index_ntotal": int(self._index.ntotal),
                     "fallback_ntotal": int(self._fallback_index.ntotal),
                     "bin_count": int(self._bin_count),
@@ -422,6 +932,7 @@ class VectorStore:
             summary = {
                 "ok": False,
                 "trained": bool(self._is_trained),
+                "index_tier": getattr(self, "_index_tier", "flat"),
                 "index_ntotal": int(self._index.ntotal) if self._index is not None else 0,
                 "fallback_ntotal": int(self._fallback_index.ntotal) if self._fallback_index is not None else 0,
                 "bin_count": int(getattr(self, "_bin_count", 0)),
@@ -439,6 +950,7 @@ class VectorStore:
             "metric.vector_index_prewarm_success=1 "
             f"metric.vector_index_prewarm_duration_ms={summary['duration_ms']:.2f} "
             f"trained={summary['trained']} "
+            f"index_tier={summary['index_tier']} "
             f"index_ntotal={summary['index_ntotal']} "
             f"fallback_ntotal={summary['fallback_ntotal']} "
             f"bin_count={summary['bin_count']}"
@@ -455,25 +967,19 @@ class VectorStore:
             return
 
         logger.info("Replaying all disk vectors to fallback index...")
-        vec_item_size = self.dimension * 2
-        id_item_size = 8
-        chunk_size = 10000 
-        
-        with open(self._bin_path, "rb") as f_vec, open(self._ids_bin_path, "rb") as f_id:
-            while True:
-                vec_data = f_vec.read(chunk_size * vec_item_size)
-                id_data = f_id.read(chunk_size * id_item_size)
-                if not vec_data: break
-                
-                batch_fp16 = np.frombuffer(vec_data, dtype=np.float16).reshape(-1, self.dimension)
-                batch_fp32 = batch_fp16.astype(np.float32)
-                faiss.normalize_L2(batch_fp32)
-                batch_ids = np.frombuffer(id_data, dtype='>i8').astype(np.int64)
-                
-                valid_mask = [id_ not in self._deleted_ids for id_ in batch_ids]
-                if any(valid_mask):
-                    self._fallback_index.add_with_ids(batch_fp32[valid_mask], batch_ids[valid_mask])
-        
+
+        # 在旁路索引上回放，完成后再原子替换，回放期间不阻塞检索
+        fallback_index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+        deleted = self._deleted_id_array()
+        for batch_fp32, batch_ids, _ in self._iter_disk_batches():
+            live = self._live_mask(batch_ids, deleted)
+            if live is not None:
+                batch_fp32, batch_ids = batch_fp32[live], batch_ids[live]
+            if len(batch_ids) > 0:
+                fallback_index.add_with_ids(batch_fp32, batch_ids)
+
+        with self._index_rw.write():
+            self._fallback_index = fallback_index
         logger.info(f"Fallback index self-bootstrapped with {self._fallback_index.ntotal} items.")
 
     def _force_train_small_data(self):
@@ -482,42 +988,38 @@ class VectorStore:
 
     def _force_train_small_data_unlocked(self):
         logger.info("Forcing training on small dataset...")
-        self._reservoir_buffer = [] 
-        
-        chunk_size = 10000
-        vec_item_size = self.dimension * 2
-        
-        with open(self._bin_path, "rb") as f:
-            while len(self._reservoir_buffer) < self.TRAIN_SIZE:
-                data = f.read(chunk_size * vec_item_size)
-                if not data: break
-                fp16 = np.frombuffer(data, dtype=np.float16).reshape(-1, self.dimension)
-                fp32 = fp16.astype(np.float32)
-                faiss.normalize_L2(fp32)
-                
-                for vec in fp32:
-                    self._reservoir_buffer.append(vec)
-                    if len(self._reservoir_buffer) >= self.TRAIN_SIZE:
-                        break
-        
+        self._reservoir_buffer = []
+
+        for batch_fp32, _, _ in self._iter_disk_batches():
+            need = self.TRAIN_SIZE - len(self._reservoir_buffer)
+            self._reservoir_buffer.extend(batch_fp32[:need])
+            if len(self._reservoir_buffer) >= self.TRAIN_SIZE:
+                break
+
         self._train_and_replay_unlocked()
 
     def delete(self, ids: List[str]) -> int:
         with self._lock:
             count = 0
+            tombstones: List[int] = []
             for str_id in ids:
                 if str_id not in self._known_hashes:
                     continue
                 int_id = self._generate_id(str_id)
                 if int_id not in self._deleted_ids:
                     self._deleted_ids.add(int_id)
-                    if self._index.is_trained:
-                         self._index.remove_ids(np.array([int_id], dtype=np.int64))
-                    # 同步从 fallback 移除
-                    if self._fallback_index.ntotal > 0:
-                         self._fallback_index.remove_ids(np.array([int_id], dtype=np.int64))
+                    with self._index_rw.write():
+                        # HNSW 不支持 remove_ids，仅依赖墓碑过滤，由 GC 重建回收
+                        if self._index.is_trained and self._index_tier != "hnsw_sq8":
+                            self._index.remove_ids(np.array([int_id], dtype=np.int64))
+                        # 同步从 fallback 移除
+                        if self._fallback_index.ntotal > 0:
+                            self._fallback_index.remove_ids(np.array([int_id], dtype=np.int64))
+                    tombstones.append(int_id)
                     count += 1
             self._total_deleted += count
+            if tombstones and self.journal_enabled and self._journal is not None:
+                self._journal.append("delete", tombstones)
             
             # Check GC
             self._check_rebuild_needed()
@@ -533,7 +1035,7 @@ class VectorStore:
 
     def rebuild_index(self):
         """GC: 重建索引，压缩 bin 文件"""
-        with self._lock:
+        with self._lock, self._index_rw.write():
             self._rebuild_index_locked()
 
     def _rebuild_index_locked(self):
@@ -543,32 +1045,19 @@ class VectorStore:
         tmp_bin = self.data_dir / "vectors.bin.tmp"
         tmp_ids = self.data_dir / "vectors_ids.bin.tmp"
         
-        vec_item_size = self.dimension * 2
-        id_item_size = 8
-        chunk_size = 10000
-        
         new_count = 0
-        
+
         # 1. Compact Files
-        with open(self._bin_path, "rb") as f_vec, open(self._ids_bin_path, "rb") as f_id, \
-             open(tmp_bin, "wb") as w_vec, open(tmp_ids, "wb") as w_id:
-            while True:
-                vec_data = f_vec.read(chunk_size * vec_item_size)
-                id_data = f_id.read(chunk_size * id_item_size)
-                if not vec_data: break
-                
-                batch_fp16 = np.frombuffer(vec_data, dtype=np.float16).reshape(-1, self.dimension)
-                batch_ids = np.frombuffer(id_data, dtype='>i8').astype(np.int64)
-                
-                keep_mask = [id_ not in self._deleted_ids for id_ in batch_ids]
-                
-                if any(keep_mask):
-                    keep_vecs = batch_fp16[keep_mask]
-                    keep_ids = batch_ids[keep_mask]
-                    
-                    w_vec.write(keep_vecs.tobytes())
-                    w_id.write(keep_ids.astype('>i8').tobytes())
-                    new_count += len(keep_ids)
+        deleted = self._deleted_id_array()
+        with open(tmp_bin, "wb") as w_vec, open(tmp_ids, "wb") as w_id:
+            for _, batch_ids, batch_fp16 in self._iter_disk_batches(normalize=False):
+                live = self._live_mask(batch_ids, deleted)
+                if live is not None:
+                    batch_fp16, batch_ids = batch_fp16[live], batch_ids[live]
+                if len(batch_ids) > 0:
+                    w_vec.write(np.ascontiguousarray(batch_fp16).tobytes())
+                    w_id.write(batch_ids.astype('>i8').tobytes())
+                    new_count += len(batch_ids)
 
         # 2. Reset State & Atomic Swap
         self._bin_count = new_count
@@ -578,7 +1067,8 @@ class VectorStore:
         if self._fallback_index: self._fallback_index.reset() # Also clear fallback
         self._is_trained = False
         
-        # Swap files
+        # Swap files（先释放 memmap，Windows 下映射中的文件无法被替换）
+        self._release_disk_view()
         shutil.move(str(tmp_bin), str(self._bin_path))
         shutil.move(str(tmp_ids), str(self._ids_bin_path))
         
@@ -590,10 +1080,21 @@ class VectorStore:
         self._init_index()
         self._init_fallback_index() # Re-init fallback too
         self._force_train_small_data() # This will train and replay from the NEW compact file
+        if self._should_promote_ann():
+            self._promote_ann_unlocked()
+        if self.use_mmap:
+            self._refresh_disk_view()
+        if self.journal_enabled and self.data_dir is not None:
+            # 压缩后行号整体变化，日志中的行位置不再可用，直接落一次全量快照
+            self.save()
         
         logger.info("Compaction Complete.")
 
     def save(self, data_dir: Optional[Union[str, Path]] = None) -> None:
+        """
+        全量快照：在 _lock 内只采集索引序列化结果与元数据，落盘在锁外完成，
+        后台快照期间事件循环上的 add/delete 不会被磁盘写入阻塞。
+        """
         with self._lock:
             if not data_dir:
                 data_dir = self.data_dir
@@ -605,24 +1106,42 @@ class VectorStore:
 
             self._flush_write_buffer_unlocked()
 
+            index_bytes = None
             if self._is_trained:
-                index_path = data_dir / "vectors.index"
-                with atomic_save_path(index_path) as tmp:
-                    faiss.write_index(self._index, tmp)
+                with self._index_rw.read():
+                    index_bytes = faiss.serialize_index(self._index)
 
+            journal_seq = self._journal.seq if self._journal is not None else 0
             meta = {
                 "dimension": self.dimension,
                 "quantization_type": self.quantization_type.value,
                 "is_trained": self._is_trained,
+                "index_tier": self._index_tier,
                 "vector_norm": self._vector_norm,
                 "deleted_ids": list(self._deleted_ids),
                 "known_hashes": list(self._known_hashes),
+                "bin_count": int(self._bin_count),
+                "journal_seq": journal_seq,
             }
-            
+            self._save_generation += 1
+            generation = self._save_generation
+
+        with self._save_lock:
+            # 并发快照时较早采集的结果可能更晚拿到写锁，此时跳过，避免旧快照覆盖新快照
+            if generation < self._saved_generation:
+                return
+            if index_bytes is not None:
+                with atomic_save_path(data_dir / "vectors.index") as tmp:
+                    index_bytes.tofile(tmp)
+
             with atomic_write(data_dir / "vectors_metadata.pkl", "wb") as f:
                 pickle.dump(meta, f)
-                
-            logger.info("VectorStore saved.")
+
+            if self._journal is not None and data_dir == self.data_dir:
+                self._journal.truncate_through(journal_seq)
+            self._saved_generation = generation
+
+        logger.info("VectorStore saved.")
 
     def migrate_legacy_npy(self, data_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
         """
@@ -647,21 +1166,24 @@ class VectorStore:
                 return {"migrated": False, "reason": "bin_exists"}
 
             # Reset in-memory state to avoid appending to stale runtime buffers.
-            self._known_hashes.clear()
-            self._deleted_ids.clear()
-            self._write_buffer_vecs.clear()
-            self._write_buffer_ids.clear()
-            self._init_index()
-            self._init_fallback_index()
-            self._is_trained = False
-            self._bin_count = 0
+            with self._index_rw.write():
+                self._reset_known_hashes(())
+                self._deleted_ids.clear()
+                self._write_buffer_vecs.clear()
+                self._write_buffer_ids.clear()
+                self._pending_view = ()
+                self._init_index()
+                self._init_fallback_index()
+                self._is_trained = False
+                self._bin_count = 0
+                self._release_disk_view()
 
             self._migrate_from_npy_unlocked(npy_path, idx_path, target_dir)
             self.save(target_dir)
             return {"migrated": True, "reason": "ok"}
 
     def load(self, data_dir: Optional[Union[str, Path]] = None) -> None:
-        with self._lock:
+        with self._lock, self._index_rw.write():
             if not data_dir: data_dir = self.data_dir
             data_dir = Path(data_dir)
             
@@ -676,8 +1198,16 @@ class VectorStore:
                 )
 
             meta_path = data_dir / "vectors_metadata.pkl"
+            replay_journal = self._journal is not None and data_dir == self.data_dir
             if not meta_path.exists():
-                logger.warning("No metadata found, initialized empty.")
+                if replay_journal and self._journal.path.exists():
+                    # 尚无快照：仅凭日志恢复 hash/墓碑，索引由 warmup_index() 从磁盘自举
+                    self._replay_journal_unlocked(0)
+                    if bin_path.exists():
+                        self._bin_count = bin_path.stat().st_size // (self.dimension * 2)
+                    logger.info("No metadata found, state recovered from journal.")
+                else:
+                    logger.warning("No metadata found, initialized empty.")
                 return
                 
             with open(meta_path, "rb") as f:
@@ -685,8 +1215,10 @@ class VectorStore:
                 
             if meta.get("vector_norm") != "l2":
                 logger.warning("Index IDMap2 version mismatch (L2 Norm), forcing rebuild...")
-                self._known_hashes = set(meta.get("ids", [])) | set(meta.get("known_hashes", []))
+                self._reset_known_hashes(set(meta.get("ids", [])) | set(meta.get("known_hashes", [])))
                 self._deleted_ids = set(meta.get("deleted_ids", []))
+                if replay_journal:
+                    self._replay_journal_unlocked(int(meta.get("journal_seq", 0) or 0))
                 self._init_index()
                 self._force_train_small_data()
                 return
@@ -694,16 +1226,30 @@ class VectorStore:
             self._is_trained = meta.get("is_trained", False)
             self._vector_norm = meta.get("vector_norm", "l2")
             self._deleted_ids = set(meta.get("deleted_ids", []))
-            self._known_hashes = set(meta.get("known_hashes", []))
+            self._reset_known_hashes(meta.get("known_hashes", []))
+            # 先回放日志再装载索引，这样重建路径能直接看到完整的墓碑集合
+            journal_deleted: List[int] = []
+            if replay_journal:
+                journal_deleted = self._replay_journal_unlocked(int(meta.get("journal_seq", 0) or 0))
+
+            disk_rows = bin_path.stat().st_size // (self.dimension * 2) if bin_path.exists() else 0
+            # 快照索引覆盖的磁盘行数；旧版快照无此字段，视为已覆盖全部行
+            snapshot_rows = int(meta.get("bin_count", disk_rows) or 0)
+            index_loaded = False
             
             if self._is_trained:
                 if idx_path.exists():
                     try:
                         self._index = faiss.read_index(str(idx_path))
-                        if not isinstance(self._index, faiss.IndexIDMap2):
+                        if not isinstance(self._index, (faiss.IndexIDMap2, faiss.IndexIVF)):
                             logger.warning("Loaded index type mismatch. Rebuilding...")
                             self._init_index()
                             self._force_train_small_data()
+                        else:
+                            tier = str(meta.get("index_tier", "flat") or "flat")
+                            self._index_tier = tier if tier in self.ANN_INDEX_TYPES else "flat"
+                            self._apply_search_params(self._index, self._index_tier)
+                            index_loaded = True
                     except Exception as e:
                          logger.error(f"Failed to load index: {e}. Rebuilding...")
                          self._init_index()
@@ -714,7 +1260,77 @@ class VectorStore:
                     self._force_train_small_data()
             
             if bin_path.exists():
-                self._bin_count = bin_path.stat().st_size // (self.dimension * 2)
+                self._bin_count = disk_rows
+
+            if index_loaded:
+                self._catch_up_index_unlocked(snapshot_rows, journal_deleted)
+
+            self._release_disk_view()
+            if self.use_mmap:
+                self._refresh_disk_view()
+
+    def _replay_journal_unlocked(self, after_seq: int) -> List[int]:
+        """回放快照之后的日志记录，返回日志中新增的墓碑 ID。"""
+        deleted: List[int] = []
+        replayed = 0
+        for _, op, payload in self._journal.replay(after_seq):
+            if op == "add":
+                for str_id in payload:
+                    self._known_hashes.add(str_id)
+                    self._id_to_hash[self._generate_id(str_id)] = str_id
+            elif op == "delete":
+                for int_id in payload:
+                    if int_id not in self._deleted_ids:
+                        self._deleted_ids.add(int_id)
+                        deleted.append(int_id)
+            replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} journal records (after seq={after_seq}).")
+        return deleted
+
+    def _catch_up_index_unlocked(self, snapshot_rows: int, deleted: List[int]) -> None:
+        """将快照之后追加到磁盘的向量补入已装载索引，并移除日志中的墓碑。"""
+        added = 0
+        live_deleted = self._deleted_id_array()
+        for batch_fp32, batch_ids, _ in self._iter_disk_batches(start=snapshot_rows):
+            live = self._live_mask(batch_ids, live_deleted)
+            if live is not None:
+                batch_fp32, batch_ids = batch_fp32[live], batch_ids[live]
+            if len(batch_ids) > 0:
+                self._index.add_with_ids(batch_fp32, batch_ids)
+                added += len(batch_ids)
+        # HNSW 不支持 remove_ids，仅依赖墓碑过滤
+        if deleted and self._index_tier != "hnsw_sq8":
+            self._index.remove_ids(np.asarray(deleted, dtype=np.int64))
+        if added or deleted:
+            logger.info(f"Index caught up from journal: +{added} vectors, -{len(deleted)} tombstones.")
+
+    def enable_journal(self, fsync_interval: float = 1.0) -> None:
+        """
+        开启增量日志：之后的 add/delete 只追加日志记录，由 commit_journal() 批量落盘，
+        避免每次写入都全量重写 vectors_metadata.pkl 与 vectors.index。
+        """
+        if self._journal is None:
+            raise ValueError("No data_dir")
+        self._journal.fsync_interval = max(0.0, float(fsync_interval))
+        self.journal_enabled = True
+
+    def commit_journal(self, force_fsync: bool = False) -> int:
+        """
+        提交增量：写缓冲先追加到 vectors.bin，再写入对应的日志记录。
+
+        Returns:
+            本次写入的日志记录数
+        """
+        with self._lock:
+            self._flush_write_buffer_unlocked()
+            if self._journal is None:
+                return 0
+            return self._journal.commit(force_fsync=force_fsync)
+
+    @property
+    def journal_size_bytes(self) -> int:
+        return self._journal.size_bytes if self._journal is not None else 0
 
     def _migrate_from_npy(self, npy_path, idx_path, data_dir):
         with self._lock:
@@ -755,17 +1371,30 @@ class VectorStore:
         logger.info("Migration complete.")
 
     def clear(self) -> None:
-        with self._lock:
+        with self._lock, self._index_rw.write():
+            self._release_disk_view()
             self._ids_bin_path.unlink(missing_ok=True)
             self._bin_path.unlink(missing_ok=True)
             self._init_index()
-            self._known_hashes.clear()
+            self._init_fallback_index()
+            self._write_buffer_vecs.clear()
+            self._write_buffer_ids.clear()
+            self._pending_view = ()
+            self._reset_known_hashes(())
             self._deleted_ids.clear()
             self._bin_count = 0
+            with self._save_lock:
+                # 清空前采集的快照不得再落盘
+                self._save_generation += 1
+                self._saved_generation = self._save_generation
+            if self._journal is not None:
+                self._journal.reset()
             logger.info("VectorStore cleared.")
 
     def has_data(self) -> bool:
-        return (self.data_dir / "vectors_metadata.pkl").exists()
+        if (self.data_dir / "vectors_metadata.pkl").exists():
+            return True
+        return self.journal_size_bytes > 0
 
     @property
     def num_vectors(self) -> int:
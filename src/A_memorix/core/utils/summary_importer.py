@@ -414,6 +414,39 @@ class SummaryImporter:
             logger.warning(f"非法 summarization.default_knowledge_type={type_str}，回退 narrative")
             knowledge_type = KnowledgeType.NARRATIVE
 
+        plugin_instance = self.plugin_config.get("plugin_instance") if isinstance(self.plugin_config, dict) else None
+        rv_cfg = self.plugin_config.get("retrieval", {}).get("relation_vectorization", {})
+        if not isinstance(rv_cfg, dict):
+            rv_cfg = {}
+        write_vector = bool(rv_cfg.get("enabled", False)) and bool(rv_cfg.get("write_on_import", True))
+
+        # 运行时提供批量写入管线时走单事务 + 批量 embedding 路径
+        batch_writer = getattr(plugin_instance, "ingest_batch", None)
+        if callable(batch_writer):
+            result = await batch_writer(
+                [
+                    {
+                        "source_type": "chat_summary",
+                        "chat_id": stream_id,
+                        "text": summary,
+                        "source": f"chat_summary:{stream_id}",
+                        "knowledge_type": knowledge_type.value,
+                        "time_meta": time_meta or {},
+                        "metadata": metadata or {},
+                        "entities": [str(item) for item in entities or [] if str(item or "").strip()],
+                        "relations": [rel for rel in relations or [] if isinstance(rel, dict)],
+                        "enqueue_episode": False,
+                    }
+                ],
+                respect_filter=False,
+                write_relation_vectors=write_vector,
+            )
+            for item in result.get("items", []):
+                if item.get("warnings"):
+                    logger.warning(f"总结导入段落进入回退写入: {item}")
+            logger.info(f"总结导入完成(批量): stored={result.get('stored_count', 0)} skipped={result.get('skipped_count', 0)}")
+            return
+
         # 导入总结文本
         hash_value = self.metadata_store.add_paragraph(
             content=summary,
@@ -423,7 +456,6 @@ class SummaryImporter:
             time_meta=time_meta,
         )
 
-        plugin_instance = self.plugin_config.get("plugin_instance") if isinstance(self.plugin_config, dict) else None
         vector_writer = getattr(plugin_instance, "write_paragraph_vector_or_enqueue", None)
         if callable(vector_writer):
             result = await vector_writer(
@@ -451,10 +483,6 @@ class SummaryImporter:
             self.graph_store.add_nodes(entities)
 
         # 导入关系
-        rv_cfg = self.plugin_config.get("retrieval", {}).get("relation_vectorization", {})
-        if not isinstance(rv_cfg, dict):
-            rv_cfg = {}
-        write_vector = bool(rv_cfg.get("enabled", False)) and bool(rv_cfg.get("write_on_import", True))
         for rel in relations:
             s, p, o = rel.get("subject"), rel.get("predicate"), rel.get("object")
             if all([s, p, o]):
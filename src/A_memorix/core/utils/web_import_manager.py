@@ -33,6 +33,7 @@ from ..storage import (
     MetadataStore,
 )
 from ..storage.type_detection import looks_like_quote_text
+from ..utils.hash import compute_hash
 from ..utils.import_payloads import (
     ImportPayloadValidationError,
     is_probable_hash_token,
@@ -84,6 +85,7 @@ CHUNK_STATUS = {
 }
 
 FILE_WARNING_KEEP_LIMIT = 50
+TEXT_INGEST_BATCH_SIZE = 128
 
 
 def _now() -> float:
@@ -2658,6 +2660,10 @@ class ImportTaskManager:
         if task.params["llm_enabled"]:
             model_cfg = await self._select_model()
 
+        # 运行时提供 ingest_batch 时，分块写入先缓冲，再按批走单事务 + 批量 embedding
+        pending_writes: Optional[List[Tuple[str, Dict[str, Any]]]] = (
+            [] if callable(getattr(self.plugin, "ingest_batch", None)) else None
+        )
         jobs = []
         for chunk in selected_chunks:
             jobs.append(
@@ -2672,10 +2678,13 @@ class ImportTaskManager:
                         chunk_semaphore=chunk_semaphore,
                         chat_log=bool(task.params.get("chat_log")),
                         chat_reference_time=str(task.params.get("chat_reference_time") or "").strip() or None,
+                        pending_writes=pending_writes,
                     )
                 )
             )
         await asyncio.gather(*jobs, return_exceptions=True)
+        if pending_writes:
+            await self._flush_text_ingest_batch(task_id, file_record, pending_writes)
 
         if await self._is_cancel_requested(task_id):
             await self._set_file_cancelled(task_id, file_record.file_id, "任务已取消")
@@ -2718,6 +2727,7 @@ class ImportTaskManager:
         chunk_semaphore: asyncio.Semaphore,
         chat_log: bool = False,
         chat_reference_time: Optional[str] = None,
+        pending_writes: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
     ) -> None:
         async with chunk_semaphore:
             chunk_id = chunk.chunk.chunk_id
@@ -2760,6 +2770,15 @@ class ImportTaskManager:
                         model_cfg,
                         reference_time=chat_reference_time,
                     )
+                if pending_writes is not None:
+                    item = self._build_chunk_ingest_item(task_id, file_record, processed, time_meta=time_meta)
+                    if item is None:
+                        await self._set_chunk_completed(task_id, file_record.file_id, chunk_id)
+                        return
+                    pending_writes.append((chunk_id, item))
+                    if len(pending_writes) >= TEXT_INGEST_BATCH_SIZE:
+                        await self._flush_text_ingest_batch(task_id, file_record, pending_writes)
+                    return
                 async with self._storage_lock:
                     await self._persist_processed_chunk(file_record, processed, time_meta=time_meta)
                 await self._set_chunk_completed(task_id, file_record.file_id, chunk_id)
@@ -3145,6 +3164,16 @@ class ImportTaskManager:
                 f"web_import text paragraph 向量写入降级: hash={para_hash[:8]} detail={vector_result.get('detail')}"
             )
 
+        entities, relations = self._collect_chunk_graph(processed)
+        for name in entities:
+            await self._add_entity_with_vector(name, source_paragraph=para_hash)
+
+        for s, p, o in relations:
+            await self._add_relation(s, p, o, source_paragraph=para_hash)
+
+    @staticmethod
+    def _collect_chunk_graph(processed: ProcessedChunk) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+        """从抽取结果收集去重实体与关系三元组。"""
         data = processed.data or {}
         entities: List[str] = []
         relations: List[Tuple[str, str, str]] = []
@@ -3172,11 +3201,71 @@ class ImportTaskManager:
                     entities.append(name)
 
         uniq_entities = list({x.strip().lower(): x.strip() for x in entities if str(x).strip()}.values())
-        for name in uniq_entities:
-            await self._add_entity_with_vector(name, source_paragraph=para_hash)
+        return uniq_entities, relations
 
+    def _build_chunk_ingest_item(
+        self,
+        task_id: str,
+        file_record: ImportFileRecord,
+        processed: ProcessedChunk,
+        *,
+        time_meta: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """将分块抽取结果转换为 ingest_batch 条目；疑似哈希段落返回 None。"""
+        content = str(processed.chunk.text or "")
+        if is_probable_hash_token(content):
+            logger.warning("跳过疑似哈希段落写入: source=%s preview=%s", self._source_label(file_record), content[:32])
+            return None
+        entities, relations = self._collect_chunk_graph(processed)
+        kept_relations: List[Dict[str, Any]] = []
         for s, p, o in relations:
-            await self._add_relation(s, p, o, source_paragraph=para_hash)
+            if any(is_probable_hash_token(token) for token in (s, p, o)):
+                logger.warning("跳过疑似哈希关系写入: %s | %s | %s", s[:24], p[:24], o[:24])
+                continue
+            kept_relations.append({"subject": s, "predicate": p, "object": o, "confidence": 1.0, "metadata": {}})
+        return {
+            "external_id": compute_hash(f"web_import:{task_id}:{file_record.file_id}:{processed.chunk.chunk_id}"),
+            "source_type": "web_import",
+            "text": content,
+            "source": self._source_label(file_record),
+            "knowledge_type": _storage_type_from_strategy(processed.type),
+            "time_meta": time_meta or {},
+            "entities": [name for name in entities if not is_probable_hash_token(name)],
+            "relations": kept_relations,
+            "enqueue_episode": False,
+        }
+
+    async def _flush_text_ingest_batch(
+        self,
+        task_id: str,
+        file_record: ImportFileRecord,
+        pending_writes: List[Tuple[str, Dict[str, Any]]],
+    ) -> None:
+        async with self._storage_lock:
+            batch = list(pending_writes)
+            pending_writes.clear()
+            error = ""
+            if batch:
+                try:
+                    await self.plugin.ingest_batch(
+                        [item for _, item in batch],
+                        respect_filter=False,
+                        embed_entities=True,
+                        write_relation_vectors=self._relation_write_vector_enabled(),
+                    )
+                except Exception as e:
+                    error = str(e)
+        for chunk_id, _ in batch:
+            if error:
+                await self._set_chunk_failed(task_id, file_record.file_id, chunk_id, f"写入失败: {error}")
+            else:
+                await self._set_chunk_completed(task_id, file_record.file_id, chunk_id)
+
+    def _relation_write_vector_enabled(self) -> bool:
+        rv_cfg = self.plugin.get_config("retrieval.relation_vectorization", {}) or {}
+        if not isinstance(rv_cfg, dict):
+            rv_cfg = {}
+        return bool(rv_cfg.get("enabled", False)) and bool(rv_cfg.get("write_on_import", True))
 
     async def _add_entity_with_vector(self, name: str, source_paragraph: str = "") -> str:
         name_token = str(name or "").strip()
@@ -3217,10 +3306,7 @@ class ImportTaskManager:
 
         await self._add_entity_with_vector(subject_token, source_paragraph=source_paragraph)
         await self._add_entity_with_vector(object_token, source_paragraph=source_paragraph)
-        rv_cfg = self.plugin.get_config("retrieval.relation_vectorization", {}) or {}
-        if not isinstance(rv_cfg, dict):
-            rv_cfg = {}
-        write_vector = bool(rv_cfg.get("enabled", False)) and bool(rv_cfg.get("write_on_import", True))
+        write_vector = self._relation_write_vector_enabled()
 
         relation_service = getattr(self.plugin, "relation_write_service", None)
         if relation_service is not None:
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+A_Memorix 图路径搜索基准脚本。
+
+在合成无标度图（Barabási–Albert 优先连接）上对比：
+1. 旧版单向 BFS（列表队列 + 每条队列项复制整条路径）
+2. 当前 GraphStore.find_paths（双向 BFS 剪枝 + 父指针枚举）
+
+报告两者的 p50 / p95 / p99 延迟、命中率，以及结果是否一致（旧版未触及扩展上限时应完全一致）。
+
+示例：
+    python benchmark_graph_paths.py --num-nodes 50000 --edges-per-node 4 --max-depth 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+import _bootstrap  # noqa: F401
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="对比 A_Memorix 图路径搜索新旧实现的延迟")
+    parser.add_argument("--num-nodes", type=int, default=20000, help="合成图节点数量")
+    parser.add_argument("--edges-per-node", type=int, default=3, help="优先连接时每个新节点连出的边数")
+    parser.add_argument("--num-queries", type=int, default=200, help="查询数量")
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--max-paths", type=int, default=5)
+    parser.add_argument("--max-expansions", type=int, default=20000)
+    parser.add_argument("--hub-queries", action="store_true", help="查询端点偏向高度数枢纽节点")
+    parser.add_argument("--skip-legacy", action="store_true", help="只测当前实现")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    return parser
+
+
+# --help/-h fast path: avoid heavy host/plugin bootstrap
+if any(arg in {"-h", "--help"} for arg in sys.argv[1:]):
+    _build_arg_parser().print_help()
+    sys.exit(0)
+
+try:
+    from A_memorix.core.storage.graph_store import GraphStore
+except Exception as e:  # pragma: no cover
+    print(f"❌ 导入核心模块失败: {e}")
+    sys.exit(1)
+
+
+def _scale_free_edges(num_nodes: int, m: int, rng: np.random.Generator) -> List[Tuple[str, str]]:
+    edges: List[Tuple[str, str]] = []
+    repeated: List[int] = []
+    targets = list(range(m))
+    for node in range(m, num_nodes):
+        for target in set(targets):
+            edges.append((f"n{node}", f"n{target}"))
+        repeated.extend(targets)
+        repeated.extend([node] * m)
+        targets = [repeated[i] for i in rng.integers(0, len(repeated), size=m)]
+    return edges
+
+
+def _legacy_find_paths(
+    store: GraphStore,
+    start_node: str,
+    end_node: str,
+    max_depth: int,
+    max_paths: int,
+    max_expansions: int,
+) -> List[List[str]]:
+    """旧版实现的逐行复刻，作为对照组。"""
+    start_idx = store._node_to_idx[store._canonicalize(start_node)]
+    end_idx = store._node_to_idx[store._canonicalize(end_node)]
+    store._ensure_adjacency_T()
+    queue = [(start_idx, [start_idx])]
+    found_paths: List[List[str]] = []
+    unique_paths = set()
+    expansions = 0
+    while queue:
+        curr, path = queue.pop(0)
+        if len(path) > max_depth + 1:
+            continue
+        if curr == end_idx:
+            path_names = [store._nodes[i] for i in path]
+            if tuple(path_names) not in unique_paths:
+                found_paths.append(path_names)
+                unique_paths.add(tuple(path_names))
+            if len(found_paths) >= max_paths:
+                break
+            continue
+        if expansions >= max_expansions:
+            break
+        expansions += 1
+        neighbors = np.concatenate(
+            (
+                store._row_neighbor_indices(store._adjacency, curr),
+                store._row_neighbor_indices(store._adjacency_T, curr),
+            )
+        )
+        seen_in_path = set(path)
+        queued_neighbors = set()
+        for neighbor_idx in neighbors:
+            neighbor = int(neighbor_idx)
+            if neighbor not in seen_in_path and neighbor not in queued_neighbors:
+                queue.append((neighbor, path + [neighbor]))
+                queued_neighbors.add(neighbor)
+    return found_paths
+
+
+def _queries(store: GraphStore, args: argparse.Namespace, rng: np.random.Generator) -> List[Tuple[str, str]]:
+    n = len(store._nodes)
+    if args.hub_queries:
+        degrees = np.asarray((store._adjacency + store._adjacency.T).getnnz(axis=1), dtype=np.float64)
+        probs = degrees / degrees.sum()
+        pairs = rng.choice(n, size=(args.num_queries, 2), p=probs)
+    else:
+        pairs = rng.integers(0, n, size=(args.num_queries, 2))
+    return [(store._nodes[a], store._nodes[b]) for a, b in pairs]
+
+
+def _measure(fn, queries: List[Tuple[str, str]]) -> Tuple[Dict[str, Any], List[List[List[str]]]]:
+    latencies: List[float] = []
+    outputs: List[List[List[str]]] = []
+    for start, end in queries:
+        started = time.perf_counter()
+        outputs.append(fn(start, end))
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    lat = np.asarray(latencies)
+    return (
+        {
+            "p50_ms": float(np.percentile(lat, 50)),
+            "p95_ms": float(np.percentile(lat, 95)),
+            "p99_ms": float(np.percentile(lat, 99)),
+            "total_ms": float(lat.sum()),
+            "hit_rate": sum(1 for item in outputs if item) / max(1, len(outputs)),
+        },
+        outputs,
+    )
+
+
+def main() -> int:
+    args = _build_arg_parser().parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    started = time.perf_counter()
+    store = GraphStore()
+    store.add_edges(_scale_free_edges(args.num_nodes, args.edges_per_node, rng))
+    build_ms = (time.perf_counter() - started) * 1000.0
+    queries = _queries(store, args, rng)
+    limits = {"max_depth": args.max_depth, "max_paths": args.max_paths, "max_expansions": args.max_expansions}
+
+    report: Dict[str, Any] = {
+        "num_nodes": store.num_nodes,
+        "num_edges": store.num_edges,
+        "num_queries": len(queries),
+        "build_ms": build_ms,
+        **limits,
+        "results": [],
+    }
+
+    current, current_out = _measure(lambda s, e: store.find_paths(s, e, **limits), queries)
+    report["results"].append({"impl": "bidirectional", **current})
+
+    if not args.skip_legacy:
+        legacy, legacy_out = _measure(lambda s, e: _legacy_find_paths(store, s, e, **limits), queries)
+        legacy["identical"] = sum(1 for a, b in zip(legacy_out, current_out, strict=True) if a == b) / max(1, len(queries))
+        report["results"].append({"impl": "legacy_bfs", **legacy})
+
+    print(
+        f"nodes={report['num_nodes']} edges={report['num_edges']} queries={len(queries)} "
+        f"depth={args.max_depth} build_ms={build_ms:.1f}"
+    )
+    print(f"{'impl':<14} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'total_ms':>10} {'hit':>6} {'same':>6}")
+    for row in report["results"]:
+        same = f"{row['identical']:.2f}" if "identical" in row else "-"
+        print(
+            f"{row['impl']:<14} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f} "
+            f"{row['total_ms']:>10.1f} {row['hit_rate']:>6.2f} {same:>6}"
+        )
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+A_Memorix 向量索引基准脚本。
+
+在合成数据上对比 Flat-SQ8（当前默认层）与 ANN 层（IVF-SQ8 / HNSW-SQ8）的：
+1. recall@k（以精确内积 Flat 检索为真值）
+2. 单查询延迟 p50 / p95 / p99
+3. search_batch 吞吐 (QPS)
+
+示例：
+    python benchmark_vector_index.py --num-vectors 300000 --dimension 384 --nprobe 16 32 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+import _bootstrap  # noqa: F401
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="对比 A_Memorix Flat-SQ8 与 ANN 向量索引的召回率与延迟")
+    parser.add_argument("--num-vectors", type=int, default=200000, help="合成向量数量")
+    parser.add_argument("--dimension", type=int, default=384, help="向量维度")
+    parser.add_argument("--num-queries", type=int, default=500, help="查询数量")
+    parser.add_argument("--clusters", type=int, default=256, help="合成数据的簇数量（模拟语义聚集）")
+    parser.add_argument("--top-k", type=int, default=10, help="recall@k 的 k")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF 聚类数（0 为自动）")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 32, 64], help="IVF nprobe 取值列表")
+    parser.add_argument("--hnsw", action="store_true", help="额外测试 HNSW-SQ8")
+    parser.add_argument("--hnsw-ef-search", type=int, nargs="+", default=[64, 128], help="HNSW efSearch 取值列表")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    return parser
+
+
+# --help/-h fast path: avoid heavy host/plugin bootstrap
+if any(arg in {"-h", "--help"} for arg in sys.argv[1:]):
+    _build_arg_parser().print_help()
+    sys.exit(0)
+
+try:
+    import faiss
+
+    from A_memorix.core.storage.vector_store import VectorStore
+except Exception as e:  # pragma: no cover
+    print(f"❌ 导入核心模块失败: {e}")
+    sys.exit(1)
+
+
+def _synthetic_data(args: argparse.Namespace) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(args.seed)
+    centers = rng.standard_normal((args.clusters, args.dimension)).astype(np.float32)
+    labels = rng.integers(0, args.clusters, size=args.num_vectors)
+    data = centers[labels] + 0.35 * rng.standard_normal((args.num_vectors, args.dimension)).astype(np.float32)
+    query_labels = rng.integers(0, args.clusters, size=args.num_queries)
+    queries = centers[query_labels] + 0.35 * rng.standard_normal((args.num_queries, args.dimension)).astype(np.float32)
+    faiss.normalize_L2(data)
+    faiss.normalize_L2(queries)
+    return data, queries
+
+
+def _ground_truth(data: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    exact = faiss.IndexFlatIP(data.shape[1])
+    exact.add(data)
+    _, ids = exact.search(queries, k)
+    return [set(int(i) for i in row) for row in ids]
+
+
+def _measure(store: VectorStore, queries: np.ndarray, truth: List[set], k: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    hits = 0
+    for row, query in enumerate(queries):
+        started = time.perf_counter()
+        ids, _ = store.search(query, k=k)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        hits += len(truth[row] & {int(item[1:]) for item in ids})
+
+    started = time.perf_counter()
+    store.search_batch(queries, k=k)
+    batch_seconds = time.perf_counter() - started
+
+    lat = np.asarray(latencies)
+    return {
+        "recall_at_k": hits / float(k * len(queries)),
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "batch_qps": len(queries) / max(batch_seconds, 1e-9),
+    }
+
+
+def _build_store(data_dir: Path, data: np.ndarray, index_type: str) -> tuple[VectorStore, float]:
+    store = VectorStore(dimension=data.shape[1], data_dir=data_dir, buffer_size=8192)
+    store.configure_ann(index_type=index_type, min_vectors=1 if index_type != "none" else None)
+    ids = [f"v{i}" for i in range(len(data))]
+    for start in range(0, len(data), 8192):
+        store.add(data[start : start + 8192], ids[start : start + 8192])
+    started = time.perf_counter()
+    store.warmup_index(force_train=True)
+    return store, (time.perf_counter() - started) * 1000.0
+
+
+def main() -> int:
+    args = _build_arg_parser().parse_args()
+    data, queries = _synthetic_data(args)
+    truth = _ground_truth(data, queries, args.top_k)
+    report: Dict[str, Any] = {
+        "num_vectors": args.num_vectors,
+        "dimension": args.dimension,
+        "num_queries": args.num_queries,
+        "top_k": args.top_k,
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="amx_vec_bench_") as tmp:
+        tmp_dir = Path(tmp)
+
+        flat_store, build_ms = _build_store(tmp_dir / "flat", data, "none")
+        row = {"tier": "flat_sq8", "build_ms": build_ms, **_measure(flat_store, queries, truth, args.top_k)}
+        report["results"].append(row)
+        del flat_store
+
+        ivf_store, build_ms = _build_store(tmp_dir / "ivf", data, "ivf_sq8")
+        if args.nlist > 0:
+            ivf_store.configure_ann(nlist=args.nlist)
+        for nprobe in args.nprobe:
+            ivf_store.configure_ann(nprobe=nprobe)
+            row = {
+                "tier": "ivf_sq8",
+                "nprobe": nprobe,
+                "build_ms": build_ms,
+                **_measure(ivf_store, queries, truth, args.top_k),
+            }
+            report["results"].append(row)
+        del ivf_store
+
+        if args.hnsw:
+            hnsw_store, build_ms = _build_store(tmp_dir / "hnsw", data, "hnsw_sq8")
+            for ef_search in args.hnsw_ef_search:
+                hnsw_store.configure_ann(hnsw_ef_search=ef_search)
+                row = {
+                    "tier": "hnsw_sq8",
+                    "ef_search": ef_search,
+                    "build_ms": build_ms,
+                    **_measure(hnsw_store, queries, truth, args.top_k),
+                }
+                report["results"].append(row)
+            del hnsw_store
+
+    print(f"N={args.num_vectors} D={args.dimension} Q={args.num_queries} k={args.top_k}")
+    print(f"{'tier':<10} {'param':<12} {'recall':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'batchQPS':>10} {'build_ms':>10}")
+    for row in report["results"]:
+        param = ""
+        if "nprobe" in row:
+            param = f"nprobe={row['nprobe']}"
+        elif "ef_search" in row:
+            param = f"ef={row['ef_search']}"
+        print(
+            f"{row['tier']:<10} {param:<12} {row['recall_at_k']:>8.4f} {row['p50_ms']:>8.3f} "
+            f"{row['p95_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['batch_qps']:>10.1f} {row['build_ms']:>10.1f}"
+        )
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+将旧版图存储（graph_metadata.pkl + graph_adjacency.npz）迁移为列式快照 graph_snapshot/。
+
+迁移前后分别在独立子进程中加载一次图，报告加载耗时与 RSS 增量：
+    python migrate_graph_snapshot.py --graph-dir data/a-memorix/graph
+
+旧文件默认备份为 *.bak；GraphStore 在下一次 save() 时也会自动完成同样的迁移。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import _bootstrap  # noqa: F401
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="迁移 A_Memorix 图存储到列式快照并报告加载耗时/RSS")
+    parser.add_argument(
+        "--graph-dir",
+        default=str(_bootstrap.DEFAULT_DATA_DIR / "graph"),
+        help="图存储目录（包含 graph_metadata.pkl）",
+    )
+    parser.add_argument("--matrix-format", default="csr", choices=["csr", "csc"])
+    parser.add_argument("--no-backup", action="store_true", help="不保留旧文件的 .bak 备份")
+    parser.add_argument("--json-out", default="", help="可选：输出 JSON 文件路径")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+# --help/-h fast path: avoid heavy host/plugin bootstrap
+if any(arg in {"-h", "--help"} for arg in sys.argv[1:]):
+    _build_arg_parser().print_help()
+    sys.exit(0)
+
+try:
+    from A_memorix.core.storage.graph_snapshot import read_graph_snapshot_manifest
+    from A_memorix.core.storage.graph_store import GraphStore
+except Exception as e:  # pragma: no cover
+    print(f"❌ 导入核心模块失败: {e}")
+    sys.exit(1)
+
+LEGACY_FILES = ("graph_metadata.pkl", "graph_adjacency.npz")
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _measure_in_process(graph_dir: Path, matrix_format: str) -> Dict[str, Any]:
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    # 不传 data_dir 构造，避免回放增量日志干扰对比
+    store = GraphStore(matrix_format=matrix_format)
+    store.load(graph_dir)
+    load_ms = (time.perf_counter() - started) * 1000.0
+    return {
+        "load_ms": load_ms,
+        "rss_delta_mb": _rss_mb() - rss_before,
+        "nodes": store.num_nodes,
+        "edges": store.num_edges,
+    }
+
+
+def _measure(graph_dir: Path, matrix_format: str) -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", "--graph-dir", str(graph_dir), "--matrix-format", matrix_format],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    args = _build_arg_parser().parse_args()
+    graph_dir = Path(args.graph_dir)
+
+    if args.measure:
+        print(json.dumps(_measure_in_process(graph_dir, args.matrix_format)))
+        return 0
+
+    if not (graph_dir / "graph_metadata.pkl").exists():
+        manifest = read_graph_snapshot_manifest(graph_dir)
+        if manifest is not None:
+            print(f"✅ 已是列式快照 (version={manifest.get('format_version')})，无需迁移: {graph_dir}")
+            return 0
+        print(f"❌ 未找到旧版图存储: {graph_dir / 'graph_metadata.pkl'}")
+        return 1
+
+    before = _measure(graph_dir, args.matrix_format)
+
+    if not args.no_backup:
+        for name in LEGACY_FILES:
+            path = graph_dir / name
+            if path.exists():
+                shutil.copy2(path, path.with_name(path.name + ".bak"))
+
+    store = GraphStore(matrix_format=args.matrix_format, data_dir=graph_dir)
+    store.load()
+    store.save()
+
+    after = _measure(graph_dir, args.matrix_format)
+    report = {"graph_dir": str(graph_dir), "legacy": before, "snapshot": after}
+
+    print(f"nodes={after['nodes']} edges={after['edges']}")
+    print(f"{'format':<10} {'load_ms':>10} {'rss_mb':>10}")
+    for label, row in (("legacy", before), ("snapshot", after)):
+        print(f"{label:<10} {row['load_ms']:>10.1f} {row['rss_delta_mb']:>10.1f}")
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"报告已写入: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -62,6 +62,7 @@ if any(arg in {"-h", "--help"} for arg in sys.argv[1:]):
 
 try:
     from A_memorix.core.storage import GraphStore, KnowledgeType, MetadataStore, QuantizationType, VectorStore
+    from A_memorix.core.storage.graph_snapshot import read_graph_snapshot_manifest
     from A_memorix.core.storage.metadata_store import (
         RUNTIME_AUTO_MIGRATION_MIN_SCHEMA_VERSION,
         SCHEMA_VERSION,
@@ -416,9 +417,11 @@ def _preflight_impl(config_path: Path, data_dir: Path) -> Dict[str, Any]:
         )
 
     graph_meta_path = data_dir / "graph" / "graph_metadata.pkl"
-    facts["graph_metadata_exists"] = graph_meta_path.exists()
+    graph_manifest = read_graph_snapshot_manifest(data_dir / "graph")
+    facts["graph_metadata_exists"] = graph_meta_path.exists() or graph_manifest is not None
+    facts["graph_snapshot_version"] = graph_manifest.get("format_version") if graph_manifest else None
     if relation_count > 0:
-        if not graph_meta_path.exists():
+        if not facts["graph_metadata_exists"]:
             checks.append(
                 CheckItem(
                     "CP-06",
@@ -428,10 +431,13 @@ def _preflight_impl(config_path: Path, data_dir: Path) -> Dict[str, Any]:
             )
         else:
             try:
-                with open(graph_meta_path, "rb") as f:
-                    graph_meta = pickle.load(f)
-                edge_hash_map = graph_meta.get("edge_hash_map", {})
-                edge_hash_map_size = len(edge_hash_map) if isinstance(edge_hash_map, dict) else 0
+                if graph_manifest is not None:
+                    edge_hash_map_size = int(graph_manifest.get("edge_hash_pairs", 0))
+                else:
+                    with open(graph_meta_path, "rb") as f:
+                        graph_meta = pickle.load(f)
+                    edge_hash_map = graph_meta.get("edge_hash_map", {})
+                    edge_hash_map_size = len(edge_hash_map) if isinstance(edge_hash_map, dict) else 0
                 facts["edge_hash_map_size"] = edge_hash_map_size
                 if edge_hash_map_size <= 0:
                     checks.append(
@@ -744,7 +750,7 @@ def _verify_impl(config_path: Path, data_dir: Path) -> Dict[str, Any]:
 
         if relation_count > 0:
             graph_dir = data_dir / "graph"
-            if not (graph_dir / "graph_metadata.pkl").exists():
+            if not GraphStore(data_dir=graph_dir).has_data():
                 checks.append(CheckItem("CP-06", "error", "graph metadata missing while relations exist"))
             else:
                 matrix_format = str(_get_nested(config_doc, ("graph", "sparse_matrix_format"), "csr") or "csr")
@@ -1,6 +1,6 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from rich.traceback import install
 from sqlmodel import select
@@ -13,6 +13,14 @@ from src.common.logger import get_logger
 from src.common.database.database import get_db_session
 from src.common.database.database_model import Images, ImageType
 from src.common.data_models.image_data_model import MaiImage
+from src.common.utils.utils_perceptual_hash import (
+    DEFAULT_DETAIL_THRESHOLD,
+    PerceptualHashIndex,
+    compute_detail_thumbnail,
+    compute_perceptual_hash,
+    max_block_difference,
+)
+from src.config.config import global_config
 from src.prompt.prompt_manager import prompt_manager
 from src.services.llm_service import LLMServiceClient
 
@@ -22,6 +30,12 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.absolute().resolve()
 DATA_DIR = PROJECT_ROOT / "data"
 IMAGE_DIR = DATA_DIR / "images"
 
+MAX_NEAR_DUPLICATE_CANDIDATES = 8
+"""每次近重复检测最多复核的候选图片数量"""
+
+PERCEPTUAL_HASH_UNAVAILABLE = ""
+"""感知哈希计算失败（无法解码或近乎纯色）时写入的占位值，避免每次见到该图片都重新计算"""
+
 logger = get_logger("image")
 
 
@@ -40,6 +54,11 @@ class ImageManager:
         """初始化图片管理器。"""
         _ensure_image_dir_exists()
         self._pending_description_tasks: Dict[str, asyncio.Task[None]] = {}
+        self._perceptual_index: Optional[PerceptualHashIndex[str]] = None
+        """已生成描述图片的感知哈希索引，首次近重复检测时从数据库加载"""
+        self._perceptual_index_lock = asyncio.Lock()
+        self._perceptual_index_additions: Optional[List[Tuple[str, str]]] = None
+        """索引加载期间新生成描述的图片，加载完成后补入索引"""
         self.cleanup_legacy_image_registration_records()
 
         logger.info("图片管理器初始化完成")
@@ -107,11 +126,13 @@ class ImageManager:
             logger.warning("图片哈希值未找到，且未提供图片字节数据，返回无描述")
             return ""
         try:
-            await self.ensure_image_saved(image_bytes)
+            mai_image = await self.ensure_image_saved(image_bytes)
         except Exception as e:
             logger.error(f"保存图片文件时发生错误: {e}")
             return ""
         if not wait_for_build:
+            if await self._reuse_near_duplicate_description(mai_image):
+                return mai_image.description
             self._schedule_description_build(hash_str, image_bytes)
             return ""
         logger.info(f"图片描述未找到，哈希值: {hash_str}，准备生成新描述")
@@ -234,6 +255,7 @@ class ImageManager:
         except Exception as e:
             logger.error(f"更新图片描述时发生错误: {e}")
             return False
+        self._add_to_perceptual_index(image)
         return True
 
     def delete_image(self, image: MaiImage) -> bool:
@@ -271,6 +293,7 @@ class ImageManager:
         """先保存图片记录，确保后续可以按哈希回填图片内容。"""
         hash_str = hashlib.sha256(image_bytes).hexdigest()
 
+        existing_image: Optional[MaiImage] = None
         try:
             with get_db_session() as session:
                 statement = select(Images).filter_by(image_hash=hash_str, image_type=ImageType.IMAGE).limit(1)
@@ -281,10 +304,14 @@ class ImageManager:
                     record.query_count += 1
                     session.add(record)
                     session.flush()
-                    return MaiImage.from_db_instance(record)
+                    existing_image = MaiImage.from_db_instance(record)
         except Exception as e:
             logger.error(f"查询图片记录时发生错误: {e}")
             raise e
+        if existing_image is not None:
+            if existing_image.perceptual_hash is None:
+                await self._backfill_perceptual_hash(existing_image, image_bytes)
+            return existing_image
 
         logger.info(f"图片不存在于数据库中，准备保存新图片，哈希值: {hash_str}")
         tmp_file_path = IMAGE_DIR / f"{hash_str}.tmp"
@@ -292,6 +319,8 @@ class ImageManager:
             f.write(image_bytes)
         mai_image = MaiImage(full_path=tmp_file_path, image_bytes=image_bytes)
         await mai_image.calculate_hash_format()
+        perceptual_hash = await asyncio.to_thread(compute_perceptual_hash, image_bytes)
+        mai_image.perceptual_hash = perceptual_hash or PERCEPTUAL_HASH_UNAVAILABLE
         if not self.register_image_to_db(mai_image):
             raise RuntimeError(f"保存图片记录到数据库失败: {hash_str}")
         return mai_image
@@ -303,6 +332,8 @@ class ImageManager:
             await mai_image.calculate_hash_format()
         if mai_image.vlm_processed and mai_image.description:
             return mai_image
+        if await self._reuse_near_duplicate_description(mai_image):
+            return mai_image
 
         desc = await self._generate_image_description(image_bytes, mai_image.image_format)
         mai_image.description = desc
@@ -324,6 +355,141 @@ class ImageManager:
         """
         return await self.build_image_description(image_bytes)
 
+    async def _backfill_perceptual_hash(self, image: MaiImage, image_bytes: bytes) -> None:
+        """为感知哈希字段出现之前入库的图片补齐感知哈希。
+
+        计算失败时写入 ``PERCEPTUAL_HASH_UNAVAILABLE``，同一张图片不会被反复计算。
+
+        Args:
+            image: 已存在于数据库中的图片对象。
+            image_bytes: 图片字节数据。
+        """
+        perceptual_hash = await asyncio.to_thread(compute_perceptual_hash, image_bytes)
+        perceptual_hash = perceptual_hash or PERCEPTUAL_HASH_UNAVAILABLE
+        try:
+            with get_db_session() as session:
+                statement = select(Images).filter_by(image_hash=image.file_hash, image_type=ImageType.IMAGE).limit(1)
+                if record := session.exec(statement).first():
+                    record.perceptual_hash = perceptual_hash
+                    session.add(record)
+        except Exception as e:
+            logger.warning(f"补齐图片感知哈希时发生错误: {e}")
+            return
+        image.perceptual_hash = perceptual_hash
+        self._add_to_perceptual_index(image)
+
+    def _load_perceptual_index(self) -> PerceptualHashIndex[str]:
+        """从数据库加载全部已生成描述图片的感知哈希。
+
+        Returns:
+            PerceptualHashIndex[str]: 以图片 sha256 为键的感知哈希索引。
+        """
+        index: PerceptualHashIndex[str] = PerceptualHashIndex()
+        with get_db_session() as session:
+            statement = select(Images).filter_by(image_type=ImageType.IMAGE, vlm_processed=True)
+            for record in session.exec(statement).yield_per(500):
+                if record.perceptual_hash and record.description:
+                    index.add(record.perceptual_hash, record.image_hash)
+        logger.info(f"图片感知哈希索引加载完成，共 {len(index)} 条记录")
+        return index
+
+    async def _get_perceptual_index(self) -> PerceptualHashIndex[str]:
+        """获取感知哈希索引，首次调用时在线程中从数据库加载。
+
+        加载期间新生成描述的图片可能未被数据库查询看到，先记录下来，加载完成后补入索引。
+        """
+        if self._perceptual_index is None:
+            async with self._perceptual_index_lock:
+                if self._perceptual_index is None:
+                    self._perceptual_index_additions = []
+                    try:
+                        index = await asyncio.to_thread(self._load_perceptual_index)
+                        for perceptual_hash, image_hash in self._perceptual_index_additions:
+                            index.add(perceptual_hash, image_hash)
+                        self._perceptual_index = index
+                    finally:
+                        self._perceptual_index_additions = None
+        return self._perceptual_index
+
+    def _add_to_perceptual_index(self, image: MaiImage) -> None:
+        """把已生成描述的图片加入感知哈希索引；索引正在加载时暂存，加载完成后补入。
+
+        Args:
+            image: 图片对象。
+        """
+        if not image.perceptual_hash or not (image.vlm_processed and image.description):
+            return
+        if self._perceptual_index is not None:
+            self._perceptual_index.add(image.perceptual_hash, image.file_hash)
+        elif self._perceptual_index_additions is not None:
+            self._perceptual_index_additions.append((image.perceptual_hash, image.file_hash))
+
+    def _find_verified_near_duplicate(self, image: MaiImage, candidate_hashes: List[str]) -> Optional[Images]:
+        """逐个复核感知哈希相近的候选图片，返回第一张缩略图也一致的已描述图片记录。
+
+        感知哈希无法区分同一模板、配字不同的图片，复核时比较两张图片的 32x32 灰度缩略图，
+        任一区块差异过大即视为不同图片。
+
+        Args:
+            image: 待生成描述的图片对象。
+            candidate_hashes: 按汉明距离升序排列的候选图片哈希。
+
+        Returns:
+            Optional[Images]: 通过复核的图片记录；没有候选通过时返回 ``None``。
+        """
+        image_bytes = image.image_bytes or image.read_image_bytes(image.full_path)
+        thumbnail = compute_detail_thumbnail(image_bytes)
+        if thumbnail is None:
+            return None
+        for candidate_hash in candidate_hashes:
+            record = self._get_image_record(candidate_hash)
+            if record is None or record.no_file_flag or not record.vlm_processed or not record.description:
+                continue
+            candidate_path = Path(record.full_path)
+            if not candidate_path.exists():
+                continue
+            candidate_thumbnail = compute_detail_thumbnail(candidate_path.read_bytes())
+            if candidate_thumbnail is None:
+                continue
+            if max_block_difference(thumbnail, candidate_thumbnail) <= DEFAULT_DETAIL_THRESHOLD:
+                return record
+        return None
+
+    async def _reuse_near_duplicate_description(self, image: MaiImage) -> bool:
+        """若已有缩放、重新压缩或转码前的同一张图片的描述，则直接复用，避免再次调用 VLM。
+
+        Args:
+            image: 尚未生成描述的图片对象。
+
+        Returns:
+            bool: 成功复用描述时返回 ``True``。
+        """
+        visual_config = global_config.visual
+        if not visual_config.enable_image_near_duplicate_reuse or not image.perceptual_hash:
+            return False
+        try:
+            index = await self._get_perceptual_index()
+            candidate_hashes = [
+                candidate_hash
+                for _, candidate_hash in index.search(image.perceptual_hash, visual_config.image_near_duplicate_max_distance)
+                if candidate_hash != image.file_hash
+            ][:MAX_NEAR_DUPLICATE_CANDIDATES]
+            if not candidate_hashes:
+                return False
+            source_record = await asyncio.to_thread(self._find_verified_near_duplicate, image, candidate_hashes)
+        except Exception as e:
+            logger.warning(f"近重复图片检测失败，哈希值: {image.file_hash}，错误: {e}")
+            return False
+        if source_record is None:
+            return False
+
+        image.description = source_record.description
+        image.vlm_processed = True
+        if not self.update_image_description(image):
+            return False
+        logger.info(f"复用近重复图片的描述，哈希值: {image.file_hash}，来源: {source_record.image_hash}")
+        return True
+
     def cleanup_invalid_descriptions_in_db(self):
         """
         清理数据库中无效的图片记录
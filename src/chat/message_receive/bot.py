@@ -12,6 +12,7 @@ from src.chat.heart_flow.heartflow_message_processor import HeartFCMessageReceiv
 from src.common.logger import get_logger
 from src.common.utils.utils_message import MessageUtils
 from src.common.utils.utils_session import SessionUtils
+from src.platform_io import get_platform_io_manager
 from src.platform_io.route_key_factory import RouteKeyFactory
 from src.core.announcement_manager import global_announcement_manager
 from src.plugin_runtime.component_query import component_query_service
@@ -174,6 +175,7 @@ class ChatBot:
         """确保所有后台任务已启动。"""
         if not self._started:
             logger.debug("确保ChatBot所有任务已启动")
+            get_platform_io_manager().set_legacy_inbound_handler(self.receive_message)
 
             self._started = True
 
@@ -223,7 +225,12 @@ class ChatBot:
             tuple[HookDispatchResult, SessionMessage]: Hook 聚合结果以及可能被改写后的消息对象。
         """
 
-        hook_result = await self._get_runtime_manager().invoke_hook(
+        runtime_manager = self._get_runtime_manager()
+        # 没有插件订阅时跳过消息的序列化与反序列化
+        if not runtime_manager.has_subscribers(hook_name):
+            return HookDispatchResult(hook_name=hook_name, kwargs=kwargs), message
+
+        hook_result = await runtime_manager.invoke_hook(
             hook_name,
             message=serialize_session_message(message),
             **kwargs,
@@ -505,7 +512,8 @@ class ChatBot:
             # logger.debug(str(message_data))
             maim_raw_message = MessageBase.from_dict(message_data)
             message = SessionMessage.from_maim_message(maim_raw_message)
-            await self.receive_message(message)
+            # 经由 Platform IO 入站调度器处理，与插件消息网关入站共用按会话的有界队列
+            await get_platform_io_manager().accept_legacy_inbound(message)
 
         except Exception as e:
             logger.error(f"预处理消息失败: {e}")
@@ -8,6 +8,7 @@ from sqlmodel import select
 from src.common.logger import get_logger
 from src.common.database.database import get_db_session
 from src.common.database.database_model import Messages
+from src.common.database.message_write_buffer import message_write_buffer
 from src.common.data_models.mai_message_data_model import MaiMessage, UserInfo
 from src.common.data_models.message_component_data_model import (
     TextComponent,
@@ -357,7 +358,9 @@ class SessionMessage(MaiMessage):
             try:
                 with get_db_session() as session:
                     statement = select(Messages).filter_by(message_id=component.target_message_id).limit(1)
-                    if db_msg := session.exec(statement).first():
+                    # 被回复的消息可能刚入库、仍在写后缓冲中
+                    pending_msg = message_write_buffer.find_pending(component.target_message_id)
+                    if db_msg := pending_msg or session.exec(statement).first():
                         component.target_message_content = db_msg.processed_plain_text
                         component.target_message_sender_cardname = db_msg.user_cardname
                         component.target_message_sender_nickname = db_msg.user_nickname
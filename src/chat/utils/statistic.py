@@ -8,11 +8,21 @@ from typing import cast
 
 from typing_extensions import TypedDict
 
+from sqlalchemy import case, func
 from sqlmodel import col, select
 
+from src.chat.utils.statistic_rollup import (
+    query_chat_names,
+    query_message_series,
+    query_message_totals,
+    query_model_usage_series,
+    query_model_usage_totals,
+    refresh_statistic_rollups,
+    series_granularity,
+)
 from src.common.logger import get_logger
 from src.common.database.database import get_db_session
-from src.common.database.database_model import Messages, ModelUsage, OnlineTime, ToolRecord
+from src.common.database.database_model import OnlineTime, ToolRecord
 from src.manager.async_task_manager import AsyncTask
 from src.manager.local_store_manager import local_storage
 
@@ -249,6 +259,11 @@ class StatisticOutputTask(AsyncTask):
             deploy_time = datetime(2000, 1, 1)
             local_storage["deploy_time"] = now.timestamp()
 
+        self.deploy_time: datetime = deploy_time
+        """
+        部署时间，全量统计的起始时间
+        """
+
         self.stat_period: list[tuple[str, timedelta, str]] = [
             ("all_time", now - deploy_time, "自部署以来"),  # 必须保留"all_time"
             ("last_30_days", timedelta(days=30), "近30天"),
@@ -428,11 +443,6 @@ class StatisticOutputTask(AsyncTask):
         counter = cast(defaultdict[str, float], stats_period[key])
         counter[subkey] += amount
 
-    @staticmethod
-    def _append_defaultdict_list(stats_period: StatPeriodData, key: str, subkey: str, value: float) -> None:
-        counter = cast(defaultdict[str, list[float]], stats_period[key])
-        counter[subkey].append(value)
-
     @staticmethod
     def _fetch_online_time_since(query_start_time: datetime) -> list[tuple[datetime, datetime]]:
         with get_db_session(auto_commit=False) as session:
@@ -441,165 +451,91 @@ class StatisticOutputTask(AsyncTask):
             return [(record.start_timestamp, record.end_timestamp) for record in records]
 
     @staticmethod
-    def _fetch_model_usage_since(query_start_time: datetime) -> list[dict[str, object]]:
-        with get_db_session(auto_commit=False) as session:
-            statement = select(ModelUsage).where(col(ModelUsage.timestamp) >= query_start_time)
-            records = session.exec(statement).all()
-            return [
-                {
-                    "timestamp": record.timestamp,
-                    "request_type": record.request_type,
-                    "model_api_provider_name": record.model_api_provider_name,
-                    "model_assign_name": record.model_assign_name,
-                    "model_name": record.model_name,
-                    "prompt_tokens": record.prompt_tokens,
-                    "completion_tokens": record.completion_tokens,
-                    "cost": record.cost,
-                    "time_cost": record.time_cost,
-                }
-                for record in records
-            ]
+    def _add_time_cost_moments(
+        moments: dict[str, dict[str, list[float]]], category: str, item_name: str, row_moments: tuple[float, ...]
+    ) -> None:
+        acc = moments[category].setdefault(item_name, [0.0, 0.0, 0.0])
+        for idx, value in enumerate(row_moments):
+            acc[idx] += value
 
     @staticmethod
-    def _collect_model_request_for_period(collect_period: list[tuple[str, datetime]]) -> StatPeriodMapping:
+    def _collect_model_request_for_period(
+        collect_period: list[tuple[str, datetime]],
+        now: datetime,
+    ) -> StatPeriodMapping:
         """
-        收集指定时间段的LLM请求统计数据
+        收集指定时间段的LLM请求统计数据（读取预聚合表）
 
         :param collect_period: 统计时间段
+        :param now: 基准当前时间
         """
         if not collect_period:
             return {}
 
-        # 排序-按照时间段开始时间降序排列（最晚的时间段在前）
-        collect_period.sort(key=lambda x: x[1], reverse=True)
-
         stats: StatPeriodMapping = {
             period_key: StatisticOutputTask._build_stat_period_data() for period_key, _ in collect_period
         }
 
-        # 以最早的时间戳为起始时间获取记录
-        # Assuming LLMUsage.timestamp is a DateTimeField
-        query_start_time = collect_period[-1][1]
-        records = StatisticOutputTask._fetch_model_usage_since(query_start_time)
-        for record in records:
-            record_timestamp = cast(datetime, record["timestamp"])
-            for idx, (_, period_start) in enumerate(collect_period):
-                if record_timestamp >= period_start:
-                    for period_key, _ in collect_period[idx:]:
-                        StatisticOutputTask._add_int_stat(stats[period_key], TOTAL_REQ_CNT, 1)
-
-                        request_type = cast(str | None, record["request_type"]) or "unknown"
-                        user_id = cast(str | None, record["model_api_provider_name"]) or "unknown"
-                        model_assign_name = cast(str | None, record["model_assign_name"])
-                        model_name = model_assign_name or cast(str | None, record["model_name"]) or "unknown"
-
-                        # 提取模块名：如果请求类型包含"."，取第一个"."之前的部分
-                        module_name = request_type.split(".")[0] if "." in request_type else request_type
-
-                        StatisticOutputTask._add_defaultdict_int(stats[period_key], REQ_CNT_BY_TYPE, request_type, 1)
-                        StatisticOutputTask._add_defaultdict_int(stats[period_key], REQ_CNT_BY_USER, user_id, 1)
-                        StatisticOutputTask._add_defaultdict_int(stats[period_key], REQ_CNT_BY_MODEL, model_name, 1)
-                        StatisticOutputTask._add_defaultdict_int(stats[period_key], REQ_CNT_BY_MODULE, module_name, 1)
-
-                        prompt_tokens = cast(int | None, record["prompt_tokens"]) or 0
-                        completion_tokens = cast(int | None, record["completion_tokens"]) or 0
-                        total_tokens = prompt_tokens + completion_tokens
-
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], IN_TOK_BY_TYPE, request_type, prompt_tokens
-                        )
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], IN_TOK_BY_USER, user_id, prompt_tokens
-                        )
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], IN_TOK_BY_MODEL, model_name, prompt_tokens
-                        )
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], IN_TOK_BY_MODULE, module_name, prompt_tokens
-                        )
-
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], OUT_TOK_BY_TYPE, request_type, completion_tokens
-                        )
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], OUT_TOK_BY_USER, user_id, completion_tokens
-                        )
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], OUT_TOK_BY_MODEL, model_name, completion_tokens
-                        )
+        with get_db_session(auto_commit=False) as session:
+            for period_key, period_start in collect_period:
+                period_stats = stats[period_key]
+                # 各分类下有效耗时的 [和, 平方和, 样本数]
+                moments: dict[str, dict[str, list[float]]] = {
+                    "type": {},
+                    "user": {},
+                    "model": {},
+                    "module": {},
+                }
+                for row in query_model_usage_totals(session, period_start, now, now):
+                    request_type, user_id, model_name = row[0], row[1], row[2]
+                    request_count, prompt_tokens, completion_tokens, _, cost = (value or 0 for value in row[3:8])
+                    time_cost_moments = tuple(float(value or 0.0) for value in row[8:11])
+                    total_tokens = prompt_tokens + completion_tokens
+
+                    # 提取模块名：如果请求类型包含"."，取第一个"."之前的部分
+                    module_name = request_type.split(".")[0] if "." in request_type else request_type
+
+                    StatisticOutputTask._add_int_stat(period_stats, TOTAL_REQ_CNT, request_count)
+                    StatisticOutputTask._add_float_stat(period_stats, TOTAL_COST, cost)
+                    for category, item_name in (
+                        ("type", request_type),
+                        ("user", user_id),
+                        ("model", model_name),
+                        ("module", module_name),
+                    ):
                         StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], OUT_TOK_BY_MODULE, module_name, completion_tokens
+                            period_stats, f"requests_by_{category}", item_name, request_count
                         )
-
                         StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], TOTAL_TOK_BY_TYPE, request_type, total_tokens
+                            period_stats, f"in_tokens_by_{category}", item_name, prompt_tokens
                         )
                         StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], TOTAL_TOK_BY_USER, user_id, total_tokens
+                            period_stats, f"out_tokens_by_{category}", item_name, completion_tokens
                         )
                         StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], TOTAL_TOK_BY_MODEL, model_name, total_tokens
+                            period_stats, f"tokens_by_{category}", item_name, total_tokens
                         )
-                        StatisticOutputTask._add_defaultdict_int(
-                            stats[period_key], TOTAL_TOK_BY_MODULE, module_name, total_tokens
+                        StatisticOutputTask._add_defaultdict_float(
+                            period_stats, f"costs_by_{category}", item_name, cost
                         )
-
-                        cost = cast(float | None, record["cost"]) or 0.0
-                        StatisticOutputTask._add_float_stat(stats[period_key], TOTAL_COST, cost)
-                        StatisticOutputTask._add_defaultdict_float(stats[period_key], COST_BY_TYPE, request_type, cost)
-                        StatisticOutputTask._add_defaultdict_float(stats[period_key], COST_BY_USER, user_id, cost)
-                        StatisticOutputTask._add_defaultdict_float(stats[period_key], COST_BY_MODEL, model_name, cost)
-                        StatisticOutputTask._add_defaultdict_float(stats[period_key], COST_BY_MODULE, module_name, cost)
-
-                        # 收集time_cost数据
-                        time_cost = cast(float | None, record["time_cost"]) or 0.0
-                        if time_cost > 0:  # 只记录有效的time_cost
-                            StatisticOutputTask._append_defaultdict_list(
-                                stats[period_key], TIME_COST_BY_TYPE, request_type, time_cost
-                            )
-                            StatisticOutputTask._append_defaultdict_list(
-                                stats[period_key], TIME_COST_BY_USER, user_id, time_cost
-                            )
-                            StatisticOutputTask._append_defaultdict_list(
-                                stats[period_key], TIME_COST_BY_MODEL, model_name, time_cost
-                            )
-                            StatisticOutputTask._append_defaultdict_list(
-                                stats[period_key], TIME_COST_BY_MODULE, module_name, time_cost
-                            )
-                    break
-
-        # 计算平均耗时和标准差
-        for period_key in stats:
-            for category in [REQ_CNT_BY_TYPE, REQ_CNT_BY_USER, REQ_CNT_BY_MODEL, REQ_CNT_BY_MODULE]:
-                time_cost_key = f"time_costs_by_{category.split('_')[-1]}"
-                avg_key = f"avg_time_costs_by_{category.split('_')[-1]}"
-                std_key = f"std_time_costs_by_{category.split('_')[-1]}"
-
-                category_data = cast(dict[str, int], stats[period_key].get(category, {}))
-                time_cost_data = cast(dict[str, list[float]], stats[period_key].get(time_cost_key, {}))
-                avg_cost_data = cast(dict[str, float], stats[period_key].get(avg_key, {}))
-                std_cost_data = cast(dict[str, float], stats[period_key].get(std_key, {}))
-
-                for item_name in category_data:
-                    time_costs = time_cost_data.get(item_name, [])
-                    if time_costs:
-                        # 计算平均耗时
-                        avg_time_cost = sum(time_costs) / len(time_costs)
+                        StatisticOutputTask._add_time_cost_moments(moments, category, item_name, time_cost_moments)
+
+                # 由耗时的和与平方和计算平均耗时和（总体）标准差
+                for category, category_moments in moments.items():
+                    avg_cost_data = cast(dict[str, float], period_stats[f"avg_time_costs_by_{category}"])
+                    std_cost_data = cast(dict[str, float], period_stats[f"std_time_costs_by_{category}"])
+                    for item_name, (time_cost_sum, time_cost_sq_sum, time_cost_count) in category_moments.items():
+                        if time_cost_count <= 0:
+                            avg_cost_data[item_name] = 0.0
+                            std_cost_data[item_name] = 0.0
+                            continue
+                        avg_time_cost = time_cost_sum / time_cost_count
                         avg_cost_data[item_name] = round(avg_time_cost, 3)
-
-                        # 计算标准差
-                        if len(time_costs) > 1:
-                            variance = sum((x - avg_time_cost) ** 2 for x in time_costs) / len(time_costs)
-                            std_time_cost = variance**0.5
-                            std_cost_data[item_name] = round(std_time_cost, 3)
+                        if time_cost_count > 1:
+                            variance = max(0.0, time_cost_sq_sum / time_cost_count - avg_time_cost**2)
+                            std_cost_data[item_name] = round(variance**0.5, 3)
                         else:
                             std_cost_data[item_name] = 0.0
-                    else:
-                        avg_cost_data[item_name] = 0.0
-                        std_cost_data[item_name] = 0.0
-
-                stats[period_key][avg_key] = avg_cost_data
-                stats[period_key][std_key] = std_cost_data
 
         return stats
 
@@ -644,14 +580,23 @@ class StatisticOutputTask(AsyncTask):
                     break
         return stats
 
+    def _update_name_mapping(self, chat_names: dict[str, tuple[str, float]]) -> None:
+        """用预聚合表中最新的聊天名称更新 name_mapping（仅用于展示聊天名称）"""
+        for chat_id, (chat_name, name_ts) in chat_names.items():
+            current = self.name_mapping.get(chat_id)
+            if current is None or name_ts >= current[1]:
+                self.name_mapping[chat_id] = (chat_name, name_ts)
+
     def _collect_message_count_for_period(
         self,
         collect_period: list[tuple[str, datetime]],
+        now: datetime,
     ) -> dict[str, dict[str, object]]:
         """
-        收集指定时间段的消息统计数据
+        收集指定时间段的消息统计数据（读取预聚合表）
 
         :param collect_period: 统计时间段
+        :param now: 基准当前时间
         """
         if not collect_period:
             return {}
@@ -667,71 +612,33 @@ class StatisticOutputTask(AsyncTask):
             for period_key, _ in collect_period
         }
 
-        query_start_timestamp = collect_period[-1][1]
         with get_db_session(auto_commit=False) as session:
-            statement = select(Messages).where(col(Messages.timestamp) >= query_start_timestamp)
-            messages = session.exec(statement).all()
-        for message in messages:
-            message_time_ts = message.timestamp.timestamp()
-
-            chat_id = None
-            chat_name = None
-
-            # Logic based on Peewee model structure, aiming to replicate original intent
-            if message.group_id:
-                chat_id = f"g{message.group_id}"
-                chat_name = message.group_name or f"群{message.group_id}"
-            elif message.user_id:
-                # This uses the message SENDER's ID as per original logic's fallback
-                chat_id = f"u{message.user_id}"
-                chat_name = message.user_nickname
-            else:
-                # If neither group_id nor sender_id is available for chat identification
-                logger.warning(
-                    f"Message (PK: {message.id if hasattr(message, 'id') else 'N/A'}) lacks group_id and user_id for chat stats."
-                )
-                continue
-
-            if not chat_id:  # Should not happen if above logic is correct
-                continue
+            self._update_name_mapping(query_chat_names(session))
+            for period_key, period_start in collect_period:
+                for chat_id, message_count, _, _ in query_message_totals(session, period_start, now, now):
+                    StatisticOutputTask._add_int_stat(stats[period_key], TOTAL_MSG_CNT, message_count or 0)
+                    StatisticOutputTask._add_defaultdict_int(
+                        stats[period_key], MSG_CNT_BY_CHAT, chat_id, message_count or 0
+                    )
 
-            # Update name_mapping（仅用于展示聊天名称）
+            # 使用 ToolRecord 中的 reply 工具次数作为回复数基准，各时间段在一次查询中按条件计数
             try:
-                if chat_id in self.name_mapping:
-                    if chat_name != self.name_mapping[chat_id][0] and message_time_ts > self.name_mapping[chat_id][1]:
-                        self.name_mapping[chat_id] = (chat_name, message_time_ts)
-                else:
-                    self.name_mapping[chat_id] = (chat_name, message_time_ts)
-            except (IndexError, TypeError) as e:
-                logger.warning(f"更新 name_mapping 时发生错误，chat_id: {chat_id}, 错误: {e}")
-                # 重置为正确的格式
-                self.name_mapping[chat_id] = (chat_name, message_time_ts)
-
-            for idx, (_, period_start_dt) in enumerate(collect_period):
-                if message_time_ts >= period_start_dt.timestamp():
-                    for period_key, _ in collect_period[idx:]:
-                        StatisticOutputTask._add_int_stat(stats[period_key], TOTAL_MSG_CNT, 1)
-                        StatisticOutputTask._add_defaultdict_int(stats[period_key], MSG_CNT_BY_CHAT, chat_id, 1)
-                    break
-
-        # 使用 ToolRecord 中的 reply 工具次数作为回复数基准
-        try:
-            tool_query_start_timestamp = collect_period[-1][1]
-            with get_db_session(auto_commit=False) as session:
-                statement = select(ToolRecord).where(col(ToolRecord.timestamp) >= tool_query_start_timestamp)
-                tool_records = session.exec(statement).all()
-            for tool_record in tool_records:
-                if tool_record.tool_name != "reply":
-                    continue
-
-                action_time_ts = tool_record.timestamp.timestamp()
-                for idx, (_, period_start_dt) in enumerate(collect_period):
-                    if action_time_ts >= period_start_dt.timestamp():
-                        for period_key, _ in collect_period[idx:]:
-                            StatisticOutputTask._add_int_stat(stats[period_key], TOTAL_REPLY_CNT, 1)
-                        break
-        except Exception as e:
-            logger.warning(f"统计 reply 工具次数失败，将回复数视为 0，错误信息：{e}")
+                statement = select(
+                    *[
+                        func.sum(case((col(ToolRecord.timestamp) >= period_start, 1), else_=0))
+                        for _, period_start in collect_period
+                    ]
+                ).where(
+                    col(ToolRecord.tool_name) == "reply",
+                    col(ToolRecord.timestamp) >= collect_period[-1][1],
+                )
+                for row in session.exec(statement).all():
+                    # 只有一个时间段时查询结果为标量
+                    reply_counts = row if len(collect_period) > 1 else (row,)
+                    for (period_key, _), reply_count in zip(collect_period, reply_counts, strict=False):
+                        StatisticOutputTask._add_int_stat(stats[period_key], TOTAL_REPLY_CNT, reply_count or 0)
+            except Exception as e:
+                logger.warning(f"统计 reply 工具次数失败，将回复数视为 0，错误信息：{e}")
 
         return stats
 
@@ -740,45 +647,22 @@ class StatisticOutputTask(AsyncTask):
         收集各时间段的统计数据
         :param now: 基准当前时间
         """
-
-        last_all_time_stat: dict[str, object] | None = None
-
         try:
-            if "last_full_statistics" in local_storage:
-                # 如果存在上次完整统计数据，则使用该数据进行增量统计
-                last_stat = cast(dict[str, object], local_storage["last_full_statistics"])
-
-                # 修复 name_mapping 数据类型不匹配问题
-                # JSON 中存储为列表，但代码期望为元组
-                raw_name_mapping = cast(dict[str, object], last_stat["name_mapping"])
-                self.name_mapping = {}
-                for chat_id, value in raw_name_mapping.items():
-                    if isinstance(value, list) and len(value) == 2:
-                        # 将列表转换为元组
-                        self.name_mapping[chat_id] = (value[0], value[1])
-                    elif isinstance(value, tuple) and len(value) == 2:
-                        # 已经是元组，直接使用
-                        self.name_mapping[chat_id] = value
-                    else:
-                        # 数据格式不正确，跳过或使用默认值
-                        logger.warning(f"name_mapping 中 chat_id {chat_id} 的数据格式不正确: {value}")
-                        continue
-                last_all_time_stat = cast(dict[str, object], last_stat["stat_data"])  # 上次完整统计的统计数据
-                last_stat_timestamp = datetime.fromtimestamp(self._to_float_timestamp(last_stat["timestamp"]))
-                self.stat_period = [
-                    item for item in self.stat_period if item[0] != "all_time"
-                ]  # 删除"所有时间"的统计时段
-                self.stat_period.append(("all_time", now - last_stat_timestamp, "自部署以来的"))
+            # 先把新增记录聚合进预聚合表，之后各时间段只需读取聚合桶
+            refresh_statistic_rollups(now=now)
         except Exception as e:
-            logger.warning(f"加载上次完整统计数据失败，进行全量统计，错误信息：{e}")
+            logger.warning(f"刷新统计预聚合失败，将使用已有的聚合数据，错误信息：{e}")
 
-        stat_start_timestamp = [(period[0], now - period[1]) for period in self.stat_period]
+        stat_start_timestamp = [
+            (period_key, self.deploy_time if period_key == "all_time" else now - period_delta)
+            for period_key, period_delta, _ in self.stat_period
+        ]
 
         stat = {item[0]: {} for item in self.stat_period}
 
-        model_req_stat = self._collect_model_request_for_period(stat_start_timestamp)
+        model_req_stat = self._collect_model_request_for_period(stat_start_timestamp, now)
         online_time_stat = self._collect_online_time_for_period(stat_start_timestamp, now)
-        message_count_stat = self._collect_message_count_for_period(stat_start_timestamp)
+        message_count_stat = self._collect_message_count_for_period(stat_start_timestamp, now)
 
         # 统计数据合并
         # 合并三类统计数据
@@ -787,71 +671,8 @@ class StatisticOutputTask(AsyncTask):
             stat[period_key].update(online_time_stat[period_key])
             stat[period_key].update(message_count_stat[period_key])
 
-        if last_all_time_stat:
-            # 若存在上次完整统计数据，则将其与当前统计数据合并
-            for key, val in last_all_time_stat.items():
-                # 确保当前统计数据中存在该key
-                if key not in stat["all_time"]:
-                    continue
-
-                if isinstance(val, dict):
-                    # 是字典类型，则进行合并
-                    for sub_key, sub_val in val.items():
-                        # 普通的数值或字典合并
-                        if sub_key in stat["all_time"][key]:
-                            # 检查是否为嵌套的字典类型（如版本统计）
-                            if isinstance(sub_val, dict) and isinstance(stat["all_time"][key][sub_key], dict):
-                                # 合并嵌套字典
-                                for nested_key, nested_val in sub_val.items():
-                                    if nested_key in stat["all_time"][key][sub_key]:
-                                        stat["all_time"][key][sub_key][nested_key] += nested_val
-                                    else:
-                                        stat["all_time"][key][sub_key][nested_key] = nested_val
-                            else:
-                                # 普通数值累加
-                                stat["all_time"][key][sub_key] += sub_val
-                        else:
-                            stat["all_time"][key][sub_key] = sub_val
-                else:
-                    # 直接合并
-                    stat["all_time"][key] += val
-
-        # 更新上次完整统计数据的时间戳
-        # 将所有defaultdict转换为普通dict以避免类型冲突
-        clean_stat_data = self._convert_defaultdict_to_dict(stat["all_time"])
-
-        # 将 name_mapping 中的元组转换为列表，因为JSON不支持元组
-        json_safe_name_mapping = {}
-        for chat_id, (chat_name, timestamp) in self.name_mapping.items():
-            json_safe_name_mapping[chat_id] = [chat_name, timestamp]
-
-        local_storage["last_full_statistics"] = {
-            "name_mapping": json_safe_name_mapping,
-            "stat_data": clean_stat_data,
-            "timestamp": now.timestamp(),
-        }
-
         return cast(StatPeriodMapping, stat)
 
-    def _convert_defaultdict_to_dict(self, data: object) -> object:
-        # sourcery skip: dict-comprehension, extract-duplicate-method, inline-immediately-returned-variable, merge-duplicate-blocks
-        """递归转换defaultdict为普通dict"""
-        if isinstance(data, defaultdict):
-            # 转换defaultdict为普通dict
-            result = {}
-            for key, value in data.items():
-                result[key] = self._convert_defaultdict_to_dict(value)
-            return result
-        elif isinstance(data, dict):
-            # 递归处理普通dict
-            result = {}
-            for key, value in data.items():
-                result[key] = self._convert_defaultdict_to_dict(value)
-            return result
-        else:
-            # 其他类型直接返回
-            return data
-
     @staticmethod
     def _to_float_timestamp(value: object) -> float:
         if isinstance(value, (int, float)):
@@ -1720,64 +1541,50 @@ class StatisticOutputTask(AsyncTask):
 
         interval_seconds = interval_minutes * 60
 
-        # 查询LLM使用记录
-        query_start_time = start_time
-        records = StatisticOutputTask._fetch_model_usage_since(query_start_time)
-        for record in records:
-            record_time = cast(datetime, record["timestamp"])
+        # 从预聚合表读取分桶数据，桶起始时间早于 start_time 的部分计入第一个间隔
+        granularity = series_granularity(start_time, now)
+        with get_db_session(auto_commit=False) as session:
+            model_rows = query_model_usage_series(session, start_time, now, granularity)
+            message_rows = query_message_series(session, start_time, now, granularity)
+            if any(chat_id not in self.name_mapping for _, chat_id, _, _ in message_rows):
+                self._update_name_mapping(query_chat_names(session))
 
+        for bucket_start, request_type, model_name, _, _, _, _, cost in model_rows:
             # 找到对应的时间间隔索引
-            time_diff = (record_time - start_time).total_seconds()
+            time_diff = (max(bucket_start, start_time) - start_time).total_seconds()
             interval_index = int(time_diff // interval_seconds)
 
             if 0 <= interval_index < len(time_points):
                 # 累加总花费数据
-                cost = cast(float | None, record["cost"]) or 0.0
+                cost = cost or 0.0
                 total_cost_data[interval_index] += cost
 
                 # 累加按模型分类的花费
-                model_assign_name = cast(str | None, record["model_assign_name"])
-                model_name = model_assign_name or cast(str | None, record["model_name"]) or "unknown"
                 if model_name not in cost_by_model:
                     cost_by_model[model_name] = [0.0] * len(time_points)
                 cost_by_model[model_name][interval_index] += cost
 
                 # 累加按模块分类的花费
-                request_type = cast(str | None, record["request_type"]) or "unknown"
                 module_name = request_type.split(".")[0] if "." in request_type else request_type
                 if module_name not in cost_by_module:
                     cost_by_module[module_name] = [0.0] * len(time_points)
                 cost_by_module[module_name][interval_index] += cost
 
-        # 查询消息记录
-        query_start_timestamp = start_time.timestamp()
-        with get_db_session(auto_commit=False) as session:
-            statement = select(Messages).where(col(Messages.timestamp) >= start_time)
-            messages = session.exec(statement).all()
-        for message in messages:
-            message_time_ts = message.timestamp.timestamp()
-
+        for bucket_start, chat_id, message_count, _ in message_rows:
             # 找到对应的时间间隔索引
-            time_diff = message_time_ts - query_start_timestamp
+            time_diff = (max(bucket_start, start_time) - start_time).total_seconds()
             interval_index = int(time_diff // interval_seconds)
 
             if 0 <= interval_index < len(time_points):
                 # 确定聊天流名称
-                chat_name = None
-                if message.group_id:
-                    chat_name = message.group_name or f"群{message.group_id}"
-                elif message.user_id:
-                    chat_name = message.user_nickname or f"用户{message.user_id}"
-                else:
-                    continue
-
+                chat_name = self.name_mapping.get(chat_id, (None, 0))[0]
                 if not chat_name:
                     continue
 
                 # 累加消息数
                 if chat_name not in message_by_chat:
                     message_by_chat[chat_name] = [0] * len(time_points)
-                message_by_chat[chat_name][interval_index] += 1
+                message_by_chat[chat_name][interval_index] += message_count or 0
 
         return {
             "time_labels": time_labels,
@@ -2107,45 +1914,31 @@ class StatisticOutputTask(AsyncTask):
         total_replies = [0] * len(time_points)
         total_online_hours = [0.0] * len(time_points)
 
-        from src.chat.utils.utils import is_bot_self
-
         interval_seconds = interval_hours * 3600
 
-        # 查询LLM使用记录
-        query_start_time = start_time
-        records = StatisticOutputTask._fetch_model_usage_since(query_start_time)
-        for record in records:
-            record_time = cast(datetime, record["timestamp"])
+        # 从预聚合表读取分桶数据，桶起始时间早于 start_time 的部分计入第一个间隔
+        granularity = series_granularity(start_time, now)
+        with get_db_session(auto_commit=False) as session:
+            model_rows = query_model_usage_series(session, start_time, now, granularity)
+            message_rows = query_message_series(session, start_time, now, granularity)
 
+        for bucket_start, _, _, _, prompt_tokens, completion_tokens, _, cost in model_rows:
             # 找到对应的时间间隔索引
-            time_diff = (record_time - start_time).total_seconds()
+            time_diff = (max(bucket_start, start_time) - start_time).total_seconds()
             interval_index = int(time_diff // interval_seconds)
 
             if 0 <= interval_index < len(time_points):
-                cost = cast(float | None, record["cost"]) or 0.0
-                prompt_tokens = cast(int | None, record["prompt_tokens"]) or 0
-                completion_tokens = cast(int | None, record["completion_tokens"]) or 0
-                total_token = prompt_tokens + completion_tokens
-
-                total_costs[interval_index] += cost
-                total_tokens[interval_index] += total_token
-
-        # 查询消息记录
-        query_start_timestamp = start_time.timestamp()
-        with get_db_session(auto_commit=False) as session:
-            statement = select(Messages).where(col(Messages.timestamp) >= start_time)
-            messages = session.exec(statement).all()
-        for message in messages:
-            message_time_ts = message.timestamp.timestamp()
+                total_costs[interval_index] += cost or 0.0
+                total_tokens[interval_index] += (prompt_tokens or 0) + (completion_tokens or 0)
 
-            time_diff = message_time_ts - query_start_timestamp
+        for bucket_start, _, message_count, bot_message_count in message_rows:
+            time_diff = (max(bucket_start, start_time) - start_time).total_seconds()
             interval_index = int(time_diff // interval_seconds)
 
             if 0 <= interval_index < len(time_points):
-                total_messages[interval_index] += 1
-                # 检查是否是bot发送的消息（回复）
-                if is_bot_self(message.platform or "", message.user_id or ""):
-                    total_replies[interval_index] += 1
+                total_messages[interval_index] += message_count or 0
+                # bot发送的消息（回复）
+                total_replies[interval_index] += bot_message_count or 0
 
         # 查询在线时间记录
         records = StatisticOutputTask._fetch_online_time_since(start_time)
@@ -0,0 +1,471 @@
+"""统计预聚合（rollup）
+
+统计报告与 WebUI 仪表盘原先每次都对 `mai_messages` / `llm_usage` 做全量行扫描，
+随着数据增长越来越慢。本模块维护两张按时间桶预聚合的表：
+
+- `stat_message_rollups`：按（粒度, 桶起始时间, 聊天）累计消息数、机器人消息数、带回复引用的消息数
+- `stat_model_usage_rollups`：按（粒度, 桶起始时间, 请求类型, 供应商, 模型）累计请求数、token、费用与耗时矩
+
+聚合由游标任务 `refresh_statistic_rollups()` 增量完成：按源表自增主键读取游标之后的新行
+（只取统计需要的窄列，不读 raw_content），聚合后以 UPSERT 累加到桶中，并在同一事务内推进游标。
+消息经写后缓冲批量落库，因此选择游标而非写入时维护。
+
+分钟桶只保留最近 `MINUTE_RETENTION`，小时桶永久保留；查询区间两端不足一小时的部分用分钟桶，
+中间整小时用小时桶，分钟桶已被清理的区间退化为整小时精度。
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import asyncio
+import threading
+
+from sqlalchemy import and_, delete, func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, col, select
+
+from src.common.database.database import get_db_session
+from src.common.database.database_model import (
+    Messages,
+    MessageStatRollup,
+    ModelUsage,
+    ModelUsageStatRollup,
+    StatRollupCursor,
+)
+from src.common.logger import get_logger
+from src.manager.async_task_manager import AsyncTask
+
+logger = get_logger("maibot_statistic")
+
+MINUTE = "minute"
+HOUR = "hour"
+
+MINUTE_RETENTION = timedelta(days=3)
+"""分钟桶保留时长，需覆盖统计图表的最大分钟级范围（48 小时）"""
+
+DEFAULT_BATCH_SIZE = 5000
+
+MESSAGE_SOURCE = "mai_messages"
+MODEL_USAGE_SOURCE = "llm_usage"
+
+_MESSAGE_KEY = ["granularity", "bucket_start", "chat_id"]
+_MODEL_USAGE_KEY = ["granularity", "bucket_start", "request_type", "provider_name", "model_name"]
+_MODEL_USAGE_SUMS = [
+    "request_count",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cost",
+    "time_cost_sum",
+    "time_cost_sq_sum",
+    "time_cost_count",
+]
+
+_refresh_lock = threading.Lock()
+
+
+@dataclass
+class _BucketRange:
+    """查询区间拆分出的一段桶条件"""
+
+    granularity: str
+    start: datetime
+    end: datetime
+    include_end: bool = False
+
+
+def floor_minute(value: datetime) -> datetime:
+    return value.replace(second=0, microsecond=0)
+
+
+def floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def minute_floor(now: datetime) -> datetime:
+    """分钟桶可保证完整的最早时间点。"""
+    return floor_hour(now - MINUTE_RETENTION) + timedelta(hours=1)
+
+
+def series_granularity(start: datetime, now: datetime) -> str:
+    """为起始于 start 的时间序列选择粒度：分钟桶完整时用分钟桶，否则用小时桶。"""
+    return MINUTE if floor_minute(start) >= minute_floor(now) else HOUR
+
+
+def chat_key_of(
+    group_id: Optional[str],
+    group_name: Optional[str],
+    user_id: Optional[str],
+    user_nickname: Optional[str],
+) -> Optional[Tuple[str, str]]:
+    """计算消息对应的统计聊天 ID 与显示名称。
+
+    Returns:
+        Optional[Tuple[str, str]]: (chat_id, chat_name)，既无群号也无用户 ID 时返回 None。
+    """
+    if group_id:
+        return f"g{group_id}", group_name or f"群{group_id}"
+    if user_id:
+        return f"u{user_id}", user_nickname or f"用户{user_id}"
+    return None
+
+
+# ==================== 增量聚合 ====================
+
+
+def refresh_statistic_rollups(batch_size: int = DEFAULT_BATCH_SIZE, now: Optional[datetime] = None) -> int:
+    """把游标之后的新消息与 LLM 使用记录聚合进预聚合表，并清理过期的分钟桶。
+
+    Args:
+        batch_size: 每个事务处理的源表行数。
+        now: 基准当前时间，缺省为 `datetime.now()`。
+
+    Returns:
+        int: 本次聚合的源表行数。
+    """
+    now = now or datetime.now()
+    # 早于该时间的分钟桶会被清理，聚合时也不再写入
+    minute_cutoff = floor_hour(now - MINUTE_RETENTION)
+    with _refresh_lock:
+        processed = _refresh_source(MESSAGE_SOURCE, _aggregate_message_batch, batch_size, minute_cutoff, now)
+        processed += _refresh_source(
+            MODEL_USAGE_SOURCE, _aggregate_model_usage_batch, batch_size, minute_cutoff, now
+        )
+        with get_db_session() as session:
+            for table in (MessageStatRollup, ModelUsageStatRollup):
+                session.exec(
+                    delete(table).where(col(table.granularity) == MINUTE, col(table.bucket_start) < minute_cutoff)
+                )
+    if processed:
+        logger.debug(f"统计预聚合已推进 {processed} 条记录")
+    return processed
+
+
+def _refresh_source(
+    source: str,
+    aggregate_batch: Callable[[Session, int, int, datetime], Optional[Tuple[int, int]]],
+    batch_size: int,
+    minute_cutoff: datetime,
+    now: datetime,
+) -> int:
+    """逐批聚合一个源表，每批与游标推进处于同一事务。"""
+    processed = 0
+    while True:
+        with get_db_session() as session:
+            cursor = session.get(StatRollupCursor, source) or StatRollupCursor(source=source, last_id=0)
+            advanced = aggregate_batch(session, cursor.last_id, batch_size, minute_cutoff)
+            if advanced is None:
+                return processed
+            cursor.last_id, batch_rows = advanced
+            cursor.updated_at = now
+            session.add(cursor)
+        processed += batch_rows
+        if batch_rows < batch_size:
+            return processed
+
+
+def _bucket_starts(timestamp: datetime, minute_cutoff: datetime) -> List[Tuple[str, datetime]]:
+    buckets = [(HOUR, floor_hour(timestamp))]
+    if timestamp >= minute_cutoff:
+        buckets.append((MINUTE, floor_minute(timestamp)))
+    return buckets
+
+
+def _aggregate_message_batch(
+    session: Session, last_id: int, batch_size: int, minute_cutoff: datetime
+) -> Optional[Tuple[int, int]]:
+    from src.chat.utils.utils import is_bot_self
+
+    statement = (
+        select(
+            Messages.id,
+            Messages.timestamp,
+            Messages.platform,
+            Messages.user_id,
+            Messages.user_nickname,
+            Messages.group_id,
+            Messages.group_name,
+            Messages.reply_to,
+        )
+        .where(col(Messages.id) > last_id)
+        .order_by(col(Messages.id))
+        .limit(batch_size)
+    )
+    rows = session.exec(statement).all()
+    if not rows:
+        return None
+
+    buckets: Dict[Tuple[str, datetime, str], Dict[str, Any]] = {}
+    bot_cache: Dict[Tuple[str, str], bool] = {}
+    for _, timestamp, platform, user_id, user_nickname, group_id, group_name, reply_to in rows:
+        chat_key = chat_key_of(group_id, group_name, user_id, user_nickname)
+        if chat_key is None or timestamp is None:
+            continue
+        chat_id, chat_name = chat_key
+        sender = (platform or "", user_id or "")
+        if sender not in bot_cache:
+            bot_cache[sender] = is_bot_self(*sender)
+        for granularity, bucket_start in _bucket_starts(timestamp, minute_cutoff):
+            bucket = buckets.setdefault(
+                (granularity, bucket_start, chat_id),
+                {
+                    "granularity": granularity,
+                    "bucket_start": bucket_start,
+                    "chat_id": chat_id,
+                    "message_count": 0,
+                    "bot_message_count": 0,
+                    "reply_message_count": 0,
+                },
+            )
+            bucket["chat_name"] = chat_name
+            bucket["message_count"] += 1
+            bucket["bot_message_count"] += int(bot_cache[sender])
+            bucket["reply_message_count"] += int(bool(reply_to))
+
+    if buckets:
+        statement = sqlite_insert(MessageStatRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=_MESSAGE_KEY,
+            set_={
+                "chat_name": statement.excluded.chat_name,
+                "message_count": col(MessageStatRollup.message_count) + statement.excluded.message_count,
+                "bot_message_count": col(MessageStatRollup.bot_message_count) + statement.excluded.bot_message_count,
+                "reply_message_count": col(MessageStatRollup.reply_message_count)
+                + statement.excluded.reply_message_count,
+            },
+        )
+        session.exec(statement, params=list(buckets.values()))
+    return rows[-1][0], len(rows)
+
+
+def _aggregate_model_usage_batch(
+    session: Session, last_id: int, batch_size: int, minute_cutoff: datetime
+) -> Optional[Tuple[int, int]]:
+    statement = (
+        select(
+            ModelUsage.id,
+            ModelUsage.timestamp,
+            ModelUsage.request_type,
+            ModelUsage.model_api_provider_name,
+            ModelUsage.model_assign_name,
+            ModelUsage.model_name,
+            ModelUsage.prompt_tokens,
+            ModelUsage.completion_tokens,
+            ModelUsage.total_tokens,
+            ModelUsage.cost,
+            ModelUsage.time_cost,
+        )
+        .where(col(ModelUsage.id) > last_id)
+        .order_by(col(ModelUsage.id))
+        .limit(batch_size)
+    )
+    rows = session.exec(statement).all()
+    if not rows:
+        return None
+
+    buckets: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for row in rows:
+        (
+            _,
+            timestamp,
+            request_type,
+            provider_name,
+            model_assign_name,
+            model_name,
+            prompt_tokens,
+            completion_tokens,
+            total_tokens,
+            cost,
+            time_cost,
+        ) = row
+        if timestamp is None:
+            continue
+        dimensions = (
+            request_type or "unknown",
+            provider_name or "unknown",
+            model_assign_name or model_name or "unknown",
+        )
+        time_cost = time_cost or 0.0
+        for granularity, bucket_start in _bucket_starts(timestamp, minute_cutoff):
+            key = (granularity, bucket_start, *dimensions)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = dict(zip(_MODEL_USAGE_KEY, key, strict=True)) | dict.fromkeys(_MODEL_USAGE_SUMS, 0)
+            bucket["request_count"] += 1
+            bucket["prompt_tokens"] += prompt_tokens or 0
+            bucket["completion_tokens"] += completion_tokens or 0
+            bucket["total_tokens"] += total_tokens or 0
+            bucket["cost"] += cost or 0.0
+            if time_cost > 0:
+                bucket["time_cost_sum"] += time_cost
+                bucket["time_cost_sq_sum"] += time_cost * time_cost
+                bucket["time_cost_count"] += 1
+
+    if buckets:
+        statement = sqlite_insert(ModelUsageStatRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=_MODEL_USAGE_KEY,
+            set_={
+                name: getattr(ModelUsageStatRollup, name) + getattr(statement.excluded, name)
+                for name in _MODEL_USAGE_SUMS
+            },
+        )
+        session.exec(statement, params=list(buckets.values()))
+    return rows[-1][0], len(rows)
+
+
+class StatisticRollupTask(AsyncTask):
+    """统计预聚合任务：定期把新增的消息与 LLM 使用记录聚合进预聚合表"""
+
+    def __init__(self):
+        super().__init__(task_name="Statistic Rollup Task", wait_before_start=5, run_interval=60)
+
+    async def run(self):
+        try:
+            await asyncio.to_thread(refresh_statistic_rollups)
+        except Exception as e:
+            logger.exception(f"统计预聚合失败: {e}")
+
+
+# ==================== 查询 ====================
+
+
+def _split_range(start: datetime, end: datetime, now: datetime) -> List[_BucketRange]:
+    """把 [start, end] 拆成「分钟桶 - 小时桶 - 分钟桶」三段。"""
+    earliest_minute = minute_floor(now)
+    range_start = floor_minute(start)
+    if range_start < earliest_minute:
+        # 分钟桶已被清理，起始端退化为整小时精度
+        range_start = floor_hour(range_start)
+    tail_start = floor_hour(end)
+    tail_granularity = MINUTE if tail_start >= earliest_minute else HOUR
+    if tail_start <= range_start:
+        return [_BucketRange(tail_granularity, range_start, end, include_end=True)]
+
+    parts: List[_BucketRange] = []
+    head_end = floor_hour(range_start)
+    if head_end < range_start:
+        head_end += timedelta(hours=1)
+        parts.append(_BucketRange(MINUTE, range_start, head_end))
+    if head_end < tail_start:
+        parts.append(_BucketRange(HOUR, head_end, tail_start))
+    parts.append(_BucketRange(tail_granularity, tail_start, end, include_end=True))
+    return parts
+
+
+def _range_condition(table, start: datetime, end: datetime, now: datetime):
+    conditions = []
+    for part in _split_range(start, end, now):
+        bucket_start = col(table.bucket_start)
+        upper = bucket_start <= part.end if part.include_end else bucket_start < part.end
+        conditions.append(and_(col(table.granularity) == part.granularity, bucket_start >= part.start, upper))
+    return or_(*conditions)
+
+
+def query_model_usage_totals(session: Session, start: datetime, end: datetime, now: datetime) -> Sequence[Any]:
+    """按（请求类型, 供应商, 模型）汇总区间内的 LLM 使用情况。
+
+    Returns:
+        Sequence[Any]: 行元组 (request_type, provider_name, model_name, request_count, prompt_tokens,
+        completion_tokens, total_tokens, cost, time_cost_sum, time_cost_sq_sum, time_cost_count)。
+    """
+    table = ModelUsageStatRollup
+    statement = (
+        select(
+            table.request_type,
+            table.provider_name,
+            table.model_name,
+            *[func.sum(getattr(table, name)) for name in _MODEL_USAGE_SUMS],
+        )
+        .where(_range_condition(table, start, end, now))
+        .group_by(col(table.request_type), col(table.provider_name), col(table.model_name))
+    )
+    return session.exec(statement).all()
+
+
+def query_message_totals(session: Session, start: datetime, end: datetime, now: datetime) -> Sequence[Any]:
+    """按聊天汇总区间内的消息数。
+
+    Returns:
+        Sequence[Any]: 行元组 (chat_id, message_count, bot_message_count, reply_message_count)。
+    """
+    table = MessageStatRollup
+    statement = (
+        select(
+            table.chat_id,
+            func.sum(table.message_count),
+            func.sum(table.bot_message_count),
+            func.sum(table.reply_message_count),
+        )
+        .where(_range_condition(table, start, end, now))
+        .group_by(col(table.chat_id))
+    )
+    return session.exec(statement).all()
+
+
+def query_model_usage_series(session: Session, start: datetime, end: datetime, granularity: str) -> Sequence[Any]:
+    """按桶给出区间内的 LLM 使用时间序列。
+
+    Returns:
+        Sequence[Any]: 行元组 (bucket_start, request_type, model_name, request_count, prompt_tokens,
+        completion_tokens, total_tokens, cost)。
+    """
+    table = ModelUsageStatRollup
+    floor = floor_minute if granularity == MINUTE else floor_hour
+    statement = (
+        select(
+            table.bucket_start,
+            table.request_type,
+            table.model_name,
+            func.sum(table.request_count),
+            func.sum(table.prompt_tokens),
+            func.sum(table.completion_tokens),
+            func.sum(table.total_tokens),
+            func.sum(table.cost),
+        )
+        .where(
+            col(table.granularity) == granularity,
+            col(table.bucket_start) >= floor(start),
+            col(table.bucket_start) <= end,
+        )
+        .group_by(col(table.bucket_start), col(table.request_type), col(table.model_name))
+    )
+    return session.exec(statement).all()
+
+
+def query_message_series(session: Session, start: datetime, end: datetime, granularity: str) -> Sequence[Any]:
+    """按桶给出区间内各聊天的消息时间序列。
+
+    Returns:
+        Sequence[Any]: 行元组 (bucket_start, chat_id, message_count, bot_message_count)。
+    """
+    table = MessageStatRollup
+    floor = floor_minute if granularity == MINUTE else floor_hour
+    statement = select(table.bucket_start, table.chat_id, table.message_count, table.bot_message_count).where(
+        col(table.granularity) == granularity,
+        col(table.bucket_start) >= floor(start),
+        col(table.bucket_start) <= end,
+    )
+    return session.exec(statement).all()
+
+
+def query_chat_names(session: Session) -> Dict[str, Tuple[str, float]]:
+    """获取每个聊天最新的显示名称。
+
+    Returns:
+        Dict[str, Tuple[str, float]]: chat_id -> (聊天名称, 名称所在小时桶的时间戳)。
+    """
+    table = MessageStatRollup
+    # SQLite 中与 max() 同查的裸列取自最大值所在行
+    statement = (
+        select(table.chat_id, table.chat_name, func.max(table.bucket_start))
+        .where(col(table.granularity) == HOUR)
+        .group_by(col(table.chat_id))
+    )
+    names: Dict[str, Tuple[str, float]] = {}
+    for chat_id, chat_name, bucket_start in session.exec(statement).all():
+        if isinstance(bucket_start, str):
+            bucket_start = datetime.fromisoformat(bucket_start)
+        names[chat_id] = (chat_name, bucket_start.timestamp() if bucket_start else 0.0)
+    return names
@@ -219,6 +219,7 @@ class MaiImage(BaseImageDataModel):
     def __init__(self, full_path: str | Path, image_bytes: Optional[bytes] = None):
         self.description: str = ""
         self.vlm_processed: bool = False
+        self.perceptual_hash: Optional[str] = None
         super().__init__(full_path, image_bytes)
 
     @classmethod
@@ -233,6 +234,7 @@ class MaiImage(BaseImageDataModel):
         obj._restore_image_format_from_path()
         obj.description = db_record.description
         obj.vlm_processed = db_record.vlm_processed
+        obj.perceptual_hash = db_record.perceptual_hash
         return obj
 
     def to_db_instance(self) -> Images:
@@ -242,4 +244,5 @@ class MaiImage(BaseImageDataModel):
             full_path=str(self.full_path),
             image_type=ImageType.IMAGE,
             vlm_processed=self.vlm_processed,
+            perceptual_hash=self.perceptual_hash,
         )
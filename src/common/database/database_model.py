@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Enum as SQLEnum, Float, Text
+from sqlalchemy import Column, DateTime, Enum as SQLEnum, Float, Text, UniqueConstraint
 from sqlmodel import Field, LargeBinary, SQLModel
 
 
@@ -78,6 +78,7 @@ class ModelUsage(SQLModel, table=True):
     prompt_tokens: int  # 提示词令牌数
     completion_tokens: int  # 完成词令牌数
     total_tokens: int  # 总令牌数
+    cached_tokens: int = Field(default=0)  # 命中供应商提示词缓存的提示词令牌数（包含在 prompt_tokens 中）
     cost: float  # 本次请求的费用，单位元
 
 
@@ -110,6 +111,7 @@ class Images(SQLModel, table=True):
     last_used_time: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, nullable=True))  # 上次使用时间
 
     vlm_processed: bool = Field(default=False)  # 是否已经过VLM处理
+    perceptual_hash: Optional[str] = Field(default=None, max_length=32)  # 图片感知哈希（128 位 dHash 的十六进制），用于近重复检测
 
 
 class ToolRecord(SQLModel, table=True):
@@ -165,6 +167,60 @@ class OnlineTime(SQLModel, table=True):
     end_timestamp: datetime = Field(sa_column=Column(DateTime))  # 下线时间
 
 
+class MessageStatRollup(SQLModel, table=True):
+    """消息统计的预聚合桶（按分钟/小时、按聊天）"""
+
+    __tablename__ = "stat_message_rollups"  # type: ignore
+    __table_args__ = (UniqueConstraint("granularity", "bucket_start", "chat_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)  # 自增主键
+
+    granularity: str = Field(max_length=10)  # 聚合粒度，"minute" 或 "hour"
+    bucket_start: datetime = Field(sa_column=Column(DateTime))  # 桶起始时间
+    chat_id: str = Field(max_length=255)  # 统计用聊天ID，群聊为 g{group_id}，私聊为 u{user_id}
+    chat_name: str = Field(default="", max_length=255)  # 桶内最新的聊天显示名称
+
+    message_count: int = Field(default=0)  # 消息数
+    bot_message_count: int = Field(default=0)  # 机器人自身发送的消息数
+    reply_message_count: int = Field(default=0)  # 带有 reply_to 的消息数
+
+
+class ModelUsageStatRollup(SQLModel, table=True):
+    """LLM 使用统计的预聚合桶（按分钟/小时、按请求类型/供应商/模型）"""
+
+    __tablename__ = "stat_model_usage_rollups"  # type: ignore
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "request_type", "provider_name", "model_name"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)  # 自增主键
+
+    granularity: str = Field(max_length=10)  # 聚合粒度，"minute" 或 "hour"
+    bucket_start: datetime = Field(sa_column=Column(DateTime))  # 桶起始时间
+    request_type: str = Field(max_length=50)  # 内部请求类型
+    provider_name: str = Field(max_length=255)  # 模型API供应商名称
+    model_name: str = Field(max_length=255)  # 模型分配名称（缺省为实际名称）
+
+    request_count: int = Field(default=0)  # 请求次数
+    prompt_tokens: int = Field(default=0)  # 提示词令牌数
+    completion_tokens: int = Field(default=0)  # 完成词令牌数
+    total_tokens: int = Field(default=0)  # 总令牌数（llm_usage.total_tokens 之和）
+    cost: float = Field(default=0.0)  # 费用，单位元
+    time_cost_sum: float = Field(default=0.0)  # 有效耗时（>0）之和
+    time_cost_sq_sum: float = Field(default=0.0)  # 有效耗时平方和，用于计算标准差
+    time_cost_count: int = Field(default=0)  # 有效耗时样本数
+
+
+class StatRollupCursor(SQLModel, table=True):
+    """统计预聚合任务的增量游标"""
+
+    __tablename__ = "stat_rollup_cursors"  # type: ignore
+
+    source: str = Field(primary_key=True, max_length=50)  # 源表名称
+    last_id: int = Field(default=0)  # 已聚合的最大源表主键
+    updated_at: datetime = Field(default_factory=datetime.now, sa_column=Column(DateTime))  # 最近推进时间
+
+
 class Expression(SQLModel, table=True):
     """用于存储表达方式的模型"""
 
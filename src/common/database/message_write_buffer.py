@@ -0,0 +1,324 @@
+"""消息写后缓冲（write-behind）
+
+`MessageUtils.store_message_to_db` 不再在事件循环上逐条开会话、提交，而是把
+`Messages` 行放入内存缓冲，由后台写线程按「条数或时间」触发，在一个事务里以
+executemany 批量插入。
+
+- 读己之写：`read_with_pending()` 在短锁内取缓冲行快照，查询数据库时不持有提交锁；
+  借助写入代数（seqlock）检测查询期间是否有批次提交，有则重试，保证叠加结果不遗漏、不重复。
+  需要原地修改缓冲行的写路径使用持有提交锁的 `pending_view()`
+- 关闭保证：`close()` 停止写线程并同步刷出剩余行；另注册了 atexit 兜底
+- 写入失败：数据库不可用（OperationalError）时整批放回缓冲等待重试；其它错误逐条重写以隔离
+  坏行，单行失败达到 `max_row_attempts` 次后丢弃；缓冲超过 `max_pending` 条时丢弃最早的行
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, TypeVar
+
+import atexit
+import threading
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from src.common.database.database_model import Messages
+from src.common.logger import get_logger
+
+logger = get_logger("message_write_buffer")
+
+DEFAULT_BATCH_SIZE = 128
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_MAX_PENDING = 20000
+DEFAULT_MAX_ROW_ATTEMPTS = 3
+OPTIMISTIC_READ_ATTEMPTS = 3
+
+_ReadResultT = TypeVar("_ReadResultT")
+
+_INSERT_COLUMNS = [column.name for column in Messages.__table__.columns if column.name != "id"]  # type: ignore[attr-defined]
+
+
+class MessageWriteBuffer:
+    """`Messages` 表的批量写后缓冲。"""
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_row_attempts: int = DEFAULT_MAX_ROW_ATTEMPTS,
+    ) -> None:
+        """初始化写后缓冲。
+
+        Args:
+            engine: 目标数据库引擎，缺省时使用全局引擎并在首次刷写前初始化数据库。
+            batch_size: 缓冲条数达到该值时立即唤醒写线程。
+            flush_interval: 缓冲中最早一条消息等待的最长秒数。
+            max_pending: 缓冲行数上限，超出时丢弃最早的行。
+            max_row_attempts: 单行写入失败的最大次数，达到后丢弃该行。
+        """
+        self._engine = engine
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.max_pending = max(self.batch_size, int(max_pending))
+        self.max_row_attempts = max(1, int(max_row_attempts))
+
+        self._lock = threading.Lock()
+        # 提交锁：持有期间「缓冲 + 在途批次」与数据库内容互不重叠
+        self._commit_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: List[Messages] = []
+        self._inflight: List[Messages] = []
+        # 写入代数：批次开始写入与结束时各加一，奇数表示有批次在途（供乐观读取校验）
+        self._write_generation = 0
+        # id(行) -> 单行写入失败次数
+        self._row_failures: Dict[int, int] = {}
+        self._oldest_enqueued_at: float = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._stats: Dict[str, float] = {
+            "enqueued": 0,
+            "written": 0,
+            "flushes": 0,
+            "failures": 0,
+            "dropped": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    # ==================== 写入 ====================
+
+    def enqueue(self, db_message: Messages) -> None:
+        """放入一条待写入的消息行。
+
+        Args:
+            db_message: 未绑定会话的 `Messages` 实例。
+        """
+        with self._lock:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                if not self._pending:
+                    self._oldest_enqueued_at = time.monotonic()
+                self._pending.append(db_message)
+                self._stats["enqueued"] += 1
+                self._trim_pending_locked()
+                should_wake = len(self._pending) >= self.batch_size
+        if closed:
+            # 关闭之后（如 atexit 阶段的迟到消息）直接同步写入，避免丢失
+            self._write_rows([db_message])
+            return
+        self._ensure_writer()
+        if should_wake:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """同步刷出当前缓冲中的全部消息。
+
+        Returns:
+            int: 本次写入的行数。
+        """
+        with self._commit_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = []
+                self._inflight = batch
+                if batch:
+                    self._write_generation += 1
+            if not batch:
+                return 0
+            requeue: List[Messages] = []
+            try:
+                self._write_rows(batch)
+                written = len(batch)
+            except OperationalError as e:
+                # 数据库不可用/被锁：整批放回，下次触发时重试（缓冲由 max_pending 限长）
+                requeue = batch
+                written = 0
+                logger.error(f"批量写入消息失败，{len(batch)} 条消息已放回缓冲等待重试: {e}")
+            except Exception as e:
+                # 数据类错误：逐条重写，隔离坏行，避免一行阻塞后续全部写入
+                logger.warning(f"批量写入消息失败，改为逐条写入以隔离异常行: {e}")
+                written, requeue = self._write_rows_individually(batch)
+            finally:
+                with self._lock:
+                    # 放回与清空在途批次在同一临界区内完成，读取方不会看到行暂时消失
+                    requeued_ids = {id(db_message) for db_message in requeue}
+                    for db_message in batch:
+                        if id(db_message) not in requeued_ids:
+                            self._row_failures.pop(id(db_message), None)
+                    if requeue:
+                        self._pending = requeue + self._pending
+                        self._oldest_enqueued_at = time.monotonic()
+                        self._stats["failures"] += 1
+                        self._trim_pending_locked()
+                    self._inflight = []
+                    self._write_generation += 1
+        return written
+
+    def _write_rows_individually(self, batch: List[Messages]) -> Tuple[int, List[Messages]]:
+        """逐条写入；返回 (写入行数, 需要放回缓冲重试的行)。"""
+        written = 0
+        requeue: List[Messages] = []
+        for index, db_message in enumerate(batch):
+            try:
+                self._write_rows([db_message])
+                written += 1
+            except OperationalError as e:
+                # 数据库中途不可用：剩余行不计失败次数，整体放回
+                logger.error(f"逐条写入消息时数据库不可用，{len(batch) - index} 条消息已放回缓冲: {e}")
+                requeue.extend(batch[index:])
+                break
+            except Exception as e:
+                with self._lock:
+                    attempts = self._row_failures.get(id(db_message), 0) + 1
+                    if attempts >= self.max_row_attempts:
+                        self._row_failures.pop(id(db_message), None)
+                        self._stats["dropped"] += 1
+                    else:
+                        self._row_failures[id(db_message)] = attempts
+                if attempts >= self.max_row_attempts:
+                    logger.error(
+                        f"消息 {db_message.message_id} 连续 {attempts} 次写入失败，已丢弃: {e}"
+                    )
+                else:
+                    requeue.append(db_message)
+        return written, requeue
+
+    def close(self) -> None:
+        """停止写线程并刷出剩余消息，可重复调用。"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+            self._thread = None
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=max(5.0, self.flush_interval * 4))
+        if written := self.flush():
+            logger.info(f"关闭消息写缓冲，已刷出 {written} 条消息")
+
+    # ==================== 读己之写 ====================
+
+    def read_with_pending(self, reader: Callable[[List[Messages]], _ReadResultT]) -> _ReadResultT:
+        """对「数据库 + 尚未落库的缓冲行」执行一次一致读取，查询期间不阻塞写线程。
+
+        只在短锁内取缓冲行快照，随后调用 ``reader`` 查询数据库并叠加；若快照时有批次在途，
+        或查询期间有批次开始/完成提交，结果可能遗漏或重复，此时重试。多次重试仍冲突时
+        退回持有提交锁的 `pending_view()`。
+
+        Args:
+            reader: 读取函数，参数为按入队顺序排列的缓冲行快照，须可安全重复执行且不修改行。
+
+        Returns:
+            _ReadResultT: ``reader`` 的返回值。
+        """
+        for _ in range(OPTIMISTIC_READ_ATTEMPTS):
+            with self._lock:
+                generation = self._write_generation
+                snapshot = self._inflight + self._pending
+            if generation % 2:
+                continue
+            result = reader(snapshot)
+            with self._lock:
+                if self._write_generation == generation:
+                    return result
+        with self.pending_view() as pending_messages:
+            return reader(pending_messages)
+
+    @contextmanager
+    def pending_view(self) -> Generator[List[Messages], None, None]:
+        """持有提交锁，给出尚未落库的消息行。
+
+        在上下文内查询数据库并叠加这些行，结果既不遗漏也不重复；
+        上下文内不可调用 `flush()`。持锁期间写线程无法提交，只读查询应使用 `read_with_pending()`。
+
+        Yields:
+            List[Messages]: 按入队顺序排列的缓冲行（与缓冲共享对象，可原地修改字段）。
+        """
+        with self._commit_lock:
+            with self._lock:
+                snapshot = self._inflight + self._pending
+            yield snapshot
+
+    def find_pending(self, message_id: str) -> Optional[Messages]:
+        """按消息 ID 查找最新一条尚未落库的消息行。
+
+        Args:
+            message_id: 消息 ID。
+
+        Returns:
+            Optional[Messages]: 命中的缓冲行，未命中时返回 ``None``。
+        """
+        with self._lock:
+            for db_message in reversed(self._inflight + self._pending):
+                if db_message.message_id == message_id:
+                    return db_message
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓冲统计信息。"""
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending) + len(self._inflight)}
+
+    # ==================== 内部实现 ====================
+
+    def _trim_pending_locked(self) -> None:
+        """缓冲超过上限时丢弃最早的行（调用方持有 `_lock`）。"""
+        overflow = len(self._pending) - self.max_pending
+        if overflow <= 0:
+            return
+        dropped = self._pending[:overflow]
+        del self._pending[:overflow]
+        for db_message in dropped:
+            self._row_failures.pop(id(db_message), None)
+        self._stats["dropped"] += overflow
+        logger.error(f"消息写缓冲已满（上限 {self.max_pending} 条），丢弃最早的 {overflow} 条消息")
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(target=self._run, name="message-write-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                pending = len(self._pending)
+                waited = time.monotonic() - self._oldest_enqueued_at if pending else 0.0
+            if pending >= self.batch_size or (pending and waited >= self.flush_interval):
+                self.flush()
+                continue
+            timeout = self.flush_interval - waited if pending else None
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _get_engine(self) -> Engine:
+        if self._engine is None:
+            from src.common.database.database import engine, initialize_database
+
+            initialize_database()
+            self._engine = engine
+        return self._engine
+
+    def _write_rows(self, batch: List[Messages]) -> None:
+        started = time.perf_counter()
+        rows = [{name: getattr(db_message, name) for name in _INSERT_COLUMNS} for db_message in batch]
+        with self._get_engine().begin() as connection:
+            connection.execute(insert(Messages), rows)
+        with self._lock:
+            self._stats["written"] += len(rows)
+            self._stats["flushes"] += 1
+            self._stats["last_flush_ms"] = (time.perf_counter() - started) * 1000.0
+
+
+message_write_buffer = MessageWriteBuffer()
+atexit.register(message_write_buffer.close)
@@ -8,12 +8,16 @@ from .registry import MigrationRegistry
 from .resolver import BaseSchemaVersionDetector, SchemaVersionResolver
 from .schema import SQLiteSchemaInspector
 from .v2_to_v3 import migrate_v2_to_v3
+from .v3_to_v4 import migrate_v3_to_v4
+from .v4_to_v5 import migrate_v4_to_v5
 from .version_store import SQLiteUserVersionStore
 
 EMPTY_SCHEMA_VERSION = 0
 LEGACY_V1_SCHEMA_VERSION = 1
 V2_SCHEMA_VERSION = 2
-LATEST_SCHEMA_VERSION = 3
+V3_SCHEMA_VERSION = 3
+V4_SCHEMA_VERSION = 4
+LATEST_SCHEMA_VERSION = 5
 
 _LEGACY_V1_EXCLUSIVE_TABLES = (
     "chat_streams",
@@ -35,6 +39,39 @@ _COMMON_MARKER_TABLES = (
 )
 
 
+def _matches_v3_layout(snapshot: DatabaseSchemaSnapshot) -> bool:
+    """判断数据库是否具备 v3 及之后版本共有的表结构。
+
+    Args:
+        snapshot: 当前数据库结构快照。
+
+    Returns:
+        bool: 若符合 v3 结构特征则返回 ``True``。
+    """
+
+    if any(snapshot.has_table(table_name) for table_name in _LEGACY_V1_EXCLUSIVE_TABLES):
+        return False
+    if not all(snapshot.has_table(table_name) for table_name in _COMMON_MARKER_TABLES):
+        return False
+    if snapshot.has_table("action_records"):
+        return False
+    if snapshot.has_table("thinking_questions"):
+        return False
+    if snapshot.has_column("images", "emotion"):
+        return False
+    if not snapshot.has_column("images", "image_hash"):
+        return False
+    if not snapshot.has_column("images", "full_path"):
+        return False
+    if not snapshot.has_column("images", "image_type"):
+        return False
+    if not snapshot.has_column("chat_history", "session_id"):
+        return False
+    if not snapshot.has_column("person_info", "user_nickname"):
+        return False
+    return True
+
+
 class LatestSchemaVersionDetector(BaseSchemaVersionDetector):
     """当前最新 schema 结构探测器。"""
 
@@ -58,27 +95,71 @@ class LatestSchemaVersionDetector(BaseSchemaVersionDetector):
             Optional[int]: 若识别为最新结构则返回最新版本号，否则返回 ``None``。
         """
 
-        if any(snapshot.has_table(table_name) for table_name in _LEGACY_V1_EXCLUSIVE_TABLES):
+        if not _matches_v3_layout(snapshot):
             return None
-        if not all(snapshot.has_table(table_name) for table_name in _COMMON_MARKER_TABLES):
-            return None
-        if snapshot.has_table("action_records"):
-            return None
-        if snapshot.has_table("thinking_questions"):
-            return None
-        if snapshot.has_column("images", "emotion"):
+        if not snapshot.has_column("llm_usage", "cached_tokens"):
             return None
-        if not snapshot.has_column("images", "image_hash"):
+        if not snapshot.has_column("images", "perceptual_hash"):
             return None
-        if not snapshot.has_column("images", "full_path"):
-            return None
-        if not snapshot.has_column("images", "image_type"):
+        return LATEST_SCHEMA_VERSION
+
+
+class V4SchemaVersionDetector(BaseSchemaVersionDetector):
+    """v4 schema 结构探测器。"""
+
+    @property
+    def name(self) -> str:
+        """返回探测器名称。
+
+        Returns:
+            str: 当前探测器名称。
+        """
+
+        return "v4_schema_detector"
+
+    def detect_version(self, snapshot: DatabaseSchemaSnapshot) -> Optional[int]:
+        """检测数据库是否为 v4 结构。
+
+        Args:
+            snapshot: 当前数据库结构快照。
+
+        Returns:
+            Optional[int]: 若识别为 v4 结构则返回 ``4``，否则返回 ``None``。
+        """
+
+        if not _matches_v3_layout(snapshot):
             return None
-        if not snapshot.has_column("chat_history", "session_id"):
+        if not snapshot.has_column("llm_usage", "cached_tokens"):
             return None
-        if not snapshot.has_column("person_info", "user_nickname"):
+        return V4_SCHEMA_VERSION
+
+
+class V3SchemaVersionDetector(BaseSchemaVersionDetector):
+    """v3 schema 结构探测器。"""
+
+    @property
+    def name(self) -> str:
+        """返回探测器名称。
+
+        Returns:
+            str: 当前探测器名称。
+        """
+
+        return "v3_schema_detector"
+
+    def detect_version(self, snapshot: DatabaseSchemaSnapshot) -> Optional[int]:
+        """检测数据库是否为 v3 结构。
+
+        Args:
+            snapshot: 当前数据库结构快照。
+
+        Returns:
+            Optional[int]: 若识别为 v3 结构则返回 ``3``，否则返回 ``None``。
+        """
+
+        if not _matches_v3_layout(snapshot):
             return None
-        return LATEST_SCHEMA_VERSION
+        return V3_SCHEMA_VERSION
 
 
 class V2SchemaVersionDetector(BaseSchemaVersionDetector):
@@ -174,6 +255,8 @@ def build_default_schema_version_detectors() -> List[BaseSchemaVersionDetector]:
 
     return [
         LatestSchemaVersionDetector(),
+        V4SchemaVersionDetector(),
+        V3SchemaVersionDetector(),
         V2SchemaVersionDetector(),
         LegacyV1SchemaDetector(),
     ]
@@ -211,10 +294,24 @@ def build_default_migration_registry() -> MigrationRegistry:
             ),
             MigrationStep(
                 version_from=V2_SCHEMA_VERSION,
-                version_to=LATEST_SCHEMA_VERSION,
+                version_to=V3_SCHEMA_VERSION,
                 name="v2_to_v3",
                 description="移除废弃表，并将 emoji 标签统一收敛到 description 字段。",
                 handler=migrate_v2_to_v3,
             ),
+            MigrationStep(
+                version_from=V3_SCHEMA_VERSION,
+                version_to=V4_SCHEMA_VERSION,
+                name="v3_to_v4",
+                description="为 llm_usage 增加命中提示词缓存的 token 数字段。",
+                handler=migrate_v3_to_v4,
+            ),
+            MigrationStep(
+                version_from=V4_SCHEMA_VERSION,
+                version_to=LATEST_SCHEMA_VERSION,
+                name="v4_to_v5",
+                description="为 images 增加用于近重复检测的感知哈希字段。",
+                handler=migrate_v4_to_v5,
+            ),
         ]
     )
@@ -0,0 +1,38 @@
+"""v3 schema 升级到 v4 的迁移逻辑。"""
+
+from src.common.logger import get_logger
+
+from .models import MigrationExecutionContext
+from .schema import SQLiteSchemaInspector
+
+logger = get_logger("database_migration")
+
+
+def migrate_v3_to_v4(context: MigrationExecutionContext) -> None:
+    """执行 v3 到 v4 的 schema 迁移：为 ``llm_usage`` 增加 ``cached_tokens`` 字段。
+
+    Args:
+        context: 当前迁移步骤执行上下文。
+    """
+
+    connection = context.connection
+    context.start_progress(
+        total_tables=1,
+        total_records=0,
+        description="v3 -> v4 迁移进度",
+        table_unit_name="表",
+        record_unit_name="记录",
+    )
+
+    schema_inspector = SQLiteSchemaInspector()
+    added_column = False
+    if schema_inspector.table_exists(connection, "llm_usage"):
+        table_schema = schema_inspector.get_table_schema(connection, "llm_usage")
+        if not table_schema.has_column("cached_tokens"):
+            connection.exec_driver_sql(
+                'ALTER TABLE "llm_usage" ADD COLUMN "cached_tokens" INTEGER NOT NULL DEFAULT 0'
+            )
+            added_column = True
+    context.advance_progress(completed_tables=1, item_name="llm_usage")
+
+    logger.info(f"v3 -> v4 数据库迁移完成: llm_usage.cached_tokens {'已添加' if added_column else '已存在'}")
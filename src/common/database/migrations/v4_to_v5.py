@@ -0,0 +1,38 @@
+"""v4 schema 升级到 v5 的迁移逻辑。"""
+
+from src.common.logger import get_logger
+
+from .models import MigrationExecutionContext
+from .schema import SQLiteSchemaInspector
+
+logger = get_logger("database_migration")
+
+
+def migrate_v4_to_v5(context: MigrationExecutionContext) -> None:
+    """执行 v4 到 v5 的 schema 迁移：为 ``images`` 增加 ``perceptual_hash`` 字段。
+
+    已有图片记录的感知哈希保持为空，在图片再次入库时按需补齐。
+
+    Args:
+        context: 当前迁移步骤执行上下文。
+    """
+
+    connection = context.connection
+    context.start_progress(
+        total_tables=1,
+        total_records=0,
+        description="v4 -> v5 迁移进度",
+        table_unit_name="表",
+        record_unit_name="记录",
+    )
+
+    schema_inspector = SQLiteSchemaInspector()
+    added_column = False
+    if schema_inspector.table_exists(connection, "images"):
+        table_schema = schema_inspector.get_table_schema(connection, "images")
+        if not table_schema.has_column("perceptual_hash"):
+            connection.exec_driver_sql('ALTER TABLE "images" ADD COLUMN "perceptual_hash" VARCHAR(32)')
+            added_column = True
+    context.advance_progress(completed_tables=1, item_name="images")
+
+    logger.info(f"v4 -> v5 数据库迁移完成: images.perceptual_hash {'已添加' if added_column else '已存在'}")
@@ -10,6 +10,7 @@ from sqlmodel import col, select
 from src.chat.message_receive.message import SessionMessage
 from src.common.database.database import get_db_session
 from src.common.database.database_model import Messages
+from src.common.database.message_write_buffer import message_write_buffer
 from src.common.logger import get_logger
 
 logger = get_logger(__name__)
@@ -108,6 +109,63 @@ def _build_message_conditions(
     return conditions
 
 
+def _pending_message_matches(
+    message: Messages,
+    *,
+    session_id: str | None = None,
+    user_id: str | None = None,
+    group_id: str | None = None,
+    platform: str | None = None,
+    message_id: str | None = None,
+    reply_to: str | None = None,
+    start_time: float | None = None,
+    end_time: float | None = None,
+    before_time: float | None = None,
+    after_time: float | None = None,
+    has_reply_to: bool | None = None,
+) -> bool:
+    """与 `_build_message_conditions` 等价的内存过滤，用于写后缓冲中尚未落库的消息。"""
+    if message.message_id == "notice":
+        return False
+    for field_name, expected in (
+        ("session_id", session_id),
+        ("user_id", user_id),
+        ("group_id", group_id),
+        ("platform", platform),
+        ("message_id", message_id),
+        ("reply_to", reply_to),
+    ):
+        if expected is not None and getattr(message, field_name) != expected:
+            return False
+    timestamp = message.timestamp
+    if start_time is not None and not timestamp >= _coerce_datetime(start_time):
+        return False
+    if end_time is not None and not timestamp <= _coerce_datetime(end_time):
+        return False
+    if before_time is not None and not timestamp < _coerce_datetime(before_time):
+        return False
+    if after_time is not None and not timestamp > _coerce_datetime(after_time):
+        return False
+    if has_reply_to is not None and (message.reply_to is not None) != has_reply_to:
+        return False
+    return True
+
+
+def _sort_pending_merged(results: list[Messages], sort: list[tuple[str, int]]) -> list[Messages]:
+    """在 Python 侧按 sort 条件对「数据库结果 + 缓冲消息」重新排序（多键稳定排序）。"""
+    for field_name, direction in reversed(sort):
+        sort_field = _resolve_field(field_name)
+        if sort_field is None:
+            continue
+        attr_name = sort_field.key
+        results.sort(
+            # 与 SQLite 一致：NULL 视为最小值
+            key=lambda msg: (getattr(msg, attr_name) is not None, getattr(msg, attr_name)),
+            reverse=direction != 1,
+        )
+    return results
+
+
 def find_messages(
     *,
     session_id: str | None = None,
@@ -149,22 +207,26 @@ def find_messages(
         消息字典列表，如果出错则返回空列表。
     """
     try:
-        conditions = _build_message_conditions(
-            session_id=session_id,
-            user_id=user_id,
-            group_id=group_id,
-            platform=platform,
-            message_id=message_id,
-            reply_to=reply_to,
-            start_time=start_time,
-            end_time=end_time,
-            before_time=before_time,
-            after_time=after_time,
-        )
+        filters: dict[str, Any] = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "group_id": group_id,
+            "platform": platform,
+            "message_id": message_id,
+            "reply_to": reply_to,
+            "start_time": start_time,
+            "end_time": end_time,
+            "before_time": before_time,
+            "after_time": after_time,
+        }
+        conditions = _build_message_conditions(**filters)
+        bot_pairs: set[tuple[str, str]] = set()
+        bot_user_fallback: str | None = None
         if filter_bot:
             from src.chat.utils.utils import get_all_bot_accounts, get_bot_account
 
             bot_accounts = get_all_bot_accounts()
+            bot_pairs = {(platform_name, account) for platform_name, account in bot_accounts.items()}
             exclusion_conditions: list[Any] = []
             if bot_accounts:
                 exclusion_conditions.append(
@@ -181,6 +243,7 @@ def find_messages(
             # plan 建议的 ("", qq_account) pair 只能覆盖空 platform 行，无法覆盖这种情况。
             # 因此这里使用全局 user_id 匹配作为临时方案，待 DB 迁移后应移除此兜底。
             if qq_fallback := get_bot_account("qq"):
+                bot_user_fallback = qq_fallback
                 exclusion_conditions.append(Messages.user_id == qq_fallback)
 
             if exclusion_conditions:
@@ -188,38 +251,60 @@ def find_messages(
         if filter_command:
             conditions.append(Messages.is_command == False)  # noqa: E712
 
+        def _pending_matches(msg: Messages) -> bool:
+            if not _pending_message_matches(msg, **filters):
+                return False
+            if filter_bot and ((msg.platform, msg.user_id) in bot_pairs or msg.user_id == bot_user_fallback):
+                return False
+            return not (filter_command and msg.is_command)
+
         statement = select(Messages).where(*conditions)
-        with get_db_session(auto_commit=False) as session:
-            if limit > 0:
-                if limit_mode == "earliest":
-                    statement = statement.order_by(col(Messages.timestamp)).limit(limit)
-                    results = list(session.exec(statement).all())
+
+        def _read(pending_messages: list[Messages]) -> list[SessionMessage]:
+            # 可能因并发提交而重试，每次从同一基础语句构建查询
+            query = statement
+            with get_db_session(auto_commit=False) as session:
+                pending_results = [msg for msg in pending_messages if _pending_matches(msg)]
+                if limit > 0:
+                    if limit_mode == "earliest":
+                        query = query.order_by(col(Messages.timestamp)).limit(limit)
+                        results = list(session.exec(query).all())
+                        if pending_results:
+                            results = sorted(results + pending_results, key=lambda msg: msg.timestamp)[:limit]
+                    else:
+                        query = query.order_by(col(Messages.timestamp).desc()).limit(limit)
+                        results = list(session.exec(query).all())
+                        results = list(reversed(results))
+                        if pending_results:
+                            results = sorted(results + pending_results, key=lambda msg: msg.timestamp)[-limit:]
                 else:
-                    statement = statement.order_by(col(Messages.timestamp).desc()).limit(limit)
-                    results = list(session.exec(statement).all())
-                    results = list(reversed(results))
-            else:
-                if sort:
-                    order_terms: list[Any] = []
-                    for field_name, direction in sort:
-                        sort_field = _resolve_field(field_name)
-                        if sort_field is None:
-                            logger.warning(f"排序字段 '{field_name}' 在 Messages 模型中未找到。将跳过此排序条件。")
-                            continue
-                        order_terms.append(sort_field.asc() if direction == 1 else sort_field.desc())
-                    if order_terms:
-                        statement = statement.order_by(*order_terms)
-                results = list(session.exec(statement).all())
-
-            if filter_intercept_message_level is not None:
-                filtered_results = []
-                for msg in results:
-                    config = _parse_additional_config(msg)
-                    if config.get("intercept_message_level", 0) <= filter_intercept_message_level:
-                        filtered_results.append(msg)
-                results = filtered_results
-
-            return [_message_to_instance(msg) for msg in results]
+                    if sort:
+                        order_terms: list[Any] = []
+                        for field_name, direction in sort:
+                            sort_field = _resolve_field(field_name)
+                            if sort_field is None:
+                                logger.warning(f"排序字段 '{field_name}' 在 Messages 模型中未找到。将跳过此排序条件。")
+                                continue
+                            order_terms.append(sort_field.asc() if direction == 1 else sort_field.desc())
+                        if order_terms:
+                            query = query.order_by(*order_terms)
+                    results = list(session.exec(query).all())
+                    if pending_results:
+                        results.extend(pending_results)
+                        if sort:
+                            results = _sort_pending_merged(results, sort)
+
+                if filter_intercept_message_level is not None:
+                    filtered_results = []
+                    for msg in results:
+                        config = _parse_additional_config(msg)
+                        if config.get("intercept_message_level", 0) <= filter_intercept_message_level:
+                            filtered_results.append(msg)
+                    results = filtered_results
+
+                return [_message_to_instance(msg) for msg in results]
+
+        return message_write_buffer.read_with_pending(_read)
     except Exception as e:
         log_message = (
             "使用 SQLModel 查找消息失败 "
@@ -280,9 +365,31 @@ def count_messages(
             has_reply_to=has_reply_to,
         )
         statement = select(func.count()).select_from(Messages).where(*conditions)
-        with get_db_session() as session:
-            result = session.exec(statement).one()
-        return int(result or 0)
+
+        def _read(pending_messages: list[Messages]) -> int:
+            with get_db_session() as session:
+                result = session.exec(statement).one()
+                pending_count = sum(
+                    1
+                    for msg in pending_messages
+                    if _pending_message_matches(
+                        msg,
+                        session_id=session_id,
+                        user_id=user_id,
+                        group_id=group_id,
+                        platform=platform,
+                        message_id=message_id,
+                        reply_to=reply_to,
+                        start_time=start_time,
+                        end_time=end_time,
+                        before_time=before_time,
+                        after_time=after_time,
+                        has_reply_to=has_reply_to,
+                    )
+                )
+                return int(result or 0) + pending_count
+
+        return message_write_buffer.read_with_pending(_read)
     except Exception as e:
         log_message = (
             "使用 SQLModel 计数消息失败 "
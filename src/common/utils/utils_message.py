@@ -142,12 +142,13 @@ class MessageUtils:
 
     @staticmethod
     def store_message_to_db(message: "SessionMessage"):
-        """存储消息到数据库，此方法没有update机制"""
-        from src.common.database.database import get_db_session
+        """存储消息到数据库，此方法没有update机制
+
+        消息先进入写后缓冲，由后台线程批量提交；`message_repository` 的查询会叠加尚未落库的消息。
+        """
+        from src.common.database.message_write_buffer import message_write_buffer
 
-        with get_db_session() as session:
-            db_message = message.to_db_instance()
-            session.add(db_message)
+        message_write_buffer.enqueue(message.to_db_instance())
 
     @staticmethod
     def update_message_id(old_message_id: str, new_message_id: str) -> bool:
@@ -169,12 +170,16 @@ class MessageUtils:
 
         from src.common.database.database import get_db_session
         from src.common.database.database_model import Messages
+        from src.common.database.message_write_buffer import message_write_buffer
 
-        with get_db_session() as session:
+        # 刚发送的消息通常仍在写后缓冲中，需要与数据库中的行一并回填
+        with message_write_buffer.pending_view() as pending_messages, get_db_session() as session:
             existing_target = session.exec(
                 select(Messages).filter_by(message_id=normalized_new_message_id).limit(1)
             ).first()
-            if existing_target is not None:
+            if existing_target is not None or any(
+                pending.message_id == normalized_new_message_id for pending in pending_messages
+            ):
                 logger.warning(
                     "消息 ID 回填时发现真实 ID 已存在，已跳过更新: "
                     f"{normalized_old_message_id} -> {normalized_new_message_id}"
@@ -184,12 +189,15 @@ class MessageUtils:
             source_messages = session.exec(
                 select(Messages).filter_by(message_id=normalized_old_message_id)
             ).all()
-            if not source_messages:
+            pending_sources = [pending for pending in pending_messages if pending.message_id == normalized_old_message_id]
+            if not source_messages and not pending_sources:
                 return False
 
             for source_message in source_messages:
                 source_message.message_id = normalized_new_message_id
                 session.add(source_message)
+            for pending in pending_sources:
+                pending.message_id = normalized_new_message_id
 
             reply_target_messages = session.exec(
                 select(Messages).filter_by(reply_to=normalized_old_message_id)
@@ -197,6 +205,9 @@ class MessageUtils:
             for reply_target_message in reply_target_messages:
                 reply_target_message.reply_to = normalized_new_message_id
                 session.add(reply_target_message)
+            for pending in pending_messages:
+                if pending.reply_to == normalized_old_message_id:
+                    pending.reply_to = normalized_new_message_id
 
         return True
 
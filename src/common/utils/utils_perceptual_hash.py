@@ -0,0 +1,204 @@
+"""图片感知哈希与汉明距离近邻索引。
+
+同一张图片被重新压缩、缩放或经其他平台转发后，字节级 sha256 会完全不同，
+但视觉内容几乎不变。这里使用双向差值哈希（dHash）描述图片的明暗梯度：
+
+- 将图片缩放为 9x8 与 8x9 的灰度缩略图，分别比较水平、垂直相邻像素的明暗，共 128 位
+- 缩放与有损压缩只会翻转少量位，不同图片的汉明距离通常远大于同图变体
+- 几乎纯色的图片梯度全部由噪声决定，容易与其他低信息量图片碰撞，此类图片不计算哈希
+
+``PerceptualHashIndex`` 是按汉明距离组织的 BK 树，利用三角不等式剪枝，
+查询给定距离内的近邻时只需访问少量节点。
+
+8x8 的梯度无法分辨“同一模板、配字不同”的图片，因此哈希命中后还需用
+``compute_detail_thumbnail`` / ``max_block_difference`` 在 32x32 灰度缩略图上复核：
+重压缩与缩放带来的是均匀的细微差异，而配字不同会在局部区域产生明显差异。
+"""
+
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+import io
+
+from PIL import Image as PILImage
+import numpy as np
+
+PERCEPTUAL_HASH_BITS = 128
+"""感知哈希位数"""
+
+_HASH_SIZE = 8
+_MIN_THUMBNAIL_STDDEV = 3.0
+"""灰度缩略图像素标准差低于该值时视为低信息量图片"""
+_DETAIL_PRESCALE_SIZE = 64
+_DETAIL_SIZE = 32
+_DETAIL_BLOCK_SIZE = 4
+
+DEFAULT_DETAIL_THRESHOLD = 4.0
+"""复核缩略图时，任一 4x4 区块的平均灰度差超过该值即视为不同图片"""
+
+KeyT = TypeVar("KeyT")
+
+
+def _load_grayscale(image_bytes: bytes) -> PILImage.Image:
+    """读取图片的第一帧并转换为灰度图，透明区域按白色背景合成。
+
+    Args:
+        image_bytes: 图片字节数据。
+
+    Returns:
+        PILImage.Image: 灰度图片。
+    """
+    with PILImage.open(io.BytesIO(image_bytes)) as image:
+        image.seek(0)
+        if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+            rgba_image = image.convert("RGBA")
+            background = PILImage.new("RGBA", rgba_image.size, (255, 255, 255, 255))
+            background.alpha_composite(rgba_image)
+            return background.convert("L")
+        return image.convert("L")
+
+
+def compute_perceptual_hash(image_bytes: bytes) -> Optional[str]:
+    """计算图片的 128 位双向 dHash。
+
+    Args:
+        image_bytes: 图片字节数据。
+
+    Returns:
+        Optional[str]: 32 位十六进制哈希字符串；无法解码或图片几乎为纯色时返回 ``None``。
+    """
+    try:
+        grayscale = _load_grayscale(image_bytes)
+    except Exception:
+        return None
+
+    horizontal = np.asarray(grayscale.resize((_HASH_SIZE + 1, _HASH_SIZE), PILImage.Resampling.LANCZOS), dtype=np.int16)
+    vertical = np.asarray(grayscale.resize((_HASH_SIZE, _HASH_SIZE + 1), PILImage.Resampling.LANCZOS), dtype=np.int16)
+    if float(horizontal.std()) < _MIN_THUMBNAIL_STDDEV:
+        return None
+
+    # 前 64 位逐行比较左右相邻像素，后 64 位逐列比较上下相邻像素
+    bits = np.concatenate(
+        [
+            (horizontal[:, :-1] > horizontal[:, 1:]).ravel(),
+            (vertical[:-1, :] > vertical[1:, :]).T.ravel(),
+        ]
+    )
+    return np.packbits(bits).tobytes().hex()
+
+
+def compute_detail_thumbnail(image_bytes: bytes) -> Optional[np.ndarray]:
+    """计算用于复核近重复图片的 32x32 灰度缩略图。
+
+    先用 LANCZOS 缩放到 64x64 抑制缩放与压缩噪声，再按 2x2 区块取平均。
+
+    Args:
+        image_bytes: 图片字节数据。
+
+    Returns:
+        Optional[np.ndarray]: ``float32`` 灰度矩阵；无法解码时返回 ``None``。
+    """
+    try:
+        grayscale = _load_grayscale(image_bytes)
+    except Exception:
+        return None
+    prescaled = grayscale.resize((_DETAIL_PRESCALE_SIZE, _DETAIL_PRESCALE_SIZE), PILImage.Resampling.LANCZOS)
+    thumbnail = prescaled.resize((_DETAIL_SIZE, _DETAIL_SIZE), PILImage.Resampling.BOX)
+    return np.asarray(thumbnail, dtype=np.float32)
+
+
+def max_block_difference(left: np.ndarray, right: np.ndarray) -> float:
+    """计算两张复核缩略图在所有 4x4 区块上平均灰度差的最大值。
+
+    Args:
+        left: ``compute_detail_thumbnail`` 的结果。
+        right: ``compute_detail_thumbnail`` 的结果。
+
+    Returns:
+        float: 最大区块平均灰度差，取值范围 0~255。
+    """
+    blocks = _DETAIL_SIZE // _DETAIL_BLOCK_SIZE
+    difference = np.abs(left - right).reshape(blocks, _DETAIL_BLOCK_SIZE, blocks, _DETAIL_BLOCK_SIZE)
+    return float(difference.mean(axis=(1, 3)).max())
+
+
+def hamming_distance(left: int, right: int) -> int:
+    """计算两个哈希值之间的汉明距离。"""
+    return (left ^ right).bit_count()
+
+
+class _BKTreeNode(Generic[KeyT]):
+    """BK 树节点，同一哈希值的多个键保存在同一节点中。"""
+
+    __slots__ = ("value", "keys", "children")
+
+    def __init__(self, value: int, key: KeyT) -> None:
+        self.value = value
+        self.keys: List[KeyT] = [key]
+        self.children: Dict[int, "_BKTreeNode[KeyT]"] = {}
+
+
+class PerceptualHashIndex(Generic[KeyT]):
+    """按汉明距离组织的感知哈希 BK 树。"""
+
+    def __init__(self) -> None:
+        self._root: Optional[_BKTreeNode[KeyT]] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, perceptual_hash: str, key: KeyT) -> None:
+        """加入一个哈希值及其关联的键。
+
+        Args:
+            perceptual_hash: 十六进制感知哈希。
+            key: 与该哈希关联的键，例如图片的 sha256。
+        """
+        value = int(perceptual_hash, 16)
+        self._size += 1
+        if self._root is None:
+            self._root = _BKTreeNode(value, key)
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node.value)
+            if distance == 0:
+                if key not in node.keys:
+                    node.keys.append(key)
+                else:
+                    self._size -= 1
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKTreeNode(value, key)
+                return
+            node = child
+
+    def search(self, perceptual_hash: str, max_distance: int) -> List[Tuple[int, KeyT]]:
+        """查询汉明距离不超过阈值的全部键。
+
+        Args:
+            perceptual_hash: 十六进制感知哈希。
+            max_distance: 最大汉明距离。
+
+        Returns:
+            List[Tuple[int, KeyT]]: 按距离升序排列的 ``(距离, 键)`` 列表。
+        """
+        if self._root is None or max_distance < 0:
+            return []
+
+        value = int(perceptual_hash, 16)
+        matches: List[Tuple[int, KeyT]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node.value)
+            if distance <= max_distance:
+                matches.extend((distance, key) for key in node.keys)
+            # 三角不等式：只有与当前节点距离在 [d - r, d + r] 内的子树可能包含结果
+            for child_distance, child in node.children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        matches.sort(key=lambda item: item[0])
+        return matches
@@ -203,6 +203,17 @@ class APIProvider(ConfigBase):
     )
     """重试间隔 (如果API调用失败, 重试的间隔时间, 单位: 秒)"""
 
+    max_concurrency: int = Field(
+        default=0,
+        ge=0,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "gauge",
+            "step": 1,
+        },
+    )
+    """最大并发请求数 (同一时间向该服务商发出的请求上限, 0 表示不限制)"""
+
     def model_post_init(self, context: Any = None) -> None:
         """执行 API 提供商配置的后置校验。
 
@@ -388,7 +399,27 @@ class TaskConfig(ConfigBase):
             "x-icon": "shuffle",
         },
     )
-    """模型选择策略：balance（负载均衡）或 random（随机选择）"""
+    """模型选择策略：balance（按延迟、错误率与并发负载均衡）或 random（随机选择）"""
+
+    enable_hedging: bool = Field(
+        default=False,
+        json_schema_extra={
+            "x-widget": "switch",
+            "x-icon": "git-branch",
+        },
+    )
+    """是否启用对冲请求：首个模型在截止时间内未返回时，向列表中的另一个模型并发发送同一请求，先成功者胜出，另一个被中断"""
+
+    hedge_delay: float = Field(
+        default=0.0,
+        ge=0,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "timer",
+            "step": 0.1,
+        },
+    )
+    """对冲截止时间（秒），0 表示按首个模型近期耗时的 p95 自动计算（样本不足时使用 slow_threshold）"""
 
 
 class ModelTaskConfig(ConfigBase):
@@ -143,6 +143,26 @@ class VisualConfig(ConfigBase):
     )
     """回复器模式，auto根据模型信息自动选择，text为纯文本模式，multimodal为多模态模式"""
 
+    enable_image_near_duplicate_reuse: bool = Field(
+        default=True,
+        json_schema_extra={
+            "x-widget": "switch",
+            "x-icon": "copy",
+        },
+    )
+    """是否为缩放、重新压缩或转发后的同一张图片复用已有的图片描述，减少 VLM 调用"""
+
+    image_near_duplicate_max_distance: int = Field(
+        default=12,
+        ge=0,
+        le=64,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "ruler",
+        },
+    )
+    """近重复图片的感知哈希最大汉明距离（共 128 位），越大越容易命中；命中的候选图片仍需通过缩略图复核"""
+
 
 class TalkRulesItem(ConfigBase):
     platform: str = ""
@@ -208,6 +228,25 @@ class ChatConfig(ConfigBase):
         },
     )
     """上下文长度"""
+
+    enable_prompt_cache_layout: bool = Field(
+        default=False,
+        json_schema_extra={
+            "x-widget": "switch",
+            "x-icon": "database",
+        },
+    )
+    """是否启用提示词缓存友好的上下文布局：历史按块裁剪、窗口按块推进，使请求前缀在多轮之间保持不变以命中供应商提示词缓存"""
+
+    prompt_cache_block_size: int = Field(
+        default=10,
+        ge=1,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "layers",
+        },
+    )
+    """提示词缓存友好布局下，历史窗口每次推进的消息条数"""
     
     planner_interrupt_max_consecutive_count: int = Field(
         default=2,
@@ -313,7 +352,57 @@ class MessageReceiveConfig(ConfigBase):
     )
     """过滤正则表达式列表"""
 
+    enable_inbound_queue: bool = Field(
+        default=False,
+        json_schema_extra={
+            "x-widget": "switch",
+            "x-icon": "list-ordered",
+        },
+    )
+    """是否为入站消息（旧链 maim_message 与插件消息网关）启用按会话划分的有界队列，并在会话间轮转处理"""
+
+    inbound_queue_high_watermark: int = Field(
+        default=100,
+        ge=1,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "arrow-up-to-line",
+        },
+    )
+    """单个会话待处理消息达到此数量时开始削峰"""
+
+    inbound_queue_low_watermark: int = Field(
+        default=20,
+        ge=0,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "arrow-down-to-line",
+        },
+    )
+    """削峰中的会话待处理消息回落到此数量时恢复正常入队，需小于高水位"""
+
+    inbound_overflow_policy: Literal["drop", "coalesce"] = Field(
+        default="drop",
+        json_schema_extra={
+            "x-widget": "select",
+            "x-icon": "filter",
+        },
+    )
+    """削峰期间的溢出策略，drop为丢弃新消息，coalesce为用新消息覆盖队尾消息（只保留最新一条）"""
+
+    inbound_dispatch_concurrency: int = Field(
+        default=8,
+        ge=1,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "layers",
+        },
+    )
+    """同时处理入站消息的会话数量上限"""
+
     def model_post_init(self, context: Optional[dict] = None) -> None:
+        if self.inbound_queue_low_watermark >= self.inbound_queue_high_watermark:
+            raise ValueError("inbound_queue_low_watermark 必须小于 inbound_queue_high_watermark")
         for pattern in self.ban_msgs_regex:
             try:
                 re.compile(pattern)
@@ -2145,5 +2234,24 @@ class PluginRuntimeConfig(ConfigBase):
     留空则自动生成临时路径
     """
 
+    ipc_frame_compression: bool = Field(
+        default=False,
+        json_schema_extra={
+            "x-widget": "switch",
+            "x-icon": "archive",
+        },
+    )
+    """是否在与 Runner 握手时协商启用 IPC 帧压缩；本机传输带宽充足，通常只在超大提示词或工具载荷频繁出现时才有收益"""
+
+    ipc_compression_threshold_kb: int = Field(
+        default=64,
+        ge=1,
+        json_schema_extra={
+            "x-widget": "input",
+            "x-icon": "minimize-2",
+        },
+    )
+    """启用 IPC 帧压缩后，仅压缩超过该大小（KB）的帧"""
+
     render: PluginRuntimeRenderConfig = Field(default_factory=PluginRuntimeRenderConfig)
     """浏览器渲染能力配置"""
@@ -0,0 +1,98 @@
+"""表情包情绪标签倒排索引。
+
+按情绪选择表情包时，旧实现会对每个表情包的每个标签逐一计算编辑距离，
+开销随表情包数量乘以标签数量线性增长。``EmojiTagIndex`` 在表情包集合变化后一次性构建：
+
+- 规范化标签 -> 表情包下标的倒排表，相同标签只计算一次相似度
+- 字符 -> 标签的倒排表：与查询没有任何公共字符的标签编辑距离必然等于较长串长度，
+  相似度恒为 0，无需计算
+
+相似度定义与旧实现一致（``1 - 编辑距离 / 较长串长度``），排序时同分按表情包原有顺序，
+因此返回的前 K 个候选与对全部表情包做 ``heapq.nlargest`` 的结果相同。
+"""
+
+from typing import Callable, Dict, List, Sequence, Set, Tuple
+
+import Levenshtein
+
+from src.common.data_models.image_data_model import MaiEmoji
+
+
+class EmojiTagIndex:
+    """表情包情绪标签索引。"""
+
+    def __init__(self, emojis: Sequence[MaiEmoji], get_emotions: Callable[[MaiEmoji], List[str]]) -> None:
+        """构建索引。
+
+        Args:
+            emojis: 当前已注册的表情包列表。
+            get_emotions: 提取单个表情包情绪标签的函数。
+        """
+        self._emojis: List[MaiEmoji] = list(emojis)
+        self._tag_postings: Dict[str, List[int]] = {}
+        self._char_postings: Dict[str, Set[str]] = {}
+        self._tagged_positions: List[int] = []
+
+        for position, emoji in enumerate(self._emojis):
+            tags = {str(emotion).strip().lower() for emotion in get_emotions(emoji) if emotion}
+            tags.discard("")
+            if not tags:
+                continue
+            self._tagged_positions.append(position)
+            for tag in tags:
+                self._tag_postings.setdefault(tag, []).append(position)
+
+        for tag in self._tag_postings:
+            for char in set(tag):
+                self._char_postings.setdefault(char, set()).add(tag)
+
+    @property
+    def tag_count(self) -> int:
+        """返回索引中不重复的标签数量。"""
+        return len(self._tag_postings)
+
+    def top_matches(self, text_emotion: str, limit: int) -> List[Tuple[MaiEmoji, float]]:
+        """返回与情绪标签最相近的若干表情包。
+
+        Args:
+            text_emotion: 请求的情绪标签。
+            limit: 返回数量上限。
+
+        Returns:
+            List[Tuple[MaiEmoji, float]]: 按相似度降序、同分按注册顺序排列的表情包及其相似度。
+        """
+        query = str(text_emotion or "").strip().lower()
+        if not query or limit <= 0 or not self._tagged_positions:
+            return []
+
+        candidate_tags: Set[str] = set()
+        for char in set(query):
+            candidate_tags.update(self._char_postings.get(char, ()))
+
+        tags_by_score: Dict[float, List[str]] = {}
+        for tag in candidate_tags:
+            score = 1 - Levenshtein.distance(query, tag) / max(len(query), len(tag))
+            if score > 0:
+                tags_by_score.setdefault(score, []).append(tag)
+
+        results: List[Tuple[MaiEmoji, float]] = []
+        seen_positions: Set[int] = set()
+        for score in sorted(tags_by_score, reverse=True):
+            positions: Set[int] = set()
+            for tag in tags_by_score[score]:
+                positions.update(self._tag_postings[tag])
+            # 每个表情包第一次出现时的分数即其所有标签中的最高分
+            positions -= seen_positions
+            seen_positions |= positions
+            for position in sorted(positions):
+                results.append((self._emojis[position], score))
+                if len(results) >= limit:
+                    return results
+
+        # 剩余表情包与请求没有任何公共字符，相似度为 0
+        for position in self._tagged_positions:
+            if position not in seen_positions:
+                results.append((self._emojis[position], 0.0))
+                if len(results) >= limit:
+                    break
+        return results
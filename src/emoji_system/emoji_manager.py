@@ -4,14 +4,12 @@ from typing import Any, Literal, Optional
 
 import asyncio
 import hashlib
-import heapq
 import random
 import re
+import threading
 
 from rich.traceback import install
-from sqlmodel import select
-
-import Levenshtein
+from sqlmodel import col, select
 
 from src.common.data_models.image_data_model import MaiEmoji
 from src.common.data_models.llm_service_data_models import LLMGenerationOptions
@@ -20,11 +18,14 @@ from src.common.database.database_model import Images, ImageType
 from src.common.logger import get_logger
 from src.common.utils.utils_image import ImageUtils
 from src.config.config import config_manager, global_config
+from src.manager.async_task_manager import AsyncTask
 from src.plugin_runtime.hook_schema_utils import build_object_schema
 from src.plugin_runtime.host.hook_spec_registry import HookSpec, HookSpecRegistry
 from src.prompt.prompt_manager import prompt_manager
 from src.services.llm_service import LLMServiceClient
 
+from .emoji_index import EmojiTagIndex
+
 logger = get_logger("emoji")
 
 install(extra_lines=3)
@@ -233,6 +234,11 @@ class EmojiManager:
 
         self._emoji_num: int = 0
         self.emojis: list[MaiEmoji] = []
+        self._emoji_index: Optional[EmojiTagIndex] = None
+        self._emoji_index_signature: tuple[int, int] = (0, 0)
+        self._pending_usage: dict[str, MaiEmoji] = {}
+        self._pending_usage_lock = threading.Lock()
+        """保护 `_pending_usage`：事件循环记录使用，写回任务在线程池中取走快照"""
         self._maintenance_wakeup_event: asyncio.Event = asyncio.Event()
         self._pending_description_tasks: dict[str, asyncio.Task[None]] = {}
         self._reload_callback_registered: bool = False
@@ -478,11 +484,13 @@ class EmojiManager:
                             f"[数据库] 加载表情包记录时出错: {e}\n记录ID: {record.id}, 路径: {record.full_path}"
                         )
                 self._emoji_num = len(self.emojis)
+                self.invalidate_emoji_index()
                 logger.info(f"[数据库] 成功加载 {self._emoji_num} 个已注册表情包")
         except Exception as e:
             logger.critical(f"[数据库] 加载表情包记录时发生不可恢复错误: {e}")
             self.emojis = []
             self._emoji_num = 0
+            self.invalidate_emoji_index()
             raise e
 
     def register_emoji_to_db(self, emoji: MaiEmoji) -> EmojiRegisterStatus:
@@ -595,35 +603,62 @@ class EmojiManager:
         return True
 
     def update_emoji_usage(self, emoji: MaiEmoji) -> bool:
-        # sourcery skip: extract-method
         """
         更新表情包的使用情况，更新查询次数和上次使用时间
 
+        内存中的计数立即生效，数据库写入由 ``flush_emoji_usage`` 定期批量完成，避免在事件循环中同步写库。
+
         Args:
             emoji (MaiEmoji): 使用的表情包对象
         Returns:
-            return (bool): 更新是否成功
+            return (bool): 是否成功记录
         """
         if not emoji or not emoji.file_hash:
             logger.error("[更新表情包使用] 无效的表情包对象")
             return False
+        with self._pending_usage_lock:
+            emoji.query_count += 1
+            emoji.last_used_time = datetime.now()
+            self._pending_usage[emoji.file_hash] = emoji
+        logger.debug(f"[记录表情包使用] 已记录表情包使用，等待批量写回: {emoji.file_hash}")
+        return True
+
+    def flush_emoji_usage(self) -> int:
+        """
+        将待写回的表情包使用记录在一个事务中批量写入数据库
+
+        可在线程池中调用：待写回记录在锁内取走并复制计数，写库期间事件循环可继续记录新的使用。
+
+        Returns:
+            return (int): 写回的表情包数量；失败时待写回记录放回队列并返回 0
+        """
+        with self._pending_usage_lock:
+            pending_emojis, self._pending_usage = self._pending_usage, {}
+            pending = {
+                emoji_hash: (emoji.query_count, emoji.last_used_time) for emoji_hash, emoji in pending_emojis.items()
+            }
+        if not pending:
+            return 0
         try:
             with get_db_session() as session:
-                statement = select(Images).filter_by(image_hash=emoji.file_hash, image_type=ImageType.EMOJI).limit(1)
-                if image_record := session.exec(statement).first():
-                    emoji.query_count += 1
-                    image_record.query_count = emoji.query_count
-                    emoji.last_used_time = datetime.now()
-                    image_record.last_used_time = emoji.last_used_time
+                statement = select(Images).where(
+                    col(Images.image_hash).in_(list(pending)),
+                    col(Images.image_type) == ImageType.EMOJI,
+                )
+                for image_record in session.exec(statement).all():
+                    usage = pending.get(image_record.image_hash)
+                    if usage is None:
+                        continue
+                    image_record.query_count, image_record.last_used_time = usage
                     session.add(image_record)
-                    logger.info(f"[记录表情包使用] 成功记录表情包使用: {emoji.file_hash}")
-                else:
-                    logger.error(f"[记录表情包使用] 未找到表情包记录: {emoji.file_hash}")
-                    return False
         except Exception as e:
-            logger.error(f"[记录表情包使用] 记录使用时出错: {e}")
-            return False
-        return True
+            with self._pending_usage_lock:
+                for emoji_hash, emoji in pending_emojis.items():
+                    self._pending_usage.setdefault(emoji_hash, emoji)
+            logger.error(f"[记录表情包使用] 批量写回 {len(pending)} 条使用记录失败，将在下次重试: {e}")
+            return 0
+        logger.debug(f"[记录表情包使用] 已批量写回 {len(pending)} 条使用记录")
+        return len(pending)
 
     def update_emoji(self, emoji: MaiEmoji) -> bool:
         """
@@ -644,6 +679,7 @@ class EmojiManager:
                 if image_record := session.exec(statement).first():
                     image_record.description = emoji.description
                     session.add(image_record)
+                    self.invalidate_emoji_index()
                     logger.info(f"[更新表情包] 成功更新表情包信息: {emoji.file_hash}")
                 else:
                     logger.error(f"[更新表情包] 未找到表情包记录: {emoji.file_hash}")
@@ -705,6 +741,7 @@ class EmojiManager:
                     session.add(image_record)
                     if emoji in self.emojis:
                         self.emojis.remove(emoji)
+                        self.invalidate_emoji_index()
                     logger.info(f"[封禁表情包] 成功封禁表情包: {emoji.file_name}")
                 else:
                     logger.warning(f"[封禁表情包] 未找到表情包记录: {emoji.file_name}")
@@ -727,13 +764,12 @@ class EmojiManager:
             logger.warning("[获取表情包] 表情包列表为空")
             return None
 
-        emoji_similarities = await asyncio.to_thread(self._calculate_emotion_similarity_list, emotion_label)
-        if not emoji_similarities:
+        # 获取前10个相似度最高的表情包
+        top_emojis = self._get_emoji_index().top_matches(emotion_label, 10)
+        if not top_emojis:
             logger.info("[获取表情包] 未找到匹配的表情包")
             return None
 
-        # 获取前10个相似度最高的表情包
-        top_emojis = heapq.nlargest(10, emoji_similarities, key=lambda x: x[1])
         selected_emoji, similarity = random.choice(top_emojis)
         self.update_emoji_usage(selected_emoji)
         logger.info(
@@ -800,9 +836,11 @@ class EmojiManager:
                 logger.info(f"[决策] 删除表情包: {emoji_to_delete.description}")
                 if self.delete_emoji(emoji_to_delete):
                     self.emojis.remove(emoji_to_delete)
+                    self.invalidate_emoji_index()
                     register_status = self.register_emoji_to_db(new_emoji)
                     if register_status == "registered":
                         self.emojis.append(new_emoji)
+                        self.invalidate_emoji_index()
                         logger.info(f"[register_emoji] Replaced old emoji with new emoji: {new_emoji.description}")
                         return True
                     if register_status == "skipped":
@@ -941,6 +979,7 @@ class EmojiManager:
                 self.emojis.remove(emoji)
                 self._emoji_num -= 1
                 removal_count += 1
+                self.invalidate_emoji_index()
                 logger.info(f"[完整性检查] 成功删除缺失文件的表情包记录: {emoji.file_name}")
             else:
                 logger.error(f"[完整性检查] 删除缺失文件的表情包记录失败: {emoji.file_name}")
@@ -1050,6 +1089,7 @@ class EmojiManager:
         if register_status == "registered":
             self.emojis.append(target_emoji)
             self._emoji_num = len(self.emojis)
+            self.invalidate_emoji_index()
             logger.info(f"[register_emoji] Registered new emoji: {target_emoji.file_name}")
         elif register_status == "failed":
             logger.error(f"[register_emoji] Failed to register emoji in database: {file_full_path}")
@@ -1057,38 +1097,33 @@ class EmojiManager:
             logger.info(f"[register_emoji] Emoji already registered, skipping: {target_emoji.file_name}")
         return register_status
 
-    def _calculate_emotion_similarity_list(self, text_emotion: str) -> list[tuple[MaiEmoji, float]]:
+    def invalidate_emoji_index(self) -> None:
+        """标记情绪标签索引失效，下次选择表情包时重建"""
+        self._emoji_index = None
+
+    def _get_emoji_index(self) -> EmojiTagIndex:
         """
-        计算文本情感标签与所有表情包情感标签的相似度列表
+        获取情绪标签索引，表情包列表变化后自动重建
 
-        Args:
-            text_emotion (str): 文本的情感标签
         Returns:
-        return (List[Tuple[MaiEmoji, float]]): 返回表情包对象及其相似度的列表
+            return (EmojiTagIndex): 与当前表情包列表一致的索引
         """
-        normalized_text_emotion = str(text_emotion or "").strip().lower()
-        if not normalized_text_emotion:
-            return []
-
-        similarity_list: list[tuple[MaiEmoji, float]] = []
-        for emoji in self.emojis:
-            candidate_emotions = _get_emoji_emotions(emoji)
-            if not candidate_emotions:
-                continue
-
-            emotion_similarities = [
-                1 - Levenshtein.distance(normalized_text_emotion, str(emotion).strip().lower()) / max(
-                    len(normalized_text_emotion),
-                    len(str(emotion).strip().lower()),
-                )
-                for emotion in candidate_emotions
-                if emotion
-            ]
-            if not emotion_similarities:
-                continue
-            # 计算该表情包与输入标签的最接近匹配度
-            similarity_list.append((emoji, max(emotion_similarities)))
-        return similarity_list
+        # 外部直接替换或增删列表时也能通过列表身份与长度察觉变化
+        signature = (id(self.emojis), len(self.emojis))
+        if self._emoji_index is None or signature != self._emoji_index_signature:
+            self._emoji_index = EmojiTagIndex(self.emojis, _get_emoji_emotions)
+            self._emoji_index_signature = signature
+        return self._emoji_index
 
 
 emoji_manager = EmojiManager()
+
+
+class EmojiUsageWriteBackTask(AsyncTask):
+    """定期将表情包使用记录批量写回数据库"""
+
+    def __init__(self):
+        super().__init__(task_name="Emoji Usage Write Back Task", wait_before_start=10, run_interval=10)
+
+    async def run(self):
+        await asyncio.to_thread(emoji_manager.flush_emoji_usage)
@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 
@@ -40,10 +42,12 @@ class ReqAbortException(Exception):
 class RespNotOkException(Exception):
     """请求响应异常，见于请求未能成功响应（非 '200 OK'）"""
 
-    def __init__(self, status_code: int, message: str | None = None):
+    def __init__(self, status_code: int, message: str | None = None, retry_after: float | None = None):
         super().__init__(message)
         self.status_code = status_code
         self.message = message
+        self.retry_after = retry_after
+        """上游 `Retry-After` 响应头给出的等待秒数"""
 
     def __str__(self):
         if self.status_code in error_code_mapping:
@@ -90,3 +94,36 @@ class ModelAttemptFailed(Exception):
 
     def __str__(self):
         return self.message
+
+
+def parse_retry_after(headers: Any) -> float | None:
+    """从响应头中解析 `Retry-After`（秒数或 HTTP 日期）以及 `retry-after-ms`。
+
+    Args:
+        headers: 类字典的响应头对象，可为 None。
+
+    Returns:
+        float | None: 需要等待的秒数，无法解析时返回 None。
+    """
+    if headers is None:
+        return None
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        retry_after = headers.get("retry-after")
+    except Exception:
+        return None
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(retry_after))
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
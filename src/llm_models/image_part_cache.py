@@ -0,0 +1,135 @@
+"""规范化图片片段的内容寻址缓存
+
+图片会长期留在上下文窗口中并在每一轮请求中重复发送。客户端每次都要对其 base64 解码、
+用 PIL 打开，必要时重新编码（OpenAI 的 webp/png 转换、413 重试时的压缩）。
+
+本模块以 ``(图片内容摘要, 目标变体, 大小上限)`` 为键缓存最终负载（如 OpenAI 的 data URI、
+Gemini 的原始字节、压缩后的 base64），由 `openai_client`、`gemini_client` 与
+`compress_messages` 共用：
+
+- LRU 淘汰：同时受条目数 `max_entries` 与负载总字节数 `max_bytes` 约束
+- 未命中时可通过 `get_or_create_async()` 在工作线程中完成转码，避免阻塞事件循环
+- 转码失败的结果（None）同样会被缓存，避免无效图片被反复解析
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+import asyncio
+import hashlib
+import threading
+
+T = TypeVar("T")
+CacheKey = Tuple[str, str, int]
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+def _payload_size(value: Any) -> int:
+    """估算缓存负载占用的字节数。"""
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_payload_size(item) for item in value)
+    return 0
+
+
+class ImagePartCache:
+    """以图片内容摘要为键的 LRU 负载缓存（线程安全）"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(image_base64: str, variant: str, size_limit: int = 0) -> CacheKey:
+        """构建缓存键。
+
+        Args:
+            image_base64: 图片的 base64 编码。
+            variant: 目标变体（客户端与目标格式），例如 ``openai:png``。
+            size_limit: 目标大小上限，不限制时为 0。
+
+        Returns:
+            CacheKey: ``(摘要, 变体, 大小上限)``。
+        """
+        digest = hashlib.blake2b(image_base64.encode("utf-8", errors="surrogatepass"), digest_size=16).hexdigest()
+        return digest, variant, size_limit
+
+    def lookup(self, key: CacheKey) -> Tuple[bool, Any]:
+        """查询缓存。
+
+        Returns:
+            Tuple[bool, Any]: ``(是否命中, 负载)``。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return True, entry[0]
+
+    def store(self, key: CacheKey, value: Any) -> None:
+        """写入负载，超出限制时淘汰最久未使用的条目。"""
+        size = _payload_size(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def get_or_create(self, image_base64: str, variant: str, size_limit: int, factory: Callable[[], T]) -> T:
+        """命中则返回缓存负载，否则在当前线程调用 ``factory`` 生成并缓存。"""
+        key = self.make_key(image_base64, variant, size_limit)
+        hit, value = self.lookup(key)
+        if hit:
+            return value
+        value = factory()
+        self.store(key, value)
+        return value
+
+    async def get_or_create_async(
+        self,
+        image_base64: str,
+        variant: str,
+        size_limit: int,
+        factory: Callable[[], T],
+    ) -> T:
+        """命中则返回缓存负载，否则在工作线程中调用 ``factory`` 生成并缓存。"""
+        key = self.make_key(image_base64, variant, size_limit)
+        hit, value = self.lookup(key)
+        if hit:
+            return value
+        value = await asyncio.to_thread(factory)
+        self.store(key, value)
+        return value
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中、未命中、淘汰次数以及当前条目数与字节数。"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._total_bytes}
+
+
+image_part_cache = ImagePartCache()
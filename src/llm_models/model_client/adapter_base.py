@@ -148,11 +148,11 @@ class AdapterClient(BaseClient, ABC, Generic[RawStreamT, RawResponseT]):
 
     @staticmethod
     def _build_usage_record(model_info: ModelInfo, usage_record: UsageTuple) -> UsageRecord:
-        """根据统一使用量三元组构建 `UsageRecord`。
+        """根据统一使用量元组构建 `UsageRecord`。
 
         Args:
             model_info: 模型信息。
-            usage_record: 使用量三元组。
+            usage_record: 使用量元组，第四项（可选）为命中提示词缓存的 token 数。
 
         Returns:
             UsageRecord: 可直接挂载到 `APIResponse` 的使用记录对象。
@@ -163,6 +163,7 @@ class AdapterClient(BaseClient, ABC, Generic[RawStreamT, RawResponseT]):
             prompt_tokens=usage_record[0],
             completion_tokens=usage_record[1],
             total_tokens=usage_record[2],
+            cached_tokens=usage_record[3] if len(usage_record) > 3 else 0,
         )
 
     def _attach_usage_record(
@@ -35,6 +35,9 @@ class UsageRecord:
     total_tokens: int
     """总token数"""
 
+    cached_tokens: int = 0
+    """命中供应商提示词缓存的提示token数（包含在 `prompt_tokens` 中）"""
+
 
 @dataclass
 class APIResponse:
@@ -54,6 +57,9 @@ class APIResponse:
     embedding: List[float] | None = None
     """嵌入向量"""
 
+    embeddings: List[List[float]] | None = None
+    """批量嵌入向量（仅数组输入时填充，顺序与输入一致）"""
+
     usage: UsageRecord | None = None
     """使用情况 (prompt_tokens, completion_tokens, total_tokens)"""
 
@@ -61,8 +67,8 @@ class APIResponse:
     """响应原始数据"""
 
 
-UsageTuple = Tuple[int, int, int]
-"""统一的使用量三元组类型，顺序为 `(prompt_tokens, completion_tokens, total_tokens)`。"""
+UsageTuple = Tuple[int, int, int] | Tuple[int, int, int, int]
+"""统一的使用量元组类型，顺序为 `(prompt_tokens, completion_tokens, total_tokens[, cached_tokens])`。"""
 
 StreamResponseHandler = Callable[
     [Any, asyncio.Event | None],
@@ -119,7 +125,8 @@ class EmbeddingRequest:
     """统一的嵌入请求。"""
 
     model_info: ModelInfo
-    embedding_input: str
+    embedding_input: str | List[str]
+    """单条文本，或一次请求编码的多条文本（OpenAI 兼容 `/embeddings` 的数组输入）"""
     extra_params: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -197,6 +204,10 @@ class BaseClient(ABC):
         """
         raise NotImplementedError("'get_support_image_formats' method should be overridden in subclasses")
 
+    async def aclose(self) -> None:
+        """释放底层 HTTP 连接池；需在客户端所属的事件循环内调用。"""
+        return None
+
 
 class ClientRegistry:
     """客户端注册表。"""
@@ -206,7 +217,12 @@ class ClientRegistry:
         self.client_registry: Dict[str, Type[BaseClient]] = {}
         """APIProvider.type -> BaseClient的映射表"""
         self.client_instance_cache: Dict[str, BaseClient] = {}
-        """APIProvider.name -> BaseClient的映射表"""
+        """APIProvider.name -> BaseClient的映射表（无运行中事件循环时使用）"""
+        self._loop_instance_caches: Dict[asyncio.AbstractEventLoop, Dict[str, BaseClient]] = {}
+        """事件循环 -> (APIProvider.name -> BaseClient)；底层 HTTP 连接池绑定事件循环，按循环隔离复用。
+
+        客户端持有所属循环的强引用，弱引用键无法回收，因此循环关闭后由 `_evict_closed_loops` 显式清除。
+        """
         config_manager.register_reload_callback(self.clear_client_instance_cache)
 
     def register_client_class(self, client_type: str) -> Callable[[Type[BaseClient]], Type[BaseClient]]:
@@ -248,17 +264,62 @@ class ClientRegistry:
             else:
                 raise KeyError(f"'{api_provider.client_type}' 类型的 Client 未注册")
 
-        # 正常的缓存逻辑
-        if api_provider.name not in self.client_instance_cache:
+        # 正常的缓存逻辑：同一事件循环内按 provider 复用长连接客户端
+        instance_cache = self._get_instance_cache()
+        if api_provider.name not in instance_cache:
             if client_class := self.client_registry.get(api_provider.client_type):
-                self.client_instance_cache[api_provider.name] = client_class(api_provider)
+                instance_cache[api_provider.name] = client_class(api_provider)
             else:
                 raise KeyError(f"'{api_provider.client_type}' 类型的 Client 未注册")
-        return self.client_instance_cache[api_provider.name]
+        return instance_cache[api_provider.name]
+
+    def _get_instance_cache(self) -> Dict[str, BaseClient]:
+        """获取当前事件循环对应的实例缓存。
+
+        异步 HTTP 客户端的连接池绑定创建时的事件循环，跨循环复用会失效，
+        因此每个运行中的事件循环持有独立缓存；已关闭循环的缓存在此顺带清除。
+
+        Returns:
+            Dict[str, BaseClient]: 当前循环的 provider 名称到客户端实例映射。
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.client_instance_cache
+        instance_cache = self._loop_instance_caches.get(loop)
+        if instance_cache is None:
+            self._evict_closed_loops()
+            instance_cache = {}
+            self._loop_instance_caches[loop] = instance_cache
+        return instance_cache
+
+    def _evict_closed_loops(self) -> None:
+        """移除已关闭事件循环的客户端缓存，释放循环与其连接池。"""
+        closed_loops = [loop for loop in self._loop_instance_caches if loop.is_closed()]
+        for loop in closed_loops:
+            self._loop_instance_caches.pop(loop, None)
+        if closed_loops:
+            logger.debug(f"已清除 {len(closed_loops)} 个已关闭事件循环的LLM客户端缓存")
+
+    async def aclose_loop_clients(self) -> None:
+        """关闭并移除当前事件循环的客户端实例。
+
+        临时事件循环（如同步调用辅助函数创建的循环）应在关闭前调用，
+        以便在循环仍可用时释放 HTTP 连接池。
+        """
+        instance_cache = self._loop_instance_caches.pop(asyncio.get_running_loop(), None)
+        if not instance_cache:
+            return
+        for client in instance_cache.values():
+            try:
+                await client.aclose()
+            except Exception as exc:
+                logger.debug(f"关闭LLM客户端 {client.api_provider.name} 失败: {exc}")
 
     def clear_client_instance_cache(self) -> None:
         """清空客户端实例缓存。"""
         self.client_instance_cache.clear()
+        self._loop_instance_caches.clear()
         logger.info("检测到配置重载，已清空LLM客户端实例缓存")
 
 
@@ -46,7 +46,9 @@ from src.llm_models.exceptions import (
     ReqAbortException,
     RespNotOkException,
     RespParseException,
+    parse_retry_after,
 )
+from src.llm_models.image_part_cache import image_part_cache
 from src.llm_models.payload_content.message import ImageMessagePart, Message, RoleType, TextMessagePart
 from src.llm_models.payload_content.resp_format import RespFormat, RespFormatType
 from src.llm_models.payload_content.tool_option import ToolCall, ToolOption
@@ -130,6 +132,9 @@ GEMINI_EXTRA_CONTENT_THOUGHT_SIGNATURE_KEY = "thought_signature"
 GEMINI_FALLBACK_THOUGHT_SIGNATURE = b"skip_thought_signature_validator"
 """当历史 function call 没有原始 thought signature 时，使用官方允许的占位签名跳过校验。"""
 
+GEMINI_IMAGE_CACHE_VARIANT = "gemini:bytes"
+"""共享图片缓存中 Gemini 原始图片字节的变体名。"""
+
 
 def _normalize_image_mime_type(image_format: str) -> str:
     """将图片格式名称转换为标准 MIME 类型。
@@ -163,13 +168,35 @@ def _build_non_tool_parts(message: Message) -> List[Part]:
         if isinstance(message_part, ImageMessagePart):
             converted_parts.append(
                 Part.from_bytes(
-                    data=base64.b64decode(message_part.image_base64),
+                    data=image_part_cache.get_or_create(
+                        message_part.image_base64,
+                        GEMINI_IMAGE_CACHE_VARIANT,
+                        0,
+                        lambda message_part=message_part: base64.b64decode(message_part.image_base64),
+                    ),
                     mime_type=_normalize_image_mime_type(message_part.normalized_image_format),
                 )
             )
     return converted_parts
 
 
+async def _prepare_image_parts(messages: List[Message]) -> None:
+    """在工作线程中预先解码未命中缓存的图片片段，使后续的同步消息转换只读缓存。
+
+    Args:
+        messages: 即将发送的消息列表。
+    """
+    for message in messages:
+        for message_part in message.parts:
+            if isinstance(message_part, ImageMessagePart):
+                await image_part_cache.get_or_create_async(
+                    message_part.image_base64,
+                    GEMINI_IMAGE_CACHE_VARIANT,
+                    0,
+                    lambda message_part=message_part: base64.b64decode(message_part.image_base64),
+                )
+
+
 def _normalize_function_response_payload(message: Message) -> Dict[str, Any]:
     """将内部工具结果消息转换为 Gemini 函数响应负载。
 
@@ -374,7 +401,7 @@ def _extract_usage_record(response: GenerateContentResponse) -> Optional[UsageTu
         response: Gemini 响应对象。
 
     Returns:
-        Optional[UsageTuple]: 统一的使用量三元组；缺失时返回 `None`。
+        Optional[UsageTuple]: 统一的使用量元组（含隐式/显式上下文缓存命中的 token 数）；缺失时返回 `None`。
     """
     usage_metadata = getattr(response, "usage_metadata", None)
     if usage_metadata is None:
@@ -385,7 +412,8 @@ def _extract_usage_record(response: GenerateContentResponse) -> Optional[UsageTu
         + (getattr(usage_metadata, "thoughts_token_count", 0) or 0)
     )
     total_tokens = getattr(usage_metadata, "total_token_count", 0) or 0
-    return prompt_tokens, completion_tokens, total_tokens
+    cached_tokens = getattr(usage_metadata, "cached_content_token_count", 0) or 0
+    return prompt_tokens, completion_tokens, total_tokens, cached_tokens
 
 
 def _extract_finish_reason(response: GenerateContentResponse | None) -> str | None:
@@ -711,6 +739,10 @@ class GeminiClient(AdapterClient[AsyncIterator[GenerateContentResponse], Generat
             http_options=_build_http_options(api_provider),
         )
 
+    async def aclose(self) -> None:
+        """关闭底层异步 HTTP 连接池。"""
+        await self.client.aio.aclose()
+
     @staticmethod
     def clamp_thinking_budget(extra_params: Dict[str, Any] | None, model_id: str) -> int:
         """将思考预算裁剪到模型允许的范围内。
@@ -913,6 +945,7 @@ class GeminiClient(AdapterClient[AsyncIterator[GenerateContentResponse], Generat
         }
 
         try:
+            await _prepare_image_parts(request.message_list)
             contents, system_instruction = _convert_messages(request.message_list)
             model_identifier, enable_google_search = self._resolve_model_identifier(
                 model_info.model_identifier,
@@ -974,7 +1007,11 @@ class GeminiClient(AdapterClient[AsyncIterator[GenerateContentResponse], Generat
                 operation="models.generate_content",
                 provider_request=snapshot_provider_request,
             )
-            wrapped_error = RespNotOkException(status_code, str(exc))
+            wrapped_error = RespNotOkException(
+                status_code,
+                str(exc),
+                retry_after=parse_retry_after(getattr(getattr(exc, "response", None), "headers", None)),
+            )
             attach_request_snapshot(wrapped_error, snapshot_path)
             raise wrapped_error from exc
         except (UnknownFunctionCallArgumentError, UnsupportedFunctionError, FunctionInvocationError) as exc:
@@ -1074,7 +1111,11 @@ class GeminiClient(AdapterClient[AsyncIterator[GenerateContentResponse], Generat
                 operation="models.embed_content",
                 provider_request=snapshot_provider_request,
             )
-            wrapped_error = RespNotOkException(status_code, str(exc))
+            wrapped_error = RespNotOkException(
+                status_code,
+                str(exc),
+                retry_after=parse_retry_after(getattr(getattr(exc, "response", None), "headers", None)),
+            )
             attach_request_snapshot(wrapped_error, snapshot_path)
             raise wrapped_error from exc
         except Exception as exc:
@@ -1113,16 +1154,21 @@ class GeminiClient(AdapterClient[AsyncIterator[GenerateContentResponse], Generat
             raise exc
         if raw_response.embeddings:
             response.embedding = raw_response.embeddings[0].values
+            if isinstance(embedding_input, list):
+                response.embeddings = [item.values for item in raw_response.embeddings]
         else:
             raise RespParseException(raw_response, "响应解析失败，缺失 embeddings 字段")
 
         billable_character_count = 0
         if raw_response.metadata is not None:
             billable_character_count = getattr(raw_response.metadata, "billable_character_count", 0) or 0
+        input_length = (
+            sum(len(item) for item in embedding_input) if isinstance(embedding_input, list) else len(embedding_input)
+        )
         usage_record: UsageTuple = (
-            billable_character_count or len(embedding_input),
+            billable_character_count or input_length,
             0,
-            billable_character_count or len(embedding_input),
+            billable_character_count or input_length,
         )
         return response, usage_record
 
@@ -1204,7 +1250,11 @@ class GeminiClient(AdapterClient[AsyncIterator[GenerateContentResponse], Generat
                 operation="models.generate_content",
                 provider_request=snapshot_provider_request,
             )
-            wrapped_error = RespNotOkException(status_code, str(exc))
+            wrapped_error = RespNotOkException(
+                status_code,
+                str(exc),
+                retry_after=parse_retry_after(getattr(getattr(exc, "response", None), "headers", None)),
+            )
             attach_request_snapshot(wrapped_error, snapshot_path)
             raise wrapped_error from exc
         except Exception as exc:
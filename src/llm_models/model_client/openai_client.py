@@ -37,7 +37,9 @@ from src.llm_models.exceptions import (
     ReqAbortException,
     RespNotOkException,
     RespParseException,
+    parse_retry_after,
 )
+from src.llm_models.image_part_cache import image_part_cache
 from src.llm_models.openai_compat import (
     build_openai_compatible_client_config,
     split_openai_request_overrides,
@@ -99,10 +101,14 @@ XML_PARAMETER_PATTERN = re.compile(
 )
 """用于从 XML 风格工具调用块中提取参数列表。"""
 
+PROMPT_CACHE_CONTROL_PARAM = "prompt_cache_control"
+"""模型级开关：为请求附加 `cache_control` 缓存断点（Anthropic 兼容网关、OpenRouter、DashScope 等支持）。"""
+
 CHAT_COMPLETIONS_RESERVED_EXTRA_BODY_KEYS = {
     "max_tokens",
     "messages",
     "model",
+    PROMPT_CACHE_CONTROL_PARAM,
     "response_format",
     "stream",
     "temperature",
@@ -187,19 +193,73 @@ def _build_image_content_part(part: ImageMessagePart) -> ChatCompletionContentPa
     Returns:
         ChatCompletionContentPartImageParam: OpenAI 兼容的图片片段。
     """
-    normalized_image = _normalize_image_part_for_openai(part)
-    if normalized_image is None:
+    image_data_uri = _get_image_data_uri(part)
+    if image_data_uri is None:
         raise ValueError("图片数据无效，无法构建图片消息片段")
 
-    image_format, image_base64 = normalized_image
     return {
         "type": "image_url",
         "image_url": {
-            "url": f"data:image/{image_format};base64,{image_base64}",
+            "url": image_data_uri,
         },
     }
 
 
+def _build_image_data_uri(part: ImageMessagePart) -> str | None:
+    """将图片片段规范化并编码为 data URI。
+
+    Args:
+        part: 内部图片片段。
+
+    Returns:
+        str | None: OpenAI 兼容的图片 data URI；无法解析时返回 `None`。
+    """
+    normalized_image = _normalize_image_part_for_openai(part)
+    if normalized_image is None:
+        return None
+    image_format, image_base64 = normalized_image
+    return f"data:image/{image_format};base64,{image_base64}"
+
+
+def _image_cache_variant(part: ImageMessagePart) -> str:
+    """图片缓存变体：无法从内容识别格式时会回退到声明格式，因此声明格式也是键的一部分。"""
+    return f"openai:{part.normalized_image_format}"
+
+
+def _get_image_data_uri(part: ImageMessagePart) -> str | None:
+    """从共享图片缓存获取图片 data URI，未命中时在当前线程转码。
+
+    Args:
+        part: 内部图片片段。
+
+    Returns:
+        str | None: 图片 data URI；无法解析时返回 `None`。
+    """
+    return image_part_cache.get_or_create(
+        part.image_base64,
+        _image_cache_variant(part),
+        0,
+        lambda: _build_image_data_uri(part),
+    )
+
+
+async def _prepare_image_parts(messages: List[Message]) -> None:
+    """在工作线程中预先转码未命中缓存的图片片段，使后续的同步消息转换只读缓存。
+
+    Args:
+        messages: 即将发送的消息列表。
+    """
+    for message in messages:
+        for part in message.parts:
+            if isinstance(part, ImageMessagePart):
+                await image_part_cache.get_or_create_async(
+                    part.image_base64,
+                    _image_cache_variant(part),
+                    0,
+                    lambda part=part: _build_image_data_uri(part),
+                )
+
+
 def _normalize_image_part_for_openai(part: ImageMessagePart) -> Tuple[str, str] | None:
     """将图片片段规范化为 OpenAI 兼容格式。
 
@@ -332,17 +392,16 @@ def _convert_user_message_content(message: Message) -> str | List[ChatCompletion
             content.append(_build_text_content_part(part.text))
             continue
 
-        normalized_image = _normalize_image_part_for_openai(part)
-        if normalized_image is None:
+        image_data_uri = _get_image_data_uri(part)
+        if image_data_uri is None:
             content.append(_build_text_content_part("[图片内容不可用]"))
             continue
 
-        image_format, image_base64 = normalized_image
         content.append(
             {
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/{image_format};base64,{image_base64}",
+                    "url": image_data_uri,
                 },
             }
         )
@@ -452,6 +511,34 @@ def _convert_messages(messages: List[Message]) -> List[ChatCompletionMessagePara
     return converted_messages
 
 
+def _apply_prompt_cache_control(messages_payload: List[ChatCompletionMessageParam]) -> None:
+    """为消息列表附加 `cache_control` 缓存断点。
+
+    断点放在 system 消息与最后一条消息上：前者覆盖稳定的提示词与工具前缀，
+    后者让下一轮请求可以复用截至本轮末尾的整段历史。
+
+    Args:
+        messages_payload: 已转换的 OpenAI 兼容消息列表，原地修改。
+    """
+    breakpoint_indices: List[int] = []
+    system_index = next(
+        (index for index, payload in enumerate(messages_payload) if payload.get("role") == "system"),
+        None,
+    )
+    if system_index is not None:
+        breakpoint_indices.append(system_index)
+    if messages_payload and len(messages_payload) - 1 not in breakpoint_indices:
+        breakpoint_indices.append(len(messages_payload) - 1)
+
+    for index in breakpoint_indices:
+        payload = cast(Dict[str, Any], messages_payload[index])
+        content = payload.get("content")
+        if isinstance(content, str) and content:
+            payload["content"] = [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
+        elif isinstance(content, list) and content:
+            payload["content"] = [*content[:-1], {**content[-1], "cache_control": {"type": "ephemeral"}}]
+
+
 def _convert_tool_options(tool_options: List[ToolOption]) -> List[ChatCompletionToolParam]:
     """将工具定义转换为 OpenAI 兼容的工具列表。
 
@@ -481,14 +568,41 @@ def _convert_tool_options(tool_options: List[ToolOption]) -> List[ChatCompletion
     return converted_tools
 
 
+def _extract_cached_prompt_tokens(usage: Any) -> int:
+    """提取命中提示词缓存的 token 数。
+
+    OpenAI 在 `prompt_tokens_details.cached_tokens` 中返回；DeepSeek 等兼容服务使用
+    顶层的 `prompt_cache_hit_tokens`。
+
+    Args:
+        usage: OpenAI SDK 返回的 usage 对象。
+
+    Returns:
+        int: 命中缓存的提示 token 数，缺失时为 0。
+    """
+    prompt_tokens_details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(prompt_tokens_details, dict):
+        cached_tokens = prompt_tokens_details.get("cached_tokens")
+    else:
+        cached_tokens = getattr(prompt_tokens_details, "cached_tokens", None)
+    if not cached_tokens:
+        cached_tokens = getattr(usage, "prompt_cache_hit_tokens", None)
+        if cached_tokens is None and isinstance(getattr(usage, "model_extra", None), dict):
+            cached_tokens = usage.model_extra.get("prompt_cache_hit_tokens")
+    try:
+        return max(0, int(cached_tokens or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
 def _extract_usage_record(usage: Any) -> UsageTuple | None:
-    """从响应对象中提取 usage 三元组。
+    """从响应对象中提取 usage 元组。
 
     Args:
         usage: OpenAI SDK 返回的 usage 对象。
 
     Returns:
-        UsageTuple | None: `(prompt_tokens, completion_tokens, total_tokens)`。
+        UsageTuple | None: `(prompt_tokens, completion_tokens, total_tokens, cached_tokens)`。
     """
     if usage is None:
         return None
@@ -496,6 +610,7 @@ def _extract_usage_record(usage: Any) -> UsageTuple | None:
         getattr(usage, "prompt_tokens", 0) or 0,
         getattr(usage, "completion_tokens", 0) or 0,
         getattr(usage, "total_tokens", 0) or 0,
+        _extract_cached_prompt_tokens(usage),
     )
 
 
@@ -1030,6 +1145,10 @@ class OpenaiClient(AdapterClient[AsyncStream[ChatCompletionChunk], ChatCompletio
             default_query=client_config.default_query or None,
         )
 
+    async def aclose(self) -> None:
+        """关闭底层 HTTP 连接池。"""
+        await self.client.close()
+
     def _build_default_stream_response_handler(
         self,
         request: ResponseRequest,
@@ -1117,7 +1236,10 @@ class OpenaiClient(AdapterClient[AsyncStream[ChatCompletionChunk], ChatCompletio
                 if request.tool_options
                 else _sanitize_messages_for_toolless_request(request.message_list)
             )
+            await _prepare_image_parts(request_messages)
             messages_payload: List[ChatCompletionMessageParam] = _convert_messages(request_messages)
+            if request.extra_params.get(PROMPT_CACHE_CONTROL_PARAM):
+                _apply_prompt_cache_control(messages_payload)
             tools_payload: List[ChatCompletionToolParam] | None = (
                 _convert_tool_options(request.tool_options) if request.tool_options else None
             )
@@ -1223,7 +1345,11 @@ class OpenaiClient(AdapterClient[AsyncStream[ChatCompletionChunk], ChatCompletio
                 operation="chat.completions.create",
                 provider_request=snapshot_provider_request,
             )
-            wrapped_error = RespNotOkException(exc.status_code, _build_api_status_message(exc))
+            wrapped_error = RespNotOkException(
+                exc.status_code,
+                _build_api_status_message(exc),
+                retry_after=parse_retry_after(getattr(getattr(exc, "response", None), "headers", None)),
+            )
             attach_request_snapshot(wrapped_error, snapshot_path)
             raise wrapped_error from exc
         except ReqAbortException:
@@ -1307,7 +1433,11 @@ class OpenaiClient(AdapterClient[AsyncStream[ChatCompletionChunk], ChatCompletio
                 operation="embeddings.create",
                 provider_request=snapshot_provider_request,
             )
-            wrapped_error = RespNotOkException(exc.status_code, _build_api_status_message(exc))
+            wrapped_error = RespNotOkException(
+                exc.status_code,
+                _build_api_status_message(exc),
+                retry_after=parse_retry_after(getattr(getattr(exc, "response", None), "headers", None)),
+            )
             attach_request_snapshot(wrapped_error, snapshot_path)
             raise wrapped_error from exc
         except Exception as exc:
@@ -1341,6 +1471,10 @@ class OpenaiClient(AdapterClient[AsyncStream[ChatCompletionChunk], ChatCompletio
             raise exc
         if raw_response.data:
             response.embedding = raw_response.data[0].embedding
+            if isinstance(embedding_input, list):
+                ordered_data = sorted(raw_response.data, key=lambda item: getattr(item, "index", 0) or 0)
+                response.embeddings = [item.embedding for item in ordered_data]
+                response.embedding = response.embeddings[0]
         else:
             raise RespParseException(raw_response, "响应解析失败，缺失嵌入数据。")
 
@@ -1413,7 +1547,11 @@ class OpenaiClient(AdapterClient[AsyncStream[ChatCompletionChunk], ChatCompletio
                 operation="audio.transcriptions.create",
                 provider_request=snapshot_provider_request,
             )
-            wrapped_error = RespNotOkException(exc.status_code, _build_api_status_message(exc))
+            wrapped_error = RespNotOkException(
+                exc.status_code,
+                _build_api_status_message(exc),
+                retry_after=parse_retry_after(getattr(getattr(exc, "response", None), "headers", None)),
+            )
             attach_request_snapshot(wrapped_error, snapshot_path)
             raise wrapped_error from exc
         except Exception as exc:
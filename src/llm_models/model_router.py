@@ -0,0 +1,338 @@
+"""进程级共享的模型路由器
+
+所有 `LLMOrchestrator`（planner、replyer、学习器、记忆、嵌入……）共用同一个 `model_router`，
+负载均衡与故障状态不再分散在各自的 `model_usage` 中：
+
+- 模型维度：EWMA 延迟、EWMA 错误率、在途请求数、累计 token，用于 `balance` 策略打分
+- 提供商维度：熔断器（连续失败达到阈值后在冷却期内不再被选中，冷却结束后放行一个探测请求，
+  探测失败则冷却时间翻倍）、`Retry-After` 暂停、并发上限（`APIProvider.max_concurrency`）
+- 重试退避：指数退避 + 抖动，上游给出 `Retry-After` 时优先遵从
+
+路由状态可通过 `snapshot()` 导出，供 WebUI 展示。
+"""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Deque, Dict, Optional, Sequence, Tuple
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+
+from src.common.logger import get_logger
+
+logger = get_logger("model_router")
+
+DEFAULT_EWMA_ALPHA = 0.2
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN_SECONDS = 30.0
+MAX_COOLDOWN_SECONDS = 300.0
+MAX_BACKOFF_SECONDS = 60.0
+LATENCY_WINDOW_SIZE = 64
+MIN_QUANTILE_SAMPLES = 5
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class ModelStats:
+    """单个模型的路由统计"""
+
+    ewma_latency: Optional[float] = None
+    """成功请求耗时的指数加权平均（秒），尚无样本时为 None"""
+    ewma_error_rate: float = 0.0
+    """请求失败率的指数加权平均"""
+    inflight: int = 0
+    """在途请求数"""
+    total_tokens: int = 0
+    requests: int = 0
+    failures: int = 0
+    recent_latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW_SIZE))
+    """最近若干次成功请求的耗时，用于估算分位数"""
+
+
+@dataclass(slots=True)
+class ProviderState:
+    """单个 API 提供商的熔断状态"""
+
+    state: str = BREAKER_CLOSED
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    """熔断（或 Retry-After 暂停）结束的 monotonic 时间"""
+    cooldown: float = DEFAULT_COOLDOWN_SECONDS
+    """下一次熔断的冷却时长，半开探测失败后翻倍"""
+    probe_started_at: float = 0.0
+    trips: int = 0
+    semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[int, asyncio.Semaphore]]" = field(
+        default_factory=weakref.WeakKeyDictionary
+    )
+    """事件循环 -> (并发上限, 信号量)；每个循环各自限流，互不重置"""
+
+
+class ModelRouter:
+    """进程级模型路由器（线程安全）"""
+
+    def __init__(
+        self,
+        *,
+        ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+    ) -> None:
+        """初始化路由器。
+
+        Args:
+            ewma_alpha: EWMA 平滑系数，越大越偏向最近的样本。
+            failure_threshold: 提供商连续失败多少次后熔断。
+            cooldown_seconds: 首次熔断的冷却时长（秒）。
+        """
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._models: Dict[str, ModelStats] = {}
+        self._providers: Dict[str, ProviderState] = {}
+        self._lock = threading.Lock()
+
+    # ==================== 选择 ====================
+
+    def select(self, candidates: Sequence[Tuple[str, str]], strategy: str) -> str:
+        """从候选模型中选出一个并登记为在途。
+
+        熔断中的提供商会被跳过；若所有候选都处于熔断，则选择最早恢复的那个，避免请求直接失败。
+
+        Args:
+            candidates: ``(模型名称, 提供商名称)`` 列表。
+            strategy: ``balance`` 或 ``random``。
+
+        Returns:
+            str: 选中的模型名称。
+
+        Raises:
+            ValueError: 候选列表为空时抛出。
+        """
+        if not candidates:
+            raise ValueError("候选模型列表不能为空")
+        now = time.monotonic()
+        with self._lock:
+            allowed = [item for item in candidates if self._provider_available_locked(item[1], now)]
+            if not allowed:
+                fallback = min(candidates, key=lambda item: self._provider_locked(item[1]).open_until)
+                logger.debug(f"候选模型的提供商均处于熔断状态，回退选择最早恢复的模型 {fallback[0]}")
+                allowed = [fallback]
+
+            if strategy == "random":
+                model_name, provider_name = random.choice(allowed)
+            else:
+                model_name, provider_name = min(allowed, key=lambda item: self._score_locked(item[0]))
+
+            provider = self._provider_locked(provider_name)
+            if provider.state == BREAKER_OPEN and now >= provider.open_until:
+                # 冷却结束：放行本次请求作为半开探测
+                provider.state = BREAKER_HALF_OPEN
+                provider.probe_started_at = now
+            self._model_locked(model_name).inflight += 1
+            return model_name
+
+    def _score_locked(self, model_name: str) -> Tuple[float, int]:
+        """balance 策略得分（越小越优）：预期延迟 ×（在途数 + 1）× 错误率惩罚，token 用量作为次序键。"""
+        stats = self._model_locked(model_name)
+        # 尚无延迟样本的模型按 0 计，保证新模型会被尽快探测
+        latency = stats.ewma_latency or 0.0
+        return latency * (stats.inflight + 1) * (1.0 + 4.0 * stats.ewma_error_rate), stats.total_tokens
+
+    def _provider_available_locked(self, provider_name: str, now: float) -> bool:
+        provider = self._provider_locked(provider_name)
+        if provider.state == BREAKER_CLOSED:
+            return now >= provider.open_until
+        if provider.state == BREAKER_HALF_OPEN:
+            # 探测请求迟迟没有结果时允许再次探测
+            return now - provider.probe_started_at >= max(provider.cooldown, MAX_BACKOFF_SECONDS)
+        return now >= provider.open_until
+
+    # ==================== 结果回报 ====================
+
+    def release(self, model_name: str) -> None:
+        """请求被中断等不计入统计的情况下，仅释放在途计数。"""
+        with self._lock:
+            stats = self._model_locked(model_name)
+            stats.inflight = max(0, stats.inflight - 1)
+
+    def record_model_result(self, model_name: str, success: bool, latency: float, total_tokens: int = 0) -> None:
+        """回报一次模型请求（含重试）的最终结果，并释放在途计数。
+
+        Args:
+            model_name: 模型名称。
+            success: 是否成功。
+            latency: 请求耗时（秒）。
+            total_tokens: 本次消耗的 token 数。
+        """
+        alpha = self.ewma_alpha
+        with self._lock:
+            stats = self._model_locked(model_name)
+            stats.inflight = max(0, stats.inflight - 1)
+            stats.requests += 1
+            stats.ewma_error_rate = (1 - alpha) * stats.ewma_error_rate + alpha * (0.0 if success else 1.0)
+            if success:
+                stats.total_tokens += total_tokens
+                stats.recent_latencies.append(latency)
+                if stats.ewma_latency is None:
+                    stats.ewma_latency = latency
+                else:
+                    stats.ewma_latency = (1 - alpha) * stats.ewma_latency + alpha * latency
+            else:
+                stats.failures += 1
+
+    def latency_quantile(self, model_name: str, quantile: float = 0.95) -> Optional[float]:
+        """估算模型最近成功请求耗时的分位数。
+
+        Args:
+            model_name: 模型名称。
+            quantile: 分位点，取值 0~1。
+
+        Returns:
+            Optional[float]: 耗时分位数（秒），样本不足时返回 None。
+        """
+        with self._lock:
+            samples = list(self._model_locked(model_name).recent_latencies)
+        return _quantile(samples, quantile)
+
+    def record_provider_success(self, provider_name: str) -> None:
+        """回报提供商的一次成功调用，关闭熔断器。"""
+        with self._lock:
+            provider = self._provider_locked(provider_name)
+            if provider.state != BREAKER_CLOSED:
+                logger.info(f"API 提供商 '{provider_name}' 已恢复，熔断器关闭")
+            provider.state = BREAKER_CLOSED
+            provider.consecutive_failures = 0
+            provider.cooldown = self.cooldown_seconds
+
+    def record_provider_failure(self, provider_name: str, retry_after: Optional[float] = None) -> None:
+        """回报提供商的一次可重试故障（网络错误、429、5xx）。
+
+        Args:
+            provider_name: 提供商名称。
+            retry_after: 上游要求的等待秒数，会暂停该提供商至少这么久。
+        """
+        now = time.monotonic()
+        with self._lock:
+            provider = self._provider_locked(provider_name)
+            provider.consecutive_failures += 1
+            if retry_after:
+                provider.open_until = max(provider.open_until, now + retry_after)
+            if provider.state == BREAKER_HALF_OPEN:
+                provider.cooldown = min(provider.cooldown * 2, MAX_COOLDOWN_SECONDS)
+                self._trip_locked(provider_name, provider, now)
+            elif provider.state == BREAKER_CLOSED and provider.consecutive_failures >= self.failure_threshold:
+                self._trip_locked(provider_name, provider, now)
+
+    def _trip_locked(self, provider_name: str, provider: ProviderState, now: float) -> None:
+        provider.state = BREAKER_OPEN
+        provider.open_until = max(provider.open_until, now + provider.cooldown)
+        provider.trips += 1
+        logger.warning(
+            f"API 提供商 '{provider_name}' 连续失败 {provider.consecutive_failures} 次，熔断 {provider.cooldown:.0f} 秒"
+        )
+
+    # ==================== 并发与退避 ====================
+
+    @asynccontextmanager
+    async def provider_slot(self, provider_name: str, max_concurrency: int) -> AsyncGenerator[None, None]:
+        """占用提供商的一个并发名额，``max_concurrency`` 不大于 0 时不限制。"""
+        if max_concurrency <= 0:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._provider_locked(provider_name).semaphores
+            entry = semaphores.get(loop)
+            if entry is None or entry[0] != max_concurrency:
+                if entry is None:
+                    # 信号量在等待时会绑定并强引用所属循环，弱键无法自动回收，新循环登记时顺带清理已关闭的循环
+                    for closed_loop in [other for other in semaphores if other.is_closed()]:
+                        del semaphores[closed_loop]
+                # 仅重建当前循环的信号量（并发上限变更），其它循环的信号量保持不变
+                entry = semaphores[loop] = (max_concurrency, asyncio.Semaphore(max_concurrency))
+            semaphore = entry[1]
+        async with semaphore:
+            yield
+
+    @staticmethod
+    def backoff_delay(base_interval: float, attempt: int, retry_after: Optional[float] = None) -> float:
+        """计算第 ``attempt`` 次重试前的等待时长。
+
+        Args:
+            base_interval: 基础重试间隔（`APIProvider.retry_interval`）。
+            attempt: 已失败的次数（从 1 开始）。
+            retry_after: 上游 `Retry-After` 给出的秒数。
+
+        Returns:
+            float: 等待秒数，不超过 `MAX_BACKOFF_SECONDS`。
+        """
+        if retry_after is not None and retry_after > 0:
+            return min(retry_after, MAX_BACKOFF_SECONDS)
+        ceiling = min(base_interval * 2 ** max(0, attempt - 1), MAX_BACKOFF_SECONDS)
+        # 等抖动：保留一半的确定等待，另一半随机，避免多个请求同时重试
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    # ==================== 状态导出 ====================
+
+    def snapshot(self) -> Dict[str, Any]:
+        """导出路由状态（供 WebUI 展示）。"""
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                name: {
+                    "ewma_latency": stats.ewma_latency,
+                    "ewma_error_rate": round(stats.ewma_error_rate, 4),
+                    "p95_latency": _quantile(list(stats.recent_latencies), 0.95),
+                    "inflight": stats.inflight,
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                    "total_tokens": stats.total_tokens,
+                }
+                for name, stats in self._models.items()
+            }
+            providers = {
+                name: {
+                    "state": provider.state,
+                    "consecutive_failures": provider.consecutive_failures,
+                    "paused_seconds": round(max(0.0, provider.open_until - now), 1),
+                    "cooldown": provider.cooldown,
+                    "trips": provider.trips,
+                }
+                for name, provider in self._providers.items()
+            }
+        return {"models": models, "providers": providers}
+
+    def reset(self) -> None:
+        """清空所有路由状态。"""
+        with self._lock:
+            self._models.clear()
+            self._providers.clear()
+
+    def _model_locked(self, model_name: str) -> ModelStats:
+        stats = self._models.get(model_name)
+        if stats is None:
+            stats = self._models[model_name] = ModelStats()
+        return stats
+
+    def _provider_locked(self, provider_name: str) -> ProviderState:
+        provider = self._providers.get(provider_name)
+        if provider is None:
+            provider = self._providers[provider_name] = ProviderState(cooldown=self.cooldown_seconds)
+        return provider
+
+
+def _quantile(samples: Sequence[float], quantile: float) -> Optional[float]:
+    if len(samples) < MIN_QUANTILE_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * quantile))]
+
+
+model_router = ModelRouter()
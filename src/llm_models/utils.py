@@ -9,6 +9,7 @@ from src.common.database.database_model import ModelUsage, ModelUser
 from src.common.logger import get_logger
 from src.config.model_configs import ModelInfo
 
+from .image_part_cache import image_part_cache
 from .model_client.base_client import UsageRecord
 from .payload_content.message import ImageMessagePart, Message, MessageBuilder, RoleType, TextMessagePart
 
@@ -149,7 +150,14 @@ def compress_messages(messages: list[Message], img_target_size: int = 1 * 1024 *
             if isinstance(message_part, ImageMessagePart):
                 message_builder.add_image_content(
                     message_part.image_format,
-                    compress_base64_image(message_part.image_base64, target_size=img_target_size),
+                    image_part_cache.get_or_create(
+                        message_part.image_base64,
+                        "compress:jpeg",
+                        img_target_size,
+                        lambda message_part=message_part: compress_base64_image(
+                            message_part.image_base64, target_size=img_target_size
+                        ),
+                    ),
                 )
                 continue
             if isinstance(message_part, TextMessagePart):
@@ -194,6 +202,7 @@ class LLMUsageRecorder:
                     prompt_tokens=model_usage.prompt_tokens or 0,
                     completion_tokens=model_usage.completion_tokens or 0,
                     total_tokens=model_usage.total_tokens or 0,
+                    cached_tokens=model_usage.cached_tokens or 0,
                     cost=total_cost or 0.0,
                 )
                 session.add(record)
@@ -201,7 +210,7 @@ class LLMUsageRecorder:
                 f"Token使用情况 - 模型: {model_usage.model_name}, "
                 f"用户: {user_id}, 类型: {request_type}, "
                 f"提示词: {model_usage.prompt_tokens}, 完成: {model_usage.completion_tokens}, "
-                f"总计: {model_usage.total_tokens}"
+                f"总计: {model_usage.total_tokens}, 缓存命中: {model_usage.cached_tokens}"
             )
         except Exception as e:
             logger.error(f"记录token使用情况失败: {str(e)}")
@@ -4,7 +4,6 @@ from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import asyncio
 import inspect
-import random
 import re
 import time
 import traceback
@@ -28,6 +27,7 @@ from src.llm_models.exceptions import (
     RespParseException,
 )
 from src.llm_models.model_client import ensure_configured_clients_loaded
+from src.llm_models.model_router import model_router
 from src.llm_models.model_client.base_client import (
     APIResponse,
     AudioTranscriptionRequest,
@@ -90,10 +90,6 @@ class LLMOrchestrator:
         self.task_name = task_name.strip()
         self.request_type = request_type
         self.model_for_task = self._get_task_config_or_raise()
-        self.model_usage: Dict[str, Tuple[int, int, int]] = {
-            model: (0, 0, 0) for model in self.model_for_task.model_list
-        }
-        """模型使用量记录，用于进行负载均衡，对应为(total_tokens, penalty, usage_penalty)，惩罚值是为了能在某个模型请求不给力或正在被使用的时候进行调整"""
 
     def _get_task_config_or_raise(self) -> TaskConfig:
         """获取当前任务名对应的最新任务配置。
@@ -122,8 +118,6 @@ class LLMOrchestrator:
         latest = self._get_task_config_or_raise()
         if latest is not self.model_for_task:
             self.model_for_task = latest
-        if list(self.model_usage.keys()) != latest.model_list:
-            self.model_usage = {model: self.model_usage.get(model, (0, 0, 0)) for model in latest.model_list}
         return self.model_for_task
 
     def _check_slow_request(self, time_cost: float, model_name: str) -> None:
@@ -671,42 +665,33 @@ class LLMOrchestrator:
             Tuple[ModelInfo, APIProvider, BaseClient]: 选中的模型、提供商与客户端实例。
         """
         self._refresh_task_config()
-        available_models = {
-            model: scores
-            for model, scores in self.model_usage.items()
-            if not exclude_models or model not in exclude_models
-        }
+        available_models = [
+            model for model in self.model_for_task.model_list if not exclude_models or model not in exclude_models
+        ]
         if not available_models:
             raise RuntimeError("没有可用的模型可供选择。所有模型均已尝试失败。")
 
         ensure_configured_clients_loaded()
 
         strategy = self.model_for_task.selection_strategy.lower()
-
-        if strategy == "random":
-            # 随机选择策略
-            selected_model_name = random.choice(list(available_models.keys()))
-        elif strategy == "balance":
-            # 负载均衡策略：根据总tokens和惩罚值选择
-            selected_model_name = min(
-                available_models,
-                key=lambda k: available_models[k][0] + available_models[k][1] * 300 + available_models[k][2] * 1000,
-            )
-        else:
+        if strategy not in ("random", "balance"):
             # 默认使用负载均衡策略
             logger.warning(f"未知的选择策略 '{strategy}'，使用默认的负载均衡策略")
-            selected_model_name = min(
-                available_models,
-                key=lambda k: available_models[k][0] + available_models[k][1] * 300 + available_models[k][2] * 1000,
-            )
+            strategy = "balance"
 
-        model_info = TempMethodsLLMUtils.get_model_info_by_name(selected_model_name)
-        api_provider = TempMethodsLLMUtils.get_provider_by_name(model_info.api_provider)
-        force_new_client = self.request_type == "embedding"
-        client = client_registry.get_client_class_instance(api_provider, force_new=force_new_client)
+        model_infos = {model: TempMethodsLLMUtils.get_model_info_by_name(model) for model in available_models}
+        selected_model_name = model_router.select(
+            [(model, model_info.api_provider) for model, model_info in model_infos.items()],
+            strategy,
+        )
+        model_info = model_infos[selected_model_name]
+        try:
+            api_provider = TempMethodsLLMUtils.get_provider_by_name(model_info.api_provider)
+            client = client_registry.get_client_class_instance(api_provider)
+        except Exception:
+            model_router.release(selected_model_name)
+            raise
         logger.debug(f"选择请求模型: {model_info.name} (策略: {strategy})")
-        total_tokens, penalty, usage_penalty = self.model_usage[model_info.name]
-        self.model_usage[model_info.name] = (total_tokens, penalty, usage_penalty + 1)
         return model_info, api_provider, client
 
     async def _attempt_request_on_model(
@@ -735,14 +720,19 @@ class LLMOrchestrator:
         model_info = request.model_info
         original_response_request = request if isinstance(request, ResponseRequest) else None
         active_request: ClientRequest = request
+        failed_attempts = 0
 
         while retry_remain > 0:
             try:
-                if isinstance(active_request, ResponseRequest):
-                    return await client.get_response(active_request)
-                if isinstance(active_request, EmbeddingRequest):
-                    return await client.get_embedding(active_request)
-                return await client.get_audio_transcriptions(active_request)
+                async with model_router.provider_slot(api_provider.name, api_provider.max_concurrency):
+                    if isinstance(active_request, ResponseRequest):
+                        response = await client.get_response(active_request)
+                    elif isinstance(active_request, EmbeddingRequest):
+                        response = await client.get_embedding(active_request)
+                    else:
+                        response = await client.get_audio_transcriptions(active_request)
+                model_router.record_provider_success(api_provider.name)
+                return response
             except EmptyResponseException as e:
                 # 空回复：通常为临时问题，单独记录并重试
                 original_error_info = self._get_original_error_info(e)
@@ -757,12 +747,14 @@ class LLMOrchestrator:
                 logger.warning(
                     f"任务 '{task_display}' 的模型 '{model_info.name}' 返回空回复(可重试){original_error_info}。剩余重试次数: {retry_remain}"
                 )
-                await asyncio.sleep(api_provider.retry_interval)
+                failed_attempts += 1
+                await asyncio.sleep(model_router.backoff_delay(api_provider.retry_interval, failed_attempts))
 
             except NetworkConnectionError as e:
                 # 网络错误：单独记录并重试
                 # 尝试从链式异常中获取原始错误信息以诊断具体原因
                 original_error_info = self._get_original_error_info(e)
+                model_router.record_provider_failure(api_provider.name)
 
                 retry_remain -= 1
                 task_display = self.request_type or "未知任务"
@@ -778,7 +770,8 @@ class LLMOrchestrator:
                     f"  其它可能原因: 网络波动、DNS 故障、连接超时、防火墙限制或代理问题\n"
                     f"  剩余重试次数: {retry_remain}"
                 )
-                await asyncio.sleep(api_provider.retry_interval)
+                failed_attempts += 1
+                await asyncio.sleep(model_router.backoff_delay(api_provider.retry_interval, failed_attempts))
 
             except RespNotOkException as e:
                 original_error_info = self._get_original_error_info(e)
@@ -791,6 +784,7 @@ class LLMOrchestrator:
                 )
 
                 if e.status_code == 429 or e.status_code >= 500:
+                    model_router.record_provider_failure(api_provider.name, e.retry_after)
                     retry_remain -= 1
                     if retry_remain <= 0:
                         logger.error(
@@ -801,7 +795,10 @@ class LLMOrchestrator:
                     logger.warning(
                         f"任务 '{task_display}' 的模型 '{model_info.name}' 遇到可重试的HTTP错误: {str(e)}{original_error_info}。剩余重试次数: {retry_remain}"
                     )
-                    await asyncio.sleep(api_provider.retry_interval)
+                    failed_attempts += 1
+                    await asyncio.sleep(
+                        model_router.backoff_delay(api_provider.retry_interval, failed_attempts, e.retry_after)
+                    )
                     continue
 
                 # 特殊处理413，尝试压缩
@@ -812,7 +809,8 @@ class LLMOrchestrator:
                         f"任务 '{task_display}' 的模型 '{model_info.name}' 返回 data URI 图片过大错误，"
                         f"检测到单项上限 {data_uri_limit_bytes} 字节，尝试压缩图片后重试..."
                     )
-                    compressed_messages = compress_messages(
+                    compressed_messages = await asyncio.to_thread(
+                        compress_messages,
                         active_request.message_list,
                         img_target_size=target_size,
                     )
@@ -827,7 +825,7 @@ class LLMOrchestrator:
                         f"任务 '{task_display}' 的模型 '{model_info.name}' 返回413请求体过大，尝试压缩后重试..."
                     )
                     # 压缩消息本身不消耗重试次数
-                    compressed_messages = compress_messages(active_request.message_list)
+                    compressed_messages = await asyncio.to_thread(compress_messages, active_request.message_list)
                     active_request = active_request.copy_with(message_list=compressed_messages)
                     continue
 
@@ -851,7 +849,8 @@ class LLMOrchestrator:
                     f"任务 '{task_display}' 的模型 '{model_info.name}' 返回内容解析失败(可重试): {str(e)}{original_error_info}。"
                     f"剩余重试次数: {retry_remain}"
                 )
-                await asyncio.sleep(api_provider.retry_interval)
+                failed_attempts += 1
+                await asyncio.sleep(model_router.backoff_delay(api_provider.retry_interval, failed_attempts))
 
             except ReqAbortException:
                 raise
@@ -884,9 +883,14 @@ class LLMOrchestrator:
         embedding_input: str | None = None,
         audio_base64: str | None = None,
         interrupt_flag: asyncio.Event | None = None,
+        busy_models: Optional[Set[str]] = None,
+        model_selected: Optional["asyncio.Future[str]"] = None,
     ) -> LLMExecutionResult:
         """执行一次完整的模型调度请求。
 
+        任务启用对冲请求时，响应请求会交给 `_execute_hedged_request` 以两条并行通道执行；
+        调用方提供流式响应处理函数时不对冲，避免同一处理函数被两条通道并发驱动。
+
         Args:
             request_type: 请求类型。
             message_factory: 消息工厂，仅在响应请求中使用。
@@ -899,24 +903,55 @@ class LLMOrchestrator:
             embedding_input: 嵌入输入文本。
             audio_base64: Base64 编码的音频数据。
             interrupt_flag: 外部中断标记。
+            busy_models: 对冲通道间共享的“正在使用”模型集合；选择时尽量避开其中的模型。
+            model_selected: 首次选定模型后写入其名称，供对冲调度据此计算截止时间。
 
         Returns:
             LLMExecutionResult: 单次模型执行结果对象。
         """
+        request_kwargs: Dict[str, Any] = {
+            "request_type": request_type,
+            "message_factory": message_factory,
+            "tool_options": tool_options,
+            "response_format": response_format,
+            "stream_response_handler": stream_response_handler,
+            "async_response_parser": async_response_parser,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "embedding_input": embedding_input,
+            "audio_base64": audio_base64,
+        }
+        if (
+            busy_models is None
+            and request_type == RequestType.RESPONSE
+            and self.model_for_task.enable_hedging
+            and len(self.model_for_task.model_list) > 1
+            and stream_response_handler is None
+        ):
+            return await self._execute_hedged_request(request_kwargs, interrupt_flag)
+
         failed_models_this_request: Set[str] = set()
         max_attempts = len(self.model_for_task.model_list)
         last_exception: Optional[Exception] = None
 
         for _ in range(max_attempts):
-            model_info, api_provider, client = self._select_model(exclude_models=failed_models_this_request)
-            message_list = []
-            if message_factory:
-                parameter_count = len(inspect.signature(message_factory).parameters)
-                if parameter_count >= 2:
-                    message_list = message_factory(client, model_info)
-                else:
-                    message_list = message_factory(client)
+            exclude_models = failed_models_this_request
+            if busy_models and set(self.model_for_task.model_list) - failed_models_this_request - busy_models:
+                exclude_models = failed_models_this_request | busy_models
+            model_info, api_provider, client = self._select_model(exclude_models=exclude_models)
+            if busy_models is not None:
+                busy_models.add(model_info.name)
+            if model_selected is not None and not model_selected.done():
+                model_selected.set_result(model_info.name)
+            started_at = time.monotonic()
             try:
+                message_list = []
+                if message_factory:
+                    parameter_count = len(inspect.signature(message_factory).parameters)
+                    if parameter_count >= 2:
+                        message_list = message_factory(client, model_info)
+                    else:
+                        message_list = message_factory(client)
                 request = self._build_client_request(
                     request_type=request_type,
                     model_info=model_info,
@@ -945,37 +980,168 @@ class LLMOrchestrator:
                     logger.info(
                         f"LLMOrchestrator[{self.request_type}] 模型 model={model_info.name} 已返回 API 响应"
                     )
-                total_tokens, penalty, usage_penalty = self.model_usage[model_info.name]
-                if response_usage := response.usage:
-                    total_tokens += response_usage.total_tokens
-                self.model_usage[model_info.name] = (total_tokens, penalty, usage_penalty - 1)
+                model_router.record_model_result(
+                    model_info.name,
+                    success=True,
+                    latency=time.monotonic() - started_at,
+                    total_tokens=response.usage.total_tokens if response.usage else 0,
+                )
                 return LLMExecutionResult(api_response=response, model_info=model_info)
 
-            except ReqAbortException as e:
-                total_tokens, penalty, usage_penalty = self.model_usage[model_info.name]
-                self.model_usage[model_info.name] = (total_tokens, penalty, usage_penalty - 1)
-                if self.request_type.startswith("maisaka_"):
-                    logger.info(
-                        f"LLMOrchestrator[{self.request_type}] 模型 model={model_info.name} 的请求已被外部信号中断"
-                    )
-                raise e
-
             except ModelAttemptFailed as e:
                 last_exception = e.original_exception or e
                 logger.warning(f"模型 '{model_info.name}' 尝试失败，切换到下一个模型。原因: {e}")
-                total_tokens, penalty, usage_penalty = self.model_usage[model_info.name]
-                self.model_usage[model_info.name] = (total_tokens, penalty + 1, usage_penalty - 1)
+                model_router.record_model_result(model_info.name, success=False, latency=time.monotonic() - started_at)
                 failed_models_this_request.add(model_info.name)
 
                 if isinstance(last_exception, RespNotOkException) and last_exception.status_code == 400:
                     logger.warning("收到客户端错误 (400)，跳过当前模型并继续尝试其他模型。")
                     continue
 
+            except BaseException as e:
+                # 中断或构建请求失败等情况不计入模型统计，只释放在途计数
+                model_router.release(model_info.name)
+                if isinstance(e, ReqAbortException) and self.request_type.startswith("maisaka_"):
+                    logger.info(
+                        f"LLMOrchestrator[{self.request_type}] 模型 model={model_info.name} 的请求已被外部信号中断"
+                    )
+                raise
+
+            finally:
+                if busy_models is not None:
+                    busy_models.discard(model_info.name)
+
         logger.error(f"所有 {max_attempts} 个模型均尝试失败。")
         if last_exception:
             raise last_exception
         raise RuntimeError("请求失败，所有可用模型均已尝试失败。")
 
+    async def _execute_hedged_request(
+        self,
+        request_kwargs: Dict[str, Any],
+        interrupt_flag: asyncio.Event | None,
+    ) -> LLMExecutionResult:
+        """以对冲方式执行响应请求。
+
+        先在一条通道上发起请求；若截止时间内未返回，则在另一条通道上选择其他模型再发一次。
+        先成功者胜出，其余通道通过各自的中断标记以 `ReqAbortException` 结束。
+        胜出通道的用量由调用方记录，落败通道若已拿到响应也会记录用量。
+
+        Args:
+            request_kwargs: 传给 `_execute_request` 的请求参数（不含中断标记）。
+            interrupt_flag: 外部中断标记，会同步到所有通道。
+
+        Returns:
+            LLMExecutionResult: 胜出通道的执行结果。
+        """
+        busy_models: Set[str] = set()
+        lane_flags: List[asyncio.Event] = []
+        lanes: List[asyncio.Task[LLMExecutionResult]] = []
+        lane_started_at: Dict[asyncio.Task[LLMExecutionResult], float] = {}
+        winner: Optional[asyncio.Task[LLMExecutionResult]] = None
+
+        def start_lane(model_selected: Optional["asyncio.Future[str]"] = None) -> None:
+            lane_flag = asyncio.Event()
+            if interrupt_flag is not None and interrupt_flag.is_set():
+                lane_flag.set()
+            lane = asyncio.create_task(
+                self._execute_request(
+                    **request_kwargs,
+                    interrupt_flag=lane_flag,
+                    busy_models=busy_models,
+                    model_selected=model_selected,
+                )
+            )
+            lane_flags.append(lane_flag)
+            lanes.append(lane)
+            lane_started_at[lane] = time.time()
+
+        async def propagate_interrupt() -> None:
+            assert interrupt_flag is not None
+            await interrupt_flag.wait()
+            for lane_flag in lane_flags:
+                lane_flag.set()
+
+        first_model: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        start_lane(first_model)
+        interrupt_watcher = asyncio.create_task(propagate_interrupt()) if interrupt_flag is not None else None
+        try:
+            # 等首条通道显式上报所选模型（或提前结束），再按该模型的近期耗时计算截止时间
+            await asyncio.wait([first_model, lanes[0]], return_when=asyncio.FIRST_COMPLETED)
+            hedge_delay = self._resolve_hedge_delay({first_model.result()} if first_model.done() else set())
+            done, _ = await asyncio.wait(lanes, timeout=hedge_delay)
+            if not done and len(busy_models) < len(self.model_for_task.model_list):
+                logger.info(
+                    f"任务 '{self.request_type or '未知任务'}' 的模型 {sorted(busy_models)} 在 {hedge_delay:.2f}s 内未返回，"
+                    "发起对冲请求"
+                )
+                start_lane()
+
+            pending: Set[asyncio.Task[LLMExecutionResult]] = set(lanes)
+            first_exception: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for lane in lanes:
+                    if lane not in done:
+                        continue
+                    if (lane_exception := lane.exception()) is None:
+                        winner = lane
+                        return lane.result()
+                    if first_exception is None or isinstance(first_exception, ReqAbortException):
+                        first_exception = lane_exception
+            assert first_exception is not None
+            raise first_exception
+        finally:
+            if interrupt_watcher is not None:
+                interrupt_watcher.cancel()
+            for lane, lane_flag in zip(lanes, lane_flags, strict=True):
+                if lane is winner:
+                    continue
+                if lane.done():
+                    self._record_hedge_loser_usage(lane, lane_started_at[lane])
+                    continue
+                lane_flag.set()
+                lane.add_done_callback(
+                    lambda finished, started=lane_started_at[lane]: self._record_hedge_loser_usage(finished, started)
+                )
+
+    def _resolve_hedge_delay(self, models: Set[str]) -> float:
+        """计算对冲截止时间。
+
+        Args:
+            models: 首条通道正在使用的模型。
+
+        Returns:
+            float: 截止时间（秒）。
+        """
+        if self.model_for_task.hedge_delay > 0:
+            return self.model_for_task.hedge_delay
+        quantiles = [model_router.latency_quantile(model) for model in models]
+        known_quantiles = [quantile for quantile in quantiles if quantile is not None]
+        if not known_quantiles:
+            return self.model_for_task.slow_threshold
+        return max(known_quantiles)
+
+    def _record_hedge_loser_usage(self, lane: "asyncio.Task[LLMExecutionResult]", started_at: float) -> None:
+        """落败的对冲通道结束后，若其已拿到响应则记录用量。
+
+        Args:
+            lane: 已结束的通道任务。
+            started_at: 通道开始时间。
+        """
+        if lane.cancelled() or lane.exception() is not None:
+            return
+        execution_result = lane.result()
+        if usage := execution_result.api_response.usage:
+            llm_usage_recorder.record_usage_to_database(
+                model_info=execution_result.model_info,
+                model_usage=usage,
+                user_id="system",
+                request_type=self.request_type,
+                endpoint="/chat/completions",
+                time_cost=time.time() - started_at,
+            )
+
     def _build_tool_options(self, tools: List[ToolDefinitionInput] | None) -> List[ToolOption] | None:
         """将任意输入工具定义列表规范化为内部工具选项。
 
@@ -7,10 +7,12 @@ import time
 
 from src.A_memorix.host_service import a_memorix_host_service
 from src.learners.expression_auto_check_task import ExpressionAutoCheckTask
-from src.emoji_system.emoji_manager import emoji_manager
+from src.emoji_system.emoji_manager import EmojiUsageWriteBackTask, emoji_manager
 from src.chat.message_receive.bot import chat_bot
 from src.chat.message_receive.chat_manager import chat_manager
 from src.chat.utils.statistic import OnlineTimeRecordTask, StatisticOutputTask
+from src.chat.utils.statistic_rollup import StatisticRollupTask
+from src.common.database.message_write_buffer import message_write_buffer
 from src.common.i18n import t
 from src.common.logger import get_logger
 from src.common.message_server import get_global_api
@@ -19,6 +21,7 @@ from src.common.remote import TelemetryHeartBeatTask
 from src.config.config import config_manager, global_config
 from src.manager.async_task_manager import async_task_manager
 from src.maisaka.display.stage_status_board import disable_stage_status_board, enable_stage_status_board
+from src.person_info.person_info import PersonInfoWriteBackTask, flush_person_info_cache
 from src.plugin_runtime.integration import get_plugin_runtime_manager
 from src.prompt.prompt_manager import prompt_manager
 from src.services.memory_flow_service import memory_automation_service
@@ -84,6 +87,9 @@ class MainSystem:
         # 添加在线时间统计任务
         await async_task_manager.add_task(OnlineTimeRecordTask())
 
+        # 添加统计预聚合任务
+        await async_task_manager.add_task(StatisticRollupTask())
+
         # 添加统计信息输出任务
         await async_task_manager.add_task(StatisticOutputTask())
 
@@ -93,6 +99,12 @@ class MainSystem:
         # 添加表达方式自动检查任务
         await async_task_manager.add_task(ExpressionAutoCheckTask())
 
+        # 添加人物信息缓存写回任务
+        await async_task_manager.add_task(PersonInfoWriteBackTask())
+
+        # 添加表情包使用记录写回任务
+        await async_task_manager.add_task(EmojiUsageWriteBackTask())
+
         # 启动API服务器
         # start_api_server()
         # logger.info("API服务器启动成功")
@@ -180,6 +192,9 @@ async def main() -> None:
         await get_plugin_runtime_manager().stop()
         await async_task_manager.stop_and_wait_all_tasks()
         emoji_manager.shutdown()
+        message_write_buffer.close()
+        flush_person_info_cache()
+        emoji_manager.flush_emoji_usage()
         await config_manager.stop_file_watcher()
 
 
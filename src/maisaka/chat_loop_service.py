@@ -33,8 +33,8 @@ from .context_messages import (
     AssistantMessage,
     LLMContextMessage,
     ToolResultMessage,
-    build_llm_message_from_context,
 )
+from .context_message_cache import context_message_cache
 from .history_utils import drop_orphan_tool_results
 from .display.prompt_cli_renderer import PromptCLIVisualizer
 from .visual_mode_utils import resolve_enable_visual_planner
@@ -408,7 +408,7 @@ class MaisakaChatLoopService:
         messages.append(system_msg.build())
 
         for msg in selected_history:
-            llm_message = build_llm_message_from_context(
+            llm_message = context_message_cache.to_llm_message(
                 msg,
                 enable_visual_message=enable_visual_message,
             )
@@ -513,25 +513,28 @@ class MaisakaChatLoopService:
         else:
             all_tools = [*get_builtin_tools(), *self._extra_tools]
 
-        before_request_result = await self._get_runtime_manager().invoke_hook(
-            "maisaka.planner.before_request",
-            messages=serialize_prompt_messages(built_messages),
-            tool_definitions=serialize_tool_definitions(all_tools),
-            selected_history_count=len(selected_history),
-            built_message_count=len(built_messages),
-            selection_reason=selection_reason,
-            session_id=self._session_id,
-        )
-        before_request_kwargs = before_request_result.kwargs
-        raw_messages = before_request_kwargs.get("messages")
-        if isinstance(raw_messages, list):
-            try:
-                built_messages = deserialize_prompt_messages(raw_messages)
-            except Exception as exc:
-                logger.warning(f"Hook maisaka.planner.before_request 返回的 messages 无法反序列化，已忽略: {exc}")
-        raw_tool_definitions = before_request_kwargs.get("tool_definitions")
-        if isinstance(raw_tool_definitions, list):
-            all_tools = [item for item in raw_tool_definitions if isinstance(item, dict)]
+        runtime_manager = self._get_runtime_manager()
+        # 没有插件订阅时跳过整段提示词的序列化与反序列化
+        if runtime_manager.has_subscribers("maisaka.planner.before_request"):
+            before_request_result = await runtime_manager.invoke_hook(
+                "maisaka.planner.before_request",
+                messages=serialize_prompt_messages(built_messages),
+                tool_definitions=serialize_tool_definitions(all_tools),
+                selected_history_count=len(selected_history),
+                built_message_count=len(built_messages),
+                selection_reason=selection_reason,
+                session_id=self._session_id,
+            )
+            before_request_kwargs = before_request_result.kwargs
+            raw_messages = before_request_kwargs.get("messages")
+            if isinstance(raw_messages, list):
+                try:
+                    built_messages = deserialize_prompt_messages(raw_messages)
+                except Exception as exc:
+                    logger.warning(f"Hook maisaka.planner.before_request 返回的 messages 无法反序列化，已忽略: {exc}")
+            raw_tool_definitions = before_request_kwargs.get("tool_definitions")
+            if isinstance(raw_tool_definitions, list):
+                all_tools = [item for item in raw_tool_definitions if isinstance(item, dict)]
 
         prompt_section: RenderableType | None = None
         if global_config.debug.show_maisaka_thinking:
@@ -557,33 +560,34 @@ class MaisakaChatLoopService:
 
         final_response = generation_result.response or ""
         final_tool_calls = list(generation_result.tool_calls or [])
-        after_response_result = await self._get_runtime_manager().invoke_hook(
-            "maisaka.planner.after_response",
-            response=final_response,
-            tool_calls=serialize_tool_calls(final_tool_calls),
-            selected_history_count=len(selected_history),
-            built_message_count=len(built_messages),
-            selection_reason=selection_reason,
-            session_id=self._session_id,
-            prompt_tokens=generation_result.prompt_tokens,
-            completion_tokens=generation_result.completion_tokens,
-            total_tokens=generation_result.total_tokens,
-        )
-        after_response_kwargs = after_response_result.kwargs
-        if "response" in after_response_kwargs:
-            final_response = str(after_response_kwargs.get("response") or "")
-        raw_tool_calls = after_response_kwargs.get("tool_calls")
-        if isinstance(raw_tool_calls, list):
-            try:
-                final_tool_calls = deserialize_tool_calls(raw_tool_calls)
-            except Exception as exc:
-                logger.warning(f"Hook maisaka.planner.after_response 返回的 tool_calls 无法反序列化，已忽略: {exc}")
-        prompt_tokens = self._coerce_int(after_response_kwargs.get("prompt_tokens"), generation_result.prompt_tokens)
-        completion_tokens = self._coerce_int(
-            after_response_kwargs.get("completion_tokens"),
-            generation_result.completion_tokens,
-        )
-        total_tokens = self._coerce_int(after_response_kwargs.get("total_tokens"), generation_result.total_tokens)
+        prompt_tokens = generation_result.prompt_tokens
+        completion_tokens = generation_result.completion_tokens
+        total_tokens = generation_result.total_tokens
+        if runtime_manager.has_subscribers("maisaka.planner.after_response"):
+            after_response_result = await runtime_manager.invoke_hook(
+                "maisaka.planner.after_response",
+                response=final_response,
+                tool_calls=serialize_tool_calls(final_tool_calls),
+                selected_history_count=len(selected_history),
+                built_message_count=len(built_messages),
+                selection_reason=selection_reason,
+                session_id=self._session_id,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=total_tokens,
+            )
+            after_response_kwargs = after_response_result.kwargs
+            if "response" in after_response_kwargs:
+                final_response = str(after_response_kwargs.get("response") or "")
+            raw_tool_calls = after_response_kwargs.get("tool_calls")
+            if isinstance(raw_tool_calls, list):
+                try:
+                    final_tool_calls = deserialize_tool_calls(raw_tool_calls)
+                except Exception as exc:
+                    logger.warning(f"Hook maisaka.planner.after_response 返回的 tool_calls 无法反序列化，已忽略: {exc}")
+            prompt_tokens = self._coerce_int(after_response_kwargs.get("prompt_tokens"), prompt_tokens)
+            completion_tokens = self._coerce_int(after_response_kwargs.get("completion_tokens"), completion_tokens)
+            total_tokens = self._coerce_int(after_response_kwargs.get("total_tokens"), total_tokens)
 
         raw_message = AssistantMessage(
             content=final_response,
@@ -612,14 +616,21 @@ class MaisakaChatLoopService:
         request_kind: str = "planner",
         max_context_size: Optional[int] = None,
     ) -> tuple[List[LLMContextMessage], str]:
-        """选择LLM上下文消息"""
+        """选择LLM上下文消息
 
-        filtered_history = MaisakaChatLoopService._filter_history_for_request_kind(
-            chat_history,
-            request_kind=request_kind,
+        从尾部向前逐条过滤与转换（结果由 `context_message_cache` 缓存），窗口填满即停止，
+        因此每轮的开销只与窗口大小有关，而与历史总长度无关。
+
+        启用提示词缓存友好布局且未显式指定 ``max_context_size`` 时，历史由后处理按块裁切，
+        这里的窗口额外预留两块余量，使窗口起点只随按块裁切移动，请求前缀在块内保持不变。
+        """
+
+        base_context_size = max(1, int(max_context_size or global_config.chat.max_context_size))
+        prompt_cache_block_size = (
+            MaisakaChatLoopService.resolve_prompt_cache_block_size() if max_context_size is None else 0
         )
-        effective_context_size = max(1, int(max_context_size or global_config.chat.max_context_size))
-        selected_indices: List[int] = []
+        effective_context_size = base_context_size + 2 * prompt_cache_block_size
+        selected_messages: List[LLMContextMessage] = []
         counted_message_count = 0
 
         active_enable_visual_message = (
@@ -628,10 +639,15 @@ class MaisakaChatLoopService:
             else MaisakaChatLoopService._resolve_enable_visual_message(request_kind)
         )
 
-        for index in range(len(filtered_history) - 1, -1, -1):
-            message = filtered_history[index]
+        for index in range(len(chat_history) - 1, -1, -1):
+            message = MaisakaChatLoopService._filter_message_for_request_kind(
+                chat_history[index],
+                request_kind=request_kind,
+            )
+            if message is None:
+                continue
             if (
-                build_llm_message_from_context(
+                context_message_cache.to_llm_message(
                     message,
                     enable_visual_message=active_enable_visual_message,
                 )
@@ -639,18 +655,21 @@ class MaisakaChatLoopService:
             ):
                 continue
 
-            selected_indices.append(index)
+            selected_messages.append(message)
             if message.count_in_context:
                 counted_message_count += 1
                 if counted_message_count >= effective_context_size:
                     break
 
-        if not selected_indices:
+        if not selected_messages:
             return [], "实际发送 0 条消息（tool 0 条，普通消息 0 条）"
 
-        selected_indices.reverse()
-        selected_history = [filtered_history[index] for index in selected_indices]
-        selected_history, _ = MaisakaChatLoopService._hide_early_assistant_messages(selected_history)
+        selected_messages.reverse()
+        selected_history = selected_messages
+        selected_history, _ = MaisakaChatLoopService._hide_early_assistant_messages(
+            selected_history,
+            stable_context_size=base_context_size if prompt_cache_block_size > 0 else None,
+        )
         selected_history, _ = drop_orphan_tool_results(selected_history)
         tool_message_count = sum(1 for message in selected_history if isinstance(message, ToolResultMessage))
         normal_message_count = len(selected_history) - tool_message_count
@@ -664,43 +683,44 @@ class MaisakaChatLoopService:
         )
 
     @staticmethod
-    def _filter_history_for_request_kind(
-        selected_history: List[LLMContextMessage],
+    def _filter_message_for_request_kind(
+        message: LLMContextMessage,
         *,
         request_kind: str,
-    ) -> List[LLMContextMessage]:
-        """按请求类型过滤不应暴露的历史工具链。"""
-
-        if request_kind != "planner":
-            return selected_history
+    ) -> Optional[LLMContextMessage]:
+        """按请求类型过滤单条消息，返回 None 表示丢弃。
 
-        filtered_history: List[LLMContextMessage] = []
-        for message in selected_history:
-            if isinstance(message, ToolResultMessage) and message.tool_name in TIMING_GATE_TOOL_NAMES:
-                continue
-
-            if isinstance(message, AssistantMessage) and message.tool_calls:
-                kept_tool_calls = [
-                    tool_call
-                    for tool_call in message.tool_calls
-                    if tool_call.func_name not in TIMING_GATE_TOOL_NAMES
-                ]
-                if not kept_tool_calls:
-                    continue
-                if len(kept_tool_calls) != len(message.tool_calls):
-                    filtered_history.append(
-                        AssistantMessage(
-                            content=message.content,
-                            timestamp=message.timestamp,
-                            tool_calls=kept_tool_calls,
-                            source_kind=message.source_kind,
-                        )
-                    )
-                    continue
+        部分工具调用被剔除的 assistant 消息会派生为新对象，派生结果按原始消息缓存，
+        保证同一条消息每轮得到同一个对象。
+        """
 
-            filtered_history.append(message)
+        if request_kind != "planner":
+            return message
+
+        if isinstance(message, ToolResultMessage) and message.tool_name in TIMING_GATE_TOOL_NAMES:
+            return None
+
+        if isinstance(message, AssistantMessage) and message.tool_calls:
+            kept_tool_calls = [
+                tool_call
+                for tool_call in message.tool_calls
+                if tool_call.func_name not in TIMING_GATE_TOOL_NAMES
+            ]
+            if not kept_tool_calls:
+                return None
+            if len(kept_tool_calls) != len(message.tool_calls):
+                return context_message_cache.derive(
+                    message,
+                    "planner_tool_calls",
+                    lambda: AssistantMessage(
+                        content=message.content,
+                        timestamp=message.timestamp,
+                        tool_calls=kept_tool_calls,
+                        source_kind=message.source_kind,
+                    ),
+                )
 
-        return filtered_history
+        return message
 
     @staticmethod
     def _resolve_enable_visual_message(request_kind: str) -> bool:
@@ -708,18 +728,43 @@ class MaisakaChatLoopService:
             return resolve_enable_visual_planner()
         return True
 
+    @staticmethod
+    def resolve_prompt_cache_block_size() -> int:
+        """返回提示词缓存友好布局的块大小，未启用时返回 0。"""
+
+        if not global_config.chat.enable_prompt_cache_layout:
+            return 0
+        return max(1, int(global_config.chat.prompt_cache_block_size))
+
     @staticmethod
     def _hide_early_assistant_messages(
         selected_history: List[LLMContextMessage],
+        *,
+        stable_context_size: Optional[int] = None,
     ) -> tuple[List[LLMContextMessage], int]:
-        """隐藏上下文中最早 50% 的 assistant 文本消息，但保留工具调用链路。"""
+        """隐藏上下文中最早 50% 的 assistant 文本消息，但保留工具调用链路。
+
+        指定 ``stable_context_size`` 时，只按窗口前 ``stable_context_size`` 条计数消息中的 assistant
+        计算隐藏数量，尾部追加新消息不会改变已发送部分的隐藏结果。
+        """
 
         assistant_indices = [
             index
             for index, message in enumerate(selected_history)
             if isinstance(message, AssistantMessage)
         ]
-        hidden_assistant_count = len(assistant_indices) // 2
+        settled_assistant_indices = assistant_indices
+        if stable_context_size is not None:
+            settled_end = len(selected_history)
+            counted_message_count = 0
+            for index, message in enumerate(selected_history):
+                if message.count_in_context:
+                    counted_message_count += 1
+                    if counted_message_count >= stable_context_size:
+                        settled_end = index + 1
+                        break
+            settled_assistant_indices = [index for index in assistant_indices if index < settled_end]
+        hidden_assistant_count = len(settled_assistant_indices) // 2
         if hidden_assistant_count <= 0:
             return selected_history, 0
 
@@ -731,11 +776,15 @@ class MaisakaChatLoopService:
                 if not message.tool_calls:
                     continue
                 filtered_history.append(
-                    AssistantMessage(
-                        content="",
-                        timestamp=message.timestamp,
-                        tool_calls=list(message.tool_calls),
-                        source_kind=message.source_kind,
+                    context_message_cache.derive(
+                        message,
+                        "hidden_assistant_text",
+                        lambda message=message: AssistantMessage(
+                            content="",
+                            timestamp=message.timestamp,
+                            tool_calls=list(message.tool_calls),
+                            source_kind=message.source_kind,
+                        ),
                     )
                 )
                 continue
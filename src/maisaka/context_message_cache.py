@@ -0,0 +1,101 @@
+"""Maisaka 上下文消息转换缓存
+
+规划器每一轮都会遍历上下文窗口，把 `LLMContextMessage` 转换为发给模型的 `Message`，
+并为按请求类型过滤、隐藏早期 assistant 文本等步骤重新构造派生消息。
+上下文消息在加入历史后不会被原地修改（视觉占位刷新会整体替换为新对象），
+因此可以按对象身份缓存这些结果：
+
+- 转换结果以 ``(消息身份, 是否启用视觉消息)`` 为键
+- 派生消息以 ``(消息身份, 派生类型)`` 为键，同一原始消息每轮得到同一个派生对象，其转换结果也能命中缓存
+- 缓存通过弱引用跟随原始消息的生命周期，消息从历史中裁剪并被回收后条目自动移除
+"""
+
+from typing import Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+import weakref
+
+from src.llm_models.payload_content.message import Message
+
+from .context_messages import LLMContextMessage
+
+T = TypeVar("T")
+_CacheKey = Tuple[int, Hashable]
+
+DEFAULT_MAX_ENTRIES = 8192
+
+
+class ContextMessageCache:
+    """按上下文消息对象身份缓存转换结果与派生消息"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._entries: Dict[_CacheKey, Tuple["weakref.ref[LLMContextMessage]", object]] = {}
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    def to_llm_message(self, message: LLMContextMessage, *, enable_visual_message: bool) -> Optional[Message]:
+        """获取上下文消息对应的 LLM 消息，未命中时调用 `to_llm_message()` 并缓存。
+
+        Args:
+            message: 上下文消息。
+            enable_visual_message: 是否启用视觉消息。
+
+        Returns:
+            Optional[Message]: 转换结果；该消息不应发给模型时返回 None。
+        """
+        return self._get_or_create(
+            message,
+            ("llm", enable_visual_message),
+            lambda: message.to_llm_message(enable_visual_message=enable_visual_message),
+        )
+
+    def derive(self, message: LLMContextMessage, variant: Hashable, factory: Callable[[], T]) -> T:
+        """获取原始消息的派生结果，同一原始消息与派生类型始终返回同一个对象。
+
+        Args:
+            message: 原始上下文消息。
+            variant: 派生类型标识。
+            factory: 未命中时构造派生结果的函数。
+
+        Returns:
+            T: 派生结果。
+        """
+        return self._get_or_create(message, ("derived", variant), factory)
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中、未命中次数与当前条目数。"""
+        return {**self._stats, "entries": len(self._entries)}
+
+    def _get_or_create(self, message: LLMContextMessage, variant: Hashable, factory: Callable[[], T]) -> T:
+        key = (id(message), variant)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is message:
+            self._stats["hits"] += 1
+            return entry[1]  # type: ignore[return-value]
+
+        self._stats["misses"] += 1
+        value = factory()
+        if len(self._entries) >= self.max_entries:
+            # 正常情况下条目会随消息回收自动移除，这里只是兜底，丢弃最早写入的条目
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (weakref.ref(message, self._make_remover(key)), value)
+        return value
+
+    def _make_remover(self, key: _CacheKey) -> Callable[["weakref.ref[LLMContextMessage]"], None]:
+        cache_ref = weakref.ref(self)
+
+        def _remove(dead_ref: "weakref.ref[LLMContextMessage]") -> None:
+            cache = cache_ref()
+            if cache is None:
+                return
+            entry = cache._entries.get(key)
+            if entry is not None and entry[0] is dead_ref:
+                del cache._entries[key]
+
+        return _remove
+
+
+context_message_cache = ContextMessageCache()
@@ -22,8 +22,25 @@ def process_chat_history_after_cycle(
     chat_history: list[LLMContextMessage],
     *,
     max_context_size: int,
+    block_size: int = 0,
 ) -> HistoryPostProcessResult:
-    """在每轮结束后统一执行历史裁切与清理。"""
+    """在每轮结束后统一执行历史裁切与清理。
+
+    Args:
+        chat_history: 当前聊天历史。
+        max_context_size: 裁切后保留的上下文消息条数。
+        block_size: 大于 0 时按块裁切：历史只在超出 ``max_context_size + block_size`` 时才统一清理，
+            其余轮次保持历史前部不变，便于命中供应商提示词缓存。
+    """
+
+    if block_size > 0:
+        context_count = sum(1 for message in chat_history if message.count_in_context)
+        if context_count <= max_context_size + block_size:
+            return HistoryPostProcessResult(
+                history=list(chat_history),
+                removed_count=0,
+                remaining_context_count=context_count,
+            )
 
     processed_history = list(chat_history)
     removed_timing_tool_count = _remove_early_timing_tool_records(processed_history)
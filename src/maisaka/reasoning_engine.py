@@ -23,7 +23,7 @@ from src.services.memory_service import memory_service
 from .builtin_tool import build_builtin_tool_handlers as build_split_builtin_tool_handlers
 from .builtin_tool import get_builtin_tool_visibility, is_builtin_tool_in_action_stage
 from .builtin_tool import get_timing_tools
-from .chat_loop_service import ChatResponse
+from .chat_loop_service import ChatResponse, MaisakaChatLoopService
 from .chat_history_visual_refresher import refresh_chat_history_visual_placeholders
 from .builtin_tool.context import BuiltinToolRuntimeContext
 from .context_messages import (
@@ -808,6 +808,7 @@ class MaisakaReasoningEngine:
         process_result = process_chat_history_after_cycle(
             self._runtime._chat_history,
             max_context_size=self._runtime._max_context_size,
+            block_size=MaisakaChatLoopService.resolve_prompt_cache_block_size(),
         )
         if process_result.removed_count <= 0:
             return
@@ -6,6 +6,7 @@ import hashlib
 import json
 import math
 import random
+import threading
 import time
 
 from json_repair import repair_json
@@ -18,6 +19,8 @@ from src.common.database.database import get_db_session
 from src.common.database.database_model import PersonInfo
 from src.common.logger import get_logger
 from src.config.config import global_config
+from src.manager.async_task_manager import AsyncTask
+from src.person_info.person_info_cache import PersonInfoCache, PersonRow
 from src.services.memory_service import memory_service
 from src.services.llm_service import LLMServiceClient
 
@@ -28,6 +31,27 @@ relation_selection_model = LLMServiceClient(
     task_name="utils", request_type="relation_selection"
 )
 
+# 缓存中保存的 PersonInfo 列（person_id 作为键，不重复保存）
+_PERSON_INFO_COLUMNS = (
+    "is_known",
+    "platform",
+    "user_id",
+    "user_nickname",
+    "person_name",
+    "name_reason",
+    "know_counts",
+    "first_known_time",
+    "last_known_time",
+    "memory_points",
+    "group_cardname",
+)
+
+person_info_cache = PersonInfoCache()
+"""进程内 PersonInfo 写回缓存，WebUI 等直接修改数据库的入口需调用 `person_info_cache.invalidate()`"""
+
+_person_info_write_lock = threading.Lock()
+"""串行化批量写回与 `Person.sync_to_database` 直写，避免线程中提交的旧快照覆盖事件循环中刚写入的新值"""
+
 
 def _to_group_cardname_records(group_cardname_json: Optional[str]) -> list[dict[str, str]]:
     """将数据库中的群名片 JSON 转换为 `Person` 内部使用的结构。
@@ -106,31 +130,86 @@ def resolve_person_id_for_memory(
     return ""
 
 
+def _load_person_row(person_id: str) -> Optional[PersonRow]:
+    """读取人物信息行，优先命中 `person_info_cache`，未命中时查询数据库并回填缓存。
+
+    Args:
+        person_id: 人物 ID。
+
+    Returns:
+        Optional[PersonRow]: 列名到值的映射；数据库中不存在时返回 None。
+    """
+    if not person_id:
+        return None
+    if (row := person_info_cache.get(person_id)) is not None:
+        return row
+    with get_db_session() as session:
+        statement = select(PersonInfo).where(col(PersonInfo.person_id) == person_id).limit(1)
+        record = session.exec(statement).first()
+        if record is None:
+            return None
+        row = {name: getattr(record, name, None) for name in _PERSON_INFO_COLUMNS}
+    person_info_cache.put(person_id, row)
+    return row
+
+
+def flush_person_info_cache() -> int:
+    """将缓存中的脏列在一个事务中批量写回数据库。
+
+    Returns:
+        int: 写回的人物数量；失败时脏列放回缓存并返回 0。
+    """
+    with _person_info_write_lock:
+        return _flush_person_info_cache_locked()
+
+
+def _flush_person_info_cache_locked() -> int:
+    """在持有 `_person_info_write_lock` 时取出脏列并写回数据库。
+
+    Returns:
+        int: 写回的人物数量；失败时脏列放回缓存并返回 0。
+    """
+    dirty = person_info_cache.pop_dirty()
+    if not dirty:
+        return 0
+    try:
+        with get_db_session() as session:
+            statement = select(PersonInfo).where(col(PersonInfo.person_id).in_(list(dirty)))
+            records = {record.person_id: record for record in session.exec(statement).all()}
+            for person_id, row in dirty.items():
+                record = records.get(person_id)
+                if record is None:
+                    if not {"platform", "user_id", "user_nickname"} <= row.keys():
+                        # 条目只有部分列且库中已无此人（已被外部删除），不再复活
+                        continue
+                    record = PersonInfo(person_id=person_id, **row)
+                else:
+                    for key, value in row.items():
+                        setattr(record, key, value)
+                session.add(record)
+    except Exception as e:
+        person_info_cache.restore_dirty(dirty)
+        logger.error(f"批量写回 {len(dirty)} 个用户信息失败，将在下次重试: {e}")
+        return 0
+    logger.debug(f"已批量写回 {len(dirty)} 个用户信息")
+    return len(dirty)
+
+
 def is_person_known(
     person_id: Optional[str] = None,
     user_id: Optional[str] = None,
     platform: Optional[str] = None,
     person_name: Optional[str] = None,
-) -> bool:  # sourcery skip: extract-duplicate-method
-    if person_id:
-        with get_db_session() as session:
-            statement = select(PersonInfo).where(col(PersonInfo.person_id) == person_id).limit(1)
-            person = session.exec(statement).first()
-            return person.is_known if person else False
-    elif user_id and platform:
-        person_id = get_person_id(platform, user_id)
-        with get_db_session() as session:
-            statement = select(PersonInfo).where(col(PersonInfo.person_id) == person_id).limit(1)
-            person = session.exec(statement).first()
-            return person.is_known if person else False
-    elif person_name:
-        person_id = get_person_id_by_person_name(person_name)
-        with get_db_session() as session:
-            statement = select(PersonInfo).where(col(PersonInfo.person_id) == person_id).limit(1)
-            person = session.exec(statement).first()
-            return person.is_known if person else False
-    else:
-        return False
+) -> bool:
+    if not person_id:
+        if user_id and platform:
+            person_id = get_person_id(platform, user_id)
+        elif person_name:
+            person_id = get_person_id_by_person_name(person_name)
+        else:
+            return False
+    row = _load_person_row(person_id)
+    return bool(row["is_known"]) if row else False
 
 
 def get_category_from_memory(memory_point: str) -> Optional[str]:
@@ -469,117 +548,127 @@ class Person:
         # 检查是否已存在该群号的记录
         for item in self.group_cardname_list:
             if item.get("group_id") == group_id:
+                if item.get("group_cardname") == group_nick_name:
+                    return
                 # 更新现有记录
                 item["group_cardname"] = group_nick_name
-                self.sync_to_database()
+                self.write_back()
                 logger.debug(f"更新用户 {self.person_id} 在群 {group_id} 的群昵称为 {group_nick_name}")
                 return
 
         # 添加新记录
         self.group_cardname_list.append({"group_id": group_id, "group_cardname": group_nick_name})
-        self.sync_to_database()
+        self.write_back()
         logger.debug(f"添加用户 {self.person_id} 在群 {group_id} 的群昵称 {group_nick_name}")
 
     def load_from_database(self):
-        """从数据库加载个人信息数据"""
+        """从数据库加载个人信息数据（优先命中 `person_info_cache`）"""
         try:
-            with get_db_session() as session:
-                statement = select(PersonInfo).where(col(PersonInfo.person_id) == self.person_id).limit(1)
-                record = session.exec(statement).first()
-
-                if record:
-                    self.user_id = record.user_id or ""
-                    self.platform = record.platform or ""
-                    self.is_known = record.is_known or False
-                    self.nickname = record.user_nickname or ""
-                    self.person_name = record.person_name or self.nickname
-                    self.name_reason = record.name_reason or None
-                    self.know_times = record.know_counts or 0
-
-                    # 处理points字段（JSON格式的列表）
-                    if record.memory_points:
-                        try:
-                            loaded_points = json.loads(record.memory_points)
-                            # 过滤掉None值，确保数据质量
-                            if isinstance(loaded_points, list):
-                                self.memory_points = [point for point in loaded_points if point is not None]
-                            else:
-                                self.memory_points = []
-                        except (json.JSONDecodeError, TypeError):
-                            logger.warning(f"解析用户 {self.person_id} 的points字段失败，使用默认值")
+            record = _load_person_row(self.person_id)
+
+            if record:
+                self.user_id = record["user_id"] or ""
+                self.platform = record["platform"] or ""
+                self.is_known = record["is_known"] or False
+                self.nickname = record["user_nickname"] or ""
+                self.person_name = record["person_name"] or self.nickname
+                self.name_reason = record["name_reason"] or None
+                self.know_times = record["know_counts"] or 0
+                # 保留已有的认识时间，避免写回时被默认值覆盖
+                if record["first_known_time"]:
+                    self.know_since = record["first_known_time"].timestamp()
+                if record["last_known_time"]:
+                    self.last_know = record["last_known_time"].timestamp()
+
+                # 处理points字段（JSON格式的列表）
+                if record["memory_points"]:
+                    try:
+                        loaded_points = json.loads(record["memory_points"])
+                        # 过滤掉None值，确保数据质量
+                        if isinstance(loaded_points, list):
+                            self.memory_points = [point for point in loaded_points if point is not None]
+                        else:
                             self.memory_points = []
-                    else:
+                    except (json.JSONDecodeError, TypeError):
+                        logger.warning(f"解析用户 {self.person_id} 的points字段失败，使用默认值")
                         self.memory_points = []
-
-                    # 处理 group_cardname 字段（JSON 格式的列表）
-                    if record.group_cardname:
-                        try:
-                            self.group_cardname_list = _to_group_cardname_records(record.group_cardname)
-                        except (json.JSONDecodeError, TypeError):
-                            logger.warning(f"解析用户 {self.person_id} 的group_cardname字段失败，使用默认值")
-                            self.group_cardname_list = []
-                    else:
+                else:
+                    self.memory_points = []
+
+                # 处理 group_cardname 字段（JSON 格式的列表）
+                if record["group_cardname"]:
+                    try:
+                        self.group_cardname_list = _to_group_cardname_records(record["group_cardname"])
+                    except (json.JSONDecodeError, TypeError):
+                        logger.warning(f"解析用户 {self.person_id} 的group_cardname字段失败，使用默认值")
                         self.group_cardname_list = []
-
-                    logger.debug(f"已从数据库加载用户 {self.person_id} 的信息")
                 else:
-                    self.sync_to_database()
-                    logger.info(f"用户 {self.person_id} 在数据库中不存在，使用默认值并创建")
+                    self.group_cardname_list = []
+
+                logger.debug(f"已从数据库加载用户 {self.person_id} 的信息")
+            else:
+                self.sync_to_database()
+                logger.info(f"用户 {self.person_id} 在数据库中不存在，使用默认值并创建")
 
         except Exception as e:
             logger.error(f"从数据库加载用户 {self.person_id} 信息时出错: {e}")
             # 出错时保持默认值
 
+    def _build_person_row(self) -> PersonRow:
+        """将当前属性转换为 PersonInfo 列值。"""
+        memory_points_value = (
+            json.dumps([point for point in self.memory_points if point is not None], ensure_ascii=False)
+            if self.memory_points
+            else json.dumps([], ensure_ascii=False)
+        )
+        return {
+            "is_known": self.is_known,
+            "platform": self.platform,
+            "user_id": self.user_id,
+            "user_nickname": self.nickname,
+            "person_name": self.person_name,
+            "name_reason": self.name_reason,
+            "know_counts": self.know_times,
+            "first_known_time": datetime.fromtimestamp(self.know_since) if self.know_since else None,
+            "last_known_time": datetime.fromtimestamp(self.last_know) if self.last_know else None,
+            "memory_points": memory_points_value,
+            "group_cardname": dump_group_cardname_records(self.group_cardname_list),
+        }
+
+    def write_back(self):
+        """将属性变化记入 `person_info_cache`，由 `PersonInfoWriteBackTask` 定期批量写回数据库。
+
+        与缓存一致时不产生任何写入；需要立即落库时使用 `sync_to_database()`。
+        """
+        if not self.is_known:
+            return
+        person_info_cache.update(self.person_id, self._build_person_row())
+
     def sync_to_database(self):
-        """将所有属性同步回数据库"""
+        """将所有属性同步回数据库（立即写入，与缓存一致时跳过）"""
         if not self.is_known:
             return
         try:
-            memory_points_value = (
-                json.dumps([point for point in self.memory_points if point is not None], ensure_ascii=False)
-                if self.memory_points
-                else json.dumps([], ensure_ascii=False)
-            )
-            group_cardname_value = dump_group_cardname_records(self.group_cardname_list)
-            first_known_time = datetime.fromtimestamp(self.know_since) if self.know_since else None
-            last_known_time = datetime.fromtimestamp(self.last_know) if self.last_know else None
-
-            with get_db_session() as session:
-                statement = select(PersonInfo).where(col(PersonInfo.person_id) == self.person_id).limit(1)
-                record = session.exec(statement).first()
-
-                if record:
-                    record.person_id = self.person_id
-                    record.is_known = self.is_known
-                    record.platform = self.platform
-                    record.user_id = self.user_id
-                    record.user_nickname = self.nickname
-                    record.person_name = self.person_name
-                    record.name_reason = self.name_reason
-                    record.know_counts = self.know_times
-                    record.first_known_time = first_known_time
-                    record.last_known_time = last_known_time
-                    record.memory_points = memory_points_value
-                    record.group_cardname = group_cardname_value
-                    session.add(record)
-                    logger.debug(f"已同步用户 {self.person_id} 的信息到数据库")
-                else:
-                    record = PersonInfo(
-                        person_id=self.person_id,
-                        is_known=self.is_known,
-                        platform=self.platform,
-                        user_id=self.user_id,
-                        user_nickname=self.nickname,
-                        person_name=self.person_name,
-                        name_reason=self.name_reason,
-                        know_counts=self.know_times,
-                        first_known_time=first_known_time,
-                        last_known_time=last_known_time,
-                        memory_points=memory_points_value,
-                        group_cardname=group_cardname_value,
-                    )
-                    session.add(record)
-                    logger.debug(f"已创建用户 {self.person_id} 的信息到数据库")
+            row = self._build_person_row()
+            with _person_info_write_lock:
+                if person_info_cache.is_unchanged(self.person_id, row):
+                    return
+
+                with get_db_session() as session:
+                    statement = select(PersonInfo).where(col(PersonInfo.person_id) == self.person_id).limit(1)
+                    record = session.exec(statement).first()
+
+                    if record:
+                        record.person_id = self.person_id
+                        for key, value in row.items():
+                            setattr(record, key, value)
+                        session.add(record)
+                        logger.debug(f"已同步用户 {self.person_id} 的信息到数据库")
+                    else:
+                        record = PersonInfo(person_id=self.person_id, **row)
+                        session.add(record)
+                        logger.debug(f"已创建用户 {self.person_id} 的信息到数据库")
+                person_info_cache.put(self.person_id, row)
 
         except Exception as e:
             logger.error(f"同步用户 {self.person_id} 信息到数据库时出错: {e}")
@@ -830,6 +919,16 @@ class PersonInfoManager:
 person_info_manager = PersonInfoManager()
 
 
+class PersonInfoWriteBackTask(AsyncTask):
+    """定期将 `person_info_cache` 中的脏数据批量写回数据库"""
+
+    def __init__(self):
+        super().__init__(task_name="PersonInfo Write Back Task", wait_before_start=10, run_interval=10)
+
+    async def run(self):
+        await asyncio.to_thread(flush_person_info_cache)
+
+
 async def store_person_memory_from_answer(person_name: str, memory_content: str, chat_id: str) -> None:
     """将人物事实写入长期记忆系统。
 
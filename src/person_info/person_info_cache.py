@@ -0,0 +1,129 @@
+"""PersonInfo 进程内写回缓存
+
+以 person_id 为键缓存 `PersonInfo` 行的列值（dict），提供：
+
+- LRU 淘汰：超过 `max_entries` 时淘汰最久未访问的干净条目，脏条目在写回前不会被淘汰
+- 列级脏标记：`update()` 只记录真正变化的列，值未变化时直接返回 False（跳过无效更新）
+- 批量写回：`pop_dirty()` 取出所有脏列交给调用方在一个事务中写回，失败时 `restore_dirty()` 放回
+- 失效：外部（如 WebUI）直接修改数据库后调用 `invalidate()` 丢弃缓存条目
+
+本模块只负责缓存结构本身，数据库读写由 `person_info` 模块完成。
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+import threading
+
+PersonRow = Dict[str, Any]
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class PersonInfoCache:
+    """以 person_id 为键的 LRU 写回缓存（线程安全）"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._rows: "OrderedDict[str, PersonRow]" = OrderedDict()
+        self._dirty: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "skipped_updates": 0, "evictions": 0}
+
+    def get(self, person_id: str) -> Optional[PersonRow]:
+        """获取缓存行的副本，未命中返回 None。"""
+        with self._lock:
+            row = self._rows.get(person_id)
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._rows.move_to_end(person_id)
+            self._stats["hits"] += 1
+            return dict(row)
+
+    def put(self, person_id: str, row: PersonRow) -> None:
+        """写入与数据库一致的干净行（加载或直写之后调用），会清除该条目的脏标记。"""
+        with self._lock:
+            self._rows[person_id] = dict(row)
+            self._rows.move_to_end(person_id)
+            self._dirty.pop(person_id, None)
+            self._evict_locked()
+
+    def update(self, person_id: str, row: PersonRow) -> bool:
+        """合并新的列值并标记变化的列为脏。
+
+        Returns:
+            bool: 有列发生变化时返回 True；与缓存完全一致时返回 False。
+        """
+        with self._lock:
+            cached = self._rows.get(person_id)
+            if cached is None:
+                # 尚未落库的新条目：所有列都需要写回
+                changed = set(row)
+                cached = self._rows[person_id] = {}
+            else:
+                changed = {key for key, value in row.items() if key not in cached or cached[key] != value}
+            self._rows.move_to_end(person_id)
+            if not changed:
+                self._stats["skipped_updates"] += 1
+                return False
+            for key in changed:
+                cached[key] = row[key]
+            self._dirty.setdefault(person_id, set()).update(changed)
+            self._evict_locked()
+            return True
+
+    def is_unchanged(self, person_id: str, row: PersonRow) -> bool:
+        """判断给定行是否与缓存一致且没有待写回的列。"""
+        with self._lock:
+            cached = self._rows.get(person_id)
+            if cached is None or person_id in self._dirty:
+                return False
+            return all(key in cached and cached[key] == value for key, value in row.items())
+
+    def invalidate(self, person_id: Optional[str] = None) -> None:
+        """丢弃指定条目（含未写回的脏列）；不传 person_id 时清空整个缓存。"""
+        with self._lock:
+            if person_id is None:
+                self._rows.clear()
+                self._dirty.clear()
+                return
+            self._rows.pop(person_id, None)
+            self._dirty.pop(person_id, None)
+
+    def pop_dirty(self) -> Dict[str, PersonRow]:
+        """取出所有脏列并清除脏标记。
+
+        Returns:
+            Dict[str, PersonRow]: person_id -> 需要写回的列值。
+        """
+        with self._lock:
+            dirty = {
+                person_id: {key: self._rows[person_id][key] for key in fields}
+                for person_id, fields in self._dirty.items()
+                if person_id in self._rows
+            }
+            self._dirty.clear()
+            return dirty
+
+    def restore_dirty(self, dirty: Dict[str, PersonRow]) -> None:
+        """写回失败时重新标记脏列；期间已被失效的条目不再恢复。"""
+        with self._lock:
+            for person_id, row in dirty.items():
+                if person_id in self._rows:
+                    self._dirty.setdefault(person_id, set()).update(row)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._rows), "dirty": len(self._dirty)}
+
+    def _evict_locked(self) -> None:
+        if len(self._rows) <= self.max_entries:
+            return
+        for person_id in list(self._rows):
+            if len(self._rows) <= self.max_entries:
+                break
+            if person_id in self._dirty:
+                continue
+            del self._rows[person_id]
+            self._stats["evictions"] += 1
@@ -4,6 +4,7 @@
 而不是直接依赖更底层的私有子模块。
 """
 
+from .inbound_scheduler import InboundOverflowPolicy, InboundScheduler
 from .manager import PlatformIOManager, get_platform_io_manager
 from .route_key_factory import RouteKeyFactory
 from .routing import RouteTable
@@ -25,6 +26,8 @@ __all__ = [
     "DriverDescriptor",
     "DriverKind",
     "InboundMessageEnvelope",
+    "InboundOverflowPolicy",
+    "InboundScheduler",
     "PlatformIOManager",
     "RouteKeyFactory",
     "RouteBinding",
@@ -0,0 +1,247 @@
+"""提供 Platform IO 的按会话有界入站队列与公平调度。
+
+入站消息通过路由与去重审核后不再直接进入主消息链，而是先放入所属会话的
+有界队列，由固定数量的工作协程按会话轮转（round-robin）取出分发：
+
+- 每个会话同一时刻最多只有一条消息在处理中，会话内保持到达顺序
+- 每个会话每轮只分发一条消息，刷屏会话无法挤占其他会话的处理机会
+- 队列深度达到高水位后进入削峰状态，直到回落到低水位才恢复正常入队；
+  削峰期间按溢出策略丢弃新消息或用新消息覆盖队尾消息
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import asyncio
+import time
+
+from src.common.logger import get_logger
+
+from .types import InboundMessageEnvelope
+
+logger = get_logger("platform_io.inbound_scheduler")
+
+InboundDispatchCallback = Callable[[InboundMessageEnvelope], Awaitable[None]]
+
+
+class InboundOverflowPolicy(str, Enum):
+    """会话队列处于削峰状态时的溢出策略。"""
+
+    DROP = "drop"
+    COALESCE = "coalesce"
+
+
+@dataclass(slots=True)
+class InboundSessionQueue:
+    """单个会话的入站队列状态。
+
+    Attributes:
+        session_key: 会话调度键。
+        pending: 等待分发的入站封装。
+        shedding: 是否处于削峰状态。
+        scheduled: 是否已在就绪队列中或正在被工作协程处理。
+        enqueued: 累计入队数量。
+        dropped: 削峰期间被丢弃的数量。
+        coalesced: 削峰期间被新消息覆盖的数量。
+        max_depth: 历史最大队列深度。
+        last_enqueued_at: 最近一次入队的单调时钟时间戳。
+    """
+
+    session_key: str
+    pending: Deque[InboundMessageEnvelope] = field(default_factory=deque)
+    shedding: bool = False
+    scheduled: bool = False
+    enqueued: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    max_depth: int = 0
+    last_enqueued_at: float = 0.0
+
+
+class InboundScheduler:
+    """按会话隔离并公平调度入站消息的有界队列。"""
+
+    def __init__(
+        self,
+        dispatcher: InboundDispatchCallback,
+        high_watermark: int = 100,
+        low_watermark: int = 20,
+        overflow_policy: InboundOverflowPolicy = InboundOverflowPolicy.DROP,
+        max_concurrency: int = 8,
+    ) -> None:
+        """初始化入站调度器。
+
+        Args:
+            dispatcher: 实际把入站封装送入下一处理阶段的异步回调。
+            high_watermark: 会话队列进入削峰状态的深度。
+            low_watermark: 会话队列退出削峰状态的深度。
+            overflow_policy: 削峰期间的溢出策略。
+            max_concurrency: 同时处理入站消息的工作协程数量。
+
+        Raises:
+            ValueError: 当水位或并发参数不合法时抛出。
+        """
+        if high_watermark <= 0:
+            raise ValueError("high_watermark 必须大于 0")
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError("low_watermark 必须不小于 0 且小于 high_watermark")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency 必须大于 0")
+
+        self._dispatcher = dispatcher
+        self._high_watermark = high_watermark
+        self._low_watermark = low_watermark
+        self._overflow_policy = InboundOverflowPolicy(overflow_policy)
+        self._max_concurrency = max_concurrency
+        self._sessions: Dict[str, InboundSessionQueue] = {}
+        self._ready: Optional[asyncio.Queue[str]] = None
+        self._workers: List[asyncio.Task[None]] = []
+        self._total_dropped = 0
+        self._total_coalesced = 0
+
+    def submit(self, session_key: str, envelope: InboundMessageEnvelope) -> bool:
+        """把一条入站封装放入所属会话的队列。
+
+        Args:
+            session_key: 会话调度键。
+            envelope: 已通过路由与去重审核的入站封装。
+
+        Returns:
+            bool: 若消息已入队或覆盖了队尾消息则返回 ``True``，被丢弃时返回 ``False``。
+        """
+        self._ensure_workers()
+        session = self._sessions.get(session_key)
+        if session is None:
+            session = InboundSessionQueue(session_key=session_key)
+            self._sessions[session_key] = session
+
+        if not session.shedding and len(session.pending) >= self._high_watermark:
+            session.shedding = True
+            logger.warning(
+                f"入站队列达到高水位，开始削峰: session={session_key} depth={len(session.pending)} "
+                f"policy={self._overflow_policy.value}"
+            )
+
+        if session.shedding:
+            if self._overflow_policy is InboundOverflowPolicy.COALESCE and session.pending:
+                session.pending[-1] = envelope
+                session.coalesced += 1
+                self._total_coalesced += 1
+                return True
+            session.dropped += 1
+            self._total_dropped += 1
+            return False
+
+        session.pending.append(envelope)
+        session.enqueued += 1
+        session.last_enqueued_at = time.monotonic()
+        session.max_depth = max(session.max_depth, len(session.pending))
+        self._schedule(session)
+        return True
+
+    async def stop(self) -> None:
+        """停止全部工作协程并丢弃尚未分发的消息。"""
+        workers = self._workers
+        self._workers = []
+        self._ready = None
+        for worker in workers:
+            worker.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        self._sessions.clear()
+
+    def stats(self, limit: int = 20) -> Dict[str, Any]:
+        """返回入站队列的运行统计。
+
+        Args:
+            limit: 按队列深度降序返回的会话数量上限。
+
+        Returns:
+            Dict[str, Any]: 全局水位配置、累计削峰数量与各会话队列状态。
+        """
+        sessions = sorted(
+            self._sessions.values(),
+            key=lambda item: (len(item.pending), item.dropped + item.coalesced),
+            reverse=True,
+        )
+        return {
+            "high_watermark": self._high_watermark,
+            "low_watermark": self._low_watermark,
+            "overflow_policy": self._overflow_policy.value,
+            "max_concurrency": self._max_concurrency,
+            "active_sessions": len(self._sessions),
+            "total_pending": sum(len(item.pending) for item in self._sessions.values()),
+            "total_dropped": self._total_dropped,
+            "total_coalesced": self._total_coalesced,
+            "sessions": [
+                {
+                    "session_key": item.session_key,
+                    "depth": len(item.pending),
+                    "max_depth": item.max_depth,
+                    "enqueued": item.enqueued,
+                    "dropped": item.dropped,
+                    "coalesced": item.coalesced,
+                    "shedding": item.shedding,
+                }
+                for item in sessions[:limit]
+            ],
+        }
+
+    def _ensure_workers(self) -> None:
+        """在首次入队时于当前事件循环中创建工作协程。"""
+        if self._ready is not None:
+            return
+        self._ready = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(self._ready), name=f"platform_io.inbound_worker.{index}")
+            for index in range(self._max_concurrency)
+        ]
+
+    def _schedule(self, session: InboundSessionQueue) -> None:
+        """把有待处理消息且未被调度的会话放到就绪队列末尾。
+
+        Args:
+            session: 会话队列状态。
+        """
+        if session.scheduled or not session.pending or self._ready is None:
+            return
+        session.scheduled = True
+        self._ready.put_nowait(session.session_key)
+
+    async def _worker_loop(self, ready: "asyncio.Queue[str]") -> None:
+        """工作协程主循环：每次从就绪会话中取一条消息分发，再把会话放回队尾。
+
+        Args:
+            ready: 就绪会话队列。
+        """
+        while True:
+            session_key = await ready.get()
+            session = self._sessions.get(session_key)
+            if session is None or not session.pending:
+                if session is not None:
+                    session.scheduled = False
+                continue
+
+            envelope = session.pending.popleft()
+            if session.shedding and len(session.pending) <= self._low_watermark:
+                session.shedding = False
+                logger.info(
+                    f"入站队列回落到低水位，结束削峰: session={session_key} "
+                    f"dropped={session.dropped} coalesced={session.coalesced}"
+                )
+
+            try:
+                await self._dispatcher(envelope)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"入站消息分发失败: session={session_key} driver={envelope.driver_id}")
+
+            session.scheduled = False
+            if session.pending:
+                self._schedule(session)
+            elif self._sessions.get(session_key) is session and not session.dropped and not session.coalesced:
+                # 空闲且未发生过削峰的会话无需保留统计，避免会话数无限增长
+                self._sessions.pop(session_key, None)
@@ -6,11 +6,20 @@ from src.common.logger import get_logger
 from src.platform_io.drivers.base import PlatformIODriver
 
 from .dedupe import MessageDeduplicator
+from .inbound_scheduler import InboundOverflowPolicy, InboundScheduler
 from .outbound_tracker import OutboundTracker
 from .route_key_factory import RouteKeyFactory
 from .registry import DriverRegistry
 from .routing import RouteTable
-from .types import DeliveryBatch, DeliveryReceipt, DeliveryStatus, InboundMessageEnvelope, RouteBinding, RouteKey
+from .types import (
+    DeliveryBatch,
+    DeliveryReceipt,
+    DeliveryStatus,
+    DriverKind,
+    InboundMessageEnvelope,
+    RouteBinding,
+    RouteKey,
+)
 
 if TYPE_CHECKING:
     from src.chat.message_receive.message import SessionMessage
@@ -18,6 +27,7 @@ if TYPE_CHECKING:
 logger = get_logger("platform_io.manager")
 
 InboundDispatcher = Callable[[InboundMessageEnvelope], Awaitable[None]]
+LegacyInboundHandler = Callable[["SessionMessage"], Awaitable[None]]
 
 
 class PlatformIOManager:
@@ -29,6 +39,8 @@ class PlatformIOManager:
     - 发送时：解析所有命中的发送绑定并全部投递。
     - 接收时：只校验当前驱动是否已登记为可接收链路，然后全部放行给上层。
     - 去重时：仅对单条链路做技术性重放抑制，不做跨链路语义去重。
+    - 分发时：若启用了入站队列，则按会话放入有界队列并轮转分发，避免单个
+      刷屏会话拖慢其他会话。
     """
 
     def __init__(self) -> None:
@@ -40,6 +52,8 @@ class PlatformIOManager:
         self._deduplicator = MessageDeduplicator()
         self._outbound_tracker = OutboundTracker()
         self._inbound_dispatcher: Optional[InboundDispatcher] = None
+        self._legacy_inbound_handler: Optional[LegacyInboundHandler] = None
+        self._inbound_scheduler: Optional[InboundScheduler] = None
         self._started = False
 
     @property
@@ -107,6 +121,7 @@ class PlatformIOManager:
                 logger.exception(f"驱动停止失败: driver_id={driver.driver_id}")
 
         self._started = False
+        await self.configure_inbound_queue(enabled=False)
         self._deduplicator.clear()
         self._outbound_tracker.clear()
         if stop_errors:
@@ -196,6 +211,47 @@ class PlatformIOManager:
         """
         return self._outbound_tracker
 
+    @property
+    def inbound_scheduler(self) -> Optional[InboundScheduler]:
+        """返回当前启用的入站调度器。
+
+        Returns:
+            Optional[InboundScheduler]: 未启用入站队列时返回 ``None``。
+        """
+        return self._inbound_scheduler
+
+    async def configure_inbound_queue(
+        self,
+        enabled: bool,
+        high_watermark: int = 100,
+        low_watermark: int = 20,
+        overflow_policy: InboundOverflowPolicy = InboundOverflowPolicy.DROP,
+        max_concurrency: int = 8,
+    ) -> None:
+        """启用、重建或关闭按会话划分的有界入站队列。
+
+        关闭或重建时，旧调度器中尚未分发的消息会被丢弃。
+
+        Args:
+            enabled: 是否启用入站队列；关闭时入站消息直接交给分发回调。
+            high_watermark: 会话队列进入削峰状态的深度。
+            low_watermark: 会话队列退出削峰状态的深度。
+            overflow_policy: 削峰期间的溢出策略。
+            max_concurrency: 同时处理入站消息的工作协程数量。
+        """
+        previous_scheduler = self._inbound_scheduler
+        self._inbound_scheduler = None
+        if previous_scheduler is not None:
+            await previous_scheduler.stop()
+        if enabled:
+            self._inbound_scheduler = InboundScheduler(
+                self._dispatch_inbound,
+                high_watermark=high_watermark,
+                low_watermark=low_watermark,
+                overflow_policy=overflow_policy,
+                max_concurrency=max_concurrency,
+            )
+
     def set_inbound_dispatcher(self, dispatcher: InboundDispatcher) -> None:
         """设置统一的入站分发回调。
 
@@ -210,6 +266,14 @@ class PlatformIOManager:
         """清除当前的入站分发回调。"""
         self._inbound_dispatcher = None
 
+    def set_legacy_inbound_handler(self, handler: LegacyInboundHandler) -> None:
+        """设置旧链 maim_message 入站消息的处理回调。
+
+        Args:
+            handler: 接收已规范化的 ``SessionMessage`` 并送入主消息链的异步回调。
+        """
+        self._legacy_inbound_handler = handler
+
     @property
     def has_inbound_dispatcher(self) -> bool:
         """返回当前是否已经配置入站分发回调。
@@ -463,9 +527,58 @@ class PlatformIOManager:
                 logger.info(f"忽略重复入站消息: dedupe_key={dedupe_key}")
                 return False
 
+        if self._inbound_scheduler is not None:
+            return self._inbound_scheduler.submit(self._build_inbound_session_key(envelope), envelope)
+
         await self._inbound_dispatcher(envelope)
         return True
 
+    async def accept_legacy_inbound(self, message: "SessionMessage") -> bool:
+        """处理一条来自旧链 maim_message 的入站消息。
+
+        旧链消息不经过驱动、接收路由表与去重，但与插件消息网关入站共用同一个
+        入站调度器，保证启用入站队列后所有会话都按同样的规则排队和削峰。
+
+        Args:
+            message: 已由旧链字典转换得到的会话消息。
+
+        Returns:
+            bool: 若消息已处理、入队或覆盖了队尾消息则返回 ``True``，否则返回 ``False``。
+        """
+        handler = self._legacy_inbound_handler
+        if handler is None:
+            logger.warning("PlatformIOManager 尚未配置旧链入站处理回调，丢弃入站消息")
+            return False
+
+        if self._inbound_scheduler is None:
+            await handler(message)
+            return True
+
+        envelope = InboundMessageEnvelope(
+            route_key=RouteKeyFactory.from_session_message(message),
+            driver_id=f"legacy.receive.{message.platform}",
+            driver_kind=DriverKind.LEGACY,
+            session_message=message,
+        )
+        return self._inbound_scheduler.submit(self._build_inbound_session_key(envelope), envelope)
+
+    async def _dispatch_inbound(self, envelope: InboundMessageEnvelope) -> None:
+        """由入站调度器调用，把排队的入站封装交给对应链路的分发回调。
+
+        Args:
+            envelope: 出队的入站封装。
+        """
+        if envelope.driver_kind is DriverKind.LEGACY:
+            if self._legacy_inbound_handler is None or envelope.session_message is None:
+                logger.debug("PlatformIOManager 旧链入站处理回调已清除，丢弃排队中的入站消息")
+                return
+            await self._legacy_inbound_handler(envelope.session_message)
+            return
+        if self._inbound_dispatcher is None:
+            logger.debug("PlatformIOManager 入站分发回调已清除，丢弃排队中的入站消息")
+            return
+        await self._inbound_dispatcher(envelope)
+
     async def send_message(
         self,
         message: "SessionMessage",
@@ -558,6 +671,29 @@ class PlatformIOManager:
 
         return f"{envelope.driver_id}:{normalized_dedupe_key}"
 
+    @staticmethod
+    def _build_inbound_session_key(envelope: InboundMessageEnvelope) -> str:
+        """构造入站调度使用的会话键。
+
+        Args:
+            envelope: 当前正在处理的入站封装。
+
+        Returns:
+            str: 同一路由下按群聊或私聊对象划分的会话键；无法识别会话时退化为路由级别。
+        """
+        route_key = envelope.route_key
+        prefix = f"{route_key.platform}:{route_key.account_id or ''}:{route_key.scope or ''}"
+        session_message = envelope.session_message
+        message_info = getattr(session_message, "message_info", None)
+        if message_info is not None:
+            group_info = getattr(message_info, "group_info", None)
+            if group_info is not None and getattr(group_info, "group_id", None):
+                return f"{prefix}:group:{group_info.group_id}"
+            user_info = getattr(message_info, "user_info", None)
+            if user_info is not None and getattr(user_info, "user_id", None):
+                return f"{prefix}:user:{user_info.user_id}"
+        return f"{prefix}:driver:{envelope.driver_id}"
+
     @staticmethod
     def _validate_binding_against_driver(binding: RouteBinding, driver: PlatformIODriver) -> None:
         """校验路由绑定与驱动描述是否一致。
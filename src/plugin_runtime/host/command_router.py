@@ -0,0 +1,168 @@
+"""命令路由预编译索引。
+
+绝大多数入站消息都不是命令，逐条执行全部命令正则与别名匹配是不必要的开销。
+``CommandRouter`` 在组件集合变化后一次性构建索引，查询时只需扫描一遍消息文本：
+
+- 别名与锚定在开头的正则字面量前缀写入同一棵前缀树，沿文本逐字符向下查找
+- 未锚定正则的前导字面量作为必需子串，文本中不包含该子串时直接排除
+- 无法提取字面量的正则（如以分组、字符类开头或忽略大小写）保留为每次都需检查的候选
+
+索引只负责给出可能匹配的候选命令，最终仍由调用方按原有规则逐个校验，
+因此匹配结果与线性扫描完全一致。
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Set, Tuple
+
+import re
+
+try:
+    from re import _parser as _sre_parser  # type: ignore[attr-defined]
+except ImportError:  # Python 3.10
+    import sre_parse as _sre_parser  # type: ignore[no-redef]
+
+if TYPE_CHECKING:
+    from .component_registry import CommandEntry
+
+
+@dataclass(slots=True)
+class _TrieNode:
+    """前缀树节点。
+
+    Attributes:
+        children: 子节点，键为单个字符。
+        indices: 以根到当前节点的路径为前缀即可能匹配的命令下标。
+    """
+
+    children: Dict[str, "_TrieNode"] = field(default_factory=dict)
+    indices: List[int] = field(default_factory=list)
+
+
+def _collect_literals(subpattern: Any, chars: List[str]) -> bool:
+    """从已解析的正则中收集前导字面量字符。
+
+    Args:
+        subpattern: ``re._parser`` 解析得到的子模式。
+        chars: 收集结果，原地追加。
+
+    Returns:
+        bool: 子模式是否全部由字面量组成；为 ``False`` 时表示收集在中途停止。
+    """
+
+    for op, av in subpattern:
+        if op is _sre_parser.LITERAL:
+            chars.append(chr(av))
+            continue
+        if op is _sre_parser.SUBPATTERN:
+            _group, add_flags, del_flags, inner = av
+            if add_flags or del_flags:
+                return False
+            if _collect_literals(inner, chars):
+                continue
+        return False
+    return True
+
+
+def extract_leading_literal(pattern: "re.Pattern[str]") -> Tuple[str, bool]:
+    """提取正则匹配成功时必然出现的前导字面量。
+
+    Args:
+        pattern: 已编译的命令正则。
+
+    Returns:
+        Tuple[str, bool]: ``(字面量, 是否锚定在文本开头)``；无法提取时字面量为空字符串。
+    """
+
+    if pattern.flags & re.IGNORECASE:
+        return "", False
+    try:
+        parsed = _sre_parser.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return "", False
+
+    items = list(parsed)
+    anchored = False
+    if items and items[0][0] is _sre_parser.AT:
+        position = items[0][1]
+        if position is _sre_parser.AT_BEGINNING_STRING:
+            anchored = True
+        elif position is _sre_parser.AT_BEGINNING:
+            # 多行模式下 ^ 可以匹配任意行首，只能退化为子串条件
+            anchored = not pattern.flags & re.MULTILINE
+        else:
+            return "", False
+        items = items[1:]
+
+    chars: List[str] = []
+    _collect_literals(items, chars)
+    return "".join(chars), anchored
+
+
+class CommandRouter:
+    """按注册顺序保存命令，并为文本查询提供候选命令预筛选。"""
+
+    def __init__(self, commands: Sequence["CommandEntry"]) -> None:
+        """构建命令路由索引。
+
+        Args:
+            commands: 按注册顺序排列的命令组件。
+        """
+
+        self._commands: List["CommandEntry"] = list(commands)
+        self._trie = _TrieNode()
+        self._substring_literals: List[Tuple[str, int]] = []
+        self._always_check: List[int] = []
+
+        for index, command in enumerate(self._commands):
+            if command.compiled_pattern is not None:
+                literal, anchored = extract_leading_literal(command.compiled_pattern)
+                if not literal:
+                    self._always_check.append(index)
+                elif anchored:
+                    self._insert_prefix(literal, index)
+                else:
+                    self._substring_literals.append((literal, index))
+            for alias in command.aliases:
+                if isinstance(alias, str):
+                    self._insert_prefix(alias, index)
+
+    def _insert_prefix(self, prefix: str, index: int) -> None:
+        """把命令下标挂到前缀树中指定前缀对应的节点上。
+
+        Args:
+            prefix: 文本必须以其开头的前缀。
+            index: 命令下标。
+        """
+
+        node = self._trie
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        if index not in node.indices:
+            node.indices.append(index)
+
+    def match_candidates(self, text: str) -> List["CommandEntry"]:
+        """返回可能匹配指定文本的命令，顺序与注册顺序一致。
+
+        Args:
+            text: 待匹配文本。
+
+        Returns:
+            List[CommandEntry]: 候选命令列表；不在列表中的命令一定无法匹配该文本。
+        """
+
+        indices: Set[int] = set(self._always_check)
+        node = self._trie
+        indices.update(node.indices)
+        for char in text:
+            next_node = node.children.get(char)
+            if next_node is None:
+                break
+            node = next_node
+            indices.update(node.indices)
+        for literal, index in self._substring_literals:
+            if index not in indices and literal in text:
+                indices.add(index)
+
+        if not indices:
+            return []
+        return [self._commands[index] for index in sorted(indices)]
@@ -18,6 +18,7 @@ import re
 from src.common.logger import get_logger
 from src.core.tooling import build_tool_detailed_description
 
+from .command_router import CommandRouter
 from .hook_spec_registry import HookSpecRegistry
 
 logger = get_logger("plugin_runtime.host.component_registry")
@@ -484,6 +485,26 @@ class ComponentRegistry:
         self._by_plugin: Dict[str, List[ComponentEntry]] = {}
         self._hook_spec_registry = hook_spec_registry
 
+        # 组件集合修订号：每次注册 / 注销组件时递增，供调用方判断缓存是否失效
+        self._revision: int = 0
+        # 按 Hook 名称索引的已排序处理器列表，惰性构建，组件变化时整体失效
+        self._hook_handler_index: Optional[Dict[str, List[HookHandlerEntry]]] = None
+        # 命令路由索引，惰性构建，组件变化时整体失效
+        self._command_router: Optional[CommandRouter] = None
+
+    @property
+    def revision(self) -> int:
+        """返回组件集合修订号，组件注册或注销后该值会变化。"""
+
+        return self._revision
+
+    def _mark_components_changed(self) -> None:
+        """在组件集合变化后递增修订号并使派生索引失效。"""
+
+        self._revision += 1
+        self._hook_handler_index = None
+        self._command_router = None
+
     @staticmethod
     def _convert_action_metadata_to_tool_metadata(
         name: str,
@@ -587,6 +608,7 @@ class ComponentRegistry:
         for type_dict in self._by_type.values():
             type_dict.clear()
         self._by_plugin.clear()
+        self._mark_components_changed()
 
     @staticmethod
     def _is_legacy_action_component(component: ComponentEntry) -> bool:
@@ -781,6 +803,7 @@ class ComponentRegistry:
         self._components[component.full_name] = component
         self._by_type[component.component_type][component.full_name] = component
         self._by_plugin.setdefault(component.plugin_id, []).append(component)
+        self._mark_components_changed()
 
     # ====== 注册 / 注销 ======
     def register_component(
@@ -878,6 +901,8 @@ class ComponentRegistry:
             self._components.pop(comp.full_name, None)
             if type_dict := self._by_type.get(comp.component_type):
                 type_dict.pop(comp.full_name, None)
+        if comps:
+            self._mark_components_changed()
         return len(comps)
 
     # ====== 启用 / 禁用 ======
@@ -1047,11 +1072,10 @@ class ComponentRegistry:
         Returns:
             result (Optional[tuple[ComponentEntry, Dict[str, Any]]]): 匹配到的组件及正则捕获组，未找到时为 None
         """
-        for comp in self._by_type.get(ComponentTypes.COMMAND, {}).values():
+        # 路由索引先排除不可能匹配的命令，剩余候选仍按注册顺序逐个校验
+        for comp in self._get_command_router().match_candidates(text):
             if not self.check_component_enabled(comp, session_id):
                 continue
-            if not isinstance(comp, CommandEntry):
-                continue
             if comp.compiled_pattern:
                 if m := comp.compiled_pattern.search(text):
                     return comp, m.groupdict()
@@ -1061,6 +1085,19 @@ class ComponentRegistry:
                     return comp, {}
         return None
 
+    def _get_command_router(self) -> CommandRouter:
+        """获取当前组件集合对应的命令路由索引。
+
+        Returns:
+            CommandRouter: 命令路由索引。
+        """
+
+        if self._command_router is None:
+            self._command_router = CommandRouter(
+                [comp for comp in self._by_type.get(ComponentTypes.COMMAND, {}).values() if isinstance(comp, CommandEntry)]
+            )
+        return self._command_router
+
     def get_event_handlers(
         self, event_type: str, *, enabled_only: bool = True, session_id: Optional[str] = None
     ) -> List[EventHandlerEntry]:
@@ -1097,16 +1134,36 @@ class ComponentRegistry:
         Returns:
             List[HookHandlerEntry]: 符合条件的 HookHandler 组件列表。
         """
-        handlers: List[HookHandlerEntry] = []
+        handlers = self._get_hook_handler_index().get(hook_name, [])
+        if not enabled_only:
+            return list(handlers)
+        return [comp for comp in handlers if self.check_component_enabled(comp, session_id)]
+
+    def _get_hook_handler_index(self) -> Dict[str, List[HookHandlerEntry]]:
+        """获取按 Hook 名称分组并排好序的处理器索引。
+
+        Returns:
+            Dict[str, List[HookHandlerEntry]]: Hook 名称到处理器列表的映射。
+        """
+
+        if self._hook_handler_index is not None:
+            return self._hook_handler_index
+
+        index: Dict[str, List[HookHandlerEntry]] = {}
         for comp in self._by_type.get(ComponentTypes.HOOK_HANDLER, {}).values():
-            if enabled_only and not self.check_component_enabled(comp, session_id):
-                continue
-            if not isinstance(comp, HookHandlerEntry):
-                continue
-            if comp.hook == hook_name:
-                handlers.append(comp)
-        handlers.sort(key=lambda comp: (self._get_hook_mode_rank(comp.mode), self._get_hook_order_rank(comp.order), comp.plugin_id, comp.name))
-        return handlers
+            if isinstance(comp, HookHandlerEntry):
+                index.setdefault(comp.hook, []).append(comp)
+        for handlers in index.values():
+            handlers.sort(
+                key=lambda comp: (
+                    self._get_hook_mode_rank(comp.mode),
+                    self._get_hook_order_rank(comp.order),
+                    comp.plugin_id,
+                    comp.name,
+                )
+            )
+        self._hook_handler_index = index
+        return index
 
     @staticmethod
     def _get_hook_mode_rank(mode: str) -> int:
@@ -14,11 +14,14 @@
 其中：
 
 - `blocking` 处理器串行执行，可修改 `kwargs`，也可中止本次 Hook 调用。
-- `observe` 处理器后台并发执行，只允许旁路观察，不参与主流程控制。
+- `observe` 处理器后台并发执行，只允许旁路观察，不参与主流程控制；
+  同一 Runner 上的多个观察型处理器会合并为一次批量 RPC。
+
+排序后的处理器列表按 Hook 名称缓存为调度计划，仅在组件注册或注销后重建。
 """
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Set
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 import asyncio
 import contextlib
@@ -94,6 +97,19 @@ class _HookInvocationTarget:
     source_rank: int
 
 
+@dataclass(slots=True)
+class _HookDispatchPlan:
+    """按 Hook 名称缓存的调度计划。
+
+    Attributes:
+        signature: 构建计划时各 Supervisor 及其组件注册表修订号；任一变化即需重建。
+        targets: 已完成全局排序的全部处理器目标（包含当前被禁用的处理器）。
+    """
+
+    signature: Tuple[Tuple["PluginRunnerSupervisor", int], ...]
+    targets: Tuple[_HookInvocationTarget, ...]
+
+
 class HookDispatcher:
     """命名 Hook 分发器。"""
 
@@ -113,6 +129,7 @@ class HookDispatcher:
         self._background_tasks: Set[asyncio.Task[Any]] = set()
         self._supervisors_provider = supervisors_provider
         self._hook_spec_registry = hook_spec_registry or HookSpecRegistry()
+        self._dispatch_plans: Dict[str, _HookDispatchPlan] = {}
 
     async def stop(self) -> None:
         """停止分发器并取消所有未完成的观察任务。"""
@@ -121,6 +138,7 @@ class HookDispatcher:
             task.cancel()
         await asyncio.gather(*self._background_tasks, return_exceptions=True)
         self._background_tasks.clear()
+        self._dispatch_plans.clear()
 
     def register_hook_spec(self, spec: HookSpec) -> None:
         """注册单个命名 Hook 规格。
@@ -183,6 +201,27 @@ class HookDispatcher:
 
         return self._hook_spec_registry.list_hook_specs()
 
+    def has_subscribers(
+        self,
+        hook_name: str,
+        supervisors: Optional[Sequence["PluginRunnerSupervisor"]] = None,
+    ) -> bool:
+        """判断当前是否有处理器订阅了指定 Hook。
+
+        调用方可据此在无人订阅时跳过构造（序列化）Hook 参数。
+
+        Args:
+            hook_name: 目标 Hook 名称。
+            supervisors: 当前运行时中所有可参与分发的 Supervisor；留空时使用绑定的提供器。
+
+        Returns:
+            bool: 是否存在启用的订阅处理器。
+        """
+
+        resolved_supervisors = supervisors if supervisors is not None else self._resolve_supervisors()
+        plan = self._get_dispatch_plan(self._normalize_hook_name(hook_name), resolved_supervisors)
+        return any(self._is_target_enabled(target) for target in plan.targets)
+
     async def invoke_hook(
         self,
         hook_name: str,
@@ -200,24 +239,22 @@ class HookDispatcher:
             HookDispatchResult: 聚合后的 Hook 调用结果。
         """
 
-        resolved_supervisors = list(supervisors) if supervisors is not None else list(self._resolve_supervisors())
+        resolved_supervisors = supervisors if supervisors is not None else self._resolve_supervisors()
         normalized_hook_name = self._normalize_hook_name(hook_name)
-        hook_spec = self.get_hook_spec(normalized_hook_name)
-        current_kwargs: Dict[str, Any] = dict(kwargs)
-        dispatch_result = HookDispatchResult(hook_name=normalized_hook_name, kwargs=dict(current_kwargs))
-        invocation_targets = self._collect_invocation_targets(normalized_hook_name, resolved_supervisors)
+        plan = self._get_dispatch_plan(normalized_hook_name, resolved_supervisors)
+        # `**kwargs` 本身就是新字典，可直接作为聚合结果持有
+        dispatch_result = HookDispatchResult(hook_name=normalized_hook_name, kwargs=kwargs)
+        invocation_targets = [target for target in plan.targets if self._is_target_enabled(target)]
 
         if not invocation_targets:
             return dispatch_result
 
+        hook_spec = self.get_hook_spec(normalized_hook_name)
+        current_kwargs: Dict[str, Any] = dict(kwargs)
+        observe_targets: List[_HookInvocationTarget] = []
         for target in invocation_targets:
             if target.entry.is_observe:
-                self._schedule_observe_handler(
-                    hook_name=normalized_hook_name,
-                    hook_spec=hook_spec,
-                    target=target,
-                    kwargs=current_kwargs,
-                )
+                observe_targets.append(target)
                 continue
 
             if not hook_spec.allow_blocking:
@@ -246,6 +283,15 @@ class HookDispatcher:
             if dispatch_result.aborted:
                 break
 
+        # blocking 处理器总是排在 observe 之前，被中止时观察型处理器同样不会触发
+        if observe_targets and not dispatch_result.aborted:
+            self._schedule_observe_handlers(
+                hook_name=normalized_hook_name,
+                hook_spec=hook_spec,
+                targets=observe_targets,
+                kwargs=current_kwargs,
+            )
+
         return dispatch_result
 
     def _resolve_supervisors(self) -> Sequence["PluginRunnerSupervisor"]:
@@ -262,6 +308,48 @@ class HookDispatcher:
             raise ValueError("当前 HookDispatcher 未绑定 supervisors_provider，请显式传入 supervisors")
         return self._supervisors_provider()
 
+    def _get_dispatch_plan(
+        self,
+        hook_name: str,
+        supervisors: Sequence["PluginRunnerSupervisor"],
+    ) -> _HookDispatchPlan:
+        """获取指定 Hook 的调度计划，仅在 Supervisor 或组件集合变化时重建。
+
+        Args:
+            hook_name: 已规范化的 Hook 名称。
+            supervisors: 当前参与调度的 Supervisor 序列。
+
+        Returns:
+            _HookDispatchPlan: 当前有效的调度计划。
+        """
+
+        signature = tuple((supervisor, supervisor.component_registry.revision) for supervisor in supervisors)
+        plan = self._dispatch_plans.get(hook_name)
+        if plan is not None and plan.signature == signature:
+            return plan
+
+        plan = _HookDispatchPlan(
+            signature=signature,
+            targets=tuple(self._collect_invocation_targets(hook_name, supervisors)),
+        )
+        self._dispatch_plans[hook_name] = plan
+        return plan
+
+    @staticmethod
+    def _is_target_enabled(target: _HookInvocationTarget) -> bool:
+        """判断处理器目标当前是否处于启用状态。
+
+        启用状态可以在不注册 / 注销组件的情况下切换，因此不缓存在调度计划中。
+
+        Args:
+            target: 处理器目标。
+
+        Returns:
+            bool: 是否启用。
+        """
+
+        return bool(target.supervisor.component_registry.check_component_enabled(target.entry))
+
     def _collect_invocation_targets(
         self,
         hook_name: str,
@@ -274,13 +362,13 @@ class HookDispatcher:
             supervisors: 当前参与调度的 Supervisor 序列。
 
         Returns:
-            List[_HookInvocationTarget]: 已完成全局排序的处理器目标列表。
+            List[_HookInvocationTarget]: 已完成全局排序的处理器目标列表，包含被禁用的处理器。
         """
 
         invocation_targets: List[_HookInvocationTarget] = []
         for supervisor in supervisors:
             source_rank = self._get_supervisor_source_rank(supervisor)
-            for entry in supervisor.component_registry.get_hook_handlers(hook_name):
+            for entry in supervisor.component_registry.get_hook_handlers(hook_name, enabled_only=False):
                 invocation_targets.append(
                     _HookInvocationTarget(
                         supervisor=supervisor,
@@ -417,7 +505,7 @@ class HookDispatcher:
         """
 
         timeout_ms = self._resolve_timeout_ms(hook_spec, target)
-        request_args: Dict[str, Any] = {"hook_name": hook_name, **dict(kwargs)}
+        request_args: Dict[str, Any] = {"hook_name": hook_name, **kwargs}
 
         try:
             response_envelope = await asyncio.wait_for(
@@ -451,7 +539,23 @@ class HookDispatcher:
                 error_message=error_message,
             )
 
-        response_payload = response_envelope.payload
+        return self._build_execution_result(target, response_envelope.payload)
+
+    def _build_execution_result(
+        self,
+        target: _HookInvocationTarget,
+        response_payload: Any,
+    ) -> HookHandlerExecutionResult:
+        """把 Runner 返回的单个处理器结果转换为执行结果对象。
+
+        Args:
+            target: 当前执行目标。
+            response_payload: Runner 返回的处理器结果。
+
+        Returns:
+            HookHandlerExecutionResult: 处理器执行结果。
+        """
+
         if not isinstance(response_payload, dict):
             return HookHandlerExecutionResult(
                 handler_name=target.entry.full_name,
@@ -585,36 +689,51 @@ class HookDispatcher:
             f"中止了 Hook {dispatch_result.hook_name}: {error_message}"
         )
 
-    def _schedule_observe_handler(
+    def _schedule_observe_handlers(
         self,
         hook_name: str,
         hook_spec: HookSpec,
-        target: _HookInvocationTarget,
+        targets: Sequence[_HookInvocationTarget],
         kwargs: Dict[str, Any],
     ) -> None:
-        """后台调度观察型处理器。
+        """后台调度观察型处理器，同一 Supervisor 上的多个处理器合并为一次批量调用。
 
         Args:
             hook_name: 当前 Hook 名称。
             hook_spec: 当前 Hook 规格。
-            target: 当前观察型处理器目标。
-            kwargs: 调用参数快照。
+            targets: 观察型处理器目标列表。
+            kwargs: 调用参数。
         """
 
         if not hook_spec.allow_observe:
-            logger.warning(f"Hook {hook_name} 不允许 observe 处理器，已跳过 {target.entry.full_name}")
+            for target in targets:
+                logger.warning(f"Hook {hook_name} 不允许 observe 处理器，已跳过 {target.entry.full_name}")
             return
 
-        task = asyncio.create_task(
-            self._run_observe_handler(
-                hook_name=hook_name,
-                hook_spec=hook_spec,
-                target=target,
-                kwargs=dict(kwargs),
-            )
-        )
-        self._background_tasks.add(task)
-        task.add_done_callback(self._handle_background_task_done)
+        # 观察型处理器只读，所有后台任务共享同一份参数快照即可
+        kwargs_snapshot = dict(kwargs)
+        grouped_targets: Dict[int, List[_HookInvocationTarget]] = {}
+        for target in targets:
+            grouped_targets.setdefault(id(target.supervisor), []).append(target)
+
+        for supervisor_targets in grouped_targets.values():
+            if len(supervisor_targets) == 1:
+                coroutine = self._run_observe_handler(
+                    hook_name=hook_name,
+                    hook_spec=hook_spec,
+                    target=supervisor_targets[0],
+                    kwargs=kwargs_snapshot,
+                )
+            else:
+                coroutine = self._run_observe_batch(
+                    hook_name=hook_name,
+                    hook_spec=hook_spec,
+                    targets=supervisor_targets,
+                    kwargs=kwargs_snapshot,
+                )
+            task = asyncio.create_task(coroutine)
+            self._background_tasks.add(task)
+            task.add_done_callback(self._handle_background_task_done)
 
     async def _run_observe_handler(
         self,
@@ -638,6 +757,61 @@ class HookDispatcher:
             target=target,
             kwargs=kwargs,
         )
+        self._report_observe_result(target, execution_result)
+
+    async def _run_observe_batch(
+        self,
+        hook_name: str,
+        hook_spec: HookSpec,
+        targets: Sequence[_HookInvocationTarget],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """通过一次批量 RPC 执行同一 Supervisor 上的多个观察型处理器。
+
+        Args:
+            hook_name: 当前 Hook 名称。
+            hook_spec: 当前 Hook 规格。
+            targets: 同属一个 Supervisor 的观察型处理器目标。
+            kwargs: 调用参数快照。
+        """
+
+        supervisor = targets[0].supervisor
+        timeout_ms = max(self._resolve_timeout_ms(hook_spec, target) for target in targets)
+        handler_names = ", ".join(target.entry.full_name for target in targets)
+        try:
+            response_envelope = await asyncio.wait_for(
+                supervisor.invoke_hook_batch(
+                    hook_name,
+                    [(target.entry.plugin_id, target.entry.name) for target in targets],
+                    kwargs,
+                    timeout_ms=timeout_ms,
+                ),
+                timeout=max(timeout_ms / 1000.0, 0.001),
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"观察型 HookHandler 批量调用超时，已超过 {timeout_ms}ms: {handler_names}")
+            return
+        except Exception as exc:
+            logger.warning(f"观察型 HookHandler 批量调用失败: {handler_names}: {exc}")
+            return
+
+        response_payload = response_envelope.payload
+        raw_results = response_payload.get("results") if isinstance(response_payload, dict) else None
+        if not isinstance(raw_results, list) or len(raw_results) != len(targets):
+            logger.warning(f"观察型 HookHandler 批量调用返回了无效结果: {handler_names}")
+            return
+
+        for target, raw_result in zip(targets, raw_results, strict=True):
+            self._report_observe_result(target, self._build_execution_result(target, raw_result))
+
+    @staticmethod
+    def _report_observe_result(target: _HookInvocationTarget, execution_result: HookHandlerExecutionResult) -> None:
+        """记录观察型处理器的执行结果，忽略其返回的控制流指令。
+
+        Args:
+            target: 当前观察型处理器目标。
+            execution_result: 处理器执行结果。
+        """
 
         if not execution_result.success:
             logger.warning(
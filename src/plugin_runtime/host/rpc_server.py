@@ -27,7 +27,12 @@ from src.plugin_runtime.protocol.envelope import (
     RequestIdGenerator,
 )
 from src.plugin_runtime.protocol.errors import ErrorCode, RPCError
-from src.plugin_runtime.transport.base import Connection, TransportServer
+from src.plugin_runtime.transport.base import (
+    DEFAULT_COMPRESSION_THRESHOLD,
+    SUPPORTED_FRAME_COMPRESSIONS,
+    Connection,
+    TransportServer,
+)
 
 logger = get_logger("plugin_runtime.host.rpc_server")
 
@@ -47,11 +52,15 @@ class RPCServer:
         session_token: Optional[str] = None,
         codec: Optional[Codec] = None,
         send_queue_size: int = 128,
+        frame_compression: bool = False,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
     ):
         self._transport = transport
         self._session_token = session_token or secrets.token_hex(32)
         self._codec = codec or MsgPackCodec()
         self._send_queue_size = send_queue_size
+        self._frame_compression = frame_compression
+        self._compression_threshold = compression_threshold
 
         self._id_gen = RequestIdGenerator()
         self._connection: Optional[Connection] = None  # 当前活跃的 Runner 连接
@@ -192,26 +201,40 @@ class RPCServer:
 
         while True:
             try:
-                conn, data, send_future = await self._send_queue.get()
+                queued_items = [await self._send_queue.get()]
             except asyncio.CancelledError:
                 break
 
-            try:
-                if conn.is_closed:
-                    raise RPCError(ErrorCode.E_PLUGIN_CRASHED, "Runner 未连接")
-                await conn.send_frame(data)
-                if not send_future.done():
-                    send_future.set_result(None)
-            except asyncio.CancelledError:
-                if not send_future.done():
-                    send_future.set_exception(RPCError(ErrorCode.E_TIMEOUT, "服务器关闭"))
-                raise
-            except Exception as e:
-                send_error = RPCError.from_exception(e, {ConnectionError: ErrorCode.E_PLUGIN_CRASHED})
-                if not send_future.done():
-                    send_future.set_exception(send_error)
-            finally:
-                self._send_queue.task_done()
+            # 取走队列中已就绪的全部消息并发提交，让连接把它们合并为一次写入
+            while True:
+                try:
+                    queued_items.append(self._send_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            await asyncio.gather(*(self._send_queued_frame(conn, data, send_future) for conn, data, send_future in queued_items))
+
+    async def _send_queued_frame(self, conn: Connection, data: bytes, send_future: asyncio.Future[None]) -> None:
+        """发送单条队列消息，并把结果回传给等待方。"""
+        if self._send_queue is None:
+            raise RuntimeError("没有消息队列")
+
+        try:
+            if conn.is_closed:
+                raise RPCError(ErrorCode.E_PLUGIN_CRASHED, "Runner 未连接")
+            await conn.send_frame(data)
+            if not send_future.done():
+                send_future.set_result(None)
+        except asyncio.CancelledError:
+            if not send_future.done():
+                send_future.set_exception(RPCError(ErrorCode.E_TIMEOUT, "服务器关闭"))
+            raise
+        except Exception as e:
+            send_error = RPCError.from_exception(e, {ConnectionError: ErrorCode.E_PLUGIN_CRASHED})
+            if not send_future.done():
+                send_future.set_exception(send_error)
+        finally:
+            self._send_queue.task_done()
 
     # ====== 发送循环方法 ======
     async def _handle_connection(self, conn: Connection) -> None:
@@ -296,9 +319,23 @@ class RPCServer:
 
         # 发送响应
         self.clear_handshake_state()
-        resp_payload = HelloResponsePayload(accepted=True, host_version=PROTOCOL_VERSION)
+        compression = ""
+        if self._frame_compression:
+            compression = next(
+                (algorithm for algorithm in hello.compression if algorithm in SUPPORTED_FRAME_COMPRESSIONS),
+                "",
+            )
+        resp_payload = HelloResponsePayload(
+            accepted=True,
+            host_version=PROTOCOL_VERSION,
+            compression=compression,
+            compression_threshold=self._compression_threshold,
+        )
         resp = envelope.make_response(payload=resp_payload.model_dump())
         await conn.send_frame(self._codec.encode_envelope(resp))
+        # 握手响应以未压缩形式发出后再启用压缩
+        if compression:
+            conn.enable_compression(compression, self._compression_threshold)
         return True
 
     def _check_sdk_version(self, sdk_version: str) -> bool:
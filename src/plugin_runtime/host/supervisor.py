@@ -28,8 +28,10 @@ from src.plugin_runtime.protocol.envelope import (
     ConfigUpdatedPayload,
     Envelope,
     HealthPayload,
+    HookHandlerTarget,
     InspectPluginConfigPayload,
     InspectPluginConfigResultPayload,
+    InvokeHookBatchPayload,
     MessageGatewayStateUpdatePayload,
     MessageGatewayStateUpdateResultPayload,
     PROTOCOL_VERSION,
@@ -126,7 +128,12 @@ class PluginRunnerSupervisor:
         self._log_bridge = RunnerLogBridge()
 
         codec = MsgPackCodec()
-        self._rpc_server = RPCServer(transport=self._transport, codec=codec)
+        self._rpc_server = RPCServer(
+            transport=self._transport,
+            codec=codec,
+            frame_compression=runtime_config.ipc_frame_compression,
+            compression_threshold=runtime_config.ipc_compression_threshold_kb * 1024,
+        )
 
         self._runner_process: Optional[asyncio.subprocess.Process] = None
         self._registered_plugins: Dict[str, RegisterPluginPayload] = {}
@@ -390,6 +397,36 @@ class PluginRunnerSupervisor:
             timeout_ms,
         )
 
+    async def invoke_hook_batch(
+        self,
+        hook_name: str,
+        handlers: List[Tuple[str, str]],
+        args: Optional[Dict[str, Any]] = None,
+        timeout_ms: int = 30000,
+    ) -> Envelope:
+        """在一次 RPC 中调用同一 Runner 内的多个 HookHandler。
+
+        Args:
+            hook_name: 当前 Hook 名称。
+            handlers: 处理器列表，元素为 ``(plugin_id, component_name)``。
+            args: 所有处理器共享的调用参数。
+            timeout_ms: RPC 超时时间，单位毫秒。
+
+        Returns:
+            Envelope: RPC 响应信封，``results`` 与 ``handlers`` 顺序一致。
+        """
+        return await self._rpc_server.send_request(
+            "plugin.invoke_hook_batch",
+            payload=InvokeHookBatchPayload(
+                handlers=[
+                    HookHandlerTarget(plugin_id=plugin_id, component_name=component_name)
+                    for plugin_id, component_name in handlers
+                ],
+                args={"hook_name": hook_name, **(args or {})},
+            ).model_dump(),
+            timeout_ms=timeout_ms,
+        )
+
     async def invoke_message_gateway(
         self,
         plugin_id: str,
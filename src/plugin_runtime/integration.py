@@ -33,7 +33,7 @@ import tomlkit
 from src.common.logger import get_logger
 from src.config.config import config_manager
 from src.config.file_watcher import FileChange, FileWatcher
-from src.platform_io import DeliveryBatch, InboundMessageEnvelope, get_platform_io_manager
+from src.platform_io import DeliveryBatch, InboundMessageEnvelope, InboundOverflowPolicy, get_platform_io_manager
 from src.plugin_runtime.capabilities import (
     RuntimeComponentCapabilityMixin,
     RuntimeCoreCapabilityMixin,
@@ -442,6 +442,14 @@ class PluginRuntimeManager(
 
         started_supervisors: List["PluginSupervisor"] = []
         try:
+            receive_config = config_manager.get_global_config().message_receive
+            await platform_io_manager.configure_inbound_queue(
+                enabled=receive_config.enable_inbound_queue,
+                high_watermark=receive_config.inbound_queue_high_watermark,
+                low_watermark=receive_config.inbound_queue_low_watermark,
+                overflow_policy=InboundOverflowPolicy(receive_config.inbound_overflow_policy),
+                max_concurrency=receive_config.inbound_dispatch_concurrency,
+            )
             platform_io_manager.set_inbound_dispatcher(self._dispatch_platform_inbound)
             await platform_io_manager.ensure_send_pipeline_ready()
             started_supervisors = await self._start_supervisors(builtin_dirs, third_party_dirs)
@@ -974,6 +982,18 @@ class PluginRuntimeManager(
 
         return True, modified
 
+    def has_subscribers(self, hook_name: str) -> bool:
+        """判断当前是否有插件订阅了指定命名 Hook。
+
+        Args:
+            hook_name: 目标 Hook 名称。
+
+        Returns:
+            bool: 是否存在启用的订阅处理器。
+        """
+
+        return self._hook_dispatcher.has_subscribers(hook_name)
+
     async def invoke_hook(self, hook_name: str, **kwargs: Any) -> HookDispatchResult:
         """触发一次跨 Supervisor 的命名 Hook 调用。
 
@@ -3,11 +3,35 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict
 
+import dataclasses
+
 import msgpack
 
+from pydantic import BaseModel
+
 from .envelope import Envelope
 
 
+def _pack_default(obj: Any) -> Any:
+    """处理 msgpack 无法直接打包的对象，转换结果与 ``model_dump()`` 保持一致。
+
+    Args:
+        obj: 待打包对象。
+
+    Returns:
+        Any: 可被 msgpack 打包的等价对象。
+
+    Raises:
+        TypeError: 对象类型不受支持时抛出。
+    """
+
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"无法序列化类型 {type(obj)!r}")
+
+
 class Codec(ABC):
     """消息编解码器基类"""
 
@@ -25,7 +49,13 @@ class Codec(ABC):
 
 
 class MsgPackCodec(Codec):
-    """MsgPack 编解码器"""
+    """MsgPack 编解码器
+
+    编码 Envelope 时直接打包实例的字段字典，不再经过 ``model_dump()`` 递归遍历业务载荷；
+    嵌套的 Pydantic 模型与 dataclass 由 ``default`` 回调按需转换。
+    解码仍使用 ``Envelope.model_validate``：其校验由 pydantic-core 完成，且 ``payload``
+    只做浅层检查，耗时与载荷大小无关，比纯 Python 的 ``model_construct`` 更快。
+    """
 
     def encode(self, obj: Dict[str, Any]) -> bytes:
         result = msgpack.packb(obj, use_bin_type=True)
@@ -40,7 +70,13 @@ class MsgPackCodec(Codec):
         return result
 
     def encode_envelope(self, envelope: Envelope) -> bytes:
-        return self.encode(envelope.model_dump())
+        if type(envelope) is not Envelope:
+            return self.encode(envelope.model_dump())
+        # Pydantic v2 实例的 __dict__ 即字段字典；MessageType 是 str 子类，可直接打包
+        result = msgpack.packb(envelope.__dict__, use_bin_type=True, default=_pack_default)
+        if result is None:
+            raise ValueError("msgpack.packb returned None, expected bytes")
+        return result
 
     def decode_envelope(self, data: bytes) -> Envelope:
         raw = self.decode(data)
@@ -168,6 +168,8 @@ class HelloPayload(BaseModel):
     """SDK 版本号"""
     session_token: str = Field(description="一次性会话令牌")
     """一次性会话令牌"""
+    compression: List[str] = Field(default_factory=list, description="Runner 支持的帧压缩算法")
+    """Runner 支持的帧压缩算法"""
 
 
 class HelloResponsePayload(BaseModel):
@@ -179,6 +181,10 @@ class HelloResponsePayload(BaseModel):
     """Host 版本号"""
     reason: str = Field(default="", description="拒绝原因 (若 accepted=False)")
     """拒绝原因 (若 `accepted`=`False`)"""
+    compression: str = Field(default="", description="双方启用的帧压缩算法，空字符串表示不压缩")
+    """双方启用的帧压缩算法，空字符串表示不压缩"""
+    compression_threshold: int = Field(default=0, description="仅压缩超过该字节数的帧")
+    """仅压缩超过该字节数的帧"""
 
 
 # ====== 组件注册消息 ======
@@ -254,6 +260,31 @@ class InvokeResultPayload(BaseModel):
     """返回值"""
 
 
+class HookHandlerTarget(BaseModel):
+    """批量 Hook 调用中的单个处理器目标"""
+
+    plugin_id: str = Field(description="处理器所属插件 ID")
+    """处理器所属插件 ID"""
+    component_name: str = Field(description="HookHandler 组件名称")
+    """HookHandler 组件名称"""
+
+
+class InvokeHookBatchPayload(BaseModel):
+    """plugin.invoke_hook_batch 请求 payload"""
+
+    handlers: List[HookHandlerTarget] = Field(default_factory=list, description="同一 Runner 内需要执行的处理器列表")
+    """同一 Runner 内需要执行的处理器列表"""
+    args: Dict[str, Any] = Field(default_factory=dict, description="所有处理器共享的调用参数")
+    """所有处理器共享的调用参数"""
+
+
+class InvokeHookBatchResultPayload(BaseModel):
+    """plugin.invoke_hook_batch 响应 payload"""
+
+    results: List[Dict[str, Any]] = Field(default_factory=list, description="与请求中处理器顺序一致的执行结果列表")
+    """与请求中处理器顺序一致的执行结果列表"""
+
+
 # ====== 能力调用消息 ======
 class CapabilityRequestPayload(BaseModel):
     """cap.* 请求 payload（插件 -> Host 能力调用）"""
@@ -16,7 +16,7 @@ from src.plugin_runtime.protocol.envelope import (
     RequestIdGenerator,
 )
 from src.plugin_runtime.protocol.errors import ErrorCode, RPCError
-from src.plugin_runtime.transport.base import Connection
+from src.plugin_runtime.transport.base import SUPPORTED_FRAME_COMPRESSIONS, Connection
 from src.plugin_runtime.transport.factory import create_transport_client
 
 logger = get_logger("plugin_runtime.runner.rpc_client")
@@ -112,6 +112,7 @@ class RPCClient:
             runner_id=self._runner_id,
             sdk_version=SDK_VERSION,
             session_token=self._session_token,
+            compression=list(SUPPORTED_FRAME_COMPRESSIONS),
         )
         request_id = await self._id_gen.next()
         envelope = Envelope(
@@ -132,6 +133,8 @@ class RPCClient:
             await self.disconnect()
             return False
 
+        if resp_payload.compression:
+            connection.enable_compression(resp_payload.compression, resp_payload.compression_threshold)
         logger.info(f"握手成功: host_version={resp_payload.host_version}")
         self._running = True
         self._recv_task = asyncio.create_task(self._recv_loop(), name="RPCClient.recv")
@@ -17,6 +17,7 @@ from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Tuple, ca
 
 import asyncio
 import contextlib
+import copy
 import inspect
 import json
 import logging as stdlib_logging
@@ -46,6 +47,8 @@ from src.plugin_runtime.protocol.envelope import (
     HealthPayload,
     InspectPluginConfigPayload,
     InspectPluginConfigResultPayload,
+    InvokeHookBatchPayload,
+    InvokeHookBatchResultPayload,
     InvokePayload,
     InvokeResultPayload,
     RegisterPluginPayload,
@@ -893,6 +896,7 @@ class PluginRunner:
         self._rpc_client.register_method("plugin.invoke_message_gateway", self._handle_invoke)
         self._rpc_client.register_method("plugin.emit_event", self._handle_event_invoke)
         self._rpc_client.register_method("plugin.invoke_hook", self._handle_hook_invoke)
+        self._rpc_client.register_method("plugin.invoke_hook_batch", self._handle_hook_batch_invoke)
         self._rpc_client.register_method("plugin.health", self._handle_health)
         self._rpc_client.register_method("plugin.prepare_shutdown", self._handle_prepare_shutdown)
         self._rpc_client.register_method("plugin.shutdown", self._handle_shutdown)
@@ -1716,35 +1720,83 @@ class PluginRunner:
                 f"插件 {plugin_id} 无组件: {component_name}",
             )
 
+        result = await self._run_hook_handler(plugin_id, component_name, handler_method, invoke.args)
+        return envelope.make_response(payload=result)
+
+    async def _handle_hook_batch_invoke(self, envelope: Envelope) -> Envelope:
+        """处理批量 HookHandler 调用请求。
+
+        Host 会把同一 Runner 内订阅同一 Hook 的观察型处理器合并为一次请求，
+        这里并发执行这些处理器，并按请求顺序返回各自的结果。
+
+        Args:
+            envelope: RPC 请求信封。
+
+        Returns:
+            Envelope: 包含全部处理器结果的响应信封。
+        """
+        try:
+            invoke = InvokeHookBatchPayload.model_validate(envelope.payload)
+        except Exception as exc:
+            return envelope.make_error_response(ErrorCode.E_BAD_PAYLOAD.value, str(exc))
+
+        async def _invoke_target(plugin_id: str, component_name: str) -> Dict[str, Any]:
+            meta = self._loader.get_plugin(plugin_id)
+            if meta is None:
+                return {"success": False, "action": "continue", "error_message": f"插件 {plugin_id} 未加载"}
+            handler_method = self._resolve_component_handler(meta, component_name)
+            if handler_method is None or not callable(handler_method):
+                return {"success": False, "action": "continue", "error_message": f"插件 {plugin_id} 无组件: {component_name}"}
+            # 每个处理器拿到独立的参数副本，避免彼此之间通过共享对象互相影响
+            return await self._run_hook_handler(plugin_id, component_name, handler_method, copy.deepcopy(invoke.args))
+
+        results = await asyncio.gather(
+            *(_invoke_target(target.plugin_id, target.component_name) for target in invoke.handlers)
+        )
+        return envelope.make_response(payload=InvokeHookBatchResultPayload(results=list(results)).model_dump())
+
+    @staticmethod
+    async def _run_hook_handler(
+        plugin_id: str,
+        component_name: str,
+        handler_method: Callable[..., Any],
+        args: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """执行单个 HookHandler 并标准化返回值。
+
+        Args:
+            plugin_id: 处理器所属插件 ID。
+            component_name: 处理器组件名称。
+            handler_method: 已解析的处理器方法。
+            args: 调用参数。
+
+        Returns:
+            Dict[str, Any]: 标准化后的 Hook 调用结果。
+        """
         try:
             raw = (
-                await handler_method(**invoke.args)
+                await handler_method(**args)
                 if inspect.iscoroutinefunction(handler_method)
-                else handler_method(**invoke.args)
+                else handler_method(**args)
             )
         except Exception as exc:
             logger.error(f"插件 {plugin_id} hook_handler {component_name} 执行异常: {exc}", exc_info=True)
-            return envelope.make_response(
-                payload={
-                    "success": False,
-                    "action": "continue",
-                    "error_message": str(exc),
-                }
-            )
+            return {
+                "success": False,
+                "action": "continue",
+                "error_message": str(exc),
+            }
 
         if raw is None:
-            result = {"success": True, "action": "continue"}
-        elif isinstance(raw, dict):
-            result = {
+            return {"success": True, "action": "continue"}
+        if isinstance(raw, dict):
+            return {
                 "success": True,
                 "action": str(raw.get("action", "continue") or "continue").strip().lower() or "continue",
                 "modified_kwargs": raw.get("modified_kwargs"),
                 "custom_result": raw.get("custom_result"),
             }
-        else:
-            result = {"success": True, "action": "continue", "custom_result": raw}
-
-        return envelope.make_response(payload=result)
+        return {"success": True, "action": "continue", "custom_result": raw}
 
     async def _handle_health(self, envelope: Envelope) -> Envelope:
         """处理健康检查"""
@@ -5,17 +5,34 @@
 业务层仅依赖此抽象，禁止直接使用具体传输实现的细节。
 
 分帧协议：4-byte big-endian length prefix + payload
+长度前缀的最高位为压缩标志，置位时 payload 为 zlib 压缩数据（需在握手时协商启用）。
+
+发送路径会合并同一轮事件循环内排队的帧（或直到达到字节预算），
+以一次 write + drain 写出，减少 Hook 扇出、日志转发等突发小帧的系统调用与等待。
 """
 
 import asyncio
 import contextlib
 import struct
+import zlib
 from abc import ABC, abstractmethod
-from typing import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
 
 # 分帧常量
 FRAME_HEADER_SIZE = 4  # 4 字节长度前缀
-MAX_FRAME_SIZE = 16 * 1024 * 1024  # 16 MB 最大帧大小
+MAX_FRAME_SIZE = 16 * 1024 * 1024  # 16 MB 最大帧大小（按未压缩的 payload 计算）
+FRAME_FLAG_COMPRESSED = 0x80000000  # 长度前缀最高位：payload 已压缩
+FRAME_LENGTH_MASK = 0x7FFFFFFF
+
+# 帧压缩
+FRAME_COMPRESSION_ZLIB = "zlib"
+SUPPORTED_FRAME_COMPRESSIONS = (FRAME_COMPRESSION_ZLIB,)
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024  # 仅压缩超过该大小的 payload
+_COMPRESSION_LEVEL = 1  # 优先压缩速度
+
+# 合并写入的单批字节预算
+DEFAULT_CORK_MAX_BYTES = 256 * 1024
 
 
 class ConnectionClosed(Exception):
@@ -24,41 +41,136 @@ class ConnectionClosed(Exception):
     pass
 
 
+@dataclass(slots=True)
+class _PendingWrite:
+    """等待合并写出的一批帧"""
+
+    chunks: List[bytes] = field(default_factory=list)
+    size: int = 0
+    flushed: bool = False
+    error: Optional[BaseException] = None
+
+
 class Connection:
     """单个连接的抽象
 
     封装了底层 StreamReader/StreamWriter，提供分帧读写能力。
     """
 
-    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        cork_max_bytes: int = DEFAULT_CORK_MAX_BYTES,
+    ) -> None:
         self._reader = reader
         self._writer = writer
         self._closed = False
-        self._write_lock = asyncio.Lock()  # 保护并发写入的帧完整性
+        self._write_lock = asyncio.Lock()  # 串行化 drain 等待
+        self._cork_max_bytes = max(int(cork_max_bytes), 1)
+        self._pending_write: Optional[_PendingWrite] = None
+        self._compression: str = ""
+        self._compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD
 
-    async def send_frame(self, data: bytes) -> None:
-        """发送一帧数据（4-byte length prefix + payload）"""
-        if self._closed:
-            raise ConnectionClosed("连接已关闭")
+    def enable_compression(self, algorithm: str, threshold: int = DEFAULT_COMPRESSION_THRESHOLD) -> None:
+        """启用发送方向的帧压缩（接收方向始终支持解压）
+
+        Args:
+            algorithm: 握手协商得到的压缩算法，空字符串表示不压缩
+            threshold: 仅压缩超过该字节数的 payload
+        """
+        if algorithm and algorithm not in SUPPORTED_FRAME_COMPRESSIONS:
+            raise ValueError(f"不支持的帧压缩算法: {algorithm}")
+        self._compression = algorithm
+        self._compression_threshold = max(int(threshold), 0)
+
+    @property
+    def compression(self) -> str:
+        """当前发送方向启用的帧压缩算法"""
+        return self._compression
+
+    def _encode_frame(self, data: bytes) -> List[bytes]:
+        """把 payload 编码为帧（长度前缀 + payload），必要时压缩"""
         length = len(data)
         if length > MAX_FRAME_SIZE:
             raise ValueError(f"帧大小 {length} 超过最大限制 {MAX_FRAME_SIZE}")
-        header = struct.pack(">I", length)
+        if self._compression and length > self._compression_threshold:
+            compressed = zlib.compress(data, _COMPRESSION_LEVEL)
+            if len(compressed) < length:
+                return [struct.pack(">I", len(compressed) | FRAME_FLAG_COMPRESSED), compressed]
+        return [struct.pack(">I", length), data]
+
+    async def send_frame(self, data: bytes) -> None:
+        """发送一帧数据（4-byte length prefix + payload）
+
+        同一轮事件循环内的多次调用会被合并为一次写入，返回时本帧已写出并完成 drain。
+        """
+        if self._closed:
+            raise ConnectionClosed("连接已关闭")
+        chunks = self._encode_frame(data)
+
+        # 底层缓冲超过高水位时先等待 drain 再入批，保证背压；未暂停时 drain 不会挂起
+        await self._drain()
+        pending = self._pending_write
+        if pending is None:
+            pending = _PendingWrite()
+            self._pending_write = pending
+            asyncio.get_running_loop().call_soon(self._flush_pending_write, pending)
+        pending.chunks.extend(chunks)
+        pending.size += sum(len(chunk) for chunk in chunks)
+
+        if pending.size >= self._cork_max_bytes:
+            self._flush_pending_write(pending)
+        else:
+            # 让出一轮事件循环：写出回调先于本协程恢复执行，期间其他协程的帧会并入同一批次
+            await asyncio.sleep(0)
+        if pending.error is not None:
+            raise pending.error
+        await self._drain()
+
+    async def _drain(self) -> None:
+        """串行等待底层写缓冲排空"""
         async with self._write_lock:
-            self._writer.write(header + data)
             await self._writer.drain()
 
+    def _flush_pending_write(self, pending: _PendingWrite) -> None:
+        """把一批帧合并为一次写入"""
+        if pending.flushed:
+            return
+        pending.flushed = True
+        if self._pending_write is pending:
+            self._pending_write = None
+        try:
+            if self._closed:
+                raise ConnectionClosed("连接已关闭")
+            self._writer.writelines(pending.chunks)
+        except Exception as exc:
+            pending.error = exc
+
     async def recv_frame(self) -> bytes:
         """接收一帧数据"""
         if self._closed:
             raise ConnectionClosed("连接已关闭")
         # 读取 4 字节长度头
         header = await self._reader.readexactly(FRAME_HEADER_SIZE)
-        (length,) = struct.unpack(">I", header)
+        (raw_length,) = struct.unpack(">I", header)
+        length = raw_length & FRAME_LENGTH_MASK
         if length > MAX_FRAME_SIZE:
             raise ValueError(f"帧大小 {length} 超过最大限制 {MAX_FRAME_SIZE}")
         # 读取 payload
-        return await self._reader.readexactly(length)
+        payload = await self._reader.readexactly(length)
+        if raw_length & FRAME_FLAG_COMPRESSED:
+            return self._decompress_payload(payload)
+        return payload
+
+    @staticmethod
+    def _decompress_payload(payload: bytes) -> bytes:
+        """解压 payload，解压后的大小同样受 MAX_FRAME_SIZE 限制"""
+        decompressor = zlib.decompressobj()
+        data = decompressor.decompress(payload, MAX_FRAME_SIZE)
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            raise ValueError(f"压缩帧无效或解压后超过最大限制 {MAX_FRAME_SIZE}")
+        return data
 
     async def close(self) -> None:
         """关闭连接"""
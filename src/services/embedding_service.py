@@ -12,6 +12,7 @@ import asyncio
 
 from src.common.data_models.embedding_service_data_models import EmbeddingResult
 from src.common.logger import get_logger
+from src.llm_models.model_client.base_client import client_registry
 from src.llm_models.utils_model import LLMOrchestrator
 from src.services.service_task_resolver import resolve_task_name
 
@@ -152,6 +153,10 @@ class EmbeddingServiceClient:
             asyncio.set_event_loop(loop)
             return loop.run_until_complete(coroutine)
         finally:
+            try:
+                loop.run_until_complete(client_registry.aclose_loop_clients())
+            except Exception as exc:
+                logger.debug(f"关闭 EmbeddingService 临时LLM客户端失败: {exc}")
             try:
                 loop.run_until_complete(loop.shutdown_asyncgens())
             except Exception as exc:
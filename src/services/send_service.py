@@ -232,7 +232,12 @@ async def _invoke_send_hook(
         tuple[HookDispatchResult, SessionMessage]: Hook 聚合结果以及可能被改写后的消息对象。
     """
 
-    hook_result = await _get_runtime_manager().invoke_hook(
+    runtime_manager = _get_runtime_manager()
+    # 没有插件订阅时跳过消息的序列化与反序列化
+    if not runtime_manager.has_subscribers(hook_name):
+        return HookDispatchResult(hook_name=hook_name, kwargs=kwargs), message
+
+    hook_result = await runtime_manager.invoke_hook(
         hook_name,
         message=serialize_session_message(message),
         **kwargs,
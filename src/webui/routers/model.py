@@ -14,6 +14,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from src.common.logger import get_logger
 from src.config.config import CONFIG_DIR
 from src.config.model_configs import APIProvider
+from src.llm_models.model_router import model_router
 from src.llm_models.openai_compat import build_openai_compatible_client_config, normalize_openai_base_url
 from src.webui.dependencies import require_auth
 from src.webui.utils.network_security import validate_public_url
@@ -409,3 +410,9 @@ async def test_provider_connection_by_name(
 
     # 调用测试接口
     return await test_provider_connection(base_url=base_url, api_key=api_key or None)
+
+
+@router.get("/router-status")
+async def get_router_status():
+    """获取共享模型路由器的状态（各模型的 EWMA 延迟/错误率、各提供商的熔断状态）。"""
+    return {"success": True, **model_router.snapshot()}
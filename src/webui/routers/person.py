@@ -20,6 +20,13 @@ logger = get_logger("webui.person")
 router = APIRouter(prefix="/person", tags=["Person"], dependencies=[Depends(require_auth)])
 
 
+def _invalidate_person_cache(person_id: str) -> None:
+    """直接修改数据库后使麦麦进程内的人物信息缓存失效"""
+    from src.person_info.person_info import person_info_cache
+
+    person_info_cache.invalidate(person_id)
+
+
 class PersonInfoResponse(BaseModel):
     """人物信息响应"""
 
@@ -275,6 +282,7 @@ async def update_person(
                     setattr(db_person, field, value)
             session.add(db_person)
             person = db_person
+        _invalidate_person_cache(person_id)
 
         logger.info(f"人物信息已更新: {person_id}, 字段: {list(update_data.keys())}")
 
@@ -314,6 +322,7 @@ async def delete_person(person_id: str):
         # 执行删除
         with get_db_session() as session:
             session.exec(delete(PersonInfo).where(col(PersonInfo.person_id) == person_id))
+        _invalidate_person_cache(person_id)
 
         logger.info(f"人物信息已删除: {person_id} ({person_name})")
 
@@ -386,6 +395,7 @@ async def batch_delete_persons(
                     if person:
                         session.exec(delete(PersonInfo).where(col(PersonInfo.person_id) == person_id))
                         deleted_count += 1
+                        _invalidate_person_cache(person_id)
                         logger.info(f"批量删除: {person_id}")
                     else:
                         failed_count += 1
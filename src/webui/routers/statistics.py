@@ -3,15 +3,24 @@
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from sqlalchemy import desc, func, or_
+from sqlalchemy import desc, or_
 from sqlmodel import col, select
 
+from src.chat.utils.statistic_rollup import (
+    HOUR,
+    query_message_totals,
+    query_model_usage_series,
+    query_model_usage_totals,
+    refresh_statistic_rollups,
+)
 from src.common.database.database import get_db_session
 from src.common.database.database_model import ModelUsage, OnlineTime
 from src.common.logger import get_logger
-from src.common.message_repository import count_messages
+from src.platform_io import get_platform_io_manager
 from src.webui.dependencies import require_auth
 
 logger = get_logger("webui.statistics")
@@ -74,6 +83,8 @@ async def get_dashboard_data(hours: int = 24):
         仪表盘数据
     """
     try:
+        await _refresh_rollups()
+
         now = datetime.now()
         start_time = now - timedelta(hours=hours)
 
@@ -105,8 +116,16 @@ async def get_dashboard_data(hours: int = 24):
         raise HTTPException(status_code=500, detail=f"获取统计数据失败: {str(e)}") from e
 
 
+async def _refresh_rollups() -> None:
+    """把新增记录聚合进统计预聚合表，失败时沿用已有聚合数据"""
+    try:
+        await asyncio.to_thread(refresh_statistic_rollups)
+    except Exception as e:
+        logger.warning(f"刷新统计预聚合失败: {e}")
+
+
 async def _get_summary_statistics(start_time: datetime, end_time: datetime) -> StatisticsSummary:
-    """获取摘要统计数据（优化：使用数据库聚合）"""
+    """获取摘要统计数据（读取预聚合表）"""
     summary = StatisticsSummary(
         total_requests=0,
         total_cost=0.0,
@@ -119,22 +138,24 @@ async def _get_summary_statistics(start_time: datetime, end_time: datetime) -> S
         tokens_per_hour=0.0,
     )
 
-    # 使用聚合查询替代全量加载
-    with get_db_session() as session:
-        statement = select(
-            func.count().label("total_requests"),
-            func.sum(col(ModelUsage.cost)).label("total_cost"),
-            func.sum(col(ModelUsage.total_tokens)).label("total_tokens"),
-            func.avg(col(ModelUsage.time_cost)).label("avg_response_time"),
-        ).where(col(ModelUsage.timestamp) >= start_time, col(ModelUsage.timestamp) <= end_time)
-        result = session.exec(statement).first()
-
-    if result:
-        total_requests, total_cost, total_tokens, avg_response_time = result
-        summary.total_requests = total_requests or 0
-        summary.total_cost = float(total_cost or 0.0)
-        summary.total_tokens = total_tokens or 0
-        summary.avg_response_time = float(avg_response_time or 0.0)
+    with get_db_session(auto_commit=False) as session:
+        usage_rows = query_model_usage_totals(session, start_time, end_time, end_time)
+        message_rows = query_message_totals(session, start_time, end_time, end_time)
+
+    time_cost_sum = 0.0
+    time_cost_count = 0
+    for row in usage_rows:
+        summary.total_requests += int(row[3] or 0)
+        summary.total_tokens += int(row[6] or 0)
+        summary.total_cost += float(row[7] or 0.0)
+        time_cost_sum += float(row[8] or 0.0)
+        time_cost_count += int(row[10] or 0)
+    if time_cost_count > 0:
+        summary.avg_response_time = time_cost_sum / time_cost_count
+
+    for _, message_count, _, reply_message_count in message_rows:
+        summary.total_messages += int(message_count or 0)
+        summary.total_replies += int(reply_message_count or 0)
 
     # 查询在线时间 - 这个数据量通常不大，保留原逻辑
     with get_db_session() as session:
@@ -152,13 +173,6 @@ async def _get_summary_statistics(start_time: datetime, end_time: datetime) -> S
             if end > start:
                 summary.online_time += (end - start).total_seconds()
 
-    summary.total_messages = count_messages(start_time=start_time.timestamp(), end_time=end_time.timestamp())
-    summary.total_replies = count_messages(
-        start_time=start_time.timestamp(),
-        end_time=end_time.timestamp(),
-        has_reply_to=True,
-    )
-
     # 计算派生指标
     if summary.online_time > 0:
         online_hours = summary.online_time / 3600.0
@@ -169,36 +183,28 @@ async def _get_summary_statistics(start_time: datetime, end_time: datetime) -> S
 
 
 async def _get_model_statistics(start_time: datetime) -> List[ModelStatistics]:
-    """获取模型统计数据（优化：使用数据库聚合和分组）"""
-    # 使用GROUP BY聚合，避免全量加载
-    statement = (
-        select(ModelUsage)
-        .where(col(ModelUsage.timestamp) >= start_time)
-        .order_by(desc(col(ModelUsage.timestamp)))
-        .limit(200)
-    )
-
-    with get_db_session() as session:
-        rows = session.exec(statement).all()
-
-        aggregates: Dict[str, Dict[str, float | int]] = {}
-        for record in rows:
-            model_name = record.model_assign_name or record.model_name or "unknown"
-            if model_name not in aggregates:
-                aggregates[model_name] = {
-                    "request_count": 0,
-                    "total_cost": 0.0,
-                    "total_tokens": 0,
-                    "total_time_cost": 0.0,
-                    "time_cost_count": 0,
-                }
-            bucket = aggregates[model_name]
-            bucket["request_count"] = int(bucket["request_count"]) + 1
-            bucket["total_cost"] = float(bucket["total_cost"]) + float(record.cost or 0.0)
-            bucket["total_tokens"] = int(bucket["total_tokens"]) + int(record.total_tokens or 0)
-            if record.time_cost:
-                bucket["total_time_cost"] = float(bucket["total_time_cost"]) + float(record.time_cost)
-                bucket["time_cost_count"] = int(bucket["time_cost_count"]) + 1
+    """获取模型统计数据（读取预聚合表）"""
+    now = datetime.now()
+    with get_db_session(auto_commit=False) as session:
+        rows = query_model_usage_totals(session, start_time, now, now)
+
+    aggregates: Dict[str, Dict[str, float | int]] = {}
+    for row in rows:
+        model_name = row[2]
+        if model_name not in aggregates:
+            aggregates[model_name] = {
+                "request_count": 0,
+                "total_cost": 0.0,
+                "total_tokens": 0,
+                "total_time_cost": 0.0,
+                "time_cost_count": 0,
+            }
+        bucket = aggregates[model_name]
+        bucket["request_count"] = int(bucket["request_count"]) + int(row[3] or 0)
+        bucket["total_tokens"] = int(bucket["total_tokens"]) + int(row[6] or 0)
+        bucket["total_cost"] = float(bucket["total_cost"]) + float(row[7] or 0.0)
+        bucket["total_time_cost"] = float(bucket["total_time_cost"]) + float(row[8] or 0.0)
+        bucket["time_cost_count"] = int(bucket["time_cost_count"]) + int(row[10] or 0)
 
     result: List[ModelStatistics] = []
     for model_name, bucket in sorted(
@@ -221,88 +227,47 @@ async def _get_model_statistics(start_time: datetime) -> List[ModelStatistics]:
     return result
 
 
-async def _get_hourly_statistics(start_time: datetime, end_time: datetime) -> List[TimeSeriesData]:
-    """获取小时级统计数据（优化：使用数据库聚合）"""
-    # SQLite的日期时间函数进行小时分组
-    # 使用strftime将timestamp格式化为小时级别
-    hour_expr = func.strftime("%Y-%m-%dT%H:00:00", col(ModelUsage.timestamp))
-    statement = (
-        select(
-            hour_expr.label("hour"),
-            func.count().label("requests"),
-            func.sum(col(ModelUsage.cost)).label("cost"),
-            func.sum(col(ModelUsage.total_tokens)).label("tokens"),
-        )
-        .where(col(ModelUsage.timestamp) >= start_time, col(ModelUsage.timestamp) <= end_time)
-        .group_by(hour_expr)
-    )
+def _get_usage_series(start_time: datetime, end_time: datetime, label_format: str) -> Dict[str, List[float | int]]:
+    """按标签格式把小时预聚合桶合并为时间序列 {标签: [请求数, 花费, token数]}"""
+    with get_db_session(auto_commit=False) as session:
+        rows = query_model_usage_series(session, start_time, end_time, HOUR)
+
+    data_dict: Dict[str, List[float | int]] = {}
+    for bucket_start, _, _, request_count, _, _, total_tokens, cost in rows:
+        item = data_dict.setdefault(bucket_start.strftime(label_format), [0, 0.0, 0])
+        item[0] = int(item[0]) + int(request_count or 0)
+        item[1] = float(item[1]) + float(cost or 0.0)
+        item[2] = int(item[2]) + int(total_tokens or 0)
+    return data_dict
 
-    with get_db_session() as session:
-        rows = session.exec(statement).all()
 
-    # 转换为字典以快速查找
-    data_dict = {row[0]: row for row in rows}
+async def _get_hourly_statistics(start_time: datetime, end_time: datetime) -> List[TimeSeriesData]:
+    """获取小时级统计数据（读取小时预聚合桶）"""
+    data_dict = _get_usage_series(start_time, end_time, "%Y-%m-%dT%H:00:00")
 
     # 填充所有小时（包括没有数据的）
     result = []
     current = start_time.replace(minute=0, second=0, microsecond=0)
     while current <= end_time:
         hour_str = current.strftime("%Y-%m-%dT%H:00:00")
-        if hour_str in data_dict:
-            row = data_dict[hour_str]
-            result.append(
-                TimeSeriesData(
-                    timestamp=hour_str,
-                    requests=row[1] or 0,
-                    cost=float(row[2] or 0.0),
-                    tokens=row[3] or 0,
-                )
-            )
-        else:
-            result.append(TimeSeriesData(timestamp=hour_str, requests=0, cost=0.0, tokens=0))
+        requests, cost, tokens = data_dict.get(hour_str, (0, 0.0, 0))
+        result.append(TimeSeriesData(timestamp=hour_str, requests=int(requests), cost=float(cost), tokens=int(tokens)))
         current += timedelta(hours=1)
 
     return result
 
 
 async def _get_daily_statistics(start_time: datetime, end_time: datetime) -> List[TimeSeriesData]:
-    """获取日级统计数据（优化：使用数据库聚合）"""
-    # 使用strftime按日期分组
-    day_expr = func.strftime("%Y-%m-%dT00:00:00", col(ModelUsage.timestamp))
-    statement = (
-        select(
-            day_expr.label("day"),
-            func.count().label("requests"),
-            func.sum(col(ModelUsage.cost)).label("cost"),
-            func.sum(col(ModelUsage.total_tokens)).label("tokens"),
-        )
-        .where(col(ModelUsage.timestamp) >= start_time, col(ModelUsage.timestamp) <= end_time)
-        .group_by(day_expr)
-    )
-
-    with get_db_session() as session:
-        rows = session.exec(statement).all()
-
-    # 转换为字典
-    data_dict = {row[0]: row for row in rows}
+    """获取日级统计数据（读取小时预聚合桶并按日合并）"""
+    data_dict = _get_usage_series(start_time, end_time, "%Y-%m-%dT00:00:00")
 
     # 填充所有天
     result = []
     current = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
     while current <= end_time:
         day_str = current.strftime("%Y-%m-%dT00:00:00")
-        if day_str in data_dict:
-            row = data_dict[day_str]
-            result.append(
-                TimeSeriesData(
-                    timestamp=day_str,
-                    requests=row[1] or 0,
-                    cost=float(row[2] or 0.0),
-                    tokens=row[3] or 0,
-                )
-            )
-        else:
-            result.append(TimeSeriesData(timestamp=day_str, requests=0, cost=0.0, tokens=0))
+        requests, cost, tokens = data_dict.get(day_str, (0, 0.0, 0))
+        result.append(TimeSeriesData(timestamp=day_str, requests=int(requests), cost=float(cost), tokens=int(tokens)))
         current += timedelta(days=1)
 
     return result
@@ -340,6 +305,7 @@ async def get_summary(hours: int = 24):
         hours: 统计时间范围（小时）
     """
     try:
+        await _refresh_rollups()
         now = datetime.now()
         start_time = now - timedelta(hours=hours)
         summary = await _get_summary_statistics(start_time, now)
@@ -358,6 +324,7 @@ async def get_model_stats(hours: int = 24):
         hours: 统计时间范围（小时）
     """
     try:
+        await _refresh_rollups()
         now = datetime.now()
         start_time = now - timedelta(hours=hours)
         stats = await _get_model_statistics(start_time)
@@ -365,3 +332,17 @@ async def get_model_stats(hours: int = 24):
     except Exception as e:
         logger.error(f"获取模型统计失败: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/inbound-queues")
+async def get_inbound_queue_stats(limit: int = 20):
+    """
+    获取 Platform IO 入站队列的深度与削峰统计
+
+    Args:
+        limit: 按队列深度降序返回的会话数量上限
+    """
+    scheduler = get_platform_io_manager().inbound_scheduler
+    if scheduler is None:
+        return {"enabled": False, "sessions": []}
+    return {"enabled": True, **scheduler.stats(limit=max(1, limit))}